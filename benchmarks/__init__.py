@@ -0,0 +1,12 @@
+"""
+Finmail micro-benchmarks.
+
+Run them from the repository root with ``make bench``. Benchmarks never reach
+Google services, so placeholder credentials are set (as pytest-env does for the
+tests) when none are configured.
+"""
+
+import os
+
+os.environ.setdefault("GOOGLE_JSON_KEY", '{"key": "value"}')
+os.environ.setdefault("GOOGLE_SPREADSHEET_IDENTIFIER", "benchmark_spreadsheet")
@@ -0,0 +1,22 @@
+"""Run every Finmail micro-benchmark."""
+
+from benchmarks import (
+    bench_batch,
+    bench_dates,
+    bench_payloads,
+    bench_records,
+    bench_rules,
+    bench_sinks,
+    bench_text,
+)
+
+for module in (
+    bench_text,
+    bench_dates,
+    bench_payloads,
+    bench_sinks,
+    bench_records,
+    bench_batch,
+    bench_rules,
+):
+    module.main()
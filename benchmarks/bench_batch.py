@@ -0,0 +1,106 @@
+"""Benchmarks for the columnar `TransactionBatch` against lists of records."""
+
+import tempfile
+from collections import defaultdict
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from benchmarks.common import measure, report
+from shared_code.finmail.domain.dedup import transaction_fingerprint
+from shared_code.finmail.models import TransactionRecord
+from shared_code.finmail.sinks import build_local_sink
+
+BATCH_SIZE = 10_000
+
+
+def _records() -> list[TransactionRecord]:
+    start = datetime(2026, 1, 1, 8, 0)
+    return [
+        TransactionRecord(
+            date_local=start + timedelta(minutes=i % 9_000),
+            pocket=f"Pocket {i % 4}",
+            category=f"Category {i % 20}",
+            currency="COP",
+            amount=-1000.0 * (i % 9_000),
+            merchant=f"Merchant {i % 50}",
+        )
+        for i in range(BATCH_SIZE)
+    ]
+
+
+def _totals(records: list[TransactionRecord]) -> dict[str, float]:
+    totals: dict[str, float] = defaultdict(float)
+    for record in records:
+        totals[record.category] += record.amount
+    return totals
+
+
+def _unique(records: list[TransactionRecord]) -> list[TransactionRecord]:
+    seen = {}
+    for record in records:
+        seen.setdefault(transaction_fingerprint(record), record)
+    return list(seen.values())
+
+
+def main() -> None:
+    """Run the batch benchmarks."""
+    try:
+        from shared_code.finmail.batch import TransactionBatch  # noqa: PLC0415
+    except ImportError:
+        print("batch benchmarks skipped: numpy not installed")
+        return
+    records = _records()
+    batch = TransactionBatch.from_transactions(records)
+
+    report(
+        f"convert {BATCH_SIZE}: records to batch",
+        measure(lambda: TransactionBatch.from_transactions(records), 3, 3),
+    )
+    report(
+        f"convert {BATCH_SIZE}: batch to records",
+        measure(batch.to_records, 3, 3),
+    )
+    report(
+        f"total {BATCH_SIZE} by category: batch",
+        measure(lambda: batch.totals_by("category"), 100, 3),
+        measure(lambda: _totals(records), 10, 3),
+    )
+    report(
+        f"filter {BATCH_SIZE} expenses in a pocket: batch",
+        measure(
+            lambda: batch.select(
+                (batch.amount < 0) & batch.isin("pocket", ["Pocket 1"])
+            ),
+            100,
+            3,
+        ),
+        measure(
+            lambda: [r for r in records if r.amount < 0 and r.pocket == "Pocket 1"],
+            10,
+            3,
+        ),
+    )
+    report(
+        f"drop duplicates of {BATCH_SIZE}: batch",
+        measure(batch.drop_duplicates, 3, 3),
+        measure(lambda: _unique(records), 3, 3),
+    )
+
+    transactions = [record.to_model() for record in records]
+    with tempfile.TemporaryDirectory() as directory:
+        for kind in ("csv", "parquet", "sqlite"):
+            path = Path(directory) / f"ledger.{kind}"
+            try:
+                sink = build_local_sink(path, kind=kind)
+            except ImportError:
+                print(f"{kind} sink skipped: optional dependency not installed")
+                continue
+            report(
+                f"{kind} sink: write_batch of {BATCH_SIZE}",
+                measure(lambda sink=sink: sink.write_batch(batch), 3, 3),
+                measure(lambda sink=sink: sink.write(transactions), 3, 3),
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""Benchmarks for date parsing."""
+
+from datetime import UTC, datetime
+
+from dateutil import tz
+
+from benchmarks.common import measure, report
+from shared_code.finmail.utils.dates import MONTHS_ES, parse_datetime_str
+
+BOGOTA = tz.gettz("America/Bogota")
+
+
+def _reference_spanish(date_str: str, time_str: str) -> datetime:
+    # Implementation before the table-driven parser
+    ds = date_str.lower()
+    for spanish, digit in MONTHS_ES.items():
+        ds = ds.replace(spanish, digit).replace(" de ", "/")
+    return datetime.strptime(f"{ds} {time_str}".strip(), "%d/%m/%Y %I:%M %p")
+
+
+def _reference_utc(date_str: str, time_str: str) -> datetime:
+    value = datetime.strptime(f"{date_str} {time_str}", "%d/%m/%Y %H:%M")
+    return value.replace(tzinfo=UTC).astimezone(BOGOTA)
+
+
+def main() -> None:
+    """Run the date parsing benchmarks."""
+    report(
+        "parse spanish date (30 de enero de 2026 10:10 am)",
+        measure(lambda: parse_datetime_str("30 de enero de 2026", "10:10 am"), 10_000),
+        measure(lambda: _reference_spanish("30 de enero de 2026", "10:10 am"), 10_000),
+    )
+    report(
+        "parse UTC date (24/10/2025 04:15) to local",
+        measure(
+            lambda: parse_datetime_str(
+                "24/10/2025", "04:15", source_tz=UTC, target_tz=BOGOTA
+            ),
+            10_000,
+        ),
+        measure(lambda: _reference_utc("24/10/2025", "04:15"), 10_000),
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""Benchmarks for the request validation of `EmailPayload` and JSON coding."""
+
+import json
+from datetime import UTC, datetime
+
+import azure.functions as func
+from dateutil import tz
+
+from benchmarks.common import HTML_SAMPLES_DIR, measure, report
+from shared_code.finmail.core.config import settings
+from shared_code.finmail.models import EmailPayload, Transaction, normalize_sender
+from shared_code.finmail.responses import read_payload
+from shared_code.finmail.utils import serialization
+from shared_code.finmail.utils.dates import get_timezone
+from shared_code.finmail.utils.serialization import dumps
+
+BATCH_SIZE = 32
+
+SENDERS = ("notificaciones@rappicard.co", "RappiPay <alertas@rappipay.co>")
+
+
+def _document(sender: str, html: str) -> dict:
+    return {
+        "subject": "Compra aprobada",
+        "sender": sender,
+        "html": html,
+        "received_at": "2026-01-30T15:10:00",
+    }
+
+
+def main() -> None:
+    """Run the payload validation benchmarks."""
+    received_at = datetime(2026, 1, 30, 15, 10, tzinfo=UTC)
+    report(
+        "normalize received_at: cached zoneinfo",
+        measure(lambda: received_at.astimezone(get_timezone(settings.DEFAULT_TZ))),
+        measure(lambda: received_at.astimezone(tz.gettz(settings.DEFAULT_TZ))),
+    )
+
+    # Without HTML, to isolate the validation overhead
+    data = _document(SENDERS[0], "<p>Compra aprobada</p>")
+
+    def first_seen(mode: str) -> EmailPayload:
+        normalize_sender.cache_clear()
+        settings.SENDER_VALIDATION = mode
+        return EmailPayload(**data)
+
+    mode = settings.SENDER_VALIDATION
+    try:
+        report(
+            "validate payload, first-seen sender: fast check",
+            measure(lambda: first_seen("fast"), 1_000),
+            measure(lambda: first_seen("full"), 1_000),
+        )
+    finally:
+        settings.SENDER_VALIDATION = mode
+    report(
+        "validate payload, repeated sender",
+        measure(lambda: EmailPayload(**data), 1_000),
+    )
+
+    html = (HTML_SAMPLES_DIR / "rappicard.html").read_text(encoding="utf-8")
+    documents = [
+        json.dumps(_document(SENDERS[i % len(SENDERS)], html))
+        for i in range(BATCH_SIZE)
+    ]
+    report(
+        f"validate batch of {BATCH_SIZE} JSON payloads with HTML",
+        measure(lambda: EmailPayload.validate_batch_json(documents), 20),
+    )
+
+    decoder = "orjson" if serialization.orjson else "stdlib, orjson not installed"
+    for copies in (1, 20):
+        body = json.dumps(_document(SENDERS[0], html * copies)).encode()
+        request = func.HttpRequest(method="POST", url="/api/ingest", body=body)
+        report(
+            f"read request of {len(body) // 1024} KiB: {decoder}",
+            measure(lambda request=request: read_payload(request), 100 // copies),
+            measure(lambda body=body: EmailPayload(**json.loads(body)), 100 // copies),
+        )
+
+    transaction = Transaction(
+        date_local=datetime(2026, 1, 30, 10, 10),
+        pocket="RappiCard",
+        currency="COP",
+        amount=-25000.0,
+        merchant="Rappi",
+    )
+    sinks = [{"name": "sqlite", "ok": True, "elapsed_ms": 1.2, "error": None}]
+    report(
+        "encode ingest response: pydantic-core",
+        measure(lambda: dumps({"ok": True, "processed": transaction, "sinks": sinks})),
+        measure(
+            lambda: json.dumps({
+                "ok": True,
+                "processed": transaction.model_dump(mode="json"),
+                "sinks": sinks,
+            })
+        ),
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Benchmarks for `TransactionRecord` against the `Transaction` model."""
+
+import pickle  # noqa: S403
+import tracemalloc
+from datetime import datetime, timedelta
+
+from benchmarks.common import measure, report
+from shared_code.finmail.domain.classification import (
+    ClassificationRule,
+    StaticRuleProvider,
+    TransactionClassifier,
+)
+from shared_code.finmail.models import Transaction, TransactionRecord
+
+BATCH_SIZE = 10_000
+
+
+def _transactions() -> list[Transaction]:
+    start = datetime(2026, 1, 1, 8, 0)
+    return [
+        Transaction(
+            date_local=start + timedelta(minutes=i),
+            pocket="RappiCard",
+            currency="COP",
+            amount=-1000.0 * i,
+            merchant=f"Merchant {i % 50}",
+        )
+        for i in range(BATCH_SIZE)
+    ]
+
+
+def _bytes_per_item(build: object) -> float:
+    tracemalloc.start()
+    items = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del items
+    return size / BATCH_SIZE
+
+
+def main() -> None:
+    """Run the record benchmarks."""
+    transactions = _transactions()
+    records = [TransactionRecord.from_model(t) for t in transactions]
+
+    model_size = _bytes_per_item(lambda: [t.model_copy() for t in transactions])
+    record_size = _bytes_per_item(lambda: [r.with_category("X") for r in records])
+    print(
+        f"memory per transaction: model {model_size:.0f} B, "
+        f"record {record_size:.0f} B ({model_size / record_size:.1f}x)"
+    )
+
+    copy_model = measure(
+        lambda: [t.model_copy(update={"category": "X"}) for t in transactions], 3, 3
+    )
+    copy_record = measure(lambda: [r.with_category("X") for r in records], 3, 3)
+    report(f"copy {BATCH_SIZE} with a category: record", copy_record, copy_model)
+
+    pickle_model = measure(lambda: pickle.loads(pickle.dumps(transactions)), 3, 3)  # noqa: S301
+    pickle_record = measure(lambda: pickle.loads(pickle.dumps(records)), 3, 3)  # noqa: S301
+    report(f"pickle round trip of {BATCH_SIZE}: record", pickle_record, pickle_model)
+
+    report(
+        f"convert {BATCH_SIZE}: model to record",
+        measure(lambda: [TransactionRecord.from_model(t) for t in transactions], 3, 3),
+    )
+    report(
+        f"convert {BATCH_SIZE}: record to model",
+        measure(lambda: [r.to_model() for r in records], 3, 3),
+    )
+
+    rules = [
+        ClassificationRule(conditions=f"merchant:^merchant {i}$", category=f"C{i}")
+        for i in range(0, 50, 2)
+    ]
+    classifier = TransactionClassifier(rule_provider=StaticRuleProvider(rules))
+    classify_model = measure(lambda: classifier.classify_batch(transactions), 3, 3)
+    classify_record = measure(lambda: classifier.classify_batch(records), 3, 3)
+    report(f"classify_batch of {BATCH_SIZE}: record", classify_record, classify_model)
+
+
+if __name__ == "__main__":
+    main()
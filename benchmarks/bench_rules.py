@@ -0,0 +1,59 @@
+"""Benchmarks for loading large classification rule sets."""
+
+from benchmarks.common import measure, report
+from shared_code.finmail.domain.classification import (
+    ClassificationRule,
+    StaticRuleProvider,
+    TransactionClassifier,
+)
+from shared_code.finmail.domain.classification.comparisons import (
+    IntervalIndex,
+    parse_comparison,
+)
+
+OPERATORS = ("<", "<=", ">", ">=", "=")
+
+
+def _constraints(count: int) -> dict:
+    # One amount comparison per rule, with a distinct bound each
+    return {
+        position: [
+            parse_comparison(
+                "amount", f"{OPERATORS[position % 5]}{(position * 7919) % 100_000}"
+            )
+        ]
+        for position in range(count)
+    }
+
+
+def _rules(count: int) -> list[ClassificationRule]:
+    return [
+        ClassificationRule(
+            conditions=f"merchant:shop {i} AND amount:<{-1000 * i}",
+            category=f"Category {i % 20}",
+        )
+        for i in range(count)
+    ]
+
+
+def main() -> None:
+    """Run the rule loading benchmarks."""
+    for count in (1_000, 3_000):
+        constraints = _constraints(count)
+        report(
+            f"index {count} rules by amount",
+            measure(lambda: IntervalIndex(range(count), constraints), 1, 3),  # noqa: B023
+        )
+    rules = _rules(1_000)
+    report(
+        "load and compile 1000 rules",
+        measure(
+            lambda: TransactionClassifier(StaticRuleProvider(rules)).refresh_rules(),
+            1,
+            3,
+        ),
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""Benchmarks for the local sinks (no network)."""
+
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from benchmarks.common import measure, report
+from shared_code.finmail.models import Transaction
+from shared_code.finmail.sinks import LOCAL_SINKS, build_local_sink
+
+BATCH_SIZE = 500
+
+
+def _transactions() -> list[Transaction]:
+    start = datetime(2026, 1, 1, 8, 0)
+    return [
+        Transaction(
+            date_local=start + timedelta(minutes=i),
+            pocket="RappiCard",
+            currency="COP",
+            amount=-1000.0 * i,
+            merchant=f"Merchant {i % 50}",
+        )
+        for i in range(BATCH_SIZE)
+    ]
+
+
+def main() -> None:
+    """Run the sink benchmarks."""
+    transactions = _transactions()
+    with tempfile.TemporaryDirectory() as directory:
+        for kind in sorted(LOCAL_SINKS):
+            try:
+                sink = build_local_sink(Path(directory) / f"ledger.{kind}", kind=kind)
+            except ImportError:
+                print(f"{kind} sink skipped: optional dependency not installed")
+                continue
+            report(
+                f"{kind} sink: write batch of {BATCH_SIZE}",
+                measure(lambda sink=sink: sink.write(transactions), 10, 3),
+            )
+            report(
+                f"{kind} sink: write single transaction",
+                measure(lambda sink=sink: sink.write(transactions[:1]), 200, 3),
+            )
+
+
+if __name__ == "__main__":
+    main()
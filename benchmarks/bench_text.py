@@ -0,0 +1,49 @@
+"""Benchmarks for text normalization on parser workloads."""
+
+import re
+import unicodedata
+from unittest import mock
+
+from benchmarks.common import load_soup, measure, report
+from shared_code.finmail.domain.parsers import RappiCardParser, RappiPayParser
+from shared_code.finmail.utils import text
+
+SAMPLES = {
+    "rappicard.html": RappiCardParser(),
+    "rappipay_bank_transfer_in.html": RappiPayParser(),
+    "rappipay_pse_payment.html": RappiPayParser(),
+}
+
+
+def _reference_normalize(s: str | None) -> str | None:
+    # Implementation before the ASCII fast path and the LRU cache
+    if s is None:
+        return None
+    s = unicodedata.normalize("NFKD", s).encode("ascii", "ignore").decode("ascii")
+    return re.sub(r"\s+", " ", s).strip().lower()
+
+
+def main() -> None:
+    """Run the text normalization benchmarks."""
+    for sample, parser in SAMPLES.items():
+        soup = load_soup(sample)
+        texts = [p.get_text() for p in soup.find_all("p")]
+        name = f"{len(texts)} paragraphs ({sample})"
+
+        baseline = measure(lambda texts=texts: [_reference_normalize(t) for t in texts])
+        uncached = measure(lambda texts=texts: [text._normalize(t) for t in texts])
+        cached = measure(lambda texts=texts: [text.normalize(t) for t in texts])
+        report(f"normalize uncached {name}", uncached, baseline)
+        report(f"normalize cached {name}", cached, baseline)
+
+        parser_module = type(parser).__module__
+        with mock.patch(f"{parser_module}.normalize", _reference_normalize):
+            parse_baseline = measure(
+                lambda parser=parser, soup=soup: parser.parse("", "", soup)
+            )
+        parse = measure(lambda parser=parser, soup=soup: parser.parse("", "", soup))
+        report(f"{type(parser).__name__}.parse ({sample})", parse, parse_baseline)
+
+
+if __name__ == "__main__":
+    main()
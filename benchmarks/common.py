@@ -0,0 +1,71 @@
+"""Shared helpers for the micro-benchmarks."""
+
+import timeit
+from collections.abc import Callable
+from pathlib import Path
+
+from bs4 import BeautifulSoup
+
+from shared_code.finmail.utils.html import clean_html
+
+HTML_SAMPLES_DIR = Path("tests/html_samples")
+
+
+def load_soup(sample: str) -> BeautifulSoup:
+    """
+    Load and clean one of the HTML samples used by the tests.
+
+    Parameters
+    ----------
+    sample : str
+        File name of the sample inside `tests/html_samples`.
+
+    Returns
+    -------
+    BeautifulSoup
+        The parsed and cleaned sample.
+    """
+    html = (HTML_SAMPLES_DIR / sample).read_text(encoding="utf-8")
+    soup = BeautifulSoup(html, "lxml")
+    clean_html(soup)
+    return soup
+
+
+def measure(func: Callable[[], object], number: int = 100, repeat: int = 5) -> float:
+    """
+    Measure the best time per call of `func`.
+
+    Parameters
+    ----------
+    func : Callable[[], object]
+        The workload to measure.
+    number : int, optional
+        Calls per measurement, by default 100.
+    repeat : int, optional
+        Number of measurements, the best one is kept. By default 5.
+
+    Returns
+    -------
+    float
+        Seconds per call.
+    """
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number
+
+
+def report(name: str, seconds: float, baseline: float | None = None) -> None:
+    """
+    Print a benchmark result, with the speedup over `baseline` if given.
+
+    Parameters
+    ----------
+    name : str
+        Name of the benchmark.
+    seconds : float
+        Seconds per call.
+    baseline : float | None, optional
+        Seconds per call of the reference implementation.
+    """
+    line = f"{name:<64} {seconds * 1e6:>12.2f} us/call"
+    if baseline:
+        line += f"  ({baseline / seconds:.1f}x)"
+    print(line)
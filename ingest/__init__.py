@@ -1,51 +1,100 @@
 """Finmail Ingest Function for Azure Functions."""
 
-import json
+import logging
 
 import azure.functions as func
 
 from shared_code.finmail.core.classifier import transaction_classifier
 from shared_code.finmail.core.config import settings
-from shared_code.finmail.core.google_client import google_sheets_client
+from shared_code.finmail.core.dedup import dedup_index
+from shared_code.finmail.core.idempotency import response_cache
+from shared_code.finmail.core.metrics import stage_histograms
+from shared_code.finmail.core.queue import ingest_queue
+from shared_code.finmail.core.sinks import transaction_sink
+from shared_code.finmail.core.tracing import trace_function
 from shared_code.finmail.domain.ingest import process_email
-from shared_code.finmail.models import EmailPayload, Transaction
-
-
-def _get_response(
-    transaction: Transaction | None, payload: EmailPayload
-) -> func.HttpResponse:
-    if transaction:
-        return func.HttpResponse(
-            json.dumps({
-                "ok": True,
-                "subject": payload.subject,
-                "processed": transaction.model_dump(mode="json"),
-            }),
-            mimetype="application/json",
-            status_code=200,
-        )
-    return func.HttpResponse(
-        json.dumps({"ok": False, "subject": payload.subject, "processed": None}),
-        mimetype="application/json",
-        status_code=200,
-    )
+from shared_code.finmail.exceptions import (
+    EmailRejectedError,
+    SinkWriteError,
+    TransactionInProgressError,
+)
+from shared_code.finmail.models import EmailPayload
+from shared_code.finmail.responses import (
+    IDEMPOTENCY_HEADER,
+    build_in_progress_response,
+    build_queued_response,
+    build_response,
+    build_sink_error_response,
+    cache_response,
+    get_replayed_response,
+    read_payload,
+)
+from shared_code.finmail.utils.timing import StageTimer
 
+logger = logging.getLogger(__name__)
 
-def main(req: func.HttpRequest) -> func.HttpResponse:  # noqa: D103
+
+def _process(payload: EmailPayload) -> func.HttpResponse:
+    timer = StageTimer()
+    debug_timings = timer.as_ms if settings.DEBUG_TIMINGS else lambda: None
     try:
-        data = req.get_json()
-    except Exception:
-        return func.HttpResponse("Bad JSON", status_code=400)
+        processed = process_email(
+            payload=payload,
+            sink=transaction_sink,
+            classifier=(
+                transaction_classifier if settings.ENABLE_CLASSIFICATION else None
+            ),
+            dedup_index=dedup_index if settings.ENABLE_DEDUP else None,
+            timer=timer,
+        )
+        response = build_response(
+            result=processed, payload=payload, timings=debug_timings()
+        )
+    except EmailRejectedError as e:
+        response = build_response(
+            result=None, payload=payload, rejected=e.reason, timings=debug_timings()
+        )
+    except SinkWriteError as e:
+        response = build_sink_error_response(
+            payload, e.results, timings=debug_timings()
+        )
+    except TransactionInProgressError as e:
+        response = build_in_progress_response(payload, str(e), timings=debug_timings())
 
+    logger.info("Ingest stage timings for %r: %s", payload.subject, timer.format())
+    stage_histograms.record(timer.timings)
+    return response
+
+
+def _enqueue(payload: EmailPayload) -> func.HttpResponse:
     try:
-        payload = EmailPayload(**data)
-    except Exception as e:
-        return func.HttpResponse(f"Validation error: {e}", status_code=422)
+        message_id = ingest_queue.enqueue(payload.model_dump_json())
+    except ValueError:
+        logger.warning(
+            "Email from %s too large for the queue; processing it inline",
+            payload.sender,
+            exc_info=True,
+        )
+        return _process(payload)
+    return build_queued_response(payload, message_id)
+
+
+@trace_function("ingest", trigger="http")
+def main(req: func.HttpRequest) -> func.HttpResponse:  # noqa: D103
+    # Retries carrying the header are answered before the body is even parsed
+    idempotency_key = req.headers.get(IDEMPOTENCY_HEADER)
+    if replayed := get_replayed_response(response_cache, idempotency_key):
+        return replayed
+
+    payload = read_payload(req)
+    if isinstance(payload, func.HttpResponse):
+        return payload
 
-    processed = process_email(
-        payload=payload,
-        google_sheets_client=google_sheets_client,
-        classifier=transaction_classifier if settings.ENABLE_CLASSIFICATION else None,
-    )
+    if not idempotency_key and payload.message_id:
+        idempotency_key = payload.message_id
+        if replayed := get_replayed_response(response_cache, idempotency_key):
+            return replayed
 
-    return _get_response(transaction=processed, payload=payload)
+    response = _process(payload) if ingest_queue is None else _enqueue(payload)
+    cache_response(response_cache, idempotency_key, response)
+    return response
@@ -0,0 +1,91 @@
+"""
+Finmail Async Ingest Function for Azure Functions.
+
+Same contract as the ``ingest`` function, but parsing runs in an executor and
+Google Sheets is written through the async client, so a worker can overlap
+many in-flight emails instead of idling on Sheets round trips.
+"""
+
+import logging
+
+import azure.functions as func
+
+from shared_code.finmail.core.aio import async_transaction_sink, parse_executor
+from shared_code.finmail.core.classifier import transaction_classifier
+from shared_code.finmail.core.config import settings
+from shared_code.finmail.core.dedup import dedup_index
+from shared_code.finmail.core.idempotency import response_cache
+from shared_code.finmail.core.metrics import stage_histograms
+from shared_code.finmail.core.tracing import trace_function
+from shared_code.finmail.domain.ingest import process_email_async
+from shared_code.finmail.exceptions import (
+    EmailRejectedError,
+    SinkWriteError,
+    TransactionInProgressError,
+)
+from shared_code.finmail.models import EmailPayload
+from shared_code.finmail.responses import (
+    IDEMPOTENCY_HEADER,
+    build_in_progress_response,
+    build_response,
+    build_sink_error_response,
+    cache_response,
+    get_replayed_response,
+    read_payload,
+)
+from shared_code.finmail.utils.timing import StageTimer
+
+logger = logging.getLogger(__name__)
+
+
+async def _process(payload: EmailPayload) -> func.HttpResponse:
+    timer = StageTimer()
+    debug_timings = timer.as_ms if settings.DEBUG_TIMINGS else lambda: None
+    try:
+        processed = await process_email_async(
+            payload=payload,
+            sink=async_transaction_sink,
+            classifier=(
+                transaction_classifier if settings.ENABLE_CLASSIFICATION else None
+            ),
+            dedup_index=dedup_index if settings.ENABLE_DEDUP else None,
+            executor=parse_executor,
+            timer=timer,
+        )
+        response = build_response(
+            result=processed, payload=payload, timings=debug_timings()
+        )
+    except EmailRejectedError as e:
+        response = build_response(
+            result=None, payload=payload, rejected=e.reason, timings=debug_timings()
+        )
+    except SinkWriteError as e:
+        response = build_sink_error_response(
+            payload, e.results, timings=debug_timings()
+        )
+    except TransactionInProgressError as e:
+        response = build_in_progress_response(payload, str(e), timings=debug_timings())
+
+    logger.info("Ingest stage timings for %r: %s", payload.subject, timer.format())
+    stage_histograms.record(timer.timings)
+    return response
+
+
+@trace_function("ingest_async", trigger="http")
+async def main(req: func.HttpRequest) -> func.HttpResponse:  # noqa: D103
+    idempotency_key = req.headers.get(IDEMPOTENCY_HEADER)
+    if replayed := get_replayed_response(response_cache, idempotency_key):
+        return replayed
+
+    payload = read_payload(req)
+    if isinstance(payload, func.HttpResponse):
+        return payload
+
+    if not idempotency_key and payload.message_id:
+        idempotency_key = payload.message_id
+        if replayed := get_replayed_response(response_cache, idempotency_key):
+            return replayed
+
+    response = await _process(payload)
+    cache_response(response_cache, idempotency_key, response)
+    return response
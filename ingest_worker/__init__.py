@@ -0,0 +1,36 @@
+"""
+Finmail Ingest Worker for Azure Functions.
+
+Drains the ingest queue filled by the ``ingest`` function (with
+``INGEST_MODE=queue``) on a timer, processing the emails in batches.
+"""
+
+import logging
+
+import azure.functions as func
+
+from shared_code.finmail.core.classifier import transaction_classifier
+from shared_code.finmail.core.config import settings
+from shared_code.finmail.core.dedup import dedup_index
+from shared_code.finmail.core.queue import ingest_queue
+from shared_code.finmail.core.sinks import transaction_sink
+from shared_code.finmail.core.tracing import trace_function
+from shared_code.finmail.queues import drain_queue
+
+logger = logging.getLogger(__name__)
+
+
+@trace_function("ingest_worker", trigger="timer")
+def main(timer: func.TimerRequest) -> None:  # noqa: ARG001, D103
+    if ingest_queue is None:
+        logger.info("INGEST_MODE is not 'queue'; nothing to drain")
+        return
+    drain_queue(
+        ingest_queue,
+        transaction_sink,
+        classifier=transaction_classifier if settings.ENABLE_CLASSIFICATION else None,
+        dedup_index=dedup_index if settings.ENABLE_DEDUP else None,
+        batch_size=settings.QUEUE_BATCH_SIZE,
+        max_batches=settings.QUEUE_MAX_BATCHES,
+        max_dequeue_count=settings.QUEUE_MAX_DEQUEUE_COUNT,
+    )
@@ -0,0 +1,32 @@
+"""
+Backfill package.
+
+Bulk ingest of archived bank emails (mbox exports or ``.eml`` directories)
+outside the HTTP function. Run it with ``python -m shared_code.finmail.backfill``.
+Transactions are written to any `shared_code.finmail.sinks.TransactionSink`.
+"""
+
+from shared_code.finmail.backfill.checkpoint import BackfillCheckpoint, PendingBatch
+from shared_code.finmail.backfill.runner import (
+    BackfillStats,
+    parse_raw_message,
+    run_backfill,
+)
+from shared_code.finmail.backfill.sources import (
+    RawMessage,
+    iter_eml_dir,
+    iter_mbox,
+    message_to_payload,
+)
+
+__all__ = [
+    "BackfillCheckpoint",
+    "BackfillStats",
+    "PendingBatch",
+    "RawMessage",
+    "iter_eml_dir",
+    "iter_mbox",
+    "message_to_payload",
+    "parse_raw_message",
+    "run_backfill",
+]
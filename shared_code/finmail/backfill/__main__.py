@@ -0,0 +1,141 @@
+"""Command line entry point for backfills."""
+
+import argparse
+import logging
+from pathlib import Path
+
+from shared_code.finmail.backfill.checkpoint import BackfillCheckpoint
+from shared_code.finmail.backfill.runner import run_backfill
+from shared_code.finmail.backfill.sources import iter_eml_dir, iter_mbox
+from shared_code.finmail.core.config import settings
+from shared_code.finmail.domain.classification import TransactionClassifier
+from shared_code.finmail.domain.dedup import DedupIndex
+from shared_code.finmail.sinks import (
+    LOCAL_SINKS,
+    GoogleSheetsSink,
+    TransactionSink,
+    build_local_sink,
+)
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m shared_code.finmail.backfill",
+        description="Backfill transactions from archived bank emails.",
+    )
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--mbox", help="Path of an mbox file (e.g. Gmail Takeout).")
+    source.add_argument("--eml-dir", help="Path of a directory of .eml files.")
+
+    output = parser.add_mutually_exclusive_group(required=True)
+    output.add_argument(
+        "--output",
+        help="Append transactions to this local file (.jsonl, .csv, .db/.sqlite "
+        "or a .parquet directory).",
+    )
+    output.add_argument(
+        "--sheets",
+        action="store_true",
+        help="Insert transactions into the configured Google Sheets worksheet.",
+    )
+
+    parser.add_argument(
+        "--format",
+        choices=sorted(LOCAL_SINKS),
+        help="Format of --output (default: inferred from its suffix).",
+    )
+    parser.add_argument(
+        "--workers", type=int, default=None, help="Worker processes (default: CPUs)."
+    )
+    parser.add_argument(
+        "--batch-size", type=int, default=500, help="Messages per batch (default: 500)."
+    )
+    parser.add_argument(
+        "--no-classify", action="store_true", help="Skip transaction classification."
+    )
+    parser.add_argument(
+        "--checkpoint",
+        help="Save progress to this file and resume from it if it exists.",
+    )
+    parser.add_argument(
+        "--dedup-db",
+        help="Skip transactions recorded in this SQLite dedup index, and record "
+        "the written ones (e.g. the DEDUP_DB_PATH of the function).",
+    )
+    return parser
+
+
+def _build_sink(args: argparse.Namespace) -> TransactionSink:
+    if args.output:
+        return build_local_sink(args.output, kind=args.format)
+
+    # Imported lazily: it authorizes against Google on import
+    from shared_code.finmail.core import google_client  # noqa: PLC0415
+
+    return GoogleSheetsSink(
+        google_sheets_client=google_client.google_sheets_client,
+        spreadsheet_identifier=settings.GOOGLE_SPREADSHEET_IDENTIFIER,
+        worksheet_name=settings.GOOGLE_WORKSHEET_NAME,
+    )
+
+
+def _build_classifier(args: argparse.Namespace) -> TransactionClassifier | None:
+    if args.no_classify or not settings.ENABLE_CLASSIFICATION:
+        return None
+
+    from shared_code.finmail.core import classifier  # noqa: PLC0415
+
+    return classifier.transaction_classifier
+
+
+def main(argv: list[str] | None = None) -> int:
+    """
+    Run a backfill from the command line.
+
+    Parameters
+    ----------
+    argv : list[str] | None, optional
+        The command line arguments. Defaults to `sys.argv`.
+
+    Returns
+    -------
+    int
+        The exit code: 0 if every message was read without errors, 1 otherwise.
+    """
+    args = _build_parser().parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+
+    source = (
+        f"mbox:{Path(args.mbox).resolve()}"
+        if args.mbox
+        else f"eml:{Path(args.eml_dir).resolve()}"
+    )
+    checkpoint = (
+        BackfillCheckpoint.load(args.checkpoint, source) if args.checkpoint else None
+    )
+    # Resume after the messages of the previous runs, pending batch included
+    start, after = 0, None
+    if checkpoint is not None:
+        pending = checkpoint.pending
+        start = checkpoint.offset + (pending.size if pending else 0)
+        after = pending.last_key if pending else checkpoint.last_key
+
+    messages = (
+        iter_mbox(args.mbox, start=start)
+        if args.mbox
+        else iter_eml_dir(args.eml_dir, after=after)
+    )
+    stats = run_backfill(
+        messages,
+        sink=_build_sink(args),
+        classifier=_build_classifier(args),
+        workers=args.workers,
+        batch_size=args.batch_size,
+        checkpoint=checkpoint,
+        dedup_index=DedupIndex(args.dedup_db) if args.dedup_db else None,
+    )
+    return 1 if stats.failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
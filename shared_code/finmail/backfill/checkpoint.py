@@ -0,0 +1,164 @@
+"""
+Backfill checkpoints.
+
+A small JSON state file records how many messages of the source were fully
+processed and, while a batch is being written, the batch itself (write-ahead).
+A restarted backfill skips the processed messages and only re-sends the part
+of the pending batch the sink did not persist, so nothing is parsed twice
+and no row is duplicated.
+"""
+
+import json
+import logging
+import os
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+from shared_code.finmail.models import Transaction
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_VERSION = 1
+
+
+@dataclass(slots=True)
+class PendingBatch:
+    """A batch whose write started but was not confirmed."""
+
+    size: int
+    last_key: str
+    transactions: list[dict]
+    position: int | None = None
+
+    def get_transactions(self) -> list[Transaction]:
+        """
+        Rebuild the transactions of the batch.
+
+        Returns
+        -------
+        list[Transaction]
+            The transactions, in write order.
+        """
+        return [Transaction.model_validate(t) for t in self.transactions]
+
+
+@dataclass(slots=True)
+class BackfillCheckpoint:
+    """Progress of a backfill over a single source, persisted after each batch."""
+
+    path: Path
+    source: str
+    offset: int = 0
+    last_key: str | None = None
+    pending: PendingBatch | None = None
+    extra: dict = field(default_factory=dict)
+
+    @classmethod
+    def load(cls, path: str | Path, source: str) -> "BackfillCheckpoint":
+        """
+        Load the checkpoint of `source`, or start a new one if the file is missing.
+
+        Parameters
+        ----------
+        path : str | Path
+            The state file.
+        source : str
+            Identifier of the source (e.g. ``mbox:/path/to/takeout.mbox``).
+
+        Returns
+        -------
+        BackfillCheckpoint
+            The loaded or new checkpoint.
+
+        Raises
+        ------
+        ValueError
+            If the state file belongs to another source or version.
+        """
+        path = Path(path)
+        if not path.exists():
+            return cls(path=path, source=source)
+
+        state = json.loads(path.read_text(encoding="utf-8"))
+        if state.get("version") != CHECKPOINT_VERSION:
+            raise ValueError(f"Unsupported checkpoint version in {path}")
+        if state["source"] != source:
+            raise ValueError(
+                f"Checkpoint {path} belongs to {state['source']}, not {source}"
+            )
+
+        pending = state.get("pending")
+        checkpoint = cls(
+            path=path,
+            source=source,
+            offset=state["offset"],
+            last_key=state.get("last_key"),
+            pending=PendingBatch(**pending) if pending else None,
+            extra=state.get("extra", {}),
+        )
+        logger.info(
+            "Resuming backfill of %s after %d messages (last: %s)",
+            source,
+            checkpoint.offset,
+            checkpoint.last_key,
+        )
+        return checkpoint
+
+    def save(self) -> None:
+        """Persist the checkpoint atomically (write to a temp file, then rename)."""
+        state = {
+            "version": CHECKPOINT_VERSION,
+            "source": self.source,
+            "offset": self.offset,
+            "last_key": self.last_key,
+            "pending": asdict(self.pending) if self.pending else None,
+            "extra": self.extra,
+        }
+        tmp_path = self.path.with_name(f"{self.path.name}.tmp")
+        tmp_path.write_text(json.dumps(state), encoding="utf-8")
+        os.replace(tmp_path, self.path)
+
+    def set_pending(
+        self,
+        size: int,
+        last_key: str,
+        transactions: list[Transaction],
+        position: int | None,
+    ) -> None:
+        """
+        Record a batch before writing it.
+
+        Parameters
+        ----------
+        size : int
+            Number of source messages in the batch (parsed or not).
+        last_key : str
+            Key of the last message of the batch.
+        transactions : list[Transaction]
+            The transactions about to be written.
+        position : int | None
+            The sink position before the write, if the sink reports one.
+        """
+        self.pending = PendingBatch(
+            size=size,
+            last_key=last_key,
+            transactions=[t.model_dump(mode="json") for t in transactions],
+            position=position,
+        )
+        self.save()
+
+    def advance(self, size: int, last_key: str) -> None:
+        """
+        Mark the next `size` messages as processed and clear the pending batch.
+
+        Parameters
+        ----------
+        size : int
+            Number of source messages processed.
+        last_key : str
+            Key of the last processed message.
+        """
+        self.offset += size
+        self.last_key = last_key
+        self.pending = None
+        self.save()
@@ -0,0 +1,268 @@
+"""
+Backfill runner.
+
+Parses raw messages across a process pool (BeautifulSoup parsing is CPU bound
+and limited by the GIL), classifies each batch at once and writes it in bulk.
+Between parsing and writing, transactions travel as lightweight
+`TransactionRecord` objects, which are cheaper to send back from the workers,
+deduplicate and classify than the pydantic model.
+With a checkpoint, progress is saved after every batch so an interrupted run
+can be resumed.
+"""
+
+import logging
+import os
+import time
+from collections.abc import Iterable
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from itertools import batched
+
+from shared_code.finmail.backfill.checkpoint import BackfillCheckpoint
+from shared_code.finmail.backfill.sources import RawMessage, message_to_payload
+from shared_code.finmail.domain.classification import TransactionClassifier
+from shared_code.finmail.domain.dedup import DedupIndex, transaction_fingerprint
+from shared_code.finmail.domain.ingest import parse_email
+from shared_code.finmail.models import Transaction, TransactionRecord
+from shared_code.finmail.sinks import TransactionSink
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class ParseOutcome:
+    """Result of parsing one raw message in a worker."""
+
+    key: str
+    transaction: TransactionRecord | None = None
+    error: str | None = None
+
+
+@dataclass(slots=True)
+class BackfillStats:
+    """Counters and throughput of a backfill run."""
+
+    read: int = 0
+    parsed: int = 0
+    skipped: int = 0
+    failed: int = 0
+    duplicates: int = 0
+    written: int = 0
+    started_at: float = field(default_factory=time.monotonic)
+
+    @property
+    def elapsed(self) -> float:
+        """Seconds since the run started."""
+        return time.monotonic() - self.started_at
+
+    @property
+    def throughput(self) -> float:
+        """Messages read per second."""
+        elapsed = self.elapsed
+        return self.read / elapsed if elapsed > 0 else 0.0
+
+
+def parse_raw_message(message: RawMessage) -> ParseOutcome:
+    """
+    Decode and parse a raw message. Runs inside the worker processes.
+
+    Parameters
+    ----------
+    message : RawMessage
+        The raw message to parse.
+
+    Returns
+    -------
+    ParseOutcome
+        The parsed transaction record (None if no parser matched) or the error.
+    """
+    try:
+        payload = message_to_payload(message.data)
+        transaction = parse_email(payload)
+    except Exception as e:
+        return ParseOutcome(key=message.key, error=f"{type(e).__name__}: {e}")
+    if transaction is None:
+        return ParseOutcome(key=message.key)
+    return ParseOutcome(
+        key=message.key, transaction=TransactionRecord.from_model(transaction)
+    )
+
+
+def _log_progress(stats: BackfillStats) -> None:
+    logger.info(
+        "Backfill progress: %d read, %d parsed, %d skipped, %d failed, "
+        "%d duplicates, %d written (%.1f msg/s)",
+        stats.read,
+        stats.parsed,
+        stats.skipped,
+        stats.failed,
+        stats.duplicates,
+        stats.written,
+        stats.throughput,
+    )
+
+
+def _parse_batch(
+    batch: tuple[RawMessage, ...], executor: Executor | None, workers: int
+) -> Iterable[ParseOutcome]:
+    if executor is None:
+        return map(parse_raw_message, batch)
+    chunksize = max(1, len(batch) // (workers * 4))
+    return executor.map(parse_raw_message, batch, chunksize=chunksize)
+
+
+def _collect_transactions(
+    outcomes: Iterable[ParseOutcome], stats: BackfillStats
+) -> list[TransactionRecord]:
+    transactions = []
+    for outcome in outcomes:
+        stats.read += 1
+        if outcome.error is not None:
+            stats.failed += 1
+            logger.warning("Failed to parse message %s: %s", outcome.key, outcome.error)
+        elif outcome.transaction is None:
+            stats.skipped += 1
+        else:
+            transactions.append(outcome.transaction)
+    stats.parsed += len(transactions)
+    return transactions
+
+
+def _drop_duplicates(
+    transactions: list[TransactionRecord],
+    dedup_index: DedupIndex,
+    stats: BackfillStats,
+) -> list[TransactionRecord]:
+    unique = []
+    fingerprints = set()
+    for transaction in transactions:
+        fingerprint = transaction_fingerprint(transaction)
+        if fingerprint in fingerprints or dedup_index.contains(transaction):
+            stats.duplicates += 1
+            continue
+        fingerprints.add(fingerprint)
+        unique.append(transaction)
+    return unique
+
+
+def _write_batch(
+    batch: tuple[RawMessage, ...],
+    transactions: list[Transaction],
+    sink: TransactionSink,
+    checkpoint: BackfillCheckpoint | None,
+) -> None:
+    if transactions:
+        if checkpoint is not None:
+            position = sink.position() if hasattr(sink, "position") else None
+            checkpoint.set_pending(len(batch), batch[-1].key, transactions, position)
+        sink.write(transactions)
+    if checkpoint is not None:
+        checkpoint.advance(len(batch), batch[-1].key)
+
+
+def _replay_pending(
+    checkpoint: BackfillCheckpoint, sink: TransactionSink, stats: BackfillStats
+) -> list[Transaction]:
+    pending = checkpoint.pending
+    if pending is None:
+        return []
+
+    transactions = pending.get_transactions()
+    written = 0
+    if pending.position is not None and hasattr(sink, "written_since"):
+        written = min(sink.written_since(pending.position), len(transactions))
+    else:
+        logger.warning(
+            "Sink cannot report partial writes; re-sending the whole pending batch"
+        )
+    logger.info(
+        "Completing pending batch ending at %s: %d of %d transactions already written",
+        pending.last_key,
+        written,
+        len(transactions),
+    )
+    if written < len(transactions):
+        sink.write(transactions[written:])
+        stats.written += len(transactions) - written
+    checkpoint.advance(pending.size, pending.last_key)
+    return transactions
+
+
+def run_backfill(  # noqa: PLR0913
+    messages: Iterable[RawMessage],
+    sink: TransactionSink,
+    *,
+    classifier: TransactionClassifier | None = None,
+    workers: int | None = None,
+    batch_size: int = 500,
+    checkpoint: BackfillCheckpoint | None = None,
+    dedup_index: DedupIndex | None = None,
+) -> BackfillStats:
+    """
+    Parse, classify and write every message of a source.
+
+    Parameters
+    ----------
+    messages : Iterable[RawMessage]
+        The raw messages, usually from `iter_mbox` or `iter_eml_dir`.
+    sink : TransactionSink
+        Receives each batch of parsed transactions.
+    classifier : TransactionClassifier | None, optional
+        Classifies each batch before writing it, if provided.
+    workers : int | None, optional
+        Number of worker processes. Defaults to the CPU count; 1 parses in the
+        current process.
+    batch_size : int, optional
+        Messages parsed, classified and written together. Default is 500.
+    checkpoint : BackfillCheckpoint | None, optional
+        Saves progress after every batch. A pending batch left by an interrupted
+        run is completed first; `messages` must already skip the
+        `checkpoint.offset` messages processed before (see `iter_mbox`).
+    dedup_index : DedupIndex | None, optional
+        Drops transactions already written (or repeated within the run) before
+        classifying them, and records the written ones.
+
+    Returns
+    -------
+    BackfillStats
+        The counters of the run.
+    """
+    workers = workers or os.cpu_count() or 1
+    stats = BackfillStats()
+    if checkpoint is not None:
+        replayed = _replay_pending(checkpoint, sink, stats)
+        if dedup_index is not None:
+            dedup_index.add(replayed)
+
+    # Started after the replay, so a failed replay leaves no workers behind
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        for batch in batched(messages, batch_size):
+            records = _collect_transactions(
+                _parse_batch(batch, executor, workers), stats
+            )
+            if dedup_index is not None:
+                records = _drop_duplicates(records, dedup_index, stats)
+
+            if classifier and records:
+                try:
+                    records = classifier.classify_batch(records)
+                except Exception:
+                    logger.warning(
+                        "Error classifying batch. Skipping classification.",
+                        exc_info=True,
+                    )
+
+            transactions = [record.to_model() for record in records]
+            _write_batch(batch, transactions, sink, checkpoint)
+            stats.written += len(transactions)
+            if dedup_index is not None:
+                dedup_index.add(transactions)
+            _log_progress(stats)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    logger.info("Backfill finished in %.1fs", stats.elapsed)
+    _log_progress(stats)
+    return stats
@@ -0,0 +1,676 @@
+"""
+Columnar transaction batches.
+
+`TransactionBatch` holds a batch of transactions as parallel arrays, one per
+field, so filters, aggregations and deduplication run over whole columns
+instead of one object at a time:
+
+* ``amount`` is a float64 array.
+* ``date_local`` is an int64 array of microseconds since the epoch of the
+  local wall-clock time (as written to the worksheet and the Parquet sink),
+  with the UTC offset of every date in ``utc_offset``.
+* ``pocket``, ``currency`` and ``category`` are dictionary-encoded
+  (`DictionaryColumn`): few distinct values repeat over the batch, so they are
+  stored once and referenced by int32 codes.
+* The free-text fields are object arrays.
+
+Batches convert to and from transactions, records and the row format of the
+sinks (`mappers.transaction_to_row`). Sinks providing a ``write_batch`` method
+write them column-wise (see `TransactionBatch.write_to`).
+
+Requires the optional ``numpy`` dependency (``finmail[columnar]``).
+"""
+
+from collections.abc import Iterable, Sequence
+from datetime import UTC, datetime, timedelta, timezone
+from typing import TYPE_CHECKING
+
+try:
+    import numpy as np
+except ImportError as e:
+    raise ImportError(
+        "TransactionBatch requires numpy. Install it with 'finmail[columnar]'."
+    ) from e
+
+from shared_code.finmail.core.config import settings
+from shared_code.finmail.domain.dedup import fingerprint, fingerprint_parts
+from shared_code.finmail.mappers import (
+    LEDGER_COLUMNS,
+    SHEET_COLUMNS,
+    SHEET_DATE_FORMAT,
+)
+from shared_code.finmail.models import Transaction, TransactionRecord
+
+if TYPE_CHECKING:
+    from shared_code.finmail.domain.dedup import DedupIndex
+    from shared_code.finmail.sinks import TransactionSink
+
+_DICTIONARY_COLUMNS = ("pocket", "category", "currency")
+_TEXT_COLUMNS = ("description", "notes", "merchant", "account_last4", "auth_code")
+_REQUIRED_COLUMNS = ("date_local", "pocket", "currency", "amount")
+
+# UTC offset of naive dates
+NAIVE_OFFSET = np.iinfo(np.int32).min
+
+_SECOND = timedelta(seconds=1)
+_MICROSECOND = timedelta(microseconds=1)
+_EPOCH = datetime(1970, 1, 1)
+_UTC_EPOCH = datetime(1970, 1, 1, tzinfo=UTC)
+_ISO_SECONDS_LENGTH = len("1970-01-01T00:00:00")
+
+
+class DictionaryColumn:
+    """Dictionary-encoded strings: int32 codes into the distinct values."""
+
+    __slots__ = ("codes", "values")
+
+    def __init__(self, codes: np.ndarray, values: tuple[str, ...]) -> None:
+        """
+        Initialize the column.
+
+        Parameters
+        ----------
+        codes : np.ndarray
+            The position in `values` of every value, as int32.
+        values : tuple[str, ...]
+            The distinct values.
+        """
+        self.codes = codes
+        self.values = values
+
+    @classmethod
+    def encode(cls, strings: Iterable[str]) -> "DictionaryColumn":
+        """
+        Encode strings, numbering the distinct values by first occurrence.
+
+        Parameters
+        ----------
+        strings : Iterable[str]
+            The values.
+
+        Returns
+        -------
+        DictionaryColumn
+            The column.
+        """
+        positions: dict[str, int] = {}
+        codes = np.fromiter(
+            (positions.setdefault(s, len(positions)) for s in strings),
+            dtype=np.int32,
+        )
+        return cls(codes, tuple(positions))
+
+    def decode(self) -> list[str]:
+        """
+        Decode the column.
+
+        Returns
+        -------
+        list[str]
+            The value of every row.
+        """
+        return np.array(self.values, dtype=object)[self.codes].tolist()
+
+    def take(self, selector: np.ndarray) -> "DictionaryColumn":
+        """
+        Select rows, sharing the distinct values.
+
+        Parameters
+        ----------
+        selector : np.ndarray
+            A boolean mask or an array of row indices.
+
+        Returns
+        -------
+        DictionaryColumn
+            The selected rows.
+        """
+        return DictionaryColumn(self.codes[selector], self.values)
+
+    def isin(self, values: Iterable[str]) -> np.ndarray:
+        """
+        Tell which rows hold one of several values, comparing codes.
+
+        Parameters
+        ----------
+        values : Iterable[str]
+            The values looked for.
+
+        Returns
+        -------
+        np.ndarray
+            A boolean mask of the matching rows.
+        """
+        wanted = set(values)
+        codes = [code for code, value in enumerate(self.values) if value in wanted]
+        return np.isin(self.codes, codes)
+
+    def __len__(self) -> int:
+        """
+        Get the number of rows.
+
+        Returns
+        -------
+        int
+            The number of rows.
+        """
+        return len(self.codes)
+
+
+def _utc_offset(value: datetime) -> int:
+    offset = value.utcoffset()
+    return NAIVE_OFFSET if offset is None else offset // _SECOND
+
+
+def _wall_clock(value: datetime, offset: int) -> int:
+    # Microseconds since the epoch; shifting the instant by the offset is
+    # several times cheaper than dropping the timezone with `replace`
+    if offset == NAIVE_OFFSET:
+        return (value - _EPOCH) // _MICROSECOND
+    return (value - _UTC_EPOCH) // _MICROSECOND + offset * 1_000_000
+
+
+def _text_array(values: Iterable[str | None]) -> np.ndarray:
+    values = list(values)
+    array = np.empty(len(values), dtype=object)
+    array[:] = values
+    return array
+
+
+class TransactionBatch:
+    """
+    A batch of transactions stored as parallel columns.
+
+    Build batches with `from_transactions` or `from_rows`. Batches are treated
+    as immutable: selections and new categories return new batches, sharing
+    the unchanged columns.
+    """
+
+    __slots__ = (
+        "account_last4",
+        "amount",
+        "auth_code",
+        "category",
+        "currency",
+        "date_local",
+        "description",
+        "merchant",
+        "notes",
+        "pocket",
+        "utc_offset",
+    )
+
+    def __init__(  # noqa: PLR0913
+        self,
+        *,
+        date_local: np.ndarray,
+        utc_offset: np.ndarray,
+        pocket: DictionaryColumn,
+        category: DictionaryColumn,
+        currency: DictionaryColumn,
+        amount: np.ndarray,
+        description: np.ndarray,
+        notes: np.ndarray,
+        merchant: np.ndarray,
+        account_last4: np.ndarray,
+        auth_code: np.ndarray,
+    ) -> None:
+        """
+        Initialize the batch from its columns, all of the same length.
+
+        Parameters
+        ----------
+        date_local : np.ndarray
+            The local wall-clock times, as int64 microseconds since the epoch.
+        utc_offset : np.ndarray
+            The UTC offsets of the dates in seconds, as int32, `NAIVE_OFFSET`
+            for naive dates.
+        pocket : DictionaryColumn
+            The pockets.
+        category : DictionaryColumn
+            The categories.
+        currency : DictionaryColumn
+            The currencies.
+        amount : np.ndarray
+            The amounts, as float64.
+        description : np.ndarray
+            The descriptions, as an object array.
+        notes : np.ndarray
+            The notes, as an object array.
+        merchant : np.ndarray
+            The merchants, as an object array.
+        account_last4 : np.ndarray
+            The account digits, as an object array.
+        auth_code : np.ndarray
+            The authorization codes, as an object array.
+        """
+        self.date_local = date_local
+        self.utc_offset = utc_offset
+        self.pocket = pocket
+        self.category = category
+        self.currency = currency
+        self.amount = amount
+        self.description = description
+        self.notes = notes
+        self.merchant = merchant
+        self.account_last4 = account_last4
+        self.auth_code = auth_code
+
+    @classmethod
+    def _from_columns(cls, columns: dict[str, list]) -> "TransactionBatch":
+        dates = columns["date_local"]
+        offsets = [_utc_offset(d) for d in dates]
+        return cls(
+            date_local=np.fromiter(
+                map(_wall_clock, dates, offsets), dtype=np.int64, count=len(dates)
+            ),
+            utc_offset=np.array(offsets, dtype=np.int32),
+            amount=np.array(columns["amount"], dtype=np.float64),
+            **{
+                column: DictionaryColumn.encode(columns[column])
+                for column in _DICTIONARY_COLUMNS
+            },
+            **{column: _text_array(columns[column]) for column in _TEXT_COLUMNS},
+        )
+
+    @classmethod
+    def from_transactions(
+        cls, transactions: Iterable[Transaction | TransactionRecord]
+    ) -> "TransactionBatch":
+        """
+        Build a batch from transactions or records.
+
+        Parameters
+        ----------
+        transactions : Iterable[Transaction | TransactionRecord]
+            The transactions, in order.
+
+        Returns
+        -------
+        TransactionBatch
+            The batch.
+        """
+        transactions = list(transactions)
+        return cls._from_columns({
+            column: [getattr(t, column) for t in transactions]
+            for column in LEDGER_COLUMNS
+        })
+
+    @classmethod
+    def from_rows(
+        cls,
+        rows: Iterable[Sequence],
+        columns: tuple[str, ...] = SHEET_COLUMNS,
+        date_format: str | None = SHEET_DATE_FORMAT,
+    ) -> "TransactionBatch":
+        """
+        Build a batch from rows in the format of `mappers.transaction_to_row`.
+
+        Parameters
+        ----------
+        rows : Iterable[Sequence]
+            The rows, without a header. Missing trailing cells and empty
+            optional cells are read as None.
+        columns : tuple[str, ...], optional
+            The transaction field of every column, in order. Defaults to the
+            worksheet columns (`SHEET_COLUMNS`). Fields not listed take their
+            default value.
+        date_format : str | None, optional
+            The `strptime` format of the dates. If None, they are read as ISO
+            8601. Defaults to the worksheet format (`SHEET_DATE_FORMAT`).
+
+        Returns
+        -------
+        TransactionBatch
+            The batch.
+
+        Raises
+        ------
+        ValueError
+            If a required field has no column, or a date or amount cannot be
+            read.
+        """
+        missing = [column for column in _REQUIRED_COLUMNS if column not in columns]
+        if missing:
+            raise ValueError(f"Missing required columns: {missing}")
+        rows = list(rows)
+        values: dict[str, list] = {}
+        for position, column in enumerate(columns):
+            values[column] = [
+                row[position] if position < len(row) else None for row in rows
+            ]
+        for column in _TEXT_COLUMNS:
+            values[column] = [
+                value or None for value in values.get(column, [None] * len(rows))
+            ]
+        values.setdefault("category", [settings.DEFAULT_CATEGORY] * len(rows))
+        values["amount"] = [float(amount) for amount in values["amount"]]
+        values["date_local"] = [
+            datetime.strptime(d, date_format)
+            if date_format
+            else datetime.fromisoformat(d)
+            for d in values["date_local"]
+        ]
+        return cls._from_columns(values)
+
+    def __len__(self) -> int:
+        """
+        Get the number of transactions.
+
+        Returns
+        -------
+        int
+            The number of transactions.
+        """
+        return len(self.amount)
+
+    def datetimes(self) -> list[datetime]:
+        """
+        Get the local dates, with their UTC offset as a fixed timezone.
+
+        Returns
+        -------
+        list[datetime]
+            The date of every transaction, equal to the original one.
+        """
+        naive = self.date_local.view("datetime64[us]").tolist()
+        if (self.utc_offset == NAIVE_OFFSET).all():
+            return naive
+        zones: dict[int, timezone] = {}
+        return [
+            value
+            if offset == NAIVE_OFFSET
+            else value.replace(
+                tzinfo=zones.get(offset)
+                or zones.setdefault(offset, timezone(offset * _SECOND))
+            )
+            for value, offset in zip(naive, self.utc_offset.tolist(), strict=True)
+        ]
+
+    def _format_dates(self, date_format: str | None) -> list[str]:
+        # Formatted by NumPy from the wall-clock times where possible
+        if date_format not in {None, SHEET_DATE_FORMAT}:
+            return [d.strftime(date_format) for d in self.datetimes()]
+        whole_seconds = bool((self.date_local % 1_000_000 == 0).all())
+        strings = np.datetime_as_string(
+            self.date_local.view("datetime64[us]"),
+            unit="s" if whole_seconds else "us",
+        ).tolist()
+        if date_format == SHEET_DATE_FORMAT:
+            return [f"{s[8:10]}/{s[5:7]}/{s[:4]} {s[11:19]}" for s in strings]
+        if not whole_seconds:
+            # `isoformat` omits zero microseconds
+            strings = [s.removesuffix(".000000") for s in strings]
+        if (self.utc_offset == NAIVE_OFFSET).all():
+            return strings
+        suffixes = {
+            offset: ""
+            if offset == NAIVE_OFFSET
+            else _EPOCH.replace(tzinfo=timezone(offset * _SECOND)).isoformat()[
+                _ISO_SECONDS_LENGTH:
+            ]
+            for offset in np.unique(self.utc_offset).tolist()
+        }
+        return [
+            string + suffixes[offset]
+            for string, offset in zip(strings, self.utc_offset.tolist(), strict=True)
+        ]
+
+    def _column_list(self, column: str) -> list:
+        if column == "date_local":
+            return self.datetimes()
+        if column in _DICTIONARY_COLUMNS:
+            return getattr(self, column).decode()
+        return getattr(self, column).tolist()
+
+    def _field_dicts(self) -> list[dict]:
+        lists = [self._column_list(column) for column in LEDGER_COLUMNS]
+        return [
+            dict(zip(LEDGER_COLUMNS, values, strict=True))
+            for values in zip(*lists, strict=True)
+        ]
+
+    def to_transactions(self) -> list[Transaction]:
+        """
+        Convert the batch to validated transactions.
+
+        Returns
+        -------
+        list[Transaction]
+            The transactions, in order.
+        """
+        return [Transaction(**fields) for fields in self._field_dicts()]
+
+    def to_records(self) -> list[TransactionRecord]:
+        """
+        Convert the batch to records.
+
+        Returns
+        -------
+        list[TransactionRecord]
+            The records, in order.
+        """
+        return [TransactionRecord(**fields) for fields in self._field_dicts()]
+
+    def to_rows(
+        self,
+        columns: tuple[str, ...] = SHEET_COLUMNS,
+        date_format: str | None = SHEET_DATE_FORMAT,
+    ) -> list[list]:
+        """
+        Map the batch to rows, column by column.
+
+        Parameters
+        ----------
+        columns : tuple[str, ...], optional
+            The transaction fields to include, in order. Defaults to the
+            worksheet columns (`SHEET_COLUMNS`).
+        date_format : str | None, optional
+            The `strftime` format of the dates. If None, they are formatted as
+            ISO 8601. Defaults to the worksheet format (`SHEET_DATE_FORMAT`).
+
+        Returns
+        -------
+        list[list]
+            The rows, equal to `mappers.transaction_to_row` of every
+            transaction.
+        """
+        lists = [
+            self._format_dates(date_format)
+            if column == "date_local"
+            else self._column_list(column)
+            for column in columns
+        ]
+        return [list(row) for row in zip(*lists, strict=True)]
+
+    def select(self, selector: np.ndarray | Sequence[int]) -> "TransactionBatch":
+        """
+        Select transactions.
+
+        Parameters
+        ----------
+        selector : np.ndarray | Sequence[int]
+            A boolean mask, e.g. ``batch.amount < 0``, or row indices.
+
+        Returns
+        -------
+        TransactionBatch
+            The selected transactions, in the order of `selector`.
+        """
+        selector = np.asarray(selector)
+        if selector.dtype != np.bool_:
+            selector = selector.astype(np.intp, copy=False)
+        return TransactionBatch(
+            date_local=self.date_local[selector],
+            utc_offset=self.utc_offset[selector],
+            amount=self.amount[selector],
+            **{
+                column: getattr(self, column).take(selector)
+                for column in _DICTIONARY_COLUMNS
+            },
+            **{column: getattr(self, column)[selector] for column in _TEXT_COLUMNS},
+        )
+
+    def _dictionary_column(self, column: str) -> DictionaryColumn:
+        if column not in _DICTIONARY_COLUMNS:
+            raise ValueError(
+                f"Unknown dictionary column {column!r}. "
+                f"Expected one of {list(_DICTIONARY_COLUMNS)}"
+            )
+        return getattr(self, column)
+
+    def isin(self, column: str, values: Iterable[str]) -> np.ndarray:
+        """
+        Tell which transactions hold one of several values in a column.
+
+        Parameters
+        ----------
+        column : str
+            One of ``pocket``, ``category`` or ``currency``.
+        values : Iterable[str]
+            The values looked for.
+
+        Returns
+        -------
+        np.ndarray
+            A boolean mask, for `select`.
+
+        Raises
+        ------
+        ValueError
+            If the column is not dictionary-encoded.
+        """  # noqa: DOC502
+        return self._dictionary_column(column).isin(values)
+
+    def totals_by(self, column: str) -> dict[str, float]:
+        """
+        Sum the amounts by the value of a column.
+
+        Parameters
+        ----------
+        column : str
+            One of ``pocket``, ``category`` or ``currency``.
+
+        Returns
+        -------
+        dict[str, float]
+            The total amount of every value present, in order of first
+            occurrence.
+
+        Raises
+        ------
+        ValueError
+            If the column is not dictionary-encoded.
+        """  # noqa: DOC502
+        encoded = self._dictionary_column(column)
+        size = len(encoded.values)
+        counts = np.bincount(encoded.codes, minlength=size)
+        totals = np.bincount(encoded.codes, weights=self.amount, minlength=size)
+        return {
+            value: total
+            for value, total, count in zip(
+                encoded.values, totals.tolist(), counts.tolist(), strict=True
+            )
+            if count
+        }
+
+    def with_categories(self, categories: Iterable[str]) -> "TransactionBatch":
+        """
+        Copy the batch with other categories, e.g. after classification.
+
+        Parameters
+        ----------
+        categories : Iterable[str]
+            The category of every transaction, in order.
+
+        Returns
+        -------
+        TransactionBatch
+            The copy, sharing the other columns.
+
+        Raises
+        ------
+        ValueError
+            If the number of categories differs from the number of
+            transactions.
+        """
+        category = DictionaryColumn.encode(categories)
+        if len(category) != len(self):
+            raise ValueError(f"Expected {len(self)} categories, got {len(category)}")
+        columns = {name: getattr(self, name) for name in self.__slots__}
+        columns["category"] = category
+        return TransactionBatch(**columns)
+
+    def _fingerprint_parts(self) -> list[tuple[str, tuple]]:
+        return [
+            fingerprint_parts(*values)
+            for values in zip(
+                self.pocket.decode(),
+                self._format_dates(None),
+                self.amount.tolist(),
+                self.merchant.tolist(),
+                self.auth_code.tolist(),
+                strict=True,
+            )
+        ]
+
+    def fingerprints(self) -> list[str]:
+        """
+        Compute the fingerprint of every transaction.
+
+        Returns
+        -------
+        list[str]
+            The fingerprints, equal to `dedup.transaction_fingerprint` of
+            every transaction.
+        """
+        return [fingerprint(*parts) for parts in self._fingerprint_parts()]
+
+    def drop_duplicates(
+        self, dedup_index: "DedupIndex | None" = None
+    ) -> "TransactionBatch":
+        """
+        Drop the repeated transactions of the batch.
+
+        Repeats within the batch are found on the fingerprint parts, without
+        hashing; only the remaining transactions are looked up in the index.
+
+        Parameters
+        ----------
+        dedup_index : DedupIndex | None, optional
+            An index of already written transactions, also dropped. It is not
+            updated: add the transactions once written.
+
+        Returns
+        -------
+        TransactionBatch
+            The first occurrence of every fingerprint not in the index, in
+            order.
+        """
+        first: dict[tuple[str, tuple], int] = {}
+        for position, parts in enumerate(self._fingerprint_parts()):
+            first.setdefault(parts, position)
+        keep = np.zeros(len(self), dtype=np.bool_)
+        keep[list(first.values())] = True
+        if dedup_index is not None:
+            keep[keep] = [
+                not dedup_index.contains(record)
+                for record in self.select(keep).to_records()
+            ]
+        return self.select(keep)
+
+    def write_to(self, sink: "TransactionSink") -> None:
+        """
+        Write the batch to a sink, column-wise if it supports it.
+
+        Parameters
+        ----------
+        sink : TransactionSink
+            The sink. Its ``write_batch`` method is used if present, otherwise
+            the batch is converted to transactions for ``write``.
+        """
+        write_batch = getattr(sink, "write_batch", None)
+        if write_batch is None:
+            sink.write(self.to_transactions())
+        else:
+            write_batch(self)
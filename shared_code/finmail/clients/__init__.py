@@ -1,5 +1,6 @@
 """Clients package."""
 
 from .google import GoogleSheetsClient
+from .google_async import AsyncGoogleSheetsClient
 
-__all__ = ["GoogleSheetsClient"]
+__all__ = ["AsyncGoogleSheetsClient", "GoogleSheetsClient"]
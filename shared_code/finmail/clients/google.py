@@ -1,21 +1,62 @@
 """Google Sheets client for Finmail."""
 
+import json
 import re
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import Any
 
 import gspread
 from google.oauth2.service_account import Credentials
 from gspread import Worksheet
 
+from shared_code.finmail.mappers import transaction_to_row
 from shared_code.finmail.models import Transaction
+from shared_code.finmail.utils.tracing import start_span
 
+SCOPES = [
+    "https://www.googleapis.com/auth/spreadsheets",
+    "https://www.googleapis.com/auth/drive",
+]
 
-def _extract_spreadsheet_id(spreadsheet_identifier: str) -> str:
+
+def extract_spreadsheet_id(spreadsheet_identifier: str) -> str:
+    """
+    Get the spreadsheet ID from a spreadsheet URL.
+
+    Parameters
+    ----------
+    spreadsheet_identifier : str
+        The ID or URL of the spreadsheet.
+
+    Returns
+    -------
+    str
+        The spreadsheet ID (the identifier itself if it is not a URL).
+    """
     match = re.search(r"/spreadsheets/d/([a-zA-Z0-9-_]+)", spreadsheet_identifier)
     if match:
         return match.group(1)
     return spreadsheet_identifier
 
 
+def _set_values_size(span: Any, values: list) -> None:
+    # Sizing serializes the values, so it is skipped when the span is not traced
+    if span.is_recording():
+        span.set_attributes({
+            "gspread.rows": len(values),
+            "gspread.bytes": len(json.dumps(values, default=str).encode()),
+        })
+
+
+@contextmanager
+def _gspread_span(method: str, values: list | None = None) -> Iterator[Any]:
+    with start_span(f"gspread.{method}", {"gspread.method": method}) as span:
+        if values is not None:
+            _set_values_size(span, values)
+        yield span
+
+
 class GoogleSheetsClient:
     """Client to interact with Google Sheets using service account credentials."""
 
@@ -40,12 +81,8 @@ class GoogleSheetsClient:
         self.client = self._authorize()
 
     def _authorize(self) -> gspread.Client:
-        scopes = [
-            "https://www.googleapis.com/auth/spreadsheets",
-            "https://www.googleapis.com/auth/drive",
-        ]
         creds = Credentials.from_service_account_info(
-            self._google_json_key, scopes=scopes
+            self._google_json_key, scopes=SCOPES
         )
         return gspread.authorize(creds)
 
@@ -68,13 +105,14 @@ class GoogleSheetsClient:
         gspread.Worksheet
             The requested worksheet object from the opened spreadsheet.
         """
-        spreadsheet_id = _extract_spreadsheet_id(spreadsheet_identifier)
-        spreadsheet = self.client.open_by_key(spreadsheet_id)
-        return (
-            spreadsheet.worksheet(worksheet_name)
-            if worksheet_name
-            else spreadsheet.sheet1
-        )
+        spreadsheet_id = extract_spreadsheet_id(spreadsheet_identifier)
+        with _gspread_span("open_by_key"):
+            spreadsheet = self.client.open_by_key(spreadsheet_id)
+        if worksheet_name:
+            with _gspread_span("worksheet"):
+                return spreadsheet.worksheet(worksheet_name)
+        with _gspread_span("sheet1"):
+            return spreadsheet.sheet1
 
     @staticmethod
     def get_last_filled_row(sheet: Worksheet, column: int = 1) -> int:
@@ -94,7 +132,9 @@ class GoogleSheetsClient:
         int
             The index of the last filled row in the worksheet.
         """
-        column_values = sheet.col_values(column)
+        with _gspread_span("col_values") as span:
+            column_values = sheet.col_values(column)
+            _set_values_size(span, column_values)
         return len(column_values)
 
     def append_row(
@@ -123,7 +163,8 @@ class GoogleSheetsClient:
         """
         sheet = self.open_sheet(spreadsheet_identifier, worksheet_name)
         first_empty_row = self.get_last_filled_row(sheet) + 1
-        sheet.insert_row(row_values, index=first_empty_row)
+        with _gspread_span("insert_row", [row_values]):
+            sheet.insert_row(row_values, index=first_empty_row)
         return True
 
     def read_all(
@@ -146,7 +187,10 @@ class GoogleSheetsClient:
             A list of rows, where each row is represented as a list of cell values.
         """
         sheet = self.open_sheet(spreadsheet_identifier, worksheet_name)
-        return sheet.get_all_values()
+        with _gspread_span("get_all_values") as span:
+            values = sheet.get_all_values()
+            _set_values_size(span, values)
+        return values
 
     def clear_sheet(
         self, spreadsheet_identifier: str, worksheet_name: str | None = None
@@ -167,7 +211,8 @@ class GoogleSheetsClient:
             True if the worksheet was cleared successfully.
         """
         sheet = self.open_sheet(spreadsheet_identifier, worksheet_name)
-        sheet.clear()
+        with _gspread_span("clear"):
+            sheet.clear()
         return True
 
     def insert_transaction(
@@ -194,14 +239,38 @@ class GoogleSheetsClient:
         bool
             True if the transaction was inserted successfully.
         """
-        formatted_date = transaction.date_local.strftime("%d/%m/%Y %H:%M:%S")
-        # TODO @juandaherrera: move this to a mapper utility
-        row_values = [
-            formatted_date,
-            transaction.pocket,
-            transaction.category,
-            transaction.currency,
-            transaction.amount,
-            transaction.description,
-        ]
+        row_values = transaction_to_row(transaction)
         return self.append_row(spreadsheet_identifier, row_values, worksheet_name)
+
+    def insert_transactions(
+        self,
+        spreadsheet_identifier: str,
+        transactions: list[Transaction],
+        worksheet_name: str | None = None,
+    ) -> bool:
+        """
+        Insert several transactions with a single write request.
+
+        Parameters
+        ----------
+        spreadsheet_identifier : str
+            The ID or URL of the Google Spreadsheet to insert the transactions into.
+        transactions : list[Transaction]
+            The Transaction objects to insert, in order.
+        worksheet_name : str or None, optional
+            The name of the worksheet within the spreadsheet. If None, the default
+            worksheet is used.
+
+        Returns
+        -------
+        bool
+            True if the transactions were inserted successfully.
+        """
+        if not transactions:
+            return True
+        rows = [transaction_to_row(transaction) for transaction in transactions]
+        sheet = self.open_sheet(spreadsheet_identifier, worksheet_name)
+        first_empty_row = self.get_last_filled_row(sheet) + 1
+        with _gspread_span("insert_rows", rows):
+            sheet.insert_rows(rows, row=first_empty_row)
+        return True
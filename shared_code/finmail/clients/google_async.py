@@ -0,0 +1,194 @@
+"""
+Async Google Sheets client for Finmail.
+
+Talks to the Sheets REST API through a pooled ``httpx.AsyncClient``, so a
+single worker can keep many writes in flight instead of blocking a thread per
+gspread call. Requires the optional ``httpx`` dependency (``finmail[async]``).
+"""
+
+import asyncio
+from types import ModuleType
+from typing import TYPE_CHECKING
+from urllib.parse import quote
+
+from google.auth.transport.requests import Request
+from google.oauth2.service_account import Credentials
+
+from shared_code.finmail.clients.google import SCOPES, extract_spreadsheet_id
+from shared_code.finmail.mappers import transaction_to_row
+from shared_code.finmail.models import Transaction
+from shared_code.finmail.utils.tracing import start_span
+
+if TYPE_CHECKING:
+    import httpx
+
+SHEETS_API_URL = "https://sheets.googleapis.com/v4/spreadsheets"
+
+
+def _import_httpx() -> ModuleType:
+    # Imported on use: httpx is optional
+    try:
+        import httpx  # noqa: PLC0415
+    except ImportError as e:
+        raise ImportError(
+            "AsyncGoogleSheetsClient requires httpx. Install it with 'finmail[async]'."
+        ) from e
+    return httpx
+
+
+def _quote_sheet_name(worksheet_name: str) -> str:
+    return "'" + worksheet_name.replace("'", "''") + "'"
+
+
+class AsyncGoogleSheetsClient:
+    """Async client of the Google Sheets API using service account credentials."""
+
+    def __init__(
+        self,
+        google_json_key: dict,
+        max_connections: int = 20,
+        timeout: float = 30.0,
+        http_client: "httpx.AsyncClient | None" = None,
+    ) -> None:
+        """
+        Initialize the client.
+
+        Parameters
+        ----------
+        google_json_key : dict
+            The Google service account JSON key.
+        max_connections : int, optional
+            Maximum number of pooled connections to the API. Default is 20.
+        timeout : float, optional
+            Timeout of each request, in seconds. Default is 30.
+        http_client : httpx.AsyncClient | None, optional
+            The HTTP client to use, with `SHEETS_API_URL` as base URL. If None,
+            a pooled client is created.
+
+        Raises
+        ------
+        ImportError
+            If httpx is not installed.
+        """  # noqa: DOC502
+        self._google_json_key = google_json_key
+        self._credentials = self._load_credentials()
+        self._token_lock = asyncio.Lock()
+        self._first_sheet_names: dict[str, str] = {}
+        if http_client is None:
+            httpx = _import_httpx()
+            http_client = httpx.AsyncClient(
+                base_url=SHEETS_API_URL,
+                limits=httpx.Limits(
+                    max_connections=max_connections,
+                    max_keepalive_connections=max_connections,
+                ),
+                timeout=timeout,
+            )
+        self.http_client = http_client
+
+    def _load_credentials(self) -> Credentials:
+        return Credentials.from_service_account_info(
+            self._google_json_key, scopes=SCOPES
+        )
+
+    async def _get_headers(self) -> dict[str, str]:
+        async with self._token_lock:
+            if not self._credentials.valid:
+                # google-auth refreshes synchronously; keep it off the event loop
+                await asyncio.to_thread(self._credentials.refresh, Request())
+        return {"Authorization": f"Bearer {self._credentials.token}"}
+
+    async def _request(self, method: str, url: str, **kwargs: object) -> dict:
+        with start_span(
+            f"sheets.{method}", {"http.request.method": method, "url.path": url}
+        ) as span:
+            response = await self.http_client.request(
+                method, url, headers=await self._get_headers(), **kwargs
+            )
+            span.set_attributes({
+                "http.response.status_code": response.status_code,
+                "sheets.bytes": len(response.content),
+            })
+            response.raise_for_status()
+            return response.json()
+
+    async def _get_range(
+        self, spreadsheet_id: str, worksheet_name: str | None, cells: str = ""
+    ) -> str:
+        if worksheet_name is None:
+            # Same default as gspread's sheet1; looked up once per spreadsheet
+            if spreadsheet_id not in self._first_sheet_names:
+                metadata = await self._request(
+                    "GET",
+                    f"/{spreadsheet_id}",
+                    params={"fields": "sheets.properties.title"},
+                )
+                self._first_sheet_names[spreadsheet_id] = metadata["sheets"][0][
+                    "properties"
+                ]["title"]
+            worksheet_name = self._first_sheet_names[spreadsheet_id]
+        sheet = _quote_sheet_name(worksheet_name)
+        return quote(f"{sheet}!{cells}" if cells else sheet, safe="")
+
+    async def read_all(
+        self, spreadsheet_identifier: str, worksheet_name: str | None = None
+    ) -> list[list]:
+        """
+        Read all values from a worksheet.
+
+        Parameters
+        ----------
+        spreadsheet_identifier : str
+            The ID or URL of the spreadsheet.
+        worksheet_name : str or None, optional
+            The name of the worksheet. If None, the first worksheet is used.
+
+        Returns
+        -------
+        list of list
+            A list of rows, where each row is represented as a list of cell values.
+        """
+        spreadsheet_id = extract_spreadsheet_id(spreadsheet_identifier)
+        cell_range = await self._get_range(spreadsheet_id, worksheet_name)
+        data = await self._request("GET", f"/{spreadsheet_id}/values/{cell_range}")
+        return data.get("values", [])
+
+    async def insert_transactions(
+        self,
+        spreadsheet_identifier: str,
+        transactions: list[Transaction],
+        worksheet_name: str | None = None,
+    ) -> bool:
+        """
+        Append several transactions after the last row with a single request.
+
+        Parameters
+        ----------
+        spreadsheet_identifier : str
+            The ID or URL of the spreadsheet.
+        transactions : list[Transaction]
+            The Transaction objects to insert, in order.
+        worksheet_name : str or None, optional
+            The name of the worksheet. If None, the first worksheet is used.
+
+        Returns
+        -------
+        bool
+            True if the transactions were inserted successfully.
+        """
+        if not transactions:
+            return True
+        spreadsheet_id = extract_spreadsheet_id(spreadsheet_identifier)
+        cell_range = await self._get_range(spreadsheet_id, worksheet_name, "A1")
+        with start_span("sheets.append", {"sheets.rows": len(transactions)}):
+            await self._request(
+                "POST",
+                f"/{spreadsheet_id}/values/{cell_range}:append",
+                params={"valueInputOption": "RAW", "insertDataOption": "INSERT_ROWS"},
+                json={"values": [transaction_to_row(t) for t in transactions]},
+            )
+        return True
+
+    async def aclose(self) -> None:
+        """Close the pooled connections."""
+        await self.http_client.aclose()
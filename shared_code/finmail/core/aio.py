@@ -0,0 +1,45 @@
+"""
+Async ingest initialization.
+
+Initializes the singletons of the async ingest function: the executor that
+parses emails off the event loop and a transaction sink writing to Google
+Sheets through the async client. Local sinks are shared with the sync sink.
+Requires the optional ``httpx`` dependency (``finmail[async]``).
+"""
+
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+
+from shared_code.finmail.clients import AsyncGoogleSheetsClient
+from shared_code.finmail.core.config import settings
+from shared_code.finmail.core.sinks import transaction_sink
+from shared_code.finmail.sinks import AsyncGoogleSheetsSink, MultiSink
+
+async_google_sheets_client = AsyncGoogleSheetsClient(
+    settings.GOOGLE_JSON_KEY, max_connections=settings.SHEETS_MAX_CONNECTIONS
+)
+
+parse_executor: Executor = (
+    ProcessPoolExecutor(max_workers=settings.PARSE_WORKERS)
+    if settings.PARSE_EXECUTOR == "process"
+    else ThreadPoolExecutor(
+        max_workers=settings.PARSE_WORKERS, thread_name_prefix="parse"
+    )
+)
+
+async_transaction_sink = MultiSink(
+    {
+        kind: (
+            AsyncGoogleSheetsSink(
+                google_sheets_client=async_google_sheets_client,
+                spreadsheet_identifier=settings.GOOGLE_SPREADSHEET_IDENTIFIER,
+                worksheet_name=settings.GOOGLE_WORKSHEET_NAME,
+            )
+            if kind == "google_sheets"
+            else sink
+        )
+        for kind, sink in transaction_sink.sinks.items()
+    },
+    timeout=settings.SINK_TIMEOUT_S,
+    timeouts=settings.SINK_TIMEOUTS_S,
+    required=transaction_sink.required,
+)
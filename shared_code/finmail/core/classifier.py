@@ -2,20 +2,51 @@
 Classifier initialization.
 
 Initializes the transaction classifier singleton with the Google Sheets
-rule provider.
+rule provider, pruning rules that never apply if `PRUNE_RULES` is set,
+profiling the rules if `RULE_PROFILE_PATH` is set and reordering them by the
+hits of `RULE_ORDER_PROFILES`. Patterns are matched with `REGEX_ENGINE`, and
+rules slower than `RULE_MATCH_BUDGET_MS` are quarantined.
 """
 
 from shared_code.finmail.core.config import settings
 from shared_code.finmail.core.google_client import google_sheets_client
 from shared_code.finmail.domain.classification import (
     GoogleSheetsRuleProvider,
+    PruningRuleProvider,
+    RuleProfiler,
+    RuleProvider,
     TransactionClassifier,
 )
+from shared_code.finmail.domain.classification.profiling import (
+    load_profiles,
+    rule_hits,
+)
 
-rule_provider = GoogleSheetsRuleProvider(
+rule_provider: RuleProvider = GoogleSheetsRuleProvider(
     google_sheets_client=google_sheets_client,
     spreadsheet_id=settings.GOOGLE_SPREADSHEET_IDENTIFIER,
     worksheet_name=settings.GOOGLE_CLASSIFICATION_WORKSHEET_NAME,
 )
+if settings.PRUNE_RULES:
+    rule_provider = PruningRuleProvider(rule_provider)
+
+rule_profiler = (
+    RuleProfiler(
+        export_path=settings.RULE_PROFILE_PATH,
+        export_every=settings.RULE_PROFILE_EXPORT_EVERY,
+    )
+    if settings.RULE_PROFILE_PATH
+    else None
+)
 
-transaction_classifier = TransactionClassifier(rule_provider=rule_provider)
+transaction_classifier = TransactionClassifier(
+    rule_provider=rule_provider,
+    profiler=rule_profiler,
+    rule_hits=(
+        rule_hits(load_profiles(settings.RULE_ORDER_PROFILES))
+        if settings.RULE_ORDER_PROFILES
+        else None
+    ),
+    regex_engine=settings.REGEX_ENGINE,
+    match_budget_ms=settings.RULE_MATCH_BUDGET_MS or None,
+)
@@ -1,6 +1,7 @@
 """Finmail Configuration Module."""
 
 import json
+from typing import Literal
 
 from pydantic import computed_field, field_validator
 from pydantic_settings import BaseSettings
@@ -20,8 +21,67 @@ class Settings(BaseSettings):
     GOOGLE_WORKSHEET_NAME: str = "Transactions"
     GOOGLE_CLASSIFICATION_WORKSHEET_NAME: str = "Classification Rules"
 
+    # Storage
+    SINKS: list[Literal["google_sheets", "csv", "jsonl", "parquet", "sqlite"]] = [
+        "google_sheets"
+    ]
+    SINK_PATHS: dict[str, str] = {}  # sink -> path, required by the local sinks
+    SINK_TIMEOUT_S: float = 10.0
+    SINK_TIMEOUTS_S: dict[str, float] = {}  # sink -> timeout overrides
+    # Sinks that must write every transaction (None: every sink in SINKS)
+    REQUIRED_SINKS: (
+        list[Literal["google_sheets", "csv", "jsonl", "parquet", "sqlite"]] | None
+    ) = None
+
+    # Async ingest
+    PARSE_EXECUTOR: Literal["thread", "process"] = "thread"
+    PARSE_WORKERS: int | None = None  # executor default if not set
+    SHEETS_MAX_CONNECTIONS: int = 20
+
+    # Queue
+    INGEST_MODE: Literal["sync", "queue"] = "sync"
+    QUEUE_BACKEND: Literal["azure_storage", "sqlite"] = "azure_storage"
+    QUEUE_NAME: str = "finmail-ingest"
+    QUEUE_CONNECTION_STRING: str | None = None  # AzureWebJobsStorage if not set
+    QUEUE_DB_PATH: str = "finmail-queue.db"
+    QUEUE_BATCH_SIZE: int = 32
+    QUEUE_MAX_BATCHES: int = 10
+    QUEUE_MAX_DEQUEUE_COUNT: int = 5
+    QUEUE_VISIBILITY_TIMEOUT_S: float = 300.0
+
     # Classification
     ENABLE_CLASSIFICATION: bool = True
+    PRUNE_RULES: bool = False  # drop duplicate and shadowed rules on load
+    RULE_PROFILE_PATH: str | None = None  # profile rules and export them here
+    RULE_PROFILE_EXPORT_EVERY: int = 1_000  # classifications between exports
+    RULE_ORDER_PROFILES: list[str] = []  # reorder compiled rules by these hits
+    REGEX_ENGINE: Literal["re", "re2"] = "re"  # re2 requires finmail[re2]
+    RULE_MATCH_BUDGET_MS: float = 0.0  # detect and quarantine slower rules; 0 disables
+
+    # Deduplication
+    ENABLE_DEDUP: bool = True
+    DEDUP_DB_PATH: str | None = None  # in-memory only if not set
+    DEDUP_CACHE_SIZE: int = 10_000
+    DEDUP_SEED_FROM_SHEET: bool = False
+
+    # Idempotency
+    IDEMPOTENCY_WINDOW_S: float = 3_600.0
+    IDEMPOTENCY_CACHE_SIZE: int = 1_000
+
+    # Ingest limits
+    MAX_HTML_SIZE: int = 2_000_000  # characters, after stripping data URIs
+    MAX_HTML_NODES: int = 20_000
+    MAX_DATA_URI_SIZE: int = 2_048
+    PARSE_TIME_BUDGET_S: float = 10.0
+
+    # Validation
+    SENDER_VALIDATION: Literal["fast", "full"] = "fast"  # full uses email-validator
+
+    # Instrumentation
+    DEBUG_TIMINGS: bool = False  # return stage timings in the ingest response
+    TIMINGS_SUMMARY_EVERY: int = 100  # requests between logged latency summaries
+    ENABLE_TRACING: bool = False  # export OpenTelemetry spans over OTLP
+    TRACING_SERVICE_NAME: str = "finmail"
 
     # GCP
     GOOGLE_JSON_KEY: dict | str
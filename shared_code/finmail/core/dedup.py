@@ -0,0 +1,21 @@
+"""
+Dedup index initialization.
+
+Initializes the transaction dedup index singleton, optionally seeded with the
+transactions already stored in the Google Sheets worksheet.
+"""
+
+from shared_code.finmail.core.config import settings
+from shared_code.finmail.core.google_client import google_sheets_client
+from shared_code.finmail.domain.dedup import DedupIndex
+
+dedup_index = DedupIndex(
+    path=settings.DEDUP_DB_PATH, cache_size=settings.DEDUP_CACHE_SIZE
+)
+
+if settings.DEDUP_SEED_FROM_SHEET:
+    dedup_index.seed_from_rows(
+        google_sheets_client.read_all(
+            settings.GOOGLE_SPREADSHEET_IDENTIFIER, settings.GOOGLE_WORKSHEET_NAME
+        )
+    )
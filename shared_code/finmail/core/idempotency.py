@@ -0,0 +1,14 @@
+"""
+Idempotency cache initialization.
+
+Initializes the bounded cache of ingest responses replayed for repeated
+idempotency keys.
+"""
+
+from shared_code.finmail.core.config import settings
+from shared_code.finmail.utils.cache import TTLCache
+
+# Idempotency key -> (status code, JSON body)
+response_cache: TTLCache[str, tuple[int, str]] = TTLCache(
+    maxsize=settings.IDEMPOTENCY_CACHE_SIZE, ttl=settings.IDEMPOTENCY_WINDOW_S
+)
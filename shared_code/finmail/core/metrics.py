@@ -0,0 +1,10 @@
+"""
+Metrics initialization.
+
+Initializes the stage latency histograms aggregated across ingest requests.
+"""
+
+from shared_code.finmail.core.config import settings
+from shared_code.finmail.utils.timing import StageHistograms
+
+stage_histograms = StageHistograms(summary_every=settings.TIMINGS_SUMMARY_EVERY)
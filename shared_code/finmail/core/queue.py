@@ -0,0 +1,37 @@
+"""
+Queue initialization.
+
+Initializes the ingest queue singleton when `INGEST_MODE` is "queue"; it is
+None otherwise, and the ingest function processes emails inline.
+"""
+
+import os
+
+from shared_code.finmail.core.config import settings
+from shared_code.finmail.queues import AzureStorageQueue, MessageQueue, SQLiteQueue
+
+
+def _build_queue() -> MessageQueue:
+    if settings.QUEUE_BACKEND == "sqlite":
+        return SQLiteQueue(
+            settings.QUEUE_DB_PATH,
+            visibility_timeout=settings.QUEUE_VISIBILITY_TIMEOUT_S,
+        )
+    connection_string = settings.QUEUE_CONNECTION_STRING or os.environ.get(
+        "AzureWebJobsStorage"
+    )
+    if not connection_string:
+        raise ValueError(
+            "QUEUE_CONNECTION_STRING (or AzureWebJobsStorage) must be set to use "
+            "the Azure Storage queue"
+        )
+    return AzureStorageQueue(
+        connection_string,
+        settings.QUEUE_NAME,
+        visibility_timeout=settings.QUEUE_VISIBILITY_TIMEOUT_S,
+    )
+
+
+ingest_queue: MessageQueue | None = (
+    _build_queue() if settings.INGEST_MODE == "queue" else None
+)
@@ -0,0 +1,36 @@
+"""
+Sink initialization.
+
+Initializes the transaction sink singleton, writing to every sink listed in
+the `SINKS` setting concurrently.
+"""
+
+from shared_code.finmail.core.config import settings
+from shared_code.finmail.core.google_client import google_sheets_client
+from shared_code.finmail.sinks import (
+    GoogleSheetsSink,
+    MultiSink,
+    TransactionSink,
+    build_local_sink,
+)
+
+
+def _build_sink(kind: str) -> TransactionSink:
+    if kind == "google_sheets":
+        return GoogleSheetsSink(
+            google_sheets_client=google_sheets_client,
+            spreadsheet_identifier=settings.GOOGLE_SPREADSHEET_IDENTIFIER,
+            worksheet_name=settings.GOOGLE_WORKSHEET_NAME,
+        )
+    path = settings.SINK_PATHS.get(kind)
+    if not path:
+        raise ValueError(f"SINK_PATHS must define the path of the {kind!r} sink")
+    return build_local_sink(path, kind=kind)
+
+
+transaction_sink = MultiSink(
+    {kind: _build_sink(kind) for kind in settings.SINKS},
+    timeout=settings.SINK_TIMEOUT_S,
+    timeouts=settings.SINK_TIMEOUTS_S,
+    required=settings.REQUIRED_SINKS,
+)
@@ -0,0 +1,45 @@
+"""
+Tracing initialization.
+
+Exports OpenTelemetry spans over OTLP if `ENABLE_TRACING` is set; tracing is a
+no-op otherwise.
+"""
+
+from collections.abc import Callable
+from typing import TYPE_CHECKING, ParamSpec, TypeVar
+
+from shared_code.finmail.core.config import settings
+from shared_code.finmail.utils.tracing import configure_tracing, traced
+
+if TYPE_CHECKING:
+    from opentelemetry.trace import TracerProvider
+
+P = ParamSpec("P")
+R = TypeVar("R")
+
+tracer_provider: "TracerProvider | None" = (
+    configure_tracing(settings.TRACING_SERVICE_NAME)
+    if settings.ENABLE_TRACING
+    else None
+)
+
+
+def trace_function(
+    name: str, trigger: str
+) -> Callable[[Callable[P, R]], Callable[P, R]]:
+    """
+    Run every invocation of an Azure Function in a span.
+
+    Parameters
+    ----------
+    name : str
+        The function name.
+    trigger : str
+        The trigger type (``http``, ``timer``...).
+
+    Returns
+    -------
+    Callable
+        The decorator of the function's ``main``.
+    """
+    return traced(f"function {name}", {"faas.name": name, "faas.trigger": trigger})
@@ -4,18 +4,44 @@ Classification package.
 Provides functionality for classifying transactions based on configurable rules.
 """
 
+from shared_code.finmail.domain.classification.analysis import (
+    RuleAnalysis,
+    RuleFinding,
+    analyze_rules,
+)
 from shared_code.finmail.domain.classification.classification_rules import (
     ClassificationRule,
 )
 from shared_code.finmail.domain.classification.classifier import TransactionClassifier
+from shared_code.finmail.domain.classification.optimizer import (
+    can_swap,
+    optimize_rule_order,
+    rules_disjoint,
+)
+from shared_code.finmail.domain.classification.profiling import (
+    RuleProfiler,
+    RuleStats,
+)
 from shared_code.finmail.domain.classification.rule_providers import (
     GoogleSheetsRuleProvider,
+    PruningRuleProvider,
     RuleProvider,
+    StaticRuleProvider,
 )
 
 __all__ = [
     "ClassificationRule",
     "GoogleSheetsRuleProvider",
+    "PruningRuleProvider",
+    "RuleAnalysis",
+    "RuleFinding",
+    "RuleProfiler",
     "RuleProvider",
+    "RuleStats",
+    "StaticRuleProvider",
     "TransactionClassifier",
+    "analyze_rules",
+    "can_swap",
+    "optimize_rule_order",
+    "rules_disjoint",
 ]
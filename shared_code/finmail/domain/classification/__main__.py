@@ -0,0 +1,208 @@
+"""Command line entry point for classification rule tools."""
+
+import argparse
+import csv
+import logging
+from collections.abc import Iterator
+from itertools import batched
+from pathlib import Path
+
+from shared_code.finmail.domain.classification.analysis import (
+    analyze_rules,
+    format_analysis,
+)
+from shared_code.finmail.domain.classification.classification_rules import (
+    ClassificationRule,
+)
+from shared_code.finmail.domain.classification.classifier import TransactionClassifier
+from shared_code.finmail.domain.classification.optimizer import (
+    expected_evaluations,
+    optimize_rule_order,
+)
+from shared_code.finmail.domain.classification.profiling import (
+    RuleProfiler,
+    format_report,
+    load_profiles,
+    rule_hits,
+)
+from shared_code.finmail.models import Transaction
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m shared_code.finmail.domain.classification",
+        description="Inspect the classification rules.",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    report = commands.add_parser(
+        "report", help="Summarize rule profiles exported by the functions."
+    )
+    report.add_argument(
+        "profiles", nargs="+", help="Profile JSON files (RULE_PROFILE_PATH)."
+    )
+    report.add_argument(
+        "--top", type=int, default=10, help="Rules and patterns listed (default: 10)."
+    )
+
+    profile = commands.add_parser(
+        "profile",
+        help="Classify stored transactions with the configured rules and profile them.",
+    )
+    profile.add_argument(
+        "--transactions",
+        required=True,
+        help="JSON Lines file of transactions (e.g. written by the jsonl sink).",
+    )
+    profile.add_argument("--output", help="Also export the profile to this file.")
+    profile.add_argument(
+        "--top", type=int, default=10, help="Rules and patterns listed (default: 10)."
+    )
+
+    reorder = commands.add_parser(
+        "reorder",
+        help="Show the order the classifier would use with RULE_ORDER_PROFILES. "
+        "The worksheet is not modified.",
+    )
+    reorder.add_argument("profiles", nargs="+", help="Profile JSON files.")
+
+    analyze = commands.add_parser(
+        "analyze",
+        help="Find duplicate, shadowed and unmatched rules. "
+        "The worksheet is not modified.",
+    )
+    analyze.add_argument(
+        "--rules",
+        help="CSV file of rules (conditions,category) to analyze instead of the "
+        "configured worksheet.",
+    )
+    analyze.add_argument(
+        "--transactions",
+        help="JSON Lines file of historical transactions; rules matching none "
+        "of them are reported.",
+    )
+    analyze.add_argument(
+        "--output",
+        help="Write the pruned rules to this CSV file (conditions,category).",
+    )
+    analyze.add_argument(
+        "--prune-unmatched",
+        action="store_true",
+        help="Also leave the unmatched rules out of --output.",
+    )
+    return parser
+
+
+def _iter_transactions(path: str) -> Iterator[Transaction]:
+    with Path(path).open(encoding="utf-8") as file:
+        for line in file:
+            if line.strip():
+                yield Transaction.model_validate_json(line)
+
+
+def _profile(args: argparse.Namespace) -> dict:
+    # Imported lazily: it authorizes against Google on import
+    from shared_code.finmail.core.classifier import rule_provider  # noqa: PLC0415
+
+    profiler = RuleProfiler()
+    classifier = TransactionClassifier(rule_provider=rule_provider, profiler=profiler)
+    for batch in batched(_iter_transactions(args.transactions), 1000):
+        classifier.classify_batch(list(batch))
+    if args.output:
+        profiler.export(args.output)
+    return profiler.to_dict()
+
+
+def _format_reorder(profiles: list[str]) -> str:
+    from shared_code.finmail.core.classifier import rule_provider  # noqa: PLC0415
+
+    profile = load_profiles(profiles)
+    hits = rule_hits(profile)
+    rules = rule_provider.get_rules()
+    order = optimize_rule_order(rules, hits)
+    optimized = [rules[i] for i in order]
+
+    lines = [
+        f"{'New':>5} {'Old':>5} {'Matches':>8}  Rule",
+        *(
+            f"{position:>5} {index + 1:>5} "
+            f"{hits.get((rules[index].conditions, rules[index].category), 0):>8}  "
+            f"{rules[index].conditions} -> {rules[index].category}"
+            for position, index in enumerate(order, start=1)
+            if position != index + 1
+        ),
+        "",
+        f"Moved rules: {sum(p != i for p, i in enumerate(order))} of {len(rules)}",
+        "Rules evaluated per transaction: "
+        f"{expected_evaluations(rules, hits, profile['classified']):.2f} -> "
+        f"{expected_evaluations(optimized, hits, profile['classified']):.2f}",
+    ]
+    return "\n".join(lines)
+
+
+def _load_rules(path: str | None) -> list[ClassificationRule]:
+    if path is not None:
+        with Path(path).open(encoding="utf-8", newline="") as file:
+            return [
+                ClassificationRule.model_validate(row) for row in csv.DictReader(file)
+            ]
+
+    from shared_code.finmail.core.classifier import rule_provider  # noqa: PLC0415
+    from shared_code.finmail.domain.classification.rule_providers import (  # noqa: PLC0415
+        PruningRuleProvider,
+    )
+
+    # Analyze the worksheet as is, even if PRUNE_RULES is set
+    if isinstance(rule_provider, PruningRuleProvider):
+        return rule_provider.rule_provider.get_rules()
+    return rule_provider.get_rules()
+
+
+def _analyze(args: argparse.Namespace) -> str:
+    sample = _iter_transactions(args.transactions) if args.transactions else None
+    analysis = analyze_rules(_load_rules(args.rules), sample)
+    if args.output:
+        with Path(args.output).open("w", encoding="utf-8", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(["conditions", "category"])
+            writer.writerows(
+                (rule.conditions, rule.category)
+                for rule in analysis.pruned_rules(
+                    include_unmatched=args.prune_unmatched
+                )
+            )
+    return format_analysis(analysis)
+
+
+def main(argv: list[str] | None = None) -> int:
+    """
+    Run a classification rule command.
+
+    Parameters
+    ----------
+    argv : list[str] | None, optional
+        The command line arguments. Defaults to `sys.argv`.
+
+    Returns
+    -------
+    int
+        The exit code.
+    """
+    args = _build_parser().parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+
+    if args.command == "analyze":
+        print(_analyze(args))  # noqa: T201
+        return 0
+    if args.command == "reorder":
+        print(_format_reorder(args.profiles))  # noqa: T201
+        return 0
+    profile = (
+        load_profiles(args.profiles) if args.command == "report" else _profile(args)
+    )
+    print(format_report(profile, top=args.top))  # noqa: T201
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,334 @@
+"""
+Rule analysis module.
+
+Finds classification rules that only cost evaluation time: rules on unknown
+fields, exact duplicates and rules shadowed by an earlier rule, which can never
+be the first match, and, given a sample of historical transactions, rules that
+match none of them. Rules with patterns that may backtrack catastrophically
+are reported too, and never run on the sample.
+"""
+
+from collections import defaultdict
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+
+from shared_code.finmail.domain.classification.classification_rules import (
+    ClassificationRule,
+)
+from shared_code.finmail.domain.classification.expressions import (
+    Expression,
+    Not,
+    Or,
+    Term,
+    is_conjunction,
+    parse_expression,
+    terms,
+)
+from shared_code.finmail.domain.classification.patterns import (
+    Condition,
+    analyze_condition,
+    analyze_conditions,
+    condition_implies,
+)
+from shared_code.finmail.domain.classification.safety import screen_pattern
+from shared_code.finmail.models import Transaction
+
+# Findings proven from the rules alone; removing these rules never changes a
+# classification. "unmatched" findings only hold for the sample, and "unsafe"
+# rules need to be rewritten rather than removed.
+PROVEN_KINDS = frozenset({"unknown_field", "duplicate", "shadowed"})
+
+
+@dataclass(slots=True)
+class RuleFinding:
+    """A problem found in a rule."""
+
+    # Index of the rule in the analyzed list
+    position: int
+    # "unknown_field", "unsafe", "duplicate", "shadowed" or "unmatched"
+    kind: str
+    detail: str
+    # Index of the earlier rule responsible, for duplicates and shadowed rules
+    related: int | None = None
+
+
+@dataclass(slots=True)
+class RuleAnalysis:
+    """Findings of `analyze_rules`."""
+
+    rules: list[ClassificationRule]
+    findings: list[RuleFinding] = field(default_factory=list)
+    # Number of sampled transactions, 0 without a sample
+    sample_size: int = 0
+
+    def pruned_rules(
+        self, *, include_unmatched: bool = False
+    ) -> list[ClassificationRule]:
+        """
+        Get the rules without the ones that never apply.
+
+        Parameters
+        ----------
+        include_unmatched : bool, optional
+            Also remove the rules that matched no sampled transaction. Unlike
+            the other findings, this may change future classifications.
+            Default is False.
+
+        Returns
+        -------
+        list[ClassificationRule]
+            The remaining rules, in their original order. Unsafe rules are
+            kept, to be rewritten.
+        """
+        removed = {
+            finding.position
+            for finding in self.findings
+            if finding.kind in PROVEN_KINDS
+            or (include_unmatched and finding.kind == "unmatched")
+        }
+        return [rule for i, rule in enumerate(self.rules) if i not in removed]
+
+
+def _rule_implies(narrow: list[Condition], broad: list[Condition]) -> bool:
+    # Every condition of the broad rule holds whenever the narrow rule matches
+    return all(
+        any(n.field == b.field and condition_implies(n, b) for n in narrow)
+        for b in broad
+    )
+
+
+def _format_rule(position: int, rule: ClassificationRule) -> str:
+    return f"#{position + 1} {rule.conditions} -> {rule.category}"
+
+
+def _find_static(
+    rules: list[ClassificationRule],
+    expressions: list[Expression],
+    analyzed: list[list[Condition]],
+) -> list[RuleFinding]:
+    findings = []
+    seen: dict[object, int] = {}
+    # Rules that never run (unknown fields) or may be quarantined (unsafe),
+    # so they cannot take the matches of a later rule
+    skipped: set[int] = set()
+    for j, (expression, conditions) in enumerate(
+        zip(expressions, analyzed, strict=True)
+    ):
+        # Only a required condition on an unknown field prevents any match
+        unknown = sorted({
+            c.field for c in conditions if c.field not in Transaction.model_fields
+        })
+        if unknown:
+            findings.append(
+                RuleFinding(j, "unknown_field", f"unknown fields: {', '.join(unknown)}")
+            )
+            skipped.add(j)
+            continue
+
+        unsafe = [
+            f"{term.field}:{term.pattern} ({reason})"
+            for term in terms(expression)
+            if (reason := screen_pattern(term.pattern)) is not None
+        ]
+        if unsafe:
+            findings.append(RuleFinding(j, "unsafe", "; ".join(unsafe)))
+            skipped.add(j)
+            continue
+
+        # The order of AND conditions does not matter; other expressions are
+        # compared as parsed
+        key = (
+            frozenset((c.field, c.pattern) for c in conditions)
+            if is_conjunction(expression)
+            else expression
+        )
+        if key in seen:
+            i = seen[key]
+            findings.append(
+                RuleFinding(
+                    j,
+                    "duplicate",
+                    f"same conditions as {_format_rule(i, rules[i])}",
+                    related=i,
+                )
+            )
+            continue
+        seen[key] = j
+
+        for i in range(j):
+            if i in skipped:
+                continue
+            if is_conjunction(expressions[i]) and _rule_implies(
+                conditions, analyzed[i]
+            ):
+                findings.append(
+                    RuleFinding(
+                        j,
+                        "shadowed",
+                        f"every match is taken by {_format_rule(i, rules[i])}",
+                        related=i,
+                    )
+                )
+                break
+    return findings
+
+
+def _condition_indices(
+    condition: Condition, values: dict[object, set[int]]
+) -> set[int]:
+    # The sampled transactions a condition matches, from the indices of each
+    # distinct value of its field
+    if condition.comparison is not None:
+        key = condition.comparison.key
+        matches = (
+            value for value in values if condition.comparison.contains(key(value))
+        )
+    else:
+        matches = (value for value in values if condition.compiled.search(str(value)))
+    return set().union(*(values[value] for value in matches))
+
+
+def _matched_indices(
+    expression: Expression,
+    indices_by_value: dict[str, dict[object, set[int]]],
+    sample_size: int,
+) -> set[int]:
+    # The sampled transactions an expression matches
+    if isinstance(expression, Term):
+        return _condition_indices(
+            analyze_condition(expression.field, expression.pattern),
+            indices_by_value.get(expression.field, {}),
+        )
+    if isinstance(expression, Not):
+        return set(range(sample_size)) - _matched_indices(
+            expression.operand, indices_by_value, sample_size
+        )
+    operands = [
+        _matched_indices(operand, indices_by_value, sample_size)
+        for operand in expression.operands
+    ]
+    if isinstance(expression, Or):
+        return set().union(*operands)
+    return set.intersection(*operands)
+
+
+def _find_unmatched(
+    expressions: list[Expression],
+    analyzed: list[list[Condition]],
+    sample: list[Transaction],
+    skipped: set[int],
+) -> list[RuleFinding]:
+    # Each distinct value of a field is matched once, for every transaction
+    # holding it
+    indices_by_value: dict[str, dict[object, set[int]]] = defaultdict(
+        lambda: defaultdict(set)
+    )
+    for index, transaction in enumerate(sample):
+        for field_name in Transaction.model_fields:
+            value = getattr(transaction, field_name)
+            if value is not None:
+                indices_by_value[field_name][value].add(index)
+
+    findings = []
+    for j, (expression, conditions) in enumerate(
+        zip(expressions, analyzed, strict=True)
+    ):
+        if j in skipped:
+            continue
+        # Point at a required condition matching nothing, if any
+        for condition in conditions:
+            values = indices_by_value.get(condition.field, {})
+            if not _condition_indices(condition, values):
+                findings.append(
+                    RuleFinding(
+                        j,
+                        "unmatched",
+                        f"{condition.field}:{condition.pattern} matches none of the "
+                        f"{len(values)} distinct sampled values",
+                    )
+                )
+                break
+        else:
+            if not _matched_indices(expression, indices_by_value, len(sample)):
+                findings.append(
+                    RuleFinding(
+                        j, "unmatched", "its conditions never match the same sample"
+                    )
+                )
+    return findings
+
+
+def analyze_rules(
+    rules: list[ClassificationRule], sample: Iterable[Transaction] | None = None
+) -> RuleAnalysis:
+    """
+    Find the rules that never apply or never matched a sample.
+
+    Shadowing is only reported when it is proven from the patterns (see
+    `patterns.condition_implies`): a rule is shadowed if an earlier rule
+    matches every transaction it matches, so it is never the first match.
+
+    Parameters
+    ----------
+    rules : list[ClassificationRule]
+        The rules, in evaluation order.
+    sample : Iterable[Transaction] | None, optional
+        Historical transactions. If provided, rules (and their conditions)
+        matching none of them are reported as ``unmatched``.
+
+    Returns
+    -------
+    RuleAnalysis
+        The findings, at most one per rule, ordered by rule.
+    """
+    expressions = [parse_expression(rule.conditions) for rule in rules]
+    analyzed = [analyze_conditions(rule.conditions) for rule in rules]
+    findings = _find_static(rules, expressions, analyzed)
+    sample = list(sample or [])
+    if sample:
+        skipped = {finding.position for finding in findings}
+        findings.extend(_find_unmatched(expressions, analyzed, sample, skipped))
+        findings.sort(key=lambda finding: finding.position)
+    return RuleAnalysis(rules=rules, findings=findings, sample_size=len(sample))
+
+
+def format_analysis(analysis: RuleAnalysis) -> str:
+    """
+    Format the findings of an analysis, grouped by kind.
+
+    Parameters
+    ----------
+    analysis : RuleAnalysis
+        The analysis to format.
+
+    Returns
+    -------
+    str
+        The report.
+    """
+    titles = {
+        "unknown_field": "Rules on unknown fields (never match)",
+        "unsafe": "Rules with patterns that may backtrack catastrophically "
+        "(quarantined unless REGEX_ENGINE is re2)",
+        "duplicate": "Duplicate rules (never the first match)",
+        "shadowed": "Shadowed rules (never the first match)",
+        "unmatched": f"Rules matching none of the {analysis.sample_size} "
+        "sampled transactions",
+    }
+    lines = [f"Analyzed rules: {len(analysis.rules)}"]
+    for kind, title in titles.items():
+        findings = [f for f in analysis.findings if f.kind == kind]
+        if kind == "unmatched" and not analysis.sample_size:
+            continue
+        lines.extend(["", f"{title}: {len(findings)}"])
+        lines.extend(
+            f"  {_format_rule(f.position, analysis.rules[f.position])}: {f.detail}"
+            for f in findings
+        )
+    lines.extend([
+        "",
+        f"Rules after pruning: {len(analysis.pruned_rules())} "
+        f"({len(analysis.pruned_rules(include_unmatched=True))} without the "
+        "unmatched ones)",
+    ])
+    return "\n".join(lines)
@@ -9,12 +9,20 @@ import re
 
 from pydantic import BaseModel, Field, field_validator
 
+from shared_code.finmail.domain.classification.comparisons import parse_comparison
+from shared_code.finmail.domain.classification.expressions import (
+    parse_expression,
+    terms,
+)
+
 
 def parse_conditions(expression: str) -> list[tuple[str, str]]:
     """
     Parse condition expression into list of (field_name, pattern) tuples.
 
-    Supports single and multi-condition expressions with AND logic.
+    Supports single and multi-condition expressions combined with AND, OR,
+    NOT and parentheses (see `expressions.parse_expression`). Every condition
+    is returned, whatever operator applies to it.
 
     Parameters
     ----------
@@ -25,12 +33,12 @@ def parse_conditions(expression: str) -> list[tuple[str, str]]:
     Returns
     -------
     list[tuple[str, str]]
-        List of (field_name, pattern) tuples.
+        List of (field_name, pattern) tuples, in source order.
 
     Raises
     ------
     ValueError
-        If the condition format is invalid (missing colon).
+        If the condition format is invalid (missing colon or parenthesis).
 
     Examples
     --------
@@ -38,22 +46,10 @@ def parse_conditions(expression: str) -> list[tuple[str, str]]:
     [("merchant", ".*uber.*")]
     >>> parse_conditions("pocket:.*Rappi.* AND description:.*food.*")
     [("pocket", ".*Rappi.*"), ("description", ".*food.*")]
-    """
-    conditions = []
-    parts = expression.split(" AND ")
-
-    for part in parts:
-        condition = part.strip()
-        if ":" not in condition:
-            raise ValueError(
-                f"Invalid condition format: {condition}. Expected 'field:pattern'"
-            )
-
-        # Split only on first ':', allowing ':' in regex pattern
-        field_name, pattern = condition.split(":", 1)
-        conditions.append((field_name.strip(), pattern.strip()))
-
-    return conditions
+    >>> parse_conditions("(merchant:uber OR merchant:didi) AND NOT pocket:Work")
+    [("merchant", "uber"), ("merchant", "didi"), ("pocket", "Work")]
+    """  # noqa: DOC502
+    return [(term.field, term.pattern) for term in terms(parse_expression(expression))]
 
 
 class ClassificationRule(BaseModel):
@@ -62,16 +58,25 @@ class ClassificationRule(BaseModel):
 
     Rules use expression syntax: 'field:pattern [AND field:pattern ...]'
     where all conditions must match (AND logic) for the rule to apply.
+    Conditions can also be combined with OR and NOT, grouped in parentheses.
+    Numeric and date fields also take typed comparisons such as
+    'amount:<-500000' or 'date_local:weekday in 5,6' (see `comparisons`).
     """
 
     conditions: str = Field(
         description=(
-            "Condition expression using 'field:pattern [AND field:pattern ...]' syntax"
+            "Condition expression using 'field:pattern [AND field:pattern ...]' "
+            "syntax, with optional OR, NOT and parentheses"
         ),
-        examples=["merchant:.*uber.*", "pocket:.*Rappi.* AND description:.*food.*"],
+        examples=[
+            "merchant:.*uber.*",
+            "pocket:.*Rappi.* AND description:.*food.*",
+            "(merchant:uber OR merchant:didi) AND NOT description:eats",
+            "amount:<-500000 AND date_local:weekday in 5,6",
+        ],
     )
     category: str = Field(
-        description="The category to assign when all conditions match",
+        description="The category to assign when the conditions match",
         examples=["Transport", "Food", "Transfer"],
     )
 
@@ -83,7 +88,8 @@ class ClassificationRule(BaseModel):
 
         Validates that:
         1. Expression can be parsed
-        2. All patterns are valid regex
+        2. All comparisons are well formed
+        3. All other patterns are valid regex
 
         Parameters
         ----------
@@ -105,8 +111,13 @@ class ClassificationRule(BaseModel):
         except ValueError as e:
             raise ValueError(f"Invalid condition expression: {e}") from e
 
-        # Validate each regex pattern
+        # Validate each comparison and regex pattern
         for field_name, pattern in parsed_conditions:
+            try:
+                if parse_comparison(field_name, pattern) is not None:
+                    continue
+            except ValueError as e:
+                raise ValueError(f"Invalid condition expression: {e}") from e
             try:
                 re.compile(pattern)
             except re.error as e:
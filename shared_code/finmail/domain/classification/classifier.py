@@ -7,29 +7,177 @@ based on multi-condition rules.
 
 import logging
 import re
+import threading
+import time
+from collections import defaultdict
+from collections.abc import Mapping
+from dataclasses import dataclass
 from datetime import datetime, timedelta
+from typing import Literal, TypeVar
 
 from shared_code.finmail.domain.classification.classification_rules import (
-    parse_conditions,
+    ClassificationRule,
+)
+from shared_code.finmail.domain.classification.comparisons import (
+    Comparison,
+    IntervalIndex,
+    parse_comparison,
+)
+from shared_code.finmail.domain.classification.expressions import (
+    parse_expression,
+    required_terms,
+    terms,
+)
+from shared_code.finmail.domain.classification.optimizer import optimize_rule_order
+from shared_code.finmail.domain.classification.plans import (
+    Check,
+    Slot,
+    build_plan,
+    compile_term,
+    evaluate_plan,
+    field_values,
+    term_slot,
+)
+from shared_code.finmail.domain.classification.profiling import (
+    PatternStats,
+    RuleProfiler,
+    RuleStats,
 )
 from shared_code.finmail.domain.classification.rule_providers import (
     RuleProvider,
 )
-from shared_code.finmail.models import Transaction
+from shared_code.finmail.domain.classification.safety import import_re2
+from shared_code.finmail.exceptions import UnsafePatternError
+from shared_code.finmail.models import Transaction, TransactionRecord
+from shared_code.finmail.utils.tracing import start_span
 
 logger = logging.getLogger(__name__)
 
+# Transactions are classified as models or as lightweight records
+TransactionT = TypeVar("TransactionT", Transaction, TransactionRecord)
+
+
+def _evaluate_cpu_time(
+    plan: tuple[Check, ...], texts: tuple, folded: tuple
+) -> tuple[bool, float]:
+    # Evaluate a rule, counting only the CPU time of this thread, so a GC
+    # pause or a busy thread does not count
+    started_at = time.thread_time()
+    matched = evaluate_plan(plan, texts, folded)
+    return matched, time.thread_time() - started_at
+
+
+def _with_category(transaction: TransactionT, category: str) -> TransactionT:
+    if type(transaction) is TransactionRecord:
+        return transaction.with_category(category)
+    return transaction.model_copy(update={"category": category})
+
+
+@dataclass(frozen=True, slots=True)
+class _CompiledRules:
+    """
+    The compiled rules of a classifier.
+
+    A classification reads a single instance, and reloads and quarantines
+    replace it as a whole, so it never sees a partially updated rule set.
+    """
+
+    rules: tuple[ClassificationRule, ...] = ()
+    # (plan, category) of every rule, in evaluation order
+    entries: tuple[tuple[tuple[Check, ...], str], ...] = ()
+    # The expression and condition checks of every rule, to rebuild the plans
+    rule_terms: tuple[tuple, ...] = ()
+    # The slots the plans check, and the candidate rules by the value of the
+    # slots compared by required typed conditions
+    slots: tuple[Slot, ...] = ()
+    candidate_indexes: tuple[tuple[int, IntervalIndex], ...] = ()
+    # The profiler counters and plans recording into them, if profiling
+    rule_stats: tuple[RuleStats, ...] = ()
+    profiled_plans: tuple[tuple[Check, ...], ...] = ()
+
+
+def _build_candidate_indexes(
+    entries: tuple, rule_terms: tuple, slots: tuple[Slot, ...]
+) -> tuple[tuple[int, IntervalIndex], ...]:
+    # Index the rules by the intervals of their required comparisons, per
+    # slot: a rule is only a candidate if its key falls in them
+    constraints: dict[int, dict[int, list[Comparison]]] = defaultdict(
+        lambda: defaultdict(list)
+    )
+    for position, (expression, _) in enumerate(rule_terms):
+        for term in required_terms(expression):
+            comparison = parse_comparison(term.field, term.pattern)
+            if comparison is not None:
+                slot = slots.index((term.field, comparison.key))
+                constraints[slot][position].append(comparison)
+    return tuple(
+        (slot, IntervalIndex(entries, rule_constraints))
+        for slot, rule_constraints in constraints.items()
+    )
+
+
+def _build_profiled_plans(
+    rule_terms: tuple, rule_stats: tuple[RuleStats, ...]
+) -> tuple[tuple[Check, ...], ...]:
+    # The plans of the rules, with conditions recording into the stats
+    return tuple(
+        build_plan(
+            expression,
+            [
+                (_profiled_check(check, index, pattern_stats), cost)
+                for (check, cost, index), pattern_stats in zip(
+                    term_checks, rule_stats.patterns, strict=True
+                )
+            ],
+        )
+        for (expression, term_checks), rule_stats in zip(
+            rule_terms, rule_stats, strict=True
+        )
+    )
+
+
+def _profiled_check(check: Check, index: int, pattern_stats: PatternStats) -> Check:
+    # Count and time the evaluations of a condition on a present field
+    def profiled(texts: tuple, folded: tuple) -> bool:
+        if texts[index] is None:
+            return check(texts, folded)
+        started_at = time.perf_counter()
+        matched = check(texts, folded)
+        pattern_stats.total_s += time.perf_counter() - started_at
+        pattern_stats.evaluations += 1
+        if matched:
+            pattern_stats.matches += 1
+        return matched
+
+    return profiled
+
 
 class TransactionClassifier:
     """
     Classifies transactions based on multi-condition classification rules.
 
-    The classifier evaluates rules with AND logic - all conditions in a rule
-    must match for the rule to apply. Rules are evaluated in order and the
-    first matching rule determines the category.
+    The classifier evaluates the condition expression of every rule (see
+    `ClassificationRule`) - conditions joined by AND, OR and NOT - and the
+    first matching rule, in order, determines the category. Expressions are
+    compiled into short-circuiting plans (see `plans`): field values are
+    looked up once per transaction, and cheap literal checks run before
+    regexes.
+
+    Rules whose patterns may backtrack catastrophically, or that exceeded the
+    match time budget, are quarantined: skipped and logged, as listed in
+    `quarantined`.
     """
 
-    def __init__(self, rule_provider: RuleProvider, ttl_min: float = 60.0) -> None:
+    def __init__(  # noqa: PLR0913
+        self,
+        rule_provider: RuleProvider,
+        ttl_min: float = 60.0,
+        profiler: RuleProfiler | None = None,
+        rule_hits: Mapping[tuple[str, str], int] | None = None,
+        *,
+        regex_engine: Literal["re", "re2"] = "re",
+        match_budget_ms: float | None = None,
+    ) -> None:
         """
         Initialize the transaction classifier.
 
@@ -40,50 +188,193 @@ class TransactionClassifier:
         ttl_min : float, optional
             Time-to-live in min for cached rules. Rules will be reloaded
             after this time expires. Default is 60.0 minutes.
-        """
+        profiler : RuleProfiler | None, optional
+            Records evaluation and match counts and pattern timings of every
+            rule, if provided. Profiling slows classification down.
+        rule_hits : Mapping[tuple[str, str], int] | None, optional
+            How often each rule matched, by ``(conditions, category)``, e.g.
+            from a rule profile. If provided, the compiled rules are reordered
+            by hits wherever it cannot change a classification (see
+            `optimize_rule_order`). The rule source is left untouched.
+        regex_engine : {"re", "re2"}, optional
+            The regex engine. With "re2", patterns are matched in linear time
+            by RE2 (``finmail[re2]`` extra), except the ones it does not
+            support, which use `re`. Default is "re".
+        match_budget_ms : float | None, optional
+            Maximum CPU time a rule may take on a transaction (a GC pause or
+            a busy thread does not count). If provided, every rule is timed
+            as it is evaluated, and a rule over the budget is quarantined for
+            as long as the process runs, unless it changes. This only detects
+            slow rules after the fact: the loading screen and RE2 are what
+            prevent the stalls. Disabled by default.
+
+        Raises
+        ------
+        ImportError
+            If `regex_engine` is "re2" and google-re2 is not installed.
+        """  # noqa: DOC502
         self.rule_provider = rule_provider
         self.ttl = timedelta(minutes=ttl_min)
-        self._compiled_rules: list[tuple[list[tuple[str, re.Pattern]], str]] | None = (
-            None
+        self.profiler = profiler
+        self.rule_hits = rule_hits
+        self._re2 = import_re2() if regex_engine == "re2" else None
+        self._match_budget_s = (
+            match_budget_ms / 1000 if match_budget_ms is not None else None
         )
+        # Serializes reloads and quarantines, which replace the rules
+        self._lock = threading.Lock()
+        # Quarantine reasons by rule (conditions, category), replaced rather
+        # than updated so they can be read without the lock
+        self._unsafe_rules: dict[tuple[str, str], str] = {}
+        self._slow_rules: dict[tuple[str, str], str] = {}
+        self._compiled: _CompiledRules | None = None
         self._rules_loaded_at: datetime | None = None
 
     def _load_and_compile_rules(self) -> None:
         """
-        Load rules from provider and compile regex patterns.
+        Load rules from provider and compile them.
 
-        Creates a list of (conditions_list, category) tuples where
-        conditions_list is a list of (field_name, compiled_pattern) tuples.
+        Creates a list of (plan, category) tuples where plan is the tuple of
+        checks that must all pass (see `plans.build_plan`). Must be called
+        with the lock held.
         """
-        rules = self.rule_provider.get_rules()
-        self._compiled_rules = []
+        with start_span("finmail.load_rules") as span:
+            started_at = time.perf_counter()
+            rules = self.rule_provider.get_rules()
+            compiled, unsafe_rules = self._compile_rules(rules)
+            self._compiled, self._unsafe_rules = compiled, unsafe_rules
+            self._rules_loaded_at = datetime.now()
+            span.set_attributes({
+                "finmail.rules.loaded": len(rules),
+                "finmail.rules.count": len(compiled.entries),
+                "finmail.rules.quarantined": len(self.quarantined),
+                "finmail.rules.reload_ms": (time.perf_counter() - started_at) * 1000,
+            })
+        logger.info(
+            "Loaded and compiled %d classification rules", len(compiled.entries)
+        )
+
+    @property
+    def quarantined(self) -> dict[tuple[str, str], str]:
+        """The reason each quarantined rule is skipped, by (conditions, category)."""
+        return {**self._unsafe_rules, **self._slow_rules}
+
+    def _compile_rules(
+        self, rules: list[ClassificationRule]
+    ) -> tuple[_CompiledRules, dict[tuple[str, str], str]]:
+        # Compile the rules, and the quarantine reasons of the unsafe ones
+        unsafe_rules = {}
+        entries = []
+        compiled_rules = []
+        rule_terms = []
+        # Index of every slot in the values shared by the plans
+        slots: dict[Slot, int] = {}
 
         for rule in rules:
-            # Parse the expression into (field_name, pattern) tuples
-            parsed_conditions = parse_conditions(rule.conditions)
+            if (rule.conditions, rule.category) in self._slow_rules:
+                continue
+
+            expression = parse_expression(rule.conditions)
 
-            # Compile all patterns
-            compiled_conditions = []
-            for field_name, pattern in parsed_conditions:
+            # Compile all conditions
+            term_checks = []
+            for term in terms(expression):
                 try:
-                    compiled_pattern = re.compile(pattern, re.IGNORECASE)
-                    compiled_conditions.append((field_name, compiled_pattern))
-                except re.error as e:
+                    index = slots.setdefault(term_slot(term), len(slots))
+                    check, cost = compile_term(term, index, self._re2)
+                except UnsafePatternError as e:
+                    unsafe_rules[rule.conditions, rule.category] = e.reason
+                    logger.warning(
+                        "Quarantined classification rule '%s' -> %s: %s",
+                        rule.conditions,
+                        rule.category,
+                        e,
+                    )
+                    break
+                except (re.error, ValueError) as e:
                     logger.warning(
-                        "Skipping invalid regex pattern '%s' for field '%s': %s",
-                        pattern,
-                        field_name,
+                        "Skipping invalid condition '%s' for field '%s': %s",
+                        term.pattern,
+                        term.field,
                         e,
                     )
-                    continue
+                    break
+                term_checks.append((check, cost, index))
+            else:
+                # Only add rule if all patterns compiled successfully
+                plan = build_plan(
+                    expression, [(check, cost) for check, cost, _ in term_checks]
+                )
+                entries.append((plan, rule.category))
+                compiled_rules.append(rule)
+                rule_terms.append((expression, term_checks))
 
-            # Only add rule if all patterns compiled successfully
-            if len(compiled_conditions) == len(parsed_conditions):
-                self._compiled_rules.append((compiled_conditions, rule.category))
+        if self.rule_hits:
+            order = optimize_rule_order(compiled_rules, self.rule_hits)
+            entries = [entries[i] for i in order]
+            compiled_rules = [compiled_rules[i] for i in order]
+            rule_terms = [rule_terms[i] for i in order]
+            logger.info(
+                "Reordered %d of %d classification rules by hits",
+                sum(i != position for position, i in enumerate(order)),
+                len(order),
+            )
 
-        self._rules_loaded_at = datetime.now()
-        logger.info(
-            "Loaded and compiled %d classification rules", len(self._compiled_rules)
+        compiled = self._build_compiled_rules(
+            tuple(compiled_rules), tuple(entries), tuple(rule_terms), tuple(slots)
+        )
+        return compiled, unsafe_rules
+
+    def _build_compiled_rules(
+        self, rules: tuple, entries: tuple, rule_terms: tuple, slots: tuple
+    ) -> _CompiledRules:
+        # Index the rules, and register them with the profiler if profiling
+        candidate_indexes = _build_candidate_indexes(entries, rule_terms, slots)
+        if self.profiler is None:
+            return _CompiledRules(rules, entries, rule_terms, slots, candidate_indexes)
+        rule_stats = tuple(self.profiler.register(list(rules)))
+        return _CompiledRules(
+            rules,
+            entries,
+            rule_terms,
+            slots,
+            candidate_indexes,
+            rule_stats,
+            _build_profiled_plans(rule_terms, rule_stats),
+        )
+
+    def _quarantine(self, entry: tuple) -> None:
+        with self._lock:
+            compiled = self._compiled
+            position = next(
+                (i for i, e in enumerate(compiled.entries) if e is entry), None
+            )
+            if position is None:
+                # Already quarantined, or the rules were reloaded
+                return
+            rule = compiled.rules[position]
+
+            def without(items: tuple) -> tuple:
+                return items[:position] + items[position + 1 :]
+
+            reason = (
+                f"exceeded the match time budget of {self._match_budget_s * 1000:g} ms"
+            )
+            self._slow_rules = {
+                **self._slow_rules,
+                (rule.conditions, rule.category): reason,
+            }
+            self._compiled = self._build_compiled_rules(
+                without(compiled.rules),
+                without(compiled.entries),
+                without(compiled.rule_terms),
+                compiled.slots,
+            )
+        logger.warning(
+            "Quarantined classification rule '%s' -> %s: %s",
+            rule.conditions,
+            rule.category,
+            reason,
         )
 
     def _is_cache_expired(self) -> bool:
@@ -96,53 +387,162 @@ class TransactionClassifier:
             True if cache is expired or not loaded, False otherwise.
         """
         return (
-            self._compiled_rules is None
+            self._compiled is None
             or self._rules_loaded_at is None
             or datetime.now() - self._rules_loaded_at > self.ttl
         )
 
-    def classify(self, transaction: Transaction) -> Transaction:
+    def refresh_rules(self) -> bool:
         """
-        Classify a transaction by applying classification rules.
-
-        Rules are evaluated in order. The first rule where ALL conditions
-        match (AND logic) determines the category.
-
-        Parameters
-        ----------
-        transaction : Transaction
-            The transaction to classify.
+        Reload the rules if the cache expired.
 
         Returns
         -------
-        Transaction
-            A new transaction instance with the classified category.
+        bool
+            True if the rules were reloaded.
         """
-        if self._is_cache_expired():
+        if not self._is_cache_expired():
+            return False
+        with self._lock:
+            # Another thread may have reloaded them while this one waited
+            if not self._is_cache_expired():
+                return False
             self._load_and_compile_rules()
+        return True
 
-        # Try each rule in order
-        for conditions_list, category in self._compiled_rules:
-            # Check if ALL conditions match (AND logic)
-            all_match = True
+    def _apply_rules(self, transaction: TransactionT) -> TransactionT:
+        # Classify with a single snapshot of the rules, even if they are
+        # reloaded or quarantined meanwhile
+        compiled = self._compiled
+        if self.profiler is not None:
+            return self._apply_rules_profiled(transaction, compiled)
+        if self._match_budget_s is None:
+            return self._apply_compiled_rules(transaction, compiled)
+        return self._apply_rules_timed(transaction, compiled)
 
-            for field_name, compiled_pattern in conditions_list:
-                # Get field value from transaction
-                field_value = getattr(transaction, field_name, None)
+    @staticmethod
+    def _candidate_rules(compiled: _CompiledRules, texts: tuple) -> tuple:
+        # Only try the rules whose typed conditions may hold, from the most
+        # selective index
+        rules = compiled.entries
+        for slot, interval_index in compiled.candidate_indexes:
+            candidates = interval_index.candidates(texts[slot])
+            if len(candidates) < len(rules):
+                rules = candidates
+        return rules
 
-                # If field doesn't exist or is None, condition fails
-                if field_value is None:
-                    all_match = False
-                    break
+    def _apply_compiled_rules(
+        self, transaction: TransactionT, compiled: _CompiledRules
+    ) -> TransactionT:
+        texts, folded = field_values(transaction, compiled.slots)
 
-                # Check if pattern matches
-                if not compiled_pattern.search(str(field_value)):
-                    all_match = False
+        # Try each rule in order
+        for plan, category in self._candidate_rules(compiled, texts):
+            # The rule matches if every check of its plan passes
+            for check in plan:
+                if not check(texts, folded):
                     break
-
-            # If all conditions matched, apply this category
-            if all_match:
-                return transaction.model_copy(update={"category": category})
+            else:
+                return _with_category(transaction, category)
 
         # No rules matched, return unchanged
         return transaction
+
+    def _apply_rules_timed(
+        self, transaction: TransactionT, compiled: _CompiledRules
+    ) -> TransactionT:
+        # Same evaluation as `_apply_compiled_rules`, timing every rule in CPU
+        # time and quarantining the ones over the budget
+        matched_category = None
+        slow_entries = []
+        texts, folded = field_values(transaction, compiled.slots)
+        for entry in self._candidate_rules(compiled, texts):
+            matched, elapsed = _evaluate_cpu_time(entry[0], texts, folded)
+            if elapsed > self._match_budget_s:
+                slow_entries.append(entry)
+            if matched:
+                matched_category = entry[1]
+                break
+        for entry in slow_entries:
+            self._quarantine(entry)
+
+        if matched_category is None:
+            return transaction
+        return _with_category(transaction, matched_category)
+
+    def _apply_rules_profiled(
+        self, transaction: TransactionT, compiled: _CompiledRules
+    ) -> TransactionT:
+        # Same evaluation as `_apply_rules`, counting and timing every step
+        matched_category = None
+        slow_entries = []
+        with self.profiler.lock:
+            texts, folded = field_values(transaction, compiled.slots)
+            for entry, plan, rule_stats in zip(
+                compiled.entries,
+                compiled.profiled_plans,
+                compiled.rule_stats,
+                strict=True,
+            ):
+                rule_stats.evaluations += 1
+                started_at = time.perf_counter()
+                cpu_started_at = time.thread_time()
+                matched = evaluate_plan(plan, texts, folded)
+                rule_stats.total_s += time.perf_counter() - started_at
+                if (
+                    self._match_budget_s is not None
+                    and time.thread_time() - cpu_started_at > self._match_budget_s
+                ):
+                    slow_entries.append(entry)
+
+                if matched:
+                    rule_stats.matches += 1
+                    matched_category = entry[1]
+                    break
+        # Quarantining registers the rules with the profiler, which needs its lock
+        for entry in slow_entries:
+            self._quarantine(entry)
+        self.profiler.record_classification()
+
+        if matched_category is None:
+            return transaction
+        return _with_category(transaction, matched_category)
+
+    def classify(self, transaction: TransactionT) -> TransactionT:
+        """
+        Classify a transaction by applying classification rules.
+
+        Rules are evaluated in order. The first rule whose condition
+        expression matches determines the category.
+
+        Parameters
+        ----------
+        transaction : Transaction | TransactionRecord
+            The transaction to classify. Records are copied without the
+            overhead of `Transaction.model_copy`.
+
+        Returns
+        -------
+        Transaction | TransactionRecord
+            A new instance of the same type with the classified category, or
+            the transaction itself if no rule matched.
+        """
+        self.refresh_rules()
+        return self._apply_rules(transaction)
+
+    def classify_batch(self, transactions: list[TransactionT]) -> list[TransactionT]:
+        """
+        Classify several transactions with a single rules cache check.
+
+        Parameters
+        ----------
+        transactions : list[Transaction | TransactionRecord]
+            The transactions to classify.
+
+        Returns
+        -------
+        list[Transaction | TransactionRecord]
+            The classified transactions, in the same order.
+        """
+        self.refresh_rules()
+        return [self._apply_rules(transaction) for transaction in transactions]
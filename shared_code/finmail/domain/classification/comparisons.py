@@ -0,0 +1,433 @@
+"""
+Typed comparison module.
+
+Parses the conditions that compare numeric and date fields natively instead of
+matching a regex on their string value::
+
+    amount:<-500000
+    amount:>=100
+    date_local:>=2024-01-01
+    date_local:weekday in 5,6
+    date_local:hour in 0..5,22..23
+
+Numeric fields (``amount``) take ``<``, ``<=``, ``>``, ``>=`` or ``=`` and a
+number. Date fields (``date_local``) take an operator and an ISO date or date
+and time, compared with the local wall-clock time; a date without a time
+stands for the whole day, so ``date_local:<=2024-01-31`` includes January 31.
+They also compare a component (``year``, ``month``, ``day``, ``weekday`` with
+0 for Monday, or ``hour``) with an operator and an integer, or with ``in`` and
+a list of integers and inclusive ``a..b`` ranges.
+
+Every comparison is a union of intervals on a key of the field value, so rules
+can be indexed by the boundaries of their intervals (see `IntervalIndex`).
+"""
+
+import operator
+import re
+from bisect import bisect_left, insort
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+from shared_code.finmail.models import Transaction
+
+# An interval: (low, high, low_closed, high_closed), None for unbounded
+Interval = tuple
+
+_OPERATOR = r"(<=|>=|<|>|=)"
+_COMPARISON = re.compile(rf"{_OPERATOR}\s*(.+?)\s*")
+_COMPONENT_NAMES = ("year", "month", "day", "weekday", "hour")
+_COMPONENT_COMPARISON = re.compile(
+    rf"({'|'.join(_COMPONENT_NAMES)})\s*(?:{_OPERATOR}\s*(.+?)|\s+in\s+(.+?))\s*"
+)
+
+_NUMERIC_FIELDS = frozenset(
+    name
+    for name, field_info in Transaction.model_fields.items()
+    if field_info.annotation in {int, float}
+)
+_DATE_FIELDS = frozenset(
+    name
+    for name, field_info in Transaction.model_fields.items()
+    if field_info.annotation is datetime
+)
+
+
+def _wall_clock(value: datetime) -> datetime:
+    return value.replace(tzinfo=None)
+
+
+# Key functions by component, None for the value itself
+_DATE_KEYS: dict[str | None, Callable] = {
+    None: _wall_clock,
+    "year": operator.attrgetter("year"),
+    "month": operator.attrgetter("month"),
+    "day": operator.attrgetter("day"),
+    "weekday": operator.methodcaller("weekday"),
+    "hour": operator.attrgetter("hour"),
+}
+
+
+@dataclass(frozen=True, slots=True)
+class Comparison:
+    """A typed condition: the intervals a key of the field value must fall in."""
+
+    field: str
+    # Component of a date compared, or None for the value itself
+    component: str | None
+    # Sorted by lower bound
+    intervals: tuple[Interval, ...]
+
+    @property
+    def key(self) -> Callable:
+        """The function computing the compared key from the field value."""
+        return float if self.field in _NUMERIC_FIELDS else _DATE_KEYS[self.component]
+
+    def contains(self, key: object) -> bool:
+        """
+        Tell whether a key falls in one of the intervals.
+
+        Parameters
+        ----------
+        key : object
+            The key of a field value, computed with `key`.
+
+        Returns
+        -------
+        bool
+            True if the condition matches.
+        """
+        return any(_in_interval(interval, key) for interval in self.intervals)
+
+
+def _in_interval(interval: Interval, key: object) -> bool:
+    low, high, low_closed, high_closed = interval
+    return (low is None or low < key or (low_closed and low == key)) and (
+        high is None or key < high or (high_closed and key == high)
+    )
+
+
+def _operator_interval(op: str, bound: object) -> Interval:
+    return {
+        "<": (None, bound, False, False),
+        "<=": (None, bound, False, True),
+        ">": (bound, None, False, False),
+        ">=": (bound, None, True, False),
+        "=": (bound, bound, True, True),
+    }[op]
+
+
+def _day_interval(op: str, day: datetime) -> Interval:
+    # A date without a time stands for [day, next day)
+    next_day = day + timedelta(days=1)
+    return {
+        "<": (None, day, False, False),
+        "<=": (None, next_day, False, False),
+        ">": (next_day, None, True, False),
+        ">=": (day, None, True, False),
+        "=": (day, next_day, True, False),
+    }[op]
+
+
+def _parse_members(text: str) -> list[Interval]:
+    intervals = []
+    for member in text.split(","):
+        low, separator, high = member.strip().partition("..")
+        low_value = int(low)
+        high_value = int(high) if separator else low_value
+        intervals.append((low_value, high_value, True, True))
+    return intervals
+
+
+def _sort_key(interval: Interval) -> tuple:
+    # Unbounded lower bounds first, then closed before open on equal bounds
+    return (interval[0] is not None, interval[0], not interval[2])
+
+
+def _parse_date(field_name: str, pattern: str) -> Comparison | None:
+    match = _COMPONENT_COMPARISON.fullmatch(pattern)
+    if match is not None:
+        component, op, value, members = match.groups()
+        intervals = (
+            _parse_members(members)
+            if members is not None
+            else [_operator_interval(op, int(value))]
+        )
+        return Comparison(
+            field_name, component, tuple(sorted(intervals, key=_sort_key))
+        )
+    match = _COMPARISON.fullmatch(pattern)
+    if match is None:
+        return None
+    op, value = match.groups()
+    bound = datetime.fromisoformat(value).replace(tzinfo=None)
+    interval = (
+        _day_interval(op, bound)
+        if len(value) == len("YYYY-MM-DD")
+        else _operator_interval(op, bound)
+    )
+    return Comparison(field_name, None, (interval,))
+
+
+def parse_comparison(field_name: str, pattern: str) -> Comparison | None:
+    """
+    Parse a typed condition.
+
+    Conditions on numeric fields starting with an operator, and on date fields
+    starting with an operator or a component name, are comparisons. These
+    never matched as regexes, since the string value of a number or date holds
+    no ``<``, ``>``, ``=`` or letters.
+
+    Parameters
+    ----------
+    field_name : str
+        The transaction field.
+    pattern : str
+        The pattern of the condition.
+
+    Returns
+    -------
+    Comparison | None
+        The comparison, or None if the condition is a regex.
+
+    Raises
+    ------
+    ValueError
+        If the condition looks like a comparison but is malformed.
+    """
+    starts_like_comparison = pattern[:1] in {"<", ">", "="}
+    try:
+        if field_name in _NUMERIC_FIELDS and starts_like_comparison:
+            match = _COMPARISON.fullmatch(pattern)
+            if match is not None:
+                op, value = match.groups()
+                return Comparison(
+                    field_name, None, (_operator_interval(op, float(value)),)
+                )
+        elif field_name in _DATE_FIELDS and (
+            starts_like_comparison or pattern.startswith(_COMPONENT_NAMES)
+        ):
+            comparison = _parse_date(field_name, pattern)
+            if comparison is not None:
+                return comparison
+        else:
+            return None
+    except ValueError:
+        pass
+    raise ValueError(
+        f"Invalid comparison '{pattern}' for field '{field_name}'. Expected "
+        "'<', '<=', '>', '>=' or '=' and a value, or a date component with an "
+        "operator or 'in'"
+    )
+
+
+def _interval_within(inner: Interval, outer: Interval) -> bool:
+    low, high, low_closed, high_closed = inner
+    outer_low, outer_high, outer_low_closed, outer_high_closed = outer
+    low_within = outer_low is None or (
+        low is not None
+        and (
+            outer_low < low
+            or (outer_low == low and (outer_low_closed or not low_closed))
+        )
+    )
+    high_within = outer_high is None or (
+        high is not None
+        and (
+            high < outer_high
+            or (high == outer_high and (outer_high_closed or not high_closed))
+        )
+    )
+    return low_within and high_within
+
+
+def _intervals_overlap(a: Interval, b: Interval) -> bool:
+    # Compare the greatest lower bound with the least upper bound
+    lows = [(x[0], x[2]) for x in (a, b) if x[0] is not None]
+    highs = [(x[1], x[3]) for x in (a, b) if x[1] is not None]
+    if not lows or not highs:
+        return True
+    low = max(bound for bound, _ in lows)
+    high = min(bound for bound, _ in highs)
+    if low != high:
+        return low < high
+    return all(closed for bound, closed in lows + highs if bound == low)
+
+
+def comparison_implies(narrow: Comparison, broad: Comparison) -> bool:
+    """
+    Tell whether a comparison matching implies another one matches.
+
+    Parameters
+    ----------
+    narrow : Comparison
+        A comparison.
+    broad : Comparison
+        A comparison on the same field.
+
+    Returns
+    -------
+    bool
+        True if every interval of `narrow` lies within an interval of
+        `broad`. False if it cannot be proven.
+    """
+    return narrow.component == broad.component and all(
+        any(_interval_within(interval, other) for other in broad.intervals)
+        for interval in narrow.intervals
+    )
+
+
+def comparisons_disjoint(a: Comparison, b: Comparison) -> bool:
+    """
+    Tell whether two comparisons on the same field never match the same value.
+
+    Parameters
+    ----------
+    a : Comparison
+        A comparison.
+    b : Comparison
+        Another comparison on the same field.
+
+    Returns
+    -------
+    bool
+        True if no interval of `a` overlaps an interval of `b`.
+    """
+    return a.component == b.component and not any(
+        _intervals_overlap(x, y) for x in a.intervals for y in b.intervals
+    )
+
+
+def _part_ranges(comparison: Comparison, boundaries: list) -> list[tuple[int, int]]:
+    # The sorted, disjoint ranges [start, end) of the parts the comparison
+    # holds on, numbering the open segments and the boundary points in turn:
+    # the segment before boundary i is part 2i, and the boundary part 2i + 1
+    parts = []
+    for low, high, low_closed, high_closed in comparison.intervals:
+        start = 0
+        if low is not None:
+            start = 2 * bisect_left(boundaries, low) + (1 if low_closed else 2)
+        end = 2 * len(boundaries) + 1
+        if high is not None:
+            end = 2 * bisect_left(boundaries, high) + (2 if high_closed else 1)
+        if start < end:
+            parts.append((start, end))
+
+    # Merged in order of their parts, whatever the order of the intervals
+    ranges: list[tuple[int, int]] = []
+    for start, end in sorted(parts):
+        if ranges and start <= ranges[-1][1]:
+            # Overlapping or adjacent intervals
+            ranges[-1] = (ranges[-1][0], max(ranges[-1][1], end))
+        else:
+            ranges.append((start, end))
+    return ranges
+
+
+def _intersect_ranges(
+    a: list[tuple[int, int]], b: list[tuple[int, int]]
+) -> list[tuple[int, int]]:
+    # The intersection of two sorted lists of disjoint ranges
+    ranges = []
+    i = j = 0
+    while i < len(a) and j < len(b):
+        start = max(a[i][0], b[j][0])
+        end = min(a[i][1], b[j][1])
+        if start < end:
+            ranges.append((start, end))
+        if a[i][1] < b[j][1]:
+            i += 1
+        else:
+            j += 1
+    return ranges
+
+
+class IntervalIndex:
+    """
+    Selects candidate items by the sorted boundaries of their comparisons.
+
+    The boundaries split the keys into points and open segments; on each,
+    every comparison either always or never holds, so the items whose
+    comparisons hold are listed once per segment, and looked up with a binary
+    search. The lists are built in a single sweep over the segments and
+    points, adding each item where the ranges it holds on start and removing
+    it where they end.
+    """
+
+    def __init__(
+        self,
+        items: Sequence,
+        constraints: dict[int, list[Comparison]],
+    ) -> None:
+        """
+        Build the index.
+
+        Parameters
+        ----------
+        items : Sequence
+            The indexed items, in order.
+        constraints : dict[int, list[Comparison]]
+            The comparisons on the key that each item requires, by position.
+            Items without constraints are candidates for every key.
+        """
+        self.boundaries = sorted({
+            bound
+            for comparisons in constraints.values()
+            for comparison in comparisons
+            for interval in comparison.intervals
+            for bound in interval[:2]
+            if bound is not None
+        })
+        part_count = 2 * len(self.boundaries) + 1
+
+        # The positions entering and leaving the candidates at each part
+        added: list[list[int]] = [[] for _ in range(part_count + 1)]
+        removed: list[list[int]] = [[] for _ in range(part_count + 1)]
+        for position in range(len(items)):
+            ranges = [(0, part_count)]
+            for comparison in constraints.get(position, ()):
+                ranges = _intersect_ranges(
+                    ranges, _part_ranges(comparison, self.boundaries)
+                )
+            for start, end in ranges:
+                added[start].append(position)
+                removed[end].append(position)
+
+        # Sweep the parts, keeping the positions of the candidates sorted
+        active: list[int] = []
+        parts = []
+        candidates: tuple = ()
+        for part in range(part_count):
+            if removed[part] or added[part] or not parts:
+                for position in removed[part]:
+                    del active[bisect_left(active, position)]
+                for position in added[part]:
+                    insort(active, position)
+                candidates = tuple(items[position] for position in active)
+            parts.append(candidates)
+        self.segments = parts[::2]
+        self.points = parts[1::2]
+        self.missing = tuple(
+            item for position, item in enumerate(items) if not constraints.get(position)
+        )
+
+    def candidates(self, key: object) -> tuple:
+        """
+        Get the items whose comparisons may hold for a key.
+
+        Parameters
+        ----------
+        key : object
+            The key, or None if the field is missing.
+
+        Returns
+        -------
+        tuple
+            The candidate items, in order.
+        """
+        if key is None:
+            return self.missing
+        position = bisect_left(self.boundaries, key)
+        if position < len(self.boundaries) and self.boundaries[position] == key:
+            return self.points[position]
+        return self.segments[position]
@@ -0,0 +1,237 @@
+"""
+Rule expression module.
+
+Parses the condition expressions of classification rules::
+
+    expression := or
+    or         := and (" OR " and)*
+    and        := unary (" AND " unary)*
+    unary      := "NOT " unary | "(" or ")" | field ":" pattern
+
+NOT binds tighter than AND, which binds tighter than OR. A pattern runs until
+the next `` AND `` or `` OR `` followed by an operand, or until a ``)`` closing
+a group: parentheses balanced within the pattern belong to the regex, so
+``merchant:^(?:uber|didi)$`` needs no quoting, and ``AND``/``OR`` not followed
+by a condition, ``NOT`` or ``(`` are part of the pattern.
+"""
+
+import re
+from dataclasses import dataclass
+
+_FIELD = re.compile(r"\s*(\w+)\s*:")
+
+# What an operand starts with, after a keyword
+_OPERAND = re.compile(r"\s*(?:\(|NOT |\w+\s*:)")
+
+_KEYWORDS = (" AND ", " OR ")
+
+
+@dataclass(frozen=True, slots=True)
+class Term:
+    """A ``field:pattern`` condition."""
+
+    field: str
+    pattern: str
+
+
+@dataclass(frozen=True, slots=True)
+class And:
+    """Matches if every operand matches."""
+
+    operands: tuple["Expression", ...]
+
+
+@dataclass(frozen=True, slots=True)
+class Or:
+    """Matches if any operand matches."""
+
+    operands: tuple["Expression", ...]
+
+
+@dataclass(frozen=True, slots=True)
+class Not:
+    """Matches if the operand does not."""
+
+    operand: "Expression"
+
+
+Expression = Term | And | Or | Not
+
+
+class _Parser:
+    def __init__(self, text: str) -> None:
+        self.text = text
+        self.pos = 0
+        self.groups = 0
+
+    def error(self, message: str) -> ValueError:
+        return ValueError(f"{message} at position {self.pos} of '{self.text}'")
+
+    def skip_spaces(self) -> None:
+        while self.pos < len(self.text) and self.text[self.pos].isspace():
+            self.pos += 1
+
+    def at_keyword(self, keyword: str) -> bool:
+        return self.text.startswith(keyword, self.pos) and bool(
+            _OPERAND.match(self.text, self.pos + len(keyword))
+        )
+
+    def parse(self) -> Expression:
+        expression = self.parse_or()
+        self.skip_spaces()
+        if self.pos < len(self.text):
+            raise self.error(f"Unexpected '{self.text[self.pos]}'")
+        return expression
+
+    def parse_or(self) -> Expression:
+        operands = [self.parse_and()]
+        while self.at_keyword(" OR "):
+            self.pos += len(" OR ")
+            operands.append(self.parse_and())
+        return operands[0] if len(operands) == 1 else Or(tuple(operands))
+
+    def parse_and(self) -> Expression:
+        operands = [self.parse_unary()]
+        while self.at_keyword(" AND "):
+            self.pos += len(" AND ")
+            operands.append(self.parse_unary())
+        return operands[0] if len(operands) == 1 else And(tuple(operands))
+
+    def parse_unary(self) -> Expression:
+        self.skip_spaces()
+        if self.text.startswith("NOT ", self.pos):
+            self.pos += len("NOT ")
+            return Not(self.parse_unary())
+        if self.text.startswith("(", self.pos):
+            self.pos += 1
+            self.groups += 1
+            expression = self.parse_or()
+            self.skip_spaces()
+            if not self.text.startswith(")", self.pos):
+                raise self.error("Missing ')'")
+            self.pos += 1
+            self.groups -= 1
+            return expression
+        return self.parse_term()
+
+    def parse_term(self) -> Term:
+        match = _FIELD.match(self.text, self.pos)
+        if match is None:
+            rest = self.text[self.pos :].strip()
+            raise ValueError(
+                f"Invalid condition format: {rest}. Expected 'field:pattern'"
+            )
+        self.pos = start = match.end()
+        self.scan_pattern()
+        return Term(match.group(1), self.text[start : self.pos].strip())
+
+    def scan_pattern(self) -> None:
+        depth = 0
+        escaped = in_class = False
+        while self.pos < len(self.text):
+            char = self.text[self.pos]
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif in_class:
+                in_class = char != "]"
+            elif char == "[":
+                in_class = True
+            elif self.at_pattern_end(depth):
+                return
+            else:
+                depth += {"(": 1, ")": -1}.get(char, 0)
+            self.pos += 1
+
+    def at_pattern_end(self, depth: int) -> bool:
+        # A ")" closing a group of the expression, or a keyword
+        if self.text[self.pos] == ")" and not depth and self.groups:
+            return True
+        return any(self.at_keyword(keyword) for keyword in _KEYWORDS)
+
+
+def parse_expression(expression: str) -> Expression:
+    """
+    Parse a rule condition expression.
+
+    Parameters
+    ----------
+    expression : str
+        The expression, e.g. ``merchant:uber AND NOT description:eats`` or
+        ``(merchant:uber OR merchant:didi) AND pocket:^Main$``.
+
+    Returns
+    -------
+    Expression
+        The syntax tree.
+
+    Raises
+    ------
+    ValueError
+        If a condition is not ``field:pattern`` or a parenthesis is missing.
+    """  # noqa: DOC502
+    return _Parser(expression).parse()
+
+
+def terms(expression: Expression) -> list[Term]:
+    """
+    Get the conditions of an expression, in source order.
+
+    Parameters
+    ----------
+    expression : Expression
+        The syntax tree.
+
+    Returns
+    -------
+    list[Term]
+        Every ``field:pattern`` condition, including negated ones.
+    """
+    if isinstance(expression, Term):
+        return [expression]
+    if isinstance(expression, Not):
+        return terms(expression.operand)
+    return [term for operand in expression.operands for term in terms(operand)]
+
+
+def required_terms(expression: Expression) -> list[Term]:
+    """
+    Get the conditions every match of an expression satisfies.
+
+    Parameters
+    ----------
+    expression : Expression
+        The syntax tree.
+
+    Returns
+    -------
+    list[Term]
+        The condition itself, or the plain conditions joined by the top-level
+        AND. Empty for an OR or NOT at the top level.
+    """
+    if isinstance(expression, Term):
+        return [expression]
+    if isinstance(expression, And):
+        return [term for o in expression.operands for term in required_terms(o)]
+    return []
+
+
+def is_conjunction(expression: Expression) -> bool:
+    """
+    Tell whether an expression only joins conditions with AND.
+
+    Parameters
+    ----------
+    expression : Expression
+        The syntax tree.
+
+    Returns
+    -------
+    bool
+        True if the expression matches exactly when its `required_terms` do.
+    """
+    return isinstance(expression, Term) or (
+        isinstance(expression, And)
+        and all(is_conjunction(operand) for operand in expression.operands)
+    )
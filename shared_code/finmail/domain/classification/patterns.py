@@ -0,0 +1,270 @@
+"""
+Condition pattern analysis module.
+
+Recognizes the condition patterns whose match set is known exactly, so rules
+can be compared without evaluating them: literal alternatives that must be the
+whole value (``^(?:uber|didi)$``), a prefix (``^rappi``), a suffix (``pay$``)
+or a substring (``uber``, ``.*uber.*``). Typed comparisons (see
+`comparisons`) are compared by their intervals. Other patterns are left
+unclassified and treated conservatively: never disjoint from, nor implied by,
+another one.
+
+Patterns are compiled case-insensitively, as in `TransactionClassifier`.
+"""
+
+import re
+from dataclasses import dataclass
+
+from shared_code.finmail.domain.classification.comparisons import (
+    Comparison,
+    comparison_implies,
+    comparisons_disjoint,
+    parse_comparison,
+)
+from shared_code.finmail.domain.classification.expressions import (
+    parse_expression,
+    required_terms,
+)
+
+_METACHARACTERS = frozenset(".^$*+?{}[]|()\\")
+
+# Patterns a search always matches (possibly with an empty match)
+_MATCH_ANYTHING = frozenset({"", ".*", "^.*", ".*$"})
+
+
+@dataclass(frozen=True, slots=True)
+class Condition:
+    """A ``field:pattern`` condition and the shape of its match set."""
+
+    field: str
+    pattern: str
+    compiled: re.Pattern
+    # "any", "exact", "prefix", "suffix", "contains" or None if unknown
+    shape: str | None
+    literals: tuple[str, ...] = ()
+    # The typed comparison, if the condition is one (with a None shape)
+    comparison: Comparison | None = None
+
+
+def _parse_literal(text: str) -> str | None:
+    chars = []
+    escaped = False
+    for char in text:
+        if escaped:
+            # Only escaped punctuation is literal; \d, \b, \s... are not
+            if char.isalnum():
+                return None
+            chars.append(char)
+            escaped = False
+        elif char == "\\":
+            escaped = True
+        elif char in _METACHARACTERS or char == "\n":
+            return None
+        else:
+            chars.append(char)
+    return None if escaped else "".join(chars)
+
+
+def _split_alternatives(text: str) -> list[str]:
+    alternatives = [""]
+    escaped = False
+    for char in text:
+        if char == "|" and not escaped:
+            alternatives.append("")
+            continue
+        alternatives[-1] += char
+        escaped = char == "\\" and not escaped
+    return alternatives
+
+
+def _literal_alternatives(body: str) -> tuple[str, ...] | None:
+    # A single literal, or literal alternatives wrapped in one group
+    for opening in ("(?:", "("):
+        if body.startswith(opening) and body.endswith(")") and not body.endswith("\\)"):
+            alternatives = _split_alternatives(body[len(opening) : -1])
+            break
+    else:
+        alternatives = [body]
+    literals = tuple(_parse_literal(alternative) for alternative in alternatives)
+    return None if None in literals else literals
+
+
+def analyze_condition(field_name: str, pattern: str) -> Condition:
+    """
+    Compile a condition and recognize the shape of its match set.
+
+    Parameters
+    ----------
+    field_name : str
+        The transaction field.
+    pattern : str
+        The regex pattern.
+
+    Returns
+    -------
+    Condition
+        The condition, with a None shape if its match set is not recognized.
+
+    Raises
+    ------
+    ValueError
+        If the condition is a malformed comparison.
+    """  # noqa: DOC502
+    compiled = re.compile(pattern, re.IGNORECASE)
+    comparison = parse_comparison(field_name, pattern)
+    if comparison is not None:
+        return Condition(field_name, pattern, compiled, None, comparison=comparison)
+    if pattern in _MATCH_ANYTHING:
+        return Condition(field_name, pattern, compiled, "any")
+
+    body = pattern
+    starts = body.startswith("^")
+    if starts:
+        body = body[1:]
+    elif body.startswith(".*"):
+        # A search may start anywhere, so a leading ".*" only widens the match
+        body = body[2:]
+    ends = body.endswith("$") and not body.endswith("\\$")
+    if ends:
+        body = body[:-1]
+    elif body.endswith(".*") and not body.endswith("\\.*"):
+        body = body[:-2]
+
+    literals = _literal_alternatives(body)
+    if literals is None:
+        return Condition(field_name, pattern, compiled, None)
+    shape = (
+        ("exact" if ends else "prefix")
+        if starts
+        else ("suffix" if ends else "contains")
+    )
+    return Condition(field_name, pattern, compiled, shape, literals)
+
+
+def analyze_conditions(expression: str) -> list[Condition]:
+    """
+    Analyze the conditions every match of a rule expression satisfies.
+
+    Parameters
+    ----------
+    expression : str
+        The conditions of a rule.
+
+    Returns
+    -------
+    list[Condition]
+        The analyzed conditions joined by the top-level AND, in order (see
+        `expressions.required_terms`). Conditions under OR or NOT are left
+        out, so rules using them are only compared conservatively.
+    """
+    return [
+        analyze_condition(term.field, term.pattern)
+        for term in required_terms(parse_expression(expression))
+    ]
+
+
+def _exact_values(condition: Condition) -> list[str]:
+    # With IGNORECASE, matching does not depend on the case of the value, and
+    # "$" also matches before a trailing newline: these values stand for the
+    # whole match set.
+    return [
+        value for literal in condition.literals for value in (literal, f"{literal}\n")
+    ]
+
+
+def _case_sensitive(condition: Condition) -> bool:
+    return "(?-i" in condition.pattern
+
+
+def _affix_relation(narrow: str, broad: str, shape: str) -> bool | None:
+    # Case-insensitive comparison is only trusted for ASCII literals
+    if not (narrow.isascii() and broad.isascii()):
+        return None
+    narrow, broad = narrow.lower(), broad.lower()
+    if shape == "prefix":
+        return narrow.startswith(broad)
+    if shape == "suffix":
+        return narrow.endswith(broad)
+    return broad in narrow
+
+
+def conditions_disjoint(a: Condition, b: Condition) -> bool:
+    """
+    Tell whether two conditions on the same field never match the same value.
+
+    Parameters
+    ----------
+    a : Condition
+        A condition.
+    b : Condition
+        Another condition on the same field.
+
+    Returns
+    -------
+    bool
+        True if their match sets are provably disjoint.
+    """
+    if a.comparison is not None or b.comparison is not None:
+        return (
+            a.comparison is not None
+            and b.comparison is not None
+            and comparisons_disjoint(a.comparison, b.comparison)
+        )
+    if a.shape != "exact" and b.shape == "exact":
+        a, b = b, a
+    if a.shape == "exact":
+        # A finite match set: test every member against the other pattern
+        return not _case_sensitive(b) and not any(
+            b.compiled.search(value) for value in _exact_values(a)
+        )
+    if a.shape in {"prefix", "suffix"} and a.shape == b.shape:
+        # Disjoint unless one literal extends the other
+        return all(
+            _affix_relation(x, y, a.shape) is False
+            and _affix_relation(y, x, a.shape) is False
+            for x in a.literals
+            for y in b.literals
+        )
+    return False
+
+
+def condition_implies(narrow: Condition, broad: Condition) -> bool:
+    """
+    Tell whether every value matching a condition also matches another one.
+
+    Parameters
+    ----------
+    narrow : Condition
+        A condition.
+    broad : Condition
+        Another condition on the same field.
+
+    Returns
+    -------
+    bool
+        True if the match set of `narrow` is provably included in the match
+        set of `broad`.
+    """
+    if narrow.pattern == broad.pattern or broad.shape == "any":
+        return True
+    if narrow.comparison is not None or broad.comparison is not None:
+        return (
+            narrow.comparison is not None
+            and broad.comparison is not None
+            and comparison_implies(narrow.comparison, broad.comparison)
+        )
+    if narrow.shape == "exact":
+        return not _case_sensitive(broad) and all(
+            broad.compiled.search(value) for value in _exact_values(narrow)
+        )
+    if broad.shape == "contains" and narrow.shape in {"prefix", "suffix", "contains"}:
+        # Every value contains the narrow literal, which contains a broad one
+        shape = "contains"
+    elif broad.shape in {"prefix", "suffix"} and narrow.shape == broad.shape:
+        shape = broad.shape
+    else:
+        return False
+    return all(
+        any(_affix_relation(n, b, shape) for b in broad.literals)
+        for n in narrow.literals
+    )
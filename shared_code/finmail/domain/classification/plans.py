@@ -0,0 +1,336 @@
+"""
+Rule evaluation plan module.
+
+Compiles rule expressions into short-circuiting evaluation plans: nested
+checks over the values of a transaction, which are computed once per
+transaction and shared by every rule. Each value fills a slot: the string of a
+field for regex conditions, or the key a typed comparison compares (see
+`comparisons`), computed without string conversion.
+
+Conditions whose pattern is a literal (see `patterns`) are checked with string
+operations on the lowercased value instead of a regex search, for ASCII values,
+where both are equivalent. Within every AND and OR, the cheapest checks run
+first: comparisons, literals, then regexes, then nested groups. Since checks
+have no side effects, the order does not change the result.
+"""
+
+import operator
+import re
+from collections.abc import Callable
+from types import ModuleType
+
+from shared_code.finmail.domain.classification.comparisons import (
+    Comparison,
+    parse_comparison,
+)
+from shared_code.finmail.domain.classification.expressions import (
+    And,
+    Expression,
+    Not,
+    Term,
+)
+from shared_code.finmail.domain.classification.patterns import analyze_condition
+from shared_code.finmail.domain.classification.safety import compile_pattern
+from shared_code.finmail.models import Transaction, TransactionRecord
+
+# A check takes the values of the slots and the lowercased string values
+# (None for missing, non-ASCII or non-string values), indexed like the slots
+Check = Callable[[tuple, tuple], bool]
+
+# A slot: a field and the key compared, or None for its string value
+Slot = tuple[str, Callable | None]
+
+# Relative cost of the checks, for ordering
+_ANY_COST = 0
+_COMPARISON_COST = 0
+_LITERAL_COST = 1
+_REGEX_COST = 4
+
+
+def term_slot(term: Term) -> Slot:
+    """
+    Get the slot of the value a condition checks.
+
+    Parameters
+    ----------
+    term : Term
+        The condition.
+
+    Returns
+    -------
+    Slot
+        The field and, for a comparison, its key function.
+
+    Raises
+    ------
+    ValueError
+        If the condition is a malformed comparison.
+    """  # noqa: DOC502
+    comparison = parse_comparison(term.field, term.pattern)
+    return (term.field, None if comparison is None else comparison.key)
+
+
+def field_values(
+    transaction: Transaction | TransactionRecord, slots: tuple[Slot, ...]
+) -> tuple[tuple, tuple]:
+    """
+    Get the values checked by the plans of a transaction.
+
+    Parameters
+    ----------
+    transaction : Transaction | TransactionRecord
+        The transaction.
+    slots : tuple[Slot, ...]
+        The slots the plans were compiled for.
+
+    Returns
+    -------
+    tuple[tuple, tuple]
+        The value of every slot (None if the field is missing), and the
+        lowercased ASCII string values (None for other values).
+    """
+    values = tuple(
+        None
+        if (value := getattr(transaction, field_name, None)) is None
+        else str(value)
+        if key is None
+        else key(value)
+        for field_name, key in slots
+    )
+    folded = tuple(
+        value.lower() if type(value) is str and value.isascii() else None
+        for value in values
+    )
+    return values, folded
+
+
+def _comparison_check(index: int, comparison: Comparison) -> Check:
+    if len(comparison.intervals) > 1:
+        contains = comparison.contains
+
+        def check(texts: tuple, folded: tuple) -> bool:  # noqa: ARG001
+            key = texts[index]
+            return key is not None and contains(key)
+
+        return check
+
+    # A single interval: compare with its bounds directly
+    ((low, high, low_closed, high_closed),) = comparison.intervals
+    below = operator.lt if low_closed else operator.le
+    above = operator.gt if high_closed else operator.ge
+
+    def check(texts: tuple, folded: tuple) -> bool:  # noqa: ARG001
+        key = texts[index]
+        return (
+            key is not None
+            and (low is None or not below(key, low))
+            and (high is None or not above(key, high))
+        )
+
+    return check
+
+
+def _regex_check(index: int, compiled: re.Pattern) -> Check:
+    search = compiled.search
+
+    def check(texts: tuple, folded: tuple) -> bool:  # noqa: ARG001
+        text = texts[index]
+        return text is not None and search(text) is not None
+
+    return check
+
+
+def _literal_check(  # noqa: C901
+    index: int, shape: str, literals: tuple[str, ...], compiled: re.Pattern
+) -> Check:
+    search = compiled.search
+    lowered = tuple(literal.lower() for literal in literals)
+    # With `re`, "$" also matches before a trailing newline; not with RE2
+    with_newline = (
+        tuple(f"{literal}\n" for literal in lowered)
+        if isinstance(compiled, re.Pattern)
+        else ()
+    )
+
+    if shape == "exact":
+        exact = frozenset(lowered + with_newline)
+
+        def matches(value: str) -> bool:
+            return value in exact
+
+    elif shape == "prefix":
+
+        def matches(value: str) -> bool:
+            return value.startswith(lowered)
+
+    elif shape == "suffix":
+
+        def matches(value: str) -> bool:
+            return value.endswith(lowered) or value.endswith(with_newline)
+
+    elif len(lowered) == 1:
+        (literal,) = lowered
+
+        def matches(value: str) -> bool:
+            return literal in value
+
+    else:
+
+        def matches(value: str) -> bool:
+            return any(literal in value for literal in lowered)
+
+    def check(texts: tuple, folded: tuple) -> bool:
+        value = folded[index]
+        if value is not None:
+            return matches(value)
+        # Missing, or not ASCII: case folding may differ from the regex
+        text = texts[index]
+        return text is not None and search(text) is not None
+
+    return check
+
+
+def compile_term(
+    term: Term, index: int, re2: ModuleType | None = None
+) -> tuple[Check, int]:
+    """
+    Compile a condition into a check.
+
+    Parameters
+    ----------
+    term : Term
+        The condition.
+    index : int
+        The index of its slot (see `term_slot`) in the plan slots.
+    re2 : ModuleType | None, optional
+        The ``re2`` module, to match with RE2 (see `safety.compile_pattern`).
+
+    Returns
+    -------
+    tuple[Check, int]
+        The check and its relative cost.
+
+    Raises
+    ------
+    ValueError
+        If the condition is a malformed comparison.
+    re.error
+        If the pattern is invalid.
+    UnsafePatternError
+        If the pattern may backtrack catastrophically.
+    """  # noqa: DOC502
+    comparison = parse_comparison(term.field, term.pattern)
+    if comparison is not None:
+        return _comparison_check(index, comparison), _COMPARISON_COST
+    compiled = compile_pattern(term.pattern, re2)
+    condition = analyze_condition(term.field, term.pattern)
+    if condition.shape == "any":
+
+        def check(texts: tuple, folded: tuple) -> bool:  # noqa: ARG001
+            return texts[index] is not None
+
+        return check, _ANY_COST
+    if condition.shape is None or not all(
+        literal.isascii() for literal in condition.literals
+    ):
+        return _regex_check(index, compiled), _REGEX_COST
+    return (
+        _literal_check(index, condition.shape, condition.literals, compiled),
+        _LITERAL_COST,
+    )
+
+
+def _all_of(checks: tuple[Check, ...]) -> Check:
+    def check(texts: tuple, folded: tuple) -> bool:
+        for operand in checks:
+            if not operand(texts, folded):
+                return False
+        return True
+
+    return check
+
+
+def _any_of(checks: tuple[Check, ...]) -> Check:
+    def check(texts: tuple, folded: tuple) -> bool:
+        for operand in checks:
+            if operand(texts, folded):
+                return True
+        return False
+
+    return check
+
+
+def _negation(operand: Check) -> Check:
+    def check(texts: tuple, folded: tuple) -> bool:
+        return not operand(texts, folded)
+
+    return check
+
+
+def _build(expression: Expression, term_checks: list) -> tuple[Check, int]:
+    if isinstance(expression, Term):
+        return term_checks.pop(0)
+    if isinstance(expression, Not):
+        operand, cost = _build(expression.operand, term_checks)
+        return _negation(operand), cost
+    operands = sorted(
+        (_build(operand, term_checks) for operand in expression.operands),
+        key=lambda item: item[1],
+    )
+    checks = tuple(check for check, _ in operands)
+    cost = sum(cost for _, cost in operands)
+    return (_all_of(checks) if isinstance(expression, And) else _any_of(checks)), cost
+
+
+def build_plan(
+    expression: Expression, term_checks: list[tuple[Check, int]]
+) -> tuple[Check, ...]:
+    """
+    Assemble the checks of the conditions of an expression into a plan.
+
+    Parameters
+    ----------
+    expression : Expression
+        The syntax tree.
+    term_checks : list[tuple[Check, int]]
+        The check and cost of every condition, in the order of
+        `expressions.terms`.
+
+    Returns
+    -------
+    tuple[Check, ...]
+        The checks joined by the top-level AND (a single check otherwise),
+        cheapest first. The expression matches if every check passes.
+    """
+    term_checks = list(term_checks)
+    if isinstance(expression, And):
+        operands = sorted(
+            (_build(operand, term_checks) for operand in expression.operands),
+            key=lambda item: item[1],
+        )
+        return tuple(check for check, _ in operands)
+    return (_build(expression, term_checks)[0],)
+
+
+def evaluate_plan(plan: tuple[Check, ...], texts: tuple, folded: tuple) -> bool:
+    """
+    Evaluate a plan on the field values of a transaction.
+
+    Parameters
+    ----------
+    plan : tuple[Check, ...]
+        A plan built by `build_plan`.
+    texts : tuple
+        The values of the slots, from `field_values`.
+    folded : tuple
+        The lowercased ASCII string values, from `field_values`.
+
+    Returns
+    -------
+    bool
+        True if the expression matches.
+    """
+    for check in plan:
+        if not check(texts, folded):
+            return False
+    return True
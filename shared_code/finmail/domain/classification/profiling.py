@@ -0,0 +1,302 @@
+"""
+Rule profiling module.
+
+Contains the RuleProfiler, which counts how often each classification rule
+and pattern is evaluated and matches and how long its patterns take, so hot
+rules can be moved up and dead ones deleted. Profiles are exported as JSON and
+summarized with `format_report`.
+"""
+
+import json
+import logging
+import os
+import threading
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+from shared_code.finmail.domain.classification.classification_rules import (
+    ClassificationRule,
+    parse_conditions,
+)
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class PatternStats:
+    """Counters of one condition of a rule."""
+
+    field: str
+    pattern: str
+    evaluations: int = 0
+    matches: int = 0
+    # Cumulative time spent in `re.Pattern.search`, in seconds
+    total_s: float = 0.0
+
+
+@dataclass(slots=True)
+class RuleStats:
+    """Counters of one rule, identified by its conditions and category."""
+
+    conditions: str
+    category: str
+    # Position of the rule in the current rule list; None once it was removed
+    position: int | None = None
+    evaluations: int = 0
+    matches: int = 0
+    total_s: float = 0.0
+    patterns: list[PatternStats] = field(default_factory=list)
+
+    @property
+    def key(self) -> tuple[str, str]:
+        """The identity of the rule across reloads."""
+        return self.conditions, self.category
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of the evaluations that matched."""
+        return self.matches / self.evaluations if self.evaluations else 0.0
+
+
+class RuleProfiler:
+    """
+    Per-rule and per-pattern counters of a `TransactionClassifier`.
+
+    Rules are identified by their conditions and category, so counters survive
+    rule reloads and reorderings. The classifier updates the counters under
+    `lock`. If `export_path` is set, the profile is saved there every
+    `export_every` classifications.
+    """
+
+    def __init__(
+        self, export_path: str | Path | None = None, export_every: int = 1000
+    ) -> None:
+        """
+        Initialize an empty profiler.
+
+        Parameters
+        ----------
+        export_path : str | Path | None, optional
+            JSON file the profile is periodically exported to. A ``{pid}``
+            placeholder is replaced with the process ID, so several workers do
+            not overwrite each other's profile.
+        export_every : int, optional
+            Classifications between exports. Default is 1000.
+        """
+        self.export_path = (
+            Path(str(export_path).format(pid=os.getpid())) if export_path else None
+        )
+        self.export_every = export_every
+        self.classified = 0
+        self.lock = threading.Lock()
+        self._stats: dict[tuple[str, str], RuleStats] = {}
+
+    def register(self, rules: list[ClassificationRule]) -> list[RuleStats]:
+        """
+        Set the current rule list, after the classifier (re)loaded its rules.
+
+        Parameters
+        ----------
+        rules : list[ClassificationRule]
+            The compiled rules, in evaluation order.
+
+        Returns
+        -------
+        list[RuleStats]
+            The counters of each rule, aligned with `rules`.
+        """
+        with self.lock:
+            for stats in self._stats.values():
+                stats.position = None
+            registered = []
+            for position, rule in enumerate(rules):
+                stats = self._stats.get((rule.conditions, rule.category))
+                if stats is None:
+                    stats = RuleStats(
+                        conditions=rule.conditions,
+                        category=rule.category,
+                        patterns=[
+                            PatternStats(field=field_name, pattern=pattern)
+                            for field_name, pattern in parse_conditions(rule.conditions)
+                        ],
+                    )
+                    self._stats[stats.key] = stats
+                stats.position = position
+                registered.append(stats)
+            return registered
+
+    def record_classification(self) -> None:
+        """Count a classification, exporting the profile when it is due."""
+        with self.lock:
+            self.classified += 1
+            export_due = (
+                self.export_path is not None
+                and self.export_every > 0
+                and self.classified % self.export_every == 0
+            )
+        if export_due:
+            try:
+                self.export(self.export_path)
+            except OSError:
+                logger.warning("Failed to export the rule profile", exc_info=True)
+
+    def to_dict(self) -> dict:
+        """
+        Serialize the profile.
+
+        Returns
+        -------
+        dict
+            The number of classifications and the counters of every rule seen,
+            in evaluation order (removed rules last).
+        """
+        with self.lock:
+            rules = sorted(
+                self._stats.values(),
+                key=lambda s: (s.position is None, s.position or 0),
+            )
+            return {
+                "classified": self.classified,
+                "rules": [asdict(stats) for stats in rules],
+            }
+
+    def export(self, path: str | Path) -> None:
+        """
+        Write the profile to a JSON file, atomically.
+
+        Parameters
+        ----------
+        path : str | Path
+            The destination file.
+        """
+        path = Path(path)
+        tmp_path = path.with_name(f".{path.name}.tmp")
+        tmp_path.write_text(json.dumps(self.to_dict(), indent=2), encoding="utf-8")
+        tmp_path.replace(path)
+
+
+def load_profiles(paths: list[str | Path]) -> dict:
+    """
+    Load and merge exported profiles, e.g. from several workers.
+
+    Parameters
+    ----------
+    paths : list[str | Path]
+        The JSON files written by `RuleProfiler.export`.
+
+    Returns
+    -------
+    dict
+        A profile in the format of `RuleProfiler.to_dict`, with the counters
+        of each rule summed. A rule keeps its position in the last profile
+        where it was active.
+    """
+    classified = 0
+    merged: dict[tuple[str, str], dict] = {}
+    for path in paths:
+        profile = json.loads(Path(path).read_text(encoding="utf-8"))
+        classified += profile["classified"]
+        for rule in profile["rules"]:
+            key = (rule["conditions"], rule["category"])
+            if key not in merged:
+                merged[key] = rule
+                continue
+            total = merged[key]
+            if rule["position"] is not None:
+                total["position"] = rule["position"]
+            for counter in ("evaluations", "matches", "total_s"):
+                total[counter] += rule[counter]
+            for total_pattern, pattern in zip(
+                total["patterns"], rule["patterns"], strict=True
+            ):
+                for counter in ("evaluations", "matches", "total_s"):
+                    total_pattern[counter] += pattern[counter]
+    rules = sorted(
+        merged.values(),
+        key=lambda r: (r["position"] is None, r["position"] or 0),
+    )
+    return {"classified": classified, "rules": rules}
+
+
+def rule_hits(profile: dict) -> dict[tuple[str, str], int]:
+    """
+    Get the match count of every rule of a profile.
+
+    Parameters
+    ----------
+    profile : dict
+        A profile, as returned by `RuleProfiler.to_dict` or `load_profiles`.
+
+    Returns
+    -------
+    dict[tuple[str, str], int]
+        The matches of each rule, by ``(conditions, category)``.
+    """
+    return {
+        (rule["conditions"], rule["category"]): rule["matches"]
+        for rule in profile["rules"]
+    }
+
+
+def _format_rule(rule: dict) -> str:
+    position = "-" if rule["position"] is None else rule["position"] + 1
+    return f"#{position} {rule['conditions']} -> {rule['category']}"
+
+
+def format_report(profile: dict, top: int = 10) -> str:
+    """
+    Summarize a profile: hot rules, dead rules and expensive patterns.
+
+    Parameters
+    ----------
+    profile : dict
+        A profile, as returned by `RuleProfiler.to_dict` or `load_profiles`.
+    top : int, optional
+        Number of hot rules and expensive patterns listed. Default is 10.
+
+    Returns
+    -------
+    str
+        The report, one section per list.
+    """
+    active = [rule for rule in profile["rules"] if rule["position"] is not None]
+    hot = sorted(
+        (rule for rule in active if rule["matches"]),
+        key=lambda r: r["matches"],
+        reverse=True,
+    )[:top]
+    dead = [rule for rule in active if not rule["matches"]]
+    patterns = sorted(
+        (
+            (pattern, rule)
+            for rule in active
+            for pattern in rule["patterns"]
+            if pattern["evaluations"]
+        ),
+        key=lambda item: item[0]["total_s"],
+        reverse=True,
+    )[:top]
+
+    lines = [
+        f"Classified transactions: {profile['classified']}",
+        f"Active rules: {len(active)}",
+        "",
+        f"Hot rules (top {top} by matches):",
+    ]
+    lines.extend(
+        f"  {rule['matches']:>8} matches  {rule['evaluations']:>8} evaluations  "
+        f"{_format_rule(rule)}"
+        for rule in hot
+    )
+    lines.extend(["", f"Dead rules (no matches): {len(dead)}"])
+    lines.extend(
+        f"  {rule['evaluations']:>8} evaluations  {_format_rule(rule)}" for rule in dead
+    )
+    lines.extend(["", f"Expensive patterns (top {top} by total time):"])
+    lines.extend(
+        f"  {pattern['total_s'] * 1000:>10.3f} ms  "
+        f"{pattern['total_s'] / pattern['evaluations'] * 1e6:>8.2f} us/eval  "
+        f"{pattern['field']}:{pattern['pattern']}  in {_format_rule(rule)}"
+        for pattern, rule in patterns
+    )
+    return "\n".join(lines)
@@ -9,6 +9,7 @@ import logging
 from typing import Protocol
 
 from shared_code.finmail.clients import GoogleSheetsClient
+from shared_code.finmail.domain.classification.analysis import analyze_rules
 from shared_code.finmail.domain.classification.classification_rules import (
     ClassificationRule,
 )
@@ -139,3 +140,68 @@ class GoogleSheetsRuleProvider:
                 "Failed to load classification rules from Google Sheets: %s", e
             )
             return []
+
+
+class StaticRuleProvider:
+    """Rule provider serving a fixed list of rules, e.g. a pruned rule set."""
+
+    def __init__(self, rules: list[ClassificationRule]) -> None:
+        """
+        Initialize the provider.
+
+        Parameters
+        ----------
+        rules : list[ClassificationRule]
+            The rules to serve, in evaluation order.
+        """
+        self.rules = list(rules)
+
+    def get_rules(self) -> list[ClassificationRule]:
+        """
+        Return the rules.
+
+        Returns
+        -------
+        list[ClassificationRule]
+            A copy of the rules.
+        """
+        return list(self.rules)
+
+
+class PruningRuleProvider:
+    """
+    Rule provider dropping the rules of another provider that never apply.
+
+    Rules on unknown fields, duplicates and shadowed rules (see
+    `analyze_rules`) are removed on every load, which never changes a
+    classification. The source of the rules is left untouched.
+    """
+
+    def __init__(self, rule_provider: RuleProvider) -> None:
+        """
+        Initialize the provider.
+
+        Parameters
+        ----------
+        rule_provider : RuleProvider
+            The provider to load the rules from.
+        """
+        self.rule_provider = rule_provider
+
+    def get_rules(self) -> list[ClassificationRule]:
+        """
+        Load the rules and drop the ones that never apply.
+
+        Returns
+        -------
+        list[ClassificationRule]
+            The remaining rules, in their original order.
+        """
+        rules = self.rule_provider.get_rules()
+        pruned = analyze_rules(rules).pruned_rules()
+        if len(pruned) < len(rules):
+            logger.info(
+                "Pruned %d classification rules that never apply",
+                len(rules) - len(pruned),
+            )
+        return pruned
@@ -0,0 +1,349 @@
+r"""
+Regex safety module.
+
+Screens user-authored rule patterns for catastrophic backtracking before they
+run on every transaction, and compiles them with RE2 (``finmail[re2]``
+extra) when it is enabled and supports the pattern. RE2 matches in linear
+time, so screened patterns are safe with it.
+
+Screening flags the constructs that make a backtracking engine exponential: an
+unbounded repetition of a group that can itself match a run in several ways,
+either through a nested unbounded quantifier (``(a+)+``, ``(\w+\s?)*``),
+through adjacent unbounded quantifiers that can share a run (``(x+x+)+``),
+through alternatives that can match the same text (``(a|a)+``) or through an
+optional part that can start another iteration (``(a|aa)*``).
+It is conservative: a few harmless patterns are flagged, while polynomial
+patterns (``.*.*x``) are not, since rule values are short.
+"""
+
+import re
+import re._constants as sre  # noqa: PLC2701
+import re._parser as sre_parse  # noqa: PLC2701
+from types import ModuleType
+
+from shared_code.finmail.exceptions import UnsafePatternError
+
+_BACKTRACKING_REPEATS = (sre.MAX_REPEAT, sre.MIN_REPEAT)
+_REPEATS = (*_BACKTRACKING_REPEATS, sre.POSSESSIVE_REPEAT)
+
+# A first-character set matching any character
+_ANY_CHAR = None
+
+# Zero-width items, skipped when looking for the first character
+_ZERO_WIDTH = (sre.AT, sre.ASSERT, sre.ASSERT_NOT)
+
+# Characters of the \d and \s categories; any non-ASCII character is assumed
+# to be a digit, and the Unicode spaces are listed
+_CATEGORY_CHARS = {
+    sre.CATEGORY_DIGIT: [(0x30, 0x39), (0x80, 0x10FFFF)],
+    sre.CATEGORY_SPACE: [
+        (0x09, 0x0D),
+        (0x1C, 0x20),
+        (0x85, 0x85),
+        (0xA0, 0xA0),
+        (0x1680, 0x1680),
+        (0x2000, 0x200A),
+        (0x2028, 0x2029),
+        (0x202F, 0x202F),
+        (0x205F, 0x205F),
+        (0x3000, 0x3000),
+    ],
+}
+
+
+def import_re2() -> ModuleType:
+    """
+    Import the RE2 bindings.
+
+    Returns
+    -------
+    ModuleType
+        The ``re2`` module of google-re2.
+
+    Raises
+    ------
+    ImportError
+        If google-re2 is not installed.
+    """
+    # Imported on use: google-re2 is optional
+    try:
+        import re2  # noqa: PLC0415
+    except ImportError as e:
+        raise ImportError(
+            "The RE2 regex engine requires google-re2. Install it with 'finmail[re2]'."
+        ) from e
+    return re2
+
+
+def _nullable(items: list) -> bool:
+    # Whether a sequence of parsed items can match the empty string
+    for op, av in items:
+        if op in _ZERO_WIDTH:
+            continue
+        if op in _REPEATS:
+            if av[0] > 0 and not _nullable(av[2]):
+                return False
+        elif op is sre.SUBPATTERN:
+            if not _nullable(av[3]):
+                return False
+        elif op is sre.BRANCH:
+            if not any(_nullable(alternative) for alternative in av[1]):
+                return False
+        else:
+            return False
+    return True
+
+
+def _has_exposed_repeat(items: list) -> bool:
+    # Whether the sequence contains an unbounded repeat while everything
+    # around it is optional, so a run can be split across outer iterations
+    items = list(items)
+    for index, (op, av) in enumerate(items):
+        if not _nullable(items[:index] + items[index + 1 :]):
+            continue
+        if (
+            op in _BACKTRACKING_REPEATS
+            and av[1] == sre.MAXREPEAT
+            and not _nullable(av[2])
+        ):
+            return True
+        if op is sre.SUBPATTERN and _has_exposed_repeat(av[3]):
+            return True
+        if op is sre.BRANCH and any(_has_exposed_repeat(a) for a in av[1]):
+            return True
+    return False
+
+
+def _case_variants(low: int, high: int) -> list[tuple[int, int]]:
+    # Patterns are matched case-insensitively: add the other case of letters
+    if low == high:
+        char = chr(low)
+        return [
+            (ord(variant), ord(variant))
+            for variant in {char, char.lower(), char.upper()}
+            if len(variant) == 1
+        ]
+    ranges = [(low, high)]
+    for lower_start, upper_start in ((ord("a"), ord("A")), (ord("A"), ord("a"))):
+        start, end = max(low, lower_start), min(high, lower_start + 25)
+        if start <= end:
+            shift = upper_start - lower_start
+            ranges.append((start + shift, end + shift))
+    return ranges
+
+
+def _set_first_chars(items: list) -> list[tuple[int, int]] | None:
+    ranges = []
+    for op, av in items:
+        if op is sre.LITERAL:
+            ranges.extend(_case_variants(av, av))
+        elif op is sre.RANGE:
+            ranges.extend(_case_variants(*av))
+        elif op is sre.CATEGORY and av in _CATEGORY_CHARS:
+            ranges.extend(_CATEGORY_CHARS[av])
+        else:
+            # Negated sets and word characters
+            return _ANY_CHAR
+    return ranges
+
+
+def _item_first_chars(op: object, av: object) -> list[tuple[int, int]] | None:
+    if op is sre.LITERAL:
+        return _case_variants(av, av)
+    if op is sre.IN:
+        return _set_first_chars(av)
+    if op in _REPEATS:
+        return _first_chars(av[2])
+    if op is sre.SUBPATTERN:
+        return _first_chars(av[3])
+    if op is sre.BRANCH:
+        return _first_chars([(op, av)])
+    # ".", negated literals, backreferences
+    return _ANY_CHAR
+
+
+def _first_chars(items: list) -> list[tuple[int, int]] | None:
+    # The characters a match of the sequence can start with, as code point
+    # ranges, or _ANY_CHAR when unknown
+    ranges = []
+    for op, av in items:
+        if op in _ZERO_WIDTH:
+            continue
+        if op is sre.BRANCH:
+            firsts = [_first_chars(alternative) for alternative in av[1]]
+            if _ANY_CHAR in firsts:
+                return _ANY_CHAR
+            first = [char_range for f in firsts for char_range in f]
+        else:
+            first = _item_first_chars(op, av)
+            if first is _ANY_CHAR:
+                return _ANY_CHAR
+        ranges.extend(first)
+        if not _nullable([(op, av)]):
+            break
+    return ranges
+
+
+def _overlap(a: list[tuple[int, int]] | None, b: list[tuple[int, int]] | None) -> bool:
+    if a is _ANY_CHAR or b is _ANY_CHAR:
+        return True
+    return any(
+        low_a <= high_b and low_b <= high_a
+        for low_a, high_a in a
+        for low_b, high_b in b
+    )
+
+
+def _unwrap(items: list) -> list:
+    # The items of a body made of a single group
+    items = list(items)
+    while len(items) == 1 and items[0][0] is sre.SUBPATTERN:
+        items = list(items[0][1][3])
+    return items
+
+
+def _is_unbounded_repeat(op: object, av: object) -> bool:
+    return (
+        op in _BACKTRACKING_REPEATS and av[1] == sre.MAXREPEAT and not _nullable(av[2])
+    )
+
+
+def _has_shared_run(items: list) -> bool:
+    # Whether two unbounded repeats, with only optional items between them,
+    # can start alike, so a run can be split between them in several ways
+    for index, (op, av) in enumerate(items):
+        if not _is_unbounded_repeat(op, av):
+            continue
+        first = _first_chars(av[2])
+        for next_index in range(index + 1, len(items)):
+            next_op, next_av = items[next_index]
+            if _is_unbounded_repeat(next_op, next_av) and _overlap(
+                first, _first_chars(next_av[2])
+            ):
+                return True
+            if not _nullable([(next_op, next_av)]):
+                break
+    return False
+
+
+def _has_ambiguous_split(items: list) -> bool:
+    # Whether a text matched by the sequence may also be matched by several
+    # iterations of it or in several ways within one: alternatives starting
+    # alike (``a|ab``) or both matching the empty remainder left once their
+    # common prefix is factored out (``a|a``), adjacent repeats sharing a run
+    # (``x+x+``), or an optional item that can start like the sequence
+    # (``a(?:a)?``)
+    items = _unwrap(items)
+    if _has_shared_run(items):
+        return True
+    first = _first_chars(items)
+    for index, (op, av) in enumerate(items):
+        if op is sre.BRANCH:
+            firsts = [_first_chars(alternative) for alternative in av[1]]
+            if (
+                any(
+                    _overlap(firsts[i], firsts[j])
+                    for i in range(len(firsts))
+                    for j in range(i)
+                )
+                or sum(map(_nullable, av[1])) > 1
+            ):
+                return True
+        if (
+            index
+            and op not in _ZERO_WIDTH
+            and _nullable([(op, av)])
+            and _overlap(_item_first_chars(op, av), first)
+        ):
+            return True
+    return False
+
+
+def _nested_sequences(op: object, av: object) -> list:
+    if op in _REPEATS:
+        return [av[2]]
+    if op is sre.SUBPATTERN:
+        return [av[3]]
+    if op is sre.BRANCH:
+        return av[1]
+    if op in {sre.ASSERT, sre.ASSERT_NOT}:
+        return [av[1]]
+    # Atomic groups never backtrack into their body
+    return []
+
+
+def _find_vulnerability(items: list) -> str | None:
+    for op, av in items:
+        # Possessive repeats never backtrack into their body
+        if op in _BACKTRACKING_REPEATS and av[1] == sre.MAXREPEAT:
+            if _has_exposed_repeat(av[2]):
+                return "nested unbounded quantifiers"
+            if _has_ambiguous_split(av[2]):
+                return "repeated group that can match the same text in several ways"
+        for sequence in _nested_sequences(op, av):
+            reason = _find_vulnerability(sequence)
+            if reason is not None:
+                return reason
+    return None
+
+
+def screen_pattern(pattern: str) -> str | None:
+    """
+    Check a pattern for catastrophic backtracking with the `re` engine.
+
+    Parameters
+    ----------
+    pattern : str
+        The regex pattern.
+
+    Returns
+    -------
+    str | None
+        Why the pattern may backtrack exponentially, or None if it looks safe.
+
+    Raises
+    ------
+    re.error
+        If the pattern is invalid.
+    """  # noqa: DOC502
+    parsed = sre_parse.parse(pattern, re.IGNORECASE)
+    return _find_vulnerability(list(parsed))
+
+
+def compile_pattern(pattern: str, re2: ModuleType | None = None) -> re.Pattern:
+    """
+    Compile a rule pattern case-insensitively, rejecting unsafe ones.
+
+    Parameters
+    ----------
+    pattern : str
+        The regex pattern.
+    re2 : ModuleType | None, optional
+        The ``re2`` module, to compile with RE2 when it supports the pattern.
+        Patterns it does not support (lookarounds, backreferences) are
+        screened and compiled with `re`.
+
+    Returns
+    -------
+    re.Pattern
+        The compiled pattern. RE2 patterns provide the same `search` method.
+
+    Raises
+    ------
+    re.error
+        If the pattern is invalid.
+    UnsafePatternError
+        If the pattern is compiled with `re` and fails screening.
+    """  # noqa: DOC502
+    if re2 is not None:
+        options = re2.Options()
+        options.case_sensitive = False
+        options.log_errors = False
+        try:
+            return re2.compile(pattern, options)
+        except re2.error:
+            pass
+    reason = screen_pattern(pattern)
+    if reason is not None:
+        raise UnsafePatternError(pattern, reason)
+    return re.compile(pattern, re.IGNORECASE)
@@ -0,0 +1,439 @@
+"""
+Transaction deduplication.
+
+The forwarder retries on timeouts and the same bank email sometimes arrives
+twice (original plus forward), so every transaction is fingerprinted and
+checked against an index before it is written.
+"""
+
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Collection, Iterable
+from pathlib import Path
+
+from shared_code.finmail.mappers import SHEET_DATE_FORMAT
+from shared_code.finmail.models import Transaction, TransactionRecord
+from shared_code.finmail.utils.text import float_from_string, normalize
+
+logger = logging.getLogger(__name__)
+
+_THOUSANDS_GROUP = 3
+
+
+def _digest(*parts: object) -> str:
+    value = "|".join("" if part is None else str(part) for part in parts)
+    return hashlib.blake2b(value.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def fingerprint_parts(
+    pocket: str,
+    date_local: str,
+    amount: float,
+    merchant: str | None,
+    auth_code: str | None,
+) -> tuple[str, tuple]:
+    """
+    Get the kind of key and the values identifying a transaction.
+
+    The authorization code (scoped to the pocket) identifies a transaction when
+    present. Otherwise the pocket, local date, amount and merchant are used.
+    Transactions with equal parts have equal fingerprints, so batches can be
+    deduplicated on the parts without hashing them.
+
+    Parameters
+    ----------
+    pocket : str
+        The pocket.
+    date_local : str
+        The local date and time, formatted with `datetime.isoformat`.
+    amount : float
+        The amount.
+    merchant : str | None
+        The merchant.
+    auth_code : str | None
+        The authorization code.
+
+    Returns
+    -------
+    tuple[str, tuple]
+        The kind of key (``auth`` or ``txn``) and the values hashed into the
+        fingerprint.
+    """
+    if auth_code:
+        return "auth", (pocket, auth_code.strip())
+    return "txn", (pocket, date_local, f"{amount:.2f}", normalize(merchant))
+
+
+def fingerprint(kind: str, parts: tuple) -> str:
+    """
+    Hash the parts of a transaction into its fingerprint.
+
+    Parameters
+    ----------
+    kind : str
+        The kind of key, from `fingerprint_parts`.
+    parts : tuple
+        The values, from `fingerprint_parts`.
+
+    Returns
+    -------
+    str
+        The fingerprint, prefixed with the kind of key.
+    """
+    return f"{kind}:{_digest(*parts)}"
+
+
+def transaction_fingerprint(transaction: Transaction | TransactionRecord) -> str:
+    """
+    Compute a stable fingerprint of a transaction.
+
+    The authorization code (scoped to the pocket) identifies a transaction when
+    present. Otherwise the pocket, local date, amount and merchant are used.
+
+    Parameters
+    ----------
+    transaction : Transaction | TransactionRecord
+        The transaction to fingerprint.
+
+    Returns
+    -------
+    str
+        The fingerprint, prefixed with the kind of key used.
+    """
+    return fingerprint(
+        *fingerprint_parts(
+            transaction.pocket,
+            transaction.date_local.isoformat(),
+            transaction.amount,
+            transaction.merchant,
+            transaction.auth_code,
+        )
+    )
+
+
+def sheet_row_key(date_str: str, pocket: str, amount: float) -> str:
+    """
+    Compute the key of a transaction from the columns stored in the sheet.
+
+    The sheet has no merchant or authorization code columns, so rows seeded
+    from it are matched on date, pocket and amount only.
+
+    Parameters
+    ----------
+    date_str : str
+        The date column, formatted with `SHEET_DATE_FORMAT`.
+    pocket : str
+        The pocket column.
+    amount : float
+        The amount column.
+
+    Returns
+    -------
+    str
+        The row key.
+    """
+    return f"row:{_digest(date_str.strip(), pocket.strip(), f'{amount:.2f}')}"
+
+
+def _transaction_row_key(transaction: Transaction | TransactionRecord) -> str:
+    return sheet_row_key(
+        transaction.date_local.strftime(SHEET_DATE_FORMAT),
+        transaction.pocket,
+        transaction.amount,
+    )
+
+
+def parse_sheet_amount(value: object) -> float | None:
+    """
+    Read the amount column of a worksheet row.
+
+    Numbers and text without separators are read as is. Formatted amounts
+    (``$1.234,00``, ``1,234.00``, ``25.000``) are read with
+    `float_from_string`, like the parsers read them: with both ``.`` and
+    ``,``, the last one is the decimal separator; a single kind of separator
+    groups thousands if it repeats or is followed by three digits, so
+    ``1.234`` is 1234.
+
+    Parameters
+    ----------
+    value : object
+        The cell value.
+
+    Returns
+    -------
+    float | None
+        The amount, or None if the cell holds no number.
+    """
+    if isinstance(value, int | float):
+        return float(value)
+    text = str(value).strip()
+    if not any(char.isdigit() for char in text):
+        return None
+    separators = [char for char in text if char in ",."]
+    if not separators:
+        return float_from_string(text)
+    last = separators[-1]
+    # A lone separator followed by three digits groups thousands ("$25.000")
+    digits_after = len(text) - text.rfind(last) - 1
+    is_decimal = len(set(separators)) > 1 or (
+        separators.count(last) == 1 and digits_after != _THOUSANDS_GROUP
+    )
+    other = "." if last == "," else ","
+    if is_decimal:
+        return float_from_string(text, thousand_sep=other, decimal_sep=last)
+    return float_from_string(text, thousand_sep=last, decimal_sep=other)
+
+
+class DedupIndex:
+    """
+    Index of already written transactions.
+
+    Recently seen keys are kept in an in-memory LRU. When a path is given they
+    are also persisted to a local SQLite database, so the index survives
+    restarts and covers more than the LRU holds.
+
+    Transactions being written are reserved first (see `reserve`), so two
+    overlapping deliveries of the same email do not both write it. When a
+    write reaches only some sinks, those are remembered in memory (see
+    `record_partial_write`), so the retry only writes the others.
+    """
+
+    def __init__(self, path: str | Path | None = None, cache_size: int = 10_000):
+        """
+        Initialize the index.
+
+        Parameters
+        ----------
+        path : str | Path | None, optional
+            The SQLite database file. If None, only the in-memory LRU is used.
+        cache_size : int, optional
+            Maximum number of keys kept in memory. Default is 10,000.
+        """
+        self.cache_size = cache_size
+        self._cache: OrderedDict[str, None] = OrderedDict()
+        # Fingerprints of the transactions being written
+        self._reserved: set[str] = set()
+        # Sinks that wrote transactions not fully written, by fingerprint
+        self._partial: OrderedDict[str, frozenset[str]] = OrderedDict()
+        self._has_seeded_rows = False
+        self._lock = threading.Lock()
+        self._connection: sqlite3.Connection | None = None
+        if path is not None:
+            self._connection = sqlite3.connect(path, check_same_thread=False)
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS seen_keys "
+                "(key TEXT PRIMARY KEY, seen_at REAL NOT NULL)"
+            )
+            self._has_seeded_rows = (
+                self._connection.execute(
+                    "SELECT 1 FROM seen_keys WHERE key LIKE 'row:%' LIMIT 1"
+                ).fetchone()
+                is not None
+            )
+
+    def _remember(self, key: str) -> None:
+        self._cache[key] = None
+        self._cache.move_to_end(key)
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def _contains_key(self, key: str) -> bool:
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            return True
+        if self._connection is None:
+            return False
+        found = self._connection.execute(
+            "SELECT 1 FROM seen_keys WHERE key = ?", (key,)
+        ).fetchone()
+        if found:
+            self._remember(key)
+        return found is not None
+
+    def _add_keys(self, keys: list[str]) -> None:
+        for key in keys:
+            self._remember(key)
+        if self._connection is not None:
+            now = time.time()
+            with self._connection:
+                self._connection.executemany(
+                    "INSERT OR IGNORE INTO seen_keys (key, seen_at) VALUES (?, ?)",
+                    [(key, now) for key in keys],
+                )
+
+    def _contains(self, transaction: Transaction | TransactionRecord, key: str) -> bool:
+        if self._contains_key(key):
+            return True
+        return self._has_seeded_rows and self._contains_key(
+            _transaction_row_key(transaction)
+        )
+
+    def contains(self, transaction: Transaction | TransactionRecord) -> bool:
+        """
+        Check whether a transaction was already written.
+
+        Parameters
+        ----------
+        transaction : Transaction | TransactionRecord
+            The transaction to look up.
+
+        Returns
+        -------
+        bool
+            True if its fingerprint (or, for rows seeded from the sheet, its row
+            key) is in the index.
+        """
+        key = transaction_fingerprint(transaction)
+        with self._lock:
+            return self._contains(transaction, key)
+
+    def reserve(self, transaction: Transaction | TransactionRecord) -> bool:
+        """
+        Claim a transaction before writing it.
+
+        The check and the claim are atomic, so of several overlapping
+        deliveries of a transaction only one can write it. The reservation
+        ends with `add` once written, or with `release` if the write failed.
+
+        Parameters
+        ----------
+        transaction : Transaction | TransactionRecord
+            The transaction about to be written.
+
+        Returns
+        -------
+        bool
+            True if it was reserved; False if it was already written (see
+            `contains`) or is reserved by another writer.
+        """
+        key = transaction_fingerprint(transaction)
+        with self._lock:
+            if key in self._reserved or self._contains(transaction, key):
+                return False
+            self._reserved.add(key)
+            return True
+
+    def release(self, transactions: Iterable[Transaction | TransactionRecord]) -> None:
+        """
+        Drop the reservations of transactions that could not be written.
+
+        Parameters
+        ----------
+        transactions : Iterable[Transaction | TransactionRecord]
+            The reserved transactions.
+        """
+        keys = [transaction_fingerprint(t) for t in transactions]
+        with self._lock:
+            self._reserved.difference_update(keys)
+
+    def add(self, transactions: Iterable[Transaction]) -> None:
+        """
+        Record written transactions, ending their reservations.
+
+        Parameters
+        ----------
+        transactions : Iterable[Transaction]
+            The transactions to record.
+        """
+        keys = [transaction_fingerprint(t) for t in transactions]
+        with self._lock:
+            self._add_keys(keys)
+            self._reserved.difference_update(keys)
+            for key in keys:
+                self._partial.pop(key, None)
+
+    def record_partial_write(
+        self,
+        transactions: Iterable[Transaction | TransactionRecord],
+        sinks: Collection[str],
+    ) -> None:
+        """
+        Remember the sinks that wrote transactions whose write failed elsewhere.
+
+        The transactions are not recorded as written (see `add`), so a retry
+        is not rejected as a duplicate.
+
+        Parameters
+        ----------
+        transactions : Iterable[Transaction | TransactionRecord]
+            The transactions of the failed write.
+        sinks : Collection[str]
+            The names of the sinks that wrote them.
+        """
+        keys = [transaction_fingerprint(t) for t in transactions]
+        with self._lock:
+            for key in keys:
+                self._partial[key] = self._partial.get(key, frozenset()) | set(sinks)
+                self._partial.move_to_end(key)
+                if len(self._partial) > self.cache_size:
+                    self._partial.popitem(last=False)
+
+    def written_sinks(
+        self, transactions: Iterable[Transaction | TransactionRecord]
+    ) -> frozenset[str]:
+        """
+        Get the sinks that already wrote every given transaction.
+
+        Parameters
+        ----------
+        transactions : Iterable[Transaction | TransactionRecord]
+            The transactions about to be written.
+
+        Returns
+        -------
+        frozenset[str]
+            The names of the sinks a previous, partially failed write reached
+            for all of them; empty if none.
+        """
+        keys = [transaction_fingerprint(t) for t in transactions]
+        with self._lock:
+            sinks = [self._partial.get(key, frozenset()) for key in keys]
+        return frozenset.intersection(*sinks) if sinks else frozenset()
+
+    def seed_from_rows(self, rows: list[list]) -> int:
+        """
+        Record the transactions already stored in the sheet.
+
+        Amounts are read with `parse_sheet_amount`. Rows without a number in
+        the amount column (e.g. the header) are skipped; rows whose amount
+        cannot be read are skipped with a warning, as their duplicates will
+        not be detected.
+
+        Parameters
+        ----------
+        rows : list[list]
+            The worksheet values, as returned by `GoogleSheetsClient.read_all`
+            (date, pocket, category, currency, amount, ...).
+
+        Returns
+        -------
+        int
+            The number of rows recorded.
+        """
+        keys = []
+        unreadable = 0
+        for row in rows:
+            if len(row) < 5:  # noqa: PLR2004
+                continue
+            date_str, pocket, _, _, amount_cell = row[:5]
+            amount = parse_sheet_amount(amount_cell)
+            if amount is None:
+                if any(char.isdigit() for char in str(amount_cell)):
+                    unreadable += 1
+                continue
+            keys.append(sheet_row_key(str(date_str), str(pocket), amount))
+        with self._lock:
+            self._add_keys(keys)
+            self._has_seeded_rows = self._has_seeded_rows or bool(keys)
+        if unreadable:
+            logger.warning(
+                "Skipped %d sheet rows with an unreadable amount while seeding "
+                "the dedup index",
+                unreadable,
+            )
+        logger.info("Seeded dedup index with %d rows", len(keys))
+        return len(keys)
@@ -1,20 +1,79 @@
 """Finmail Ingest Module."""
 
+import asyncio
+import inspect
 import logging
+import time
+from collections.abc import Iterator
+from concurrent.futures import Executor
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from functools import partial
 
 from bs4 import BeautifulSoup
 
-from shared_code.finmail.clients import GoogleSheetsClient
 from shared_code.finmail.core.config import settings
 from shared_code.finmail.domain.classification import TransactionClassifier
+from shared_code.finmail.domain.dedup import DedupIndex, transaction_fingerprint
 from shared_code.finmail.domain.parsers.base import Parser
+from shared_code.finmail.domain.parsers.prefilter import prefilter_matches
 from shared_code.finmail.domain.parsers.registry import get_registry
+from shared_code.finmail.exceptions import (
+    DuplicateTransactionError,
+    EmailRejectedError,
+    SinkWriteError,
+    TransactionInProgressError,
+)
 from shared_code.finmail.models import EmailPayload, Transaction
+from shared_code.finmail.sinks import (
+    AsyncTransactionSink,
+    MultiSink,
+    SinkResult,
+    TransactionSink,
+)
+from shared_code.finmail.utils.timing import StageTimer
+from shared_code.finmail.utils.tracing import start_span
 
 logger = logging.getLogger(__name__)
 
 
-def detect_parser(sender: str, subject: str, soup: BeautifulSoup) -> Parser | None:
+@dataclass(slots=True)
+class IngestResult:
+    """Outcome of processing an email."""
+
+    transaction: Transaction
+    # Per-sink outcomes, when the sink is a `MultiSink`
+    sink_results: list[SinkResult] = field(default_factory=list)
+    # Duration of each processing stage, in seconds
+    timings: dict[str, float] = field(default_factory=dict)
+
+
+@dataclass(slots=True)
+class EmailOutcome:
+    """Outcome of one email processed in a batch."""
+
+    transaction: Transaction | None = None
+    # Why the email was not stored (no parser, limits, duplicate)
+    rejected: str | None = None
+    # Unexpected parsing error; the email may succeed if retried
+    error: str | None = None
+
+
+def _check_time_budget(started_at: float, stage: str) -> None:
+    elapsed = time.monotonic() - started_at
+    if elapsed > settings.PARSE_TIME_BUDGET_S:
+        raise EmailRejectedError(
+            f"Time budget of {settings.PARSE_TIME_BUDGET_S}s exceeded during {stage} "
+            f"({elapsed:.2f}s)"
+        )
+
+
+def detect_parser(
+    sender: str,
+    subject: str,
+    soup: BeautifulSoup,
+    started_at: float | None = None,
+) -> Parser | None:
     """
     Detect and returns the appropriate parser for a given email.
 
@@ -26,14 +85,25 @@ def detect_parser(sender: str, subject: str, soup: BeautifulSoup) -> Parser | No
         The subject line of the email.
     soup : BeautifulSoup
         Parsed HTML content of the email.
+    started_at : float | None, optional
+        The `time.monotonic` time processing started at. If provided, the
+        time budget (`PARSE_TIME_BUDGET_S`) is checked before trying each
+        parser.
 
     Returns
     -------
     Parser or None
         The matching parser object if found, otherwise None.
-    """
+
+    Raises
+    ------
+    EmailRejectedError
+        If the time budget runs out before a parser matched.
+    """  # noqa: DOC502
     parsers = get_registry()
     for p in parsers:
+        if started_at is not None:
+            _check_time_budget(started_at, "parser detection")
         if p.matches(sender, subject, soup):
             return p
     logger.warning(
@@ -46,42 +116,429 @@ def detect_parser(sender: str, subject: str, soup: BeautifulSoup) -> Parser | No
     return None
 
 
-def process_email(
-    payload: EmailPayload,
-    google_sheets_client: GoogleSheetsClient,
-    classifier: TransactionClassifier | None = None,
+def parse_email(
+    payload: EmailPayload, timer: StageTimer | None = None
 ) -> Transaction | None:
-    """Process an incoming email and extracts relevant information."""  # noqa: DOC201
-    soup = payload.get_soup()
-    parser = detect_parser(
-        sender=payload.sender,
-        subject=payload.subject,
-        soup=soup,
-    )
+    """
+    Detect the parser of an email and extract its transaction.
+
+    The time budget (`PARSE_TIME_BUDGET_S`, counted from the start, so
+    including the soup) bounds parser detection: it is checked before trying
+    each parser and before parsing starts. A parse that has started is not
+    interrupted, and its transaction is kept.
+
+    Parameters
+    ----------
+    payload : EmailPayload
+        The incoming email.
+    timer : StageTimer | None, optional
+        Records the duration of the ``prefilter``, ``get_soup``,
+        ``detect_parser`` and ``parse`` stages, if provided.
+
+    Returns
+    -------
+    Transaction | None
+        The parsed transaction, or None if no parser matched the email.
+
+    Raises
+    ------
+    EmailRejectedError
+        If the email exceeds the HTML limits, or the time budget runs out
+        before parsing starts.
+    """  # noqa: DOC502
+    if timer is None:
+        timer = StageTimer()
+    started_at = time.monotonic()
+    with timer.stage("prefilter"):
+        matches = prefilter_matches(
+            payload.sender, payload.subject, payload.html, get_registry()
+        )
+    if not matches:
+        logger.info(
+            "Email from %s with subject %s rejected by prefilter",
+            payload.sender,
+            payload.subject,
+        )
+        return None
+
+    with timer.stage("get_soup"):
+        soup = payload.get_soup()
+    with timer.stage("detect_parser"), start_span("finmail.detect_parser") as span:
+        parser = detect_parser(
+            sender=payload.sender,
+            subject=payload.subject,
+            soup=soup,
+            started_at=started_at,
+        )
+        span.set_attribute("finmail.parser", type(parser).__name__ if parser else "")
     if not parser:
         return None
+    _check_time_budget(started_at, "parser detection")
+
+    with (
+        timer.stage("parse"),
+        start_span("finmail.parse", {"finmail.parser": type(parser).__name__}),
+    ):
+        return parser.parse(
+            sender=payload.sender,
+            subject=payload.subject,
+            soup=soup,
+            received_at=payload.received_at,
+        )
 
-    transaction = parser.parse(
-        sender=payload.sender,
-        subject=payload.subject,
-        soup=soup,
-        received_at=payload.received_at,
-    )
 
-    # Classify transaction if classifier provided
+@contextmanager
+def _reserved(
+    transaction: Transaction,
+    dedup_index: DedupIndex | None,
+    sender: str,
+    timer: StageTimer,
+) -> Iterator[None]:
+    # Holds the transaction in the dedup index while it is classified and
+    # written, so an overlapping delivery of the same email does not write it
+    if dedup_index is None:
+        yield
+        return
+    with timer.stage("dedup"):
+        is_reserved = dedup_index.reserve(transaction)
+    if not is_reserved:
+        fingerprint = transaction_fingerprint(transaction)
+        if not dedup_index.contains(transaction):
+            logger.info(
+                "Transaction %s from %s already in progress", fingerprint, sender
+            )
+            raise TransactionInProgressError(fingerprint)
+        logger.info("Skipping duplicate transaction %s from %s", fingerprint, sender)
+        raise DuplicateTransactionError(fingerprint)
+    try:
+        yield
+    except BaseException:
+        dedup_index.release([transaction])
+        raise
+
+
+def _classify(
+    transaction: Transaction,
+    classifier: TransactionClassifier | None,
+    timer: StageTimer,
+) -> Transaction:
     if classifier:
         try:
-            transaction = classifier.classify(transaction)
+            # Rule reloads are timed apart, as they hit the rule provider
+            started_at = time.perf_counter()
+            if classifier.refresh_rules():
+                timer.add("load_rules", time.perf_counter() - started_at)
+            with timer.stage("classify"):
+                return classifier.classify(transaction)
         except Exception:
             logger.warning(
                 "Error classifying transaction. Skipping.",
                 exc_info=True,
             )
+    return transaction
+
+
+def _written_sinks(
+    transactions: list[Transaction], dedup_index: DedupIndex | None
+) -> frozenset[str]:
+    if dedup_index is None:
+        return frozenset()
+    return dedup_index.written_sinks(transactions)
+
+
+def _check_sink_results(
+    sink: MultiSink,
+    sink_results: list[SinkResult],
+    transactions: list[Transaction],
+    dedup_index: DedupIndex | None,
+) -> None:
+    try:
+        sink.check_results(sink_results)
+    except SinkWriteError:
+        # Not recorded as written: the retry only writes the failed sinks
+        if dedup_index is not None:
+            dedup_index.record_partial_write(
+                transactions, [result.name for result in sink_results if result.ok]
+            )
+        raise
+
+
+def process_email(
+    payload: EmailPayload,
+    sink: TransactionSink,
+    classifier: TransactionClassifier | None = None,
+    dedup_index: DedupIndex | None = None,
+    timer: StageTimer | None = None,
+) -> IngestResult | None:
+    """
+    Process an incoming email and extracts relevant information.
+
+    Parameters
+    ----------
+    payload : EmailPayload
+        The incoming email.
+    sink : TransactionSink
+        The sink used to store the transaction. With a `MultiSink`, the
+        transaction is written to every sink concurrently, each outcome is
+        reported in the result, and every required sink must succeed.
+    classifier : TransactionClassifier | None, optional
+        The classifier used to categorize the transaction, if any.
+    dedup_index : DedupIndex | None, optional
+        Index of already written transactions. Duplicates are rejected before
+        classification and nothing is written; otherwise the transaction is
+        reserved in it while it is classified and written.
+    timer : StageTimer | None, optional
+        Records the duration of each stage (see `parse_email`, plus ``dedup``,
+        ``load_rules`` when the rules are reloaded, ``classify`` and ``write``),
+        including those of a rejected email. A new one is used if None; its
+        timings are returned in the result either way.
+
+    Returns
+    -------
+    IngestResult | None
+        The stored transaction, per-sink results and stage timings, or None if
+        no parser matched the email.
+
+    Raises
+    ------
+    EmailRejectedError
+        If the email exceeds the HTML limits or the parser detection time
+        budget (`PARSE_TIME_BUDGET_S`). Nothing is written in that case.
+    DuplicateTransactionError
+        If the transaction is already in `dedup_index`.
+    TransactionInProgressError
+        If another request is writing the same transaction (reserved in
+        `dedup_index`). Retrying later either writes it or finds a duplicate.
+    SinkWriteError
+        If a required sink of a `MultiSink` could not write the transaction.
+        It is not recorded in `dedup_index`, so the client can retry; the
+        sinks that wrote it are remembered and skipped by the retry.
+    """  # noqa: DOC502
+    if timer is None:
+        timer = StageTimer()
+    transaction = parse_email(payload, timer)
+    if transaction is None:
+        return None
+
+    sink_results = []
+    with _reserved(transaction, dedup_index, payload.sender, timer):
+        transaction = _classify(transaction, classifier, timer)
+        with timer.stage("write"):
+            if isinstance(sink, MultiSink):
+                sink_results = sink.dispatch(
+                    [transaction], skip=_written_sinks([transaction], dedup_index)
+                )
+            else:
+                sink.write([transaction])
+        if isinstance(sink, MultiSink):
+            _check_sink_results(sink, sink_results, [transaction], dedup_index)
+        if dedup_index is not None:
+            dedup_index.add([transaction])
+
+    return IngestResult(
+        transaction=transaction, sink_results=sink_results, timings=timer.timings
+    )
+
+
+async def process_email_async(  # noqa: PLR0913
+    payload: EmailPayload,
+    sink: TransactionSink | AsyncTransactionSink,
+    classifier: TransactionClassifier | None = None,
+    dedup_index: DedupIndex | None = None,
+    *,
+    executor: Executor | None = None,
+    timer: StageTimer | None = None,
+) -> IngestResult | None:
+    """
+    Process an incoming email without blocking the event loop.
+
+    Same steps as `process_email`, but parsing runs in `executor` and the
+    classifier in a worker thread (its rules may be loaded from Sheets), so
+    one worker can overlap many in-flight emails.
+
+    Parameters
+    ----------
+    payload : EmailPayload
+        The incoming email.
+    sink : TransactionSink | AsyncTransactionSink
+        The sink used to store the transaction. Async sinks are awaited; a
+        `MultiSink` is written with `MultiSink.adispatch`; other sinks run in a
+        worker thread.
+    classifier : TransactionClassifier | None, optional
+        The classifier used to categorize the transaction, if any.
+    dedup_index : DedupIndex | None, optional
+        Index of already written transactions. Duplicates are rejected before
+        classification and nothing is written; otherwise the transaction is
+        reserved in it while it is classified and written.
+    executor : Executor | None, optional
+        Runs the CPU-bound parsing (a thread or process pool). If None, the
+        event loop's default executor is used.
+    timer : StageTimer | None, optional
+        Records the duration of each stage, as in `process_email`, plus
+        ``parse_email``: the whole executor call, including the wait for a
+        free worker. With a process pool, the parsing stages run in another
+        process and only ``parse_email`` is recorded.
+
+    Returns
+    -------
+    IngestResult | None
+        The stored transaction, per-sink results and stage timings, or None if
+        no parser matched the email.
+
+    Raises
+    ------
+    EmailRejectedError
+        If the email exceeds the HTML limits or the parser detection time
+        budget (`PARSE_TIME_BUDGET_S`). Nothing is written in that case.
+    DuplicateTransactionError
+        If the transaction is already in `dedup_index`.
+    TransactionInProgressError
+        If another request is writing the same transaction.
+    SinkWriteError
+        If a required sink of a `MultiSink` could not write the transaction.
+        It is not recorded in `dedup_index`, so the client can retry; the
+        sinks that wrote it are remembered and skipped by the retry.
+    """  # noqa: DOC502
+    if timer is None:
+        timer = StageTimer()
+    loop = asyncio.get_running_loop()
+    with timer.stage("parse_email"):
+        transaction = await loop.run_in_executor(
+            executor, partial(parse_email, payload, timer)
+        )
+    if transaction is None:
+        return None
+
+    sink_results = []
+    with _reserved(transaction, dedup_index, payload.sender, timer):
+        if classifier:
+            transaction = await asyncio.to_thread(
+                _classify, transaction, classifier, timer
+            )
+        with timer.stage("write"):
+            if isinstance(sink, MultiSink):
+                sink_results = await sink.adispatch(
+                    [transaction], skip=_written_sinks([transaction], dedup_index)
+                )
+            elif inspect.iscoroutinefunction(sink.write):
+                await sink.write([transaction])
+            else:
+                await asyncio.to_thread(sink.write, [transaction])
+        if isinstance(sink, MultiSink):
+            _check_sink_results(sink, sink_results, [transaction], dedup_index)
+        if dedup_index is not None:
+            dedup_index.add([transaction])
 
-    google_sheets_client.insert_transaction(
-        spreadsheet_identifier=settings.GOOGLE_SPREADSHEET_IDENTIFIER,
-        worksheet_name=settings.GOOGLE_WORKSHEET_NAME,
-        transaction=transaction,
+    return IngestResult(
+        transaction=transaction, sink_results=sink_results, timings=timer.timings
     )
 
-    return transaction
+
+def _parse_outcome(payload: EmailPayload) -> EmailOutcome:
+    try:
+        transaction = parse_email(payload)
+    except EmailRejectedError as e:
+        return EmailOutcome(rejected=e.reason)
+    except Exception as e:
+        logger.warning("Failed to parse email from %s", payload.sender, exc_info=True)
+        return EmailOutcome(error=f"{type(e).__name__}: {e}")
+    if transaction is None:
+        return EmailOutcome(rejected="No parser matched the email")
+    return EmailOutcome(transaction=transaction)
+
+
+def _reserve_outcomes(
+    outcomes: list[EmailOutcome], dedup_index: DedupIndex | None
+) -> list[EmailOutcome]:
+    # Rejects the duplicates (also within the batch) and reserves the others
+    fingerprints = set()
+    pending = []
+    for outcome in outcomes:
+        if outcome.transaction is None:
+            continue
+        fingerprint = transaction_fingerprint(outcome.transaction)
+        if fingerprint in fingerprints:
+            outcome.rejected = DuplicateTransactionError(fingerprint).reason
+            outcome.transaction = None
+        elif dedup_index is not None and not dedup_index.reserve(outcome.transaction):
+            if dedup_index.contains(outcome.transaction):
+                outcome.rejected = DuplicateTransactionError(fingerprint).reason
+            else:
+                # Being written by another request: retry it later
+                outcome.error = str(TransactionInProgressError(fingerprint))
+            outcome.transaction = None
+        else:
+            fingerprints.add(fingerprint)
+            pending.append(outcome)
+    return pending
+
+
+def process_emails(
+    payloads: list[EmailPayload],
+    sink: TransactionSink,
+    classifier: TransactionClassifier | None = None,
+    dedup_index: DedupIndex | None = None,
+) -> list[EmailOutcome]:
+    """
+    Process a batch of emails, classifying and writing them in bulk.
+
+    Each email is parsed on its own, so one failure does not affect the
+    others; the parsed transactions are then deduplicated (also within the
+    batch), classified with `TransactionClassifier.classify_batch` and written
+    with a single sink call.
+
+    Parameters
+    ----------
+    payloads : list[EmailPayload]
+        The incoming emails.
+    sink : TransactionSink
+        The sink used to store the transactions.
+    classifier : TransactionClassifier | None, optional
+        The classifier used to categorize the transactions, if any.
+    dedup_index : DedupIndex | None, optional
+        Index of already written transactions. Duplicates are rejected, and
+        the other transactions are reserved in it until written. Transactions
+        another request is writing are reported as errors, to be retried.
+
+    Returns
+    -------
+    list[EmailOutcome]
+        One outcome per email, in order.
+
+    Raises
+    ------
+    SinkWriteError
+        If a required sink of a `MultiSink` could not write the batch. Any
+        error of a plain sink is propagated. Nothing is recorded in
+        `dedup_index` then, but the sinks that wrote the batch are skipped
+        when it is retried.
+    """  # noqa: DOC502
+    outcomes = [_parse_outcome(payload) for payload in payloads]
+    pending = _reserve_outcomes(outcomes, dedup_index)
+    if not pending:
+        return outcomes
+
+    transactions = [outcome.transaction for outcome in pending]
+    try:
+        if classifier:
+            try:
+                transactions = classifier.classify_batch(transactions)
+            except Exception:
+                logger.warning("Error classifying batch. Skipping.", exc_info=True)
+        for outcome, transaction in zip(pending, transactions, strict=True):
+            outcome.transaction = transaction
+
+        if isinstance(sink, MultiSink):
+            sink_results = sink.dispatch(
+                transactions, skip=_written_sinks(transactions, dedup_index)
+            )
+            _check_sink_results(sink, sink_results, transactions, dedup_index)
+        else:
+            sink.write(transactions)
+    except BaseException:
+        if dedup_index is not None:
+            dedup_index.release(transactions)
+        raise
+    if dedup_index is not None:
+        dedup_index.add(transactions)
+    return outcomes
@@ -1,6 +1,7 @@
 """Finmail Parsers Module."""
 
 from .base import Parser
+from .prefilter import prefilter_matches
 from .rappicard import RappiCardParser
 from .rappipay import RappiPayParser
 from .registry import get_registry, register_parser
@@ -12,5 +13,6 @@ __all__ = [
     "RappiPayParser",
     "RemotePassParser",
     "get_registry",
+    "prefilter_matches",
     "register_parser",
 ]
@@ -14,6 +14,10 @@ class Parser(ABC):
 
     DOMAINS: ClassVar[tuple[str, ...]]
     CURRENCY: ClassVar[str]
+    # Case-insensitive tokens, at least one of which (or one of DOMAINS) must
+    # appear in the raw sender, subject or HTML for `matches` to return True.
+    # None disables the prefilter for every parser.
+    KEYWORDS: ClassVar[tuple[str, ...] | None] = None
 
     @abstractmethod
     def matches(self, sender: str, subject: str, soup: BeautifulSoup) -> bool:
@@ -0,0 +1,62 @@
+"""Prefilter to reject emails no registered parser can handle."""
+
+import re
+from functools import lru_cache
+
+from shared_code.finmail.domain.parsers.base import Parser
+
+
+@lru_cache(maxsize=8)
+def _compile_prefilter(parsers: tuple[Parser, ...]) -> re.Pattern | None:
+    tokens: set[str] = set()
+    for parser in parsers:
+        if parser.KEYWORDS is None:
+            # The parser does not declare its keywords, so nothing can be rejected
+            return None
+        tokens.update(getattr(parser, "DOMAINS", ()))
+        tokens.update(parser.KEYWORDS)
+
+    if not tokens:
+        return re.compile(r"(?!)")  # never matches
+
+    # Longest first so overlapping tokens report the most specific match
+    alternation = "|".join(
+        re.escape(token) for token in sorted(tokens, key=len, reverse=True)
+    )
+    return re.compile(alternation, re.IGNORECASE)
+
+
+def prefilter_matches(
+    sender: str | None,
+    subject: str | None,
+    html: str | None,
+    parsers: list[Parser],
+) -> bool:
+    """
+    Check whether any of the given parsers could match an email.
+
+    A single compiled pattern over every parser's `DOMAINS` and `KEYWORDS` is
+    searched in the raw sender, subject and HTML, so emails that cannot match
+    are rejected without building a BeautifulSoup tree. A True result does not
+    guarantee a match; `detect_parser` still has the final word.
+
+    Parameters
+    ----------
+    sender : str | None
+        The email address of the sender.
+    subject : str | None
+        The subject line of the email.
+    html : str | None
+        The raw HTML content of the email.
+    parsers : list[Parser]
+        The candidate parsers, usually the registry.
+
+    Returns
+    -------
+    bool
+        False if no parser can match the email, True otherwise.
+    """
+    pattern = _compile_prefilter(tuple(parsers))
+    if pattern is None:
+        return True
+    return any(pattern.search(value) for value in (sender, subject, html) if value)
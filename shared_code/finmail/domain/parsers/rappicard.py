@@ -5,17 +5,17 @@ from datetime import datetime
 from typing import ClassVar
 
 from bs4 import BeautifulSoup
-from dateutil import tz
 
 from shared_code.finmail.core.config import settings
 from shared_code.finmail.domain.parsers.base import Parser
 from shared_code.finmail.domain.parsers.registry import register_parser
 from shared_code.finmail.models import Transaction
+from shared_code.finmail.utils.dates import get_timezone, parse_datetime_str
 from shared_code.finmail.utils.html import extract_subject
 from shared_code.finmail.utils.text import float_from_string, normalize
 
 logger = logging.getLogger(__name__)
-TZ = tz.gettz(settings.DEFAULT_TZ)
+TZ = get_timezone(settings.DEFAULT_TZ)
 
 LABELS = {
     "amount": ["monto"],
@@ -31,9 +31,10 @@ LABELS = {
 
 
 def _find_value_by_label(soup: BeautifulSoup, label_variants: list[str]) -> str | None:
+    variants = {normalize(v) for v in label_variants}
+
     for p in soup.find_all("p"):
-        txt = normalize(p.get_text())
-        if any(normalize(v) == txt for v in label_variants):
+        if normalize(p.get_text()) in variants:
             tr = p.find_parent("tr")
             if not tr:
                 continue
@@ -52,6 +53,7 @@ class RappiCardParser(Parser):
         "noreply@rappicard.co",
     )
     CURRENCY: ClassVar[str] = "COP"
+    KEYWORDS: ClassVar[tuple[str, ...]] = ("rappicard",)
 
     def matches(self, sender: str, subject: str, soup: BeautifulSoup) -> bool:
         """
@@ -117,7 +119,7 @@ class RappiCardParser(Parser):
         return Transaction(
             # TODO @juandaherrera: maybe this could be done more general
             pocket="RappiCard",
-            date_local=" ".join(date_str.split()) if date_str else None,
+            date_local=parse_datetime_str(date_str),
             amount=amount_float,
             currency=self.CURRENCY,
             merchant=merchant,
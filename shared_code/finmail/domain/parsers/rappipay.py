@@ -5,18 +5,17 @@ from datetime import datetime
 from typing import ClassVar
 
 from bs4 import BeautifulSoup
-from dateutil import tz
 
 from shared_code.finmail.core.config import settings
 from shared_code.finmail.domain.parsers.base import Parser
 from shared_code.finmail.domain.parsers.registry import register_parser
 from shared_code.finmail.models import Transaction
-from shared_code.finmail.utils.dates import parse_spanish_datetime_str
+from shared_code.finmail.utils.dates import get_timezone, parse_datetime_str
 from shared_code.finmail.utils.html import extract_subject
 from shared_code.finmail.utils.text import float_from_string, normalize
 
 logger = logging.getLogger(__name__)
-TZ = tz.gettz(settings.DEFAULT_TZ)
+TZ = get_timezone(settings.DEFAULT_TZ)
 
 MATCH_KEYWORDS = (
     "transferencia bancaria",
@@ -25,6 +24,8 @@ MATCH_KEYWORDS = (
     "tu dinero esta en camino",
     "tu dinero ya esta disponible",
 )
+# Accent-free words contained in MATCH_KEYWORDS, used by the prefilter on raw HTML
+PREFILTER_KEYWORDS = ("transferencia", "compra", "rappipay", "dinero")
 
 LABELS = {
     "amount_in": ["monto recibido"],
@@ -136,6 +137,7 @@ class RappiPayParser(Parser):
 
     DOMAINS: ClassVar[tuple[str, ...]] = ("noreply@rappipay.co",)
     CURRENCY: ClassVar[str] = "COP"
+    KEYWORDS: ClassVar[tuple[str, ...]] = PREFILTER_KEYWORDS
 
     def matches(self, sender: str, subject: str, soup: BeautifulSoup) -> bool:
         """
@@ -198,7 +200,7 @@ class RappiPayParser(Parser):
             fields["amount_pse"],
         )
 
-        date_local = parse_spanish_datetime_str(
+        date_local = parse_datetime_str(
             fields["date"],
             fields["time"],
         )
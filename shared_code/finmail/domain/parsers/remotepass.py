@@ -2,20 +2,20 @@
 
 import logging
 import re
-from datetime import datetime
+from datetime import UTC, datetime
 from typing import ClassVar
 
 from bs4 import BeautifulSoup
-from dateutil import tz
 
 from shared_code.finmail.core.config import settings
 from shared_code.finmail.domain.parsers.base import Parser
 from shared_code.finmail.domain.parsers.registry import register_parser
 from shared_code.finmail.models import Transaction
+from shared_code.finmail.utils.dates import get_timezone, parse_datetime_str
 from shared_code.finmail.utils.text import float_from_string, normalize
 
 logger = logging.getLogger(__name__)
-TZ = tz.gettz(settings.DEFAULT_TZ)
+TZ = get_timezone(settings.DEFAULT_TZ)
 
 
 @register_parser()
@@ -24,6 +24,7 @@ class RemotePassParser(Parser):
 
     DOMAINS: ClassVar[tuple[str, ...]] = ("no-reply@remotepass.team",)
     CURRENCY: ClassVar[str] = "USD"
+    KEYWORDS: ClassVar[tuple[str, ...]] = ("remotepass",)
 
     def matches(self, sender: str, subject: str, soup: BeautifulSoup) -> bool:  # noqa: ARG002
         """
@@ -131,10 +132,7 @@ class RemotePassParser(Parser):
         amount = -float_from_string(amount_str, thousand_sep=",", decimal_sep=".")
 
         # Parse datetime (UTC → local)
-        dt_utc = datetime.strptime(f"{date_str} {time_str}", "%d/%m/%Y %H:%M").replace(
-            tzinfo=tz.UTC
-        )
-        date_local = dt_utc.astimezone(TZ)
+        date_local = parse_datetime_str(date_str, time_str, source_tz=UTC, target_tz=TZ)
 
         description = f"Purchase at {merchant}. {settings.service_signature}."
 
@@ -0,0 +1,85 @@
+"""Finmail exceptions."""
+
+
+class EmailRejectedError(ValueError):
+    """Raised when an email is rejected before or during parsing."""
+
+    def __init__(self, reason: str) -> None:
+        """
+        Initialize the error with the rejection reason.
+
+        Parameters
+        ----------
+        reason : str
+            Human readable reason of the rejection, reported in the response.
+        """
+        super().__init__(reason)
+        self.reason = reason
+
+
+class DuplicateTransactionError(EmailRejectedError):
+    """Raised when the parsed transaction was already written."""
+
+    def __init__(self, fingerprint: str) -> None:
+        """
+        Initialize the error with the fingerprint of the duplicate.
+
+        Parameters
+        ----------
+        fingerprint : str
+            The fingerprint found in the dedup index.
+        """
+        super().__init__(f"Duplicate transaction ({fingerprint})")
+        self.fingerprint = fingerprint
+
+
+class TransactionInProgressError(RuntimeError):
+    """Raised when the parsed transaction is being written by another request."""
+
+    def __init__(self, fingerprint: str) -> None:
+        """
+        Initialize the error with the fingerprint of the transaction.
+
+        Parameters
+        ----------
+        fingerprint : str
+            The fingerprint reserved in the dedup index.
+        """
+        super().__init__(f"Transaction already being written ({fingerprint})")
+        self.fingerprint = fingerprint
+
+
+class UnsafePatternError(ValueError):
+    """Raised when a rule pattern may backtrack catastrophically."""
+
+    def __init__(self, pattern: str, reason: str) -> None:
+        """
+        Initialize the error with the pattern and what makes it unsafe.
+
+        Parameters
+        ----------
+        pattern : str
+            The regex pattern.
+        reason : str
+            Human readable description of the vulnerable construct.
+        """
+        super().__init__(f"Unsafe regex pattern '{pattern}': {reason}")
+        self.pattern = pattern
+        self.reason = reason
+
+
+class SinkWriteError(RuntimeError):
+    """Raised when a transaction could not be written to every required sink."""
+
+    def __init__(self, results: list) -> None:
+        """
+        Initialize the error with the failed sink results.
+
+        Parameters
+        ----------
+        results : list[SinkResult]
+            The result of every sink.
+        """
+        errors = "; ".join(f"{r.name}: {r.error}" for r in results if not r.ok)
+        super().__init__(f"Could not write the transaction to every sink ({errors})")
+        self.results = results
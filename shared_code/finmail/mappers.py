@@ -0,0 +1,58 @@
+"""
+Finmail column mappers.
+
+Shared mapping of transactions to tabular rows, used by every sink so the
+Google Sheets worksheet and the local stores agree on column order and format.
+"""
+
+from datetime import datetime
+
+from shared_code.finmail.models import Transaction
+
+SHEET_DATE_FORMAT = "%d/%m/%Y %H:%M:%S"
+
+# Columns of the Google Sheets transactions worksheet, in order
+SHEET_COLUMNS: tuple[str, ...] = (
+    "date_local",
+    "pocket",
+    "category",
+    "currency",
+    "amount",
+    "description",
+)
+
+# Every transaction field, for local stores that keep the full record
+LEDGER_COLUMNS: tuple[str, ...] = tuple(Transaction.model_fields)
+
+
+def transaction_to_row(
+    transaction: Transaction,
+    columns: tuple[str, ...] = SHEET_COLUMNS,
+    date_format: str | None = SHEET_DATE_FORMAT,
+) -> list:
+    """
+    Map a transaction to a row of values.
+
+    Parameters
+    ----------
+    transaction : Transaction
+        The transaction to map.
+    columns : tuple[str, ...], optional
+        The transaction fields to include, in order. Defaults to the worksheet
+        columns (`SHEET_COLUMNS`).
+    date_format : str | None, optional
+        The `strftime` format of datetime fields. If None, they are formatted as
+        ISO 8601. Defaults to the worksheet format (`SHEET_DATE_FORMAT`).
+
+    Returns
+    -------
+    list
+        The row values.
+    """
+    row = []
+    for column in columns:
+        value = getattr(transaction, column)
+        if isinstance(value, datetime):
+            value = value.strftime(date_format) if date_format else value.isoformat()
+        row.append(value)
+    return row
@@ -1,13 +1,100 @@
 """Finmail data models."""
 
+import re
+from dataclasses import dataclass
 from datetime import UTC, datetime
+from functools import lru_cache
 
 from bs4 import BeautifulSoup
-from dateutil import tz
-from pydantic import BaseModel, EmailStr, Field, field_validator
+from pydantic import (
+    BaseModel,
+    Field,
+    ValidationError,
+    field_validator,
+    validate_email,
+)
 
 from shared_code.finmail.core.config import settings
-from shared_code.finmail.utils.html import clean_html
+from shared_code.finmail.exceptions import EmailRejectedError
+from shared_code.finmail.utils.dates import get_timezone
+from shared_code.finmail.utils.html import (
+    clean_html,
+    estimate_node_count,
+    strip_data_uris,
+)
+
+# "Display Name <address>"
+_NAMED_ADDRESS = re.compile(r"[^<]*<([^<>]*)>")
+
+# A local part without spaces or separators, and a domain with a TLD
+_ADDRESS = re.compile(
+    r"[^\s@<>()\[\],;:\"]+@(?:[^\W_](?:[\w-]*[^\W_])?\.)+[^\W\d_]{2,}"
+)
+
+_MAX_ADDRESS_LENGTH = 254
+
+
+def check_sender(value: str) -> str:
+    """
+    Check the syntax of an email address, without email-validator.
+
+    A lightweight stand-in for `pydantic.EmailStr`: display names are dropped
+    and the domain is lowercased, as email-validator does, but special-use
+    domains and internationalized names are not verified.
+
+    Parameters
+    ----------
+    value : str
+        The address, optionally as ``Display Name <address>``.
+
+    Returns
+    -------
+    str
+        The normalized address.
+
+    Raises
+    ------
+    ValueError
+        If the address is malformed.
+    """
+    address = value.strip()
+    if named := _NAMED_ADDRESS.fullmatch(address):
+        address = named.group(1).strip()
+    if len(address) > _MAX_ADDRESS_LENGTH or not _ADDRESS.fullmatch(address):
+        raise ValueError(f"value is not a valid email address: {value!r}")
+    local, _, domain = address.rpartition("@")
+    return f"{local}@{domain.lower()}"
+
+
+@lru_cache(maxsize=1_024)
+def normalize_sender(value: str, mode: str = "fast") -> str:
+    """
+    Validate and normalize a sender address, caching the result.
+
+    A few senders account for most requests, so each is validated once;
+    invalid addresses are not cached.
+
+    Parameters
+    ----------
+    value : str
+        The address.
+    mode : str, optional
+        ``full`` to validate with email-validator, as `pydantic.EmailStr`
+        does, or ``fast`` to only check the syntax (see `check_sender`).
+
+    Returns
+    -------
+    str
+        The normalized address.
+
+    Raises
+    ------
+    ValueError
+        If the address is not valid.
+    """  # noqa: DOC502
+    if mode == "full":
+        return validate_email(value)[1]
+    return check_sender(value)
 
 
 class Transaction(BaseModel):
@@ -52,17 +139,143 @@ class Transaction(BaseModel):
     )
 
 
+@dataclass(slots=True, kw_only=True)
+class TransactionRecord:
+    """
+    Lightweight transaction for internal batch paths.
+
+    Holds the fields of `Transaction` in a slotted dataclass, without
+    validation: it takes a fraction of the memory of the model and copies
+    several times faster. Batch paths such as the backfill convert parsed
+    transactions with `from_model`, and back with `to_model` where they leave
+    the pipeline. Records are treated as immutable; classification returns
+    copies.
+    """
+
+    date_local: datetime
+    pocket: str
+    category: str = settings.DEFAULT_CATEGORY
+    currency: str
+    amount: float
+    description: str | None = None
+    notes: str | None = None
+    merchant: str | None = None
+    account_last4: str | None = None
+    auth_code: str | None = None
+
+    @classmethod
+    def from_model(cls, transaction: Transaction) -> "TransactionRecord":
+        """
+        Create a record from a validated transaction.
+
+        Parameters
+        ----------
+        transaction : Transaction
+            The transaction.
+
+        Returns
+        -------
+        TransactionRecord
+            The record, sharing the field values of the transaction.
+        """
+        return cls(**transaction.__dict__)
+
+    def to_model(self) -> Transaction:
+        """
+        Convert the record to a validated transaction.
+
+        Returns
+        -------
+        Transaction
+            The transaction.
+        """
+        return Transaction(
+            date_local=self.date_local,
+            pocket=self.pocket,
+            category=self.category,
+            currency=self.currency,
+            amount=self.amount,
+            description=self.description,
+            notes=self.notes,
+            merchant=self.merchant,
+            account_last4=self.account_last4,
+            auth_code=self.auth_code,
+        )
+
+    def with_category(self, category: str) -> "TransactionRecord":
+        """
+        Copy the record with another category.
+
+        Parameters
+        ----------
+        category : str
+            The new category.
+
+        Returns
+        -------
+        TransactionRecord
+            The copy.
+        """
+        return TransactionRecord(
+            date_local=self.date_local,
+            pocket=self.pocket,
+            category=category,
+            currency=self.currency,
+            amount=self.amount,
+            description=self.description,
+            notes=self.notes,
+            merchant=self.merchant,
+            account_last4=self.account_last4,
+            auth_code=self.auth_code,
+        )
+
+
 class EmailPayload(BaseModel):
     """Represents the payload of an email to be processed."""
 
     subject: str = Field(description="The subject of the email")
-    sender: EmailStr = Field(
-        description="The sender of the email", examples=["nreply@bank.com"]
+    sender: str = Field(
+        description="The sender of the email",
+        examples=["nreply@bank.com"],
+        json_schema_extra={"format": "email"},
     )
     html: str | None = Field(default=None, description="The HTML content of the email")
     received_at: datetime | None = Field(
         default=None, description="The timestamp when the email was received"
     )
+    message_id: str | None = Field(
+        default=None,
+        description="The Message-ID header of the email. Used as idempotency key "
+        "when the request has no Idempotency-Key header",
+        examples=["<CAF=abc123@mail.gmail.com>"],
+    )
+
+    @field_validator("sender", mode="after")
+    @classmethod
+    def validate_sender(cls, value: str) -> str:
+        """
+        Validate the sender address.
+
+        The address is validated with the ``SENDER_VALIDATION`` mode (see
+        `normalize_sender`): email-validator with ``full``, a syntax check with
+        ``fast``.
+
+        Parameters
+        ----------
+        value : str
+            The sender address.
+
+        Returns
+        -------
+        str
+            The normalized address.
+
+        Raises
+        ------
+        ValueError
+            If the address is not valid.
+        """  # noqa: DOC502
+        return normalize_sender(value, settings.SENDER_VALIDATION)
 
     @field_validator("received_at", mode="after")
     @classmethod
@@ -91,8 +304,7 @@ class EmailPayload(BaseModel):
             value = value.replace(tzinfo=UTC)
 
         # Convert to default timezone
-        default_tz = tz.gettz(settings.DEFAULT_TZ)
-        return value.astimezone(default_tz)
+        return value.astimezone(get_timezone(settings.DEFAULT_TZ))
 
     # TODO @juandaherrera: define if this should be here
     def get_soup(self) -> BeautifulSoup:
@@ -104,11 +316,57 @@ class EmailPayload(BaseModel):
         parsed content. If the `html` attribute is None or empty, an empty string
         is parsed and cleaned.
 
+        Oversized inline data URIs are stripped before parsing, and the HTML is
+        rejected without being parsed when it exceeds the configured size
+        (`MAX_HTML_SIZE`) or estimated node count (`MAX_HTML_NODES`).
+
         Returns
         -------
         BeautifulSoup
             The cleaned HTML content as a string.
+
+        Raises
+        ------
+        EmailRejectedError
+            If the HTML exceeds the configured size or node limits.
         """
-        soup = BeautifulSoup(self.html or "", "lxml")
+        html = strip_data_uris(self.html or "", settings.MAX_DATA_URI_SIZE)
+        if len(html) > settings.MAX_HTML_SIZE:
+            raise EmailRejectedError(
+                f"HTML size {len(html)} exceeds limit of {settings.MAX_HTML_SIZE}"
+            )
+        node_count = estimate_node_count(html)
+        if node_count > settings.MAX_HTML_NODES:
+            raise EmailRejectedError(
+                f"HTML node count {node_count} exceeds limit of "
+                f"{settings.MAX_HTML_NODES}"
+            )
+
+        soup = BeautifulSoup(html, "lxml")
         clean_html(soup=soup)
         return soup
+
+    @classmethod
+    def validate_batch_json(
+        cls, documents: list[str]
+    ) -> list["EmailPayload | ValidationError"]:
+        """
+        Validate a batch of JSON payloads, keeping the invalid ones apart.
+
+        Parameters
+        ----------
+        documents : list[str]
+            The JSON documents, e.g. the bodies of queue messages.
+
+        Returns
+        -------
+        list[EmailPayload | ValidationError]
+            The payload of every document, or the error that rejected it.
+        """
+        results: list[EmailPayload | ValidationError] = []
+        for document in documents:
+            try:
+                results.append(cls.model_validate_json(document))
+            except ValidationError as e:
+                results.append(e)
+        return results
@@ -0,0 +1,21 @@
+"""
+Queues package.
+
+Decouples the HTTP ingest from the sinks: emails are enqueued and a worker
+drains them in batches. Backed by Azure Storage Queue, or by a local SQLite
+database for development and tests.
+"""
+
+from shared_code.finmail.queues.azure import AzureStorageQueue
+from shared_code.finmail.queues.base import MessageQueue, QueueMessage
+from shared_code.finmail.queues.sqlite import SQLiteQueue
+from shared_code.finmail.queues.worker import DrainStats, drain_queue
+
+__all__ = [
+    "AzureStorageQueue",
+    "DrainStats",
+    "MessageQueue",
+    "QueueMessage",
+    "SQLiteQueue",
+    "drain_queue",
+]
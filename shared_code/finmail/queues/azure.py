@@ -0,0 +1,228 @@
+"""
+Azure Storage Queue.
+
+Requires the optional ``azure-storage-queue`` dependency (``finmail[queue]``).
+"""
+
+import base64
+import json
+import zlib
+from types import ModuleType
+from typing import TYPE_CHECKING
+
+from shared_code.finmail.queues.base import QueueMessage
+
+if TYPE_CHECKING:
+    from azure.storage.queue import QueueClient
+
+# Azure Storage Queue rejects messages larger than 64 KiB
+MAX_MESSAGE_SIZE = 64 * 1024
+
+
+def _import_azure_queue() -> ModuleType:
+    # Imported on use: azure-storage-queue is optional
+    try:
+        import azure.storage.queue as azure_queue  # noqa: PLC0415
+    except ImportError as e:
+        raise ImportError(
+            "AzureStorageQueue requires azure-storage-queue. "
+            "Install it with 'finmail[queue]'."
+        ) from e
+    return azure_queue
+
+
+def encode_message(body: str) -> str:
+    """
+    Encode a message body for the queue (zlib, then base64).
+
+    Email HTML compresses well; it would rarely fit the size limit otherwise.
+
+    Parameters
+    ----------
+    body : str
+        The message body.
+
+    Returns
+    -------
+    str
+        The encoded content.
+    """
+    return base64.b64encode(zlib.compress(body.encode("utf-8"))).decode("ascii")
+
+
+def decode_message(content: str) -> str:
+    """
+    Decode the content of a queue message, e.g. one read from the poison queue.
+
+    Parameters
+    ----------
+    content : str
+        The message content.
+
+    Returns
+    -------
+    str
+        The message body, or `content` itself if it was not encoded with
+        `encode_message`.
+    """
+    try:
+        return zlib.decompress(base64.b64decode(content)).decode("utf-8")
+    except (ValueError, zlib.error):
+        # Not written by `enqueue`; returned as is, to be dead-lettered
+        return content
+
+
+class AzureStorageQueue:
+    """
+    Ingest queue backed by Azure Storage Queue.
+
+    Bodies are stored compressed. Dead-lettered messages are moved to the
+    ``<queue name>-poison`` queue (the naming used by the Functions runtime),
+    wrapped with the reason and dequeue count.
+    """
+
+    def __init__(
+        self,
+        connection_string: str,
+        queue_name: str,
+        visibility_timeout: float = 300.0,
+        queue_client: "QueueClient | None" = None,
+        poison_queue_client: "QueueClient | None" = None,
+    ) -> None:
+        """
+        Connect to the queue and its poison queue, creating them if missing.
+
+        Parameters
+        ----------
+        connection_string : str
+            The storage account connection string.
+        queue_name : str
+            The queue name.
+        visibility_timeout : float, optional
+            Seconds a received message stays hidden. Default is 300.
+        queue_client : QueueClient | None, optional
+            The client of the queue. If None, it is created from the connection
+            string.
+        poison_queue_client : QueueClient | None, optional
+            The client of the poison queue. If None, it is created from the
+            connection string.
+
+        Raises
+        ------
+        ImportError
+            If azure-storage-queue is not installed.
+        """  # noqa: DOC502
+        self.visibility_timeout = visibility_timeout
+        if queue_client is None or poison_queue_client is None:
+            client_class = _import_azure_queue().QueueClient
+            queue_client = queue_client or client_class.from_connection_string(
+                connection_string, queue_name
+            )
+            poison_queue_client = (
+                poison_queue_client
+                or client_class.from_connection_string(
+                    connection_string, f"{queue_name}-poison"
+                )
+            )
+            for client in (queue_client, poison_queue_client):
+                self._create_if_missing(client)
+        self._client = queue_client
+        self._poison_client = poison_queue_client
+
+    @staticmethod
+    def _create_if_missing(client: "QueueClient") -> None:
+        from azure.core.exceptions import ResourceExistsError  # noqa: PLC0415
+
+        try:
+            client.create_queue()
+        except ResourceExistsError:
+            pass
+
+    def enqueue(self, body: str) -> str:
+        """
+        Add a message to the queue.
+
+        Parameters
+        ----------
+        body : str
+            The message body.
+
+        Returns
+        -------
+        str
+            The message ID.
+
+        Raises
+        ------
+        ValueError
+            If the compressed body exceeds the 64 KiB message limit.
+        """
+        content = encode_message(body)
+        if len(content) > MAX_MESSAGE_SIZE:
+            raise ValueError(
+                f"Message of {len(content)} bytes exceeds the queue limit of "
+                f"{MAX_MESSAGE_SIZE} bytes"
+            )
+        return self._client.send_message(content).id
+
+    def receive(self, max_messages: int) -> list[QueueMessage]:
+        """
+        Lease up to `max_messages` visible messages.
+
+        Parameters
+        ----------
+        max_messages : int
+            Maximum number of messages to receive (at most 32 per request).
+
+        Returns
+        -------
+        list[QueueMessage]
+            The received messages. Empty if the queue is empty.
+        """
+        return [
+            QueueMessage(
+                id=message.id,
+                body=decode_message(message.content),
+                dequeue_count=message.dequeue_count,
+                receipt=message.pop_receipt,
+            )
+            for message in self._client.receive_messages(
+                max_messages=max_messages,
+                messages_per_page=min(max_messages, 32),
+                visibility_timeout=int(self.visibility_timeout),
+            )
+        ]
+
+    def delete(self, message: QueueMessage) -> None:
+        """
+        Delete a processed message.
+
+        Parameters
+        ----------
+        message : QueueMessage
+            A message returned by `receive`.
+        """
+        self._client.delete_message(message.id, message.receipt)
+
+    def dead_letter(self, message: QueueMessage, reason: str) -> None:
+        """
+        Move a message to the poison queue.
+
+        Parameters
+        ----------
+        message : QueueMessage
+            A message returned by `receive`.
+        reason : str
+            Why the message was dead-lettered.
+        """
+        self._poison_client.send_message(
+            encode_message(
+                json.dumps({
+                    "id": message.id,
+                    "reason": reason,
+                    "dequeue_count": message.dequeue_count,
+                    "body": message.body,
+                })
+            )
+        )
+        self.delete(message)
@@ -0,0 +1,87 @@
+"""
+Queue protocols.
+
+The HTTP ingest can enqueue emails and return immediately; a worker drains the
+queue in batches. Messages that keep failing are moved to a dead-letter store.
+"""
+
+from dataclasses import dataclass
+from typing import Protocol
+
+
+@dataclass(slots=True, frozen=True)
+class QueueMessage:
+    """A message leased from a queue."""
+
+    id: str
+    body: str
+    # Times the message was received, including this one
+    dequeue_count: int
+    # Lease token required to delete the message (the Azure pop receipt)
+    receipt: str
+
+
+class MessageQueue(Protocol):
+    """
+    Protocol for ingest queues.
+
+    A received message is hidden from other consumers for a visibility timeout.
+    If it is not deleted before the timeout expires, it becomes visible again
+    and is received once more with a higher `dequeue_count`.
+    """
+
+    def enqueue(self, body: str) -> str:
+        """
+        Add a message to the queue.
+
+        Parameters
+        ----------
+        body : str
+            The message body.
+
+        Returns
+        -------
+        str
+            The message ID.
+        """
+        ...
+
+    def receive(self, max_messages: int) -> list[QueueMessage]:
+        """
+        Lease up to `max_messages` visible messages.
+
+        Parameters
+        ----------
+        max_messages : int
+            Maximum number of messages to receive.
+
+        Returns
+        -------
+        list[QueueMessage]
+            The received messages, oldest first. Empty if the queue is empty.
+        """
+        ...
+
+    def delete(self, message: QueueMessage) -> None:
+        """
+        Delete a processed message.
+
+        Parameters
+        ----------
+        message : QueueMessage
+            A message returned by `receive`.
+        """
+        ...
+
+    def dead_letter(self, message: QueueMessage, reason: str) -> None:
+        """
+        Move a message that cannot be processed to the dead-letter store.
+
+        Parameters
+        ----------
+        message : QueueMessage
+            A message returned by `receive`.
+        reason : str
+            Why the message was dead-lettered.
+        """
+        ...
@@ -0,0 +1,171 @@
+"""SQLite queue, a local stand-in for Azure Storage Queue."""
+
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+
+from shared_code.finmail.queues.base import QueueMessage
+
+
+class SQLiteQueue:
+    """
+    Ingest queue stored in a local SQLite database.
+
+    Messages are leased with a visibility timeout, like Azure Storage Queue,
+    and dead-lettered messages are kept in a ``dead_letters`` table. Receiving
+    runs in an immediate transaction, so several processes can share the file.
+    """
+
+    def __init__(self, path: str | Path, visibility_timeout: float = 300.0) -> None:
+        """
+        Open (or create) the queue database.
+
+        Parameters
+        ----------
+        path : str | Path
+            The database file.
+        visibility_timeout : float, optional
+            Seconds a received message stays hidden. Default is 300.
+        """
+        self.path = Path(path)
+        self.visibility_timeout = visibility_timeout
+        self._lock = threading.Lock()
+        # Autocommit mode: transactions are explicit
+        self._connection = sqlite3.connect(
+            self.path, check_same_thread=False, isolation_level=None
+        )
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS messages ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, body TEXT NOT NULL, "
+            "visible_at REAL NOT NULL, dequeue_count INTEGER NOT NULL DEFAULT 0, "
+            "receipt TEXT)"
+        )
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS dead_letters ("
+            "id INTEGER PRIMARY KEY, body TEXT NOT NULL, reason TEXT NOT NULL, "
+            "dequeue_count INTEGER NOT NULL, failed_at REAL NOT NULL)"
+        )
+
+    def enqueue(self, body: str) -> str:
+        """
+        Add a message to the queue.
+
+        Parameters
+        ----------
+        body : str
+            The message body.
+
+        Returns
+        -------
+        str
+            The message ID.
+        """
+        with self._lock:
+            cursor = self._connection.execute(
+                "INSERT INTO messages (body, visible_at) VALUES (?, ?)",
+                (body, time.time()),
+            )
+        return str(cursor.lastrowid)
+
+    def receive(self, max_messages: int) -> list[QueueMessage]:
+        """
+        Lease up to `max_messages` visible messages.
+
+        Parameters
+        ----------
+        max_messages : int
+            Maximum number of messages to receive.
+
+        Returns
+        -------
+        list[QueueMessage]
+            The received messages, oldest first. Empty if the queue is empty.
+        """
+        now = time.time()
+        visible_at = now + self.visibility_timeout
+        with self._lock:
+            self._connection.execute("BEGIN IMMEDIATE")
+            try:
+                rows = self._connection.execute(
+                    "SELECT id, body, dequeue_count FROM messages "
+                    "WHERE visible_at <= ? ORDER BY id LIMIT ?",
+                    (now, max_messages),
+                ).fetchall()
+                messages = [
+                    QueueMessage(
+                        id=str(id_),
+                        body=body,
+                        dequeue_count=dequeue_count + 1,
+                        receipt=uuid.uuid4().hex,
+                    )
+                    for id_, body, dequeue_count in rows
+                ]
+                self._connection.executemany(
+                    "UPDATE messages SET visible_at = ?, dequeue_count = ?, "
+                    "receipt = ? WHERE id = ?",
+                    [(visible_at, m.dequeue_count, m.receipt, m.id) for m in messages],
+                )
+            except BaseException:
+                self._connection.execute("ROLLBACK")
+                raise
+            self._connection.execute("COMMIT")
+        return messages
+
+    def delete(self, message: QueueMessage) -> None:
+        """
+        Delete a processed message.
+
+        Nothing is deleted if the lease expired and the message was received
+        again meanwhile.
+
+        Parameters
+        ----------
+        message : QueueMessage
+            A message returned by `receive`.
+        """
+        with self._lock:
+            self._connection.execute(
+                "DELETE FROM messages WHERE id = ? AND receipt = ?",
+                (message.id, message.receipt),
+            )
+
+    def dead_letter(self, message: QueueMessage, reason: str) -> None:
+        """
+        Move a message to the ``dead_letters`` table.
+
+        Parameters
+        ----------
+        message : QueueMessage
+            A message returned by `receive`.
+        reason : str
+            Why the message was dead-lettered.
+        """
+        with self._lock:
+            self._connection.execute("BEGIN IMMEDIATE")
+            try:
+                self._connection.execute(
+                    "INSERT OR REPLACE INTO dead_letters "
+                    "(id, body, reason, dequeue_count, failed_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (
+                        message.id,
+                        message.body,
+                        reason,
+                        message.dequeue_count,
+                        time.time(),
+                    ),
+                )
+                self._connection.execute(
+                    "DELETE FROM messages WHERE id = ?", (message.id,)
+                )
+            except BaseException:
+                self._connection.execute("ROLLBACK")
+                raise
+            self._connection.execute("COMMIT")
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self._connection.close()
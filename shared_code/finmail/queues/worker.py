@@ -0,0 +1,177 @@
+"""
+Queue worker.
+
+Drains the ingest queue in batches: every batch is parsed, deduplicated,
+classified and written with a single sink call (see `process_emails`).
+Processed and rejected emails are deleted; emails that fail are left in the
+queue to be retried after the visibility timeout, and moved to the
+dead-letter store once they reach the maximum dequeue count.
+"""
+
+import logging
+import time
+from dataclasses import dataclass, field
+
+from shared_code.finmail.domain.classification import TransactionClassifier
+from shared_code.finmail.domain.dedup import DedupIndex
+from shared_code.finmail.domain.ingest import process_emails
+from shared_code.finmail.models import EmailPayload
+from shared_code.finmail.queues.base import MessageQueue, QueueMessage
+from shared_code.finmail.sinks import TransactionSink
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class DrainStats:
+    """Counters of a queue drain."""
+
+    received: int = 0
+    written: int = 0
+    rejected: int = 0
+    retried: int = 0
+    dead_lettered: int = 0
+    started_at: float = field(default_factory=time.monotonic)
+
+    @property
+    def elapsed(self) -> float:
+        """Seconds since the drain started."""
+        return time.monotonic() - self.started_at
+
+
+def _retry_or_dead_letter(
+    queue: MessageQueue,
+    message: QueueMessage,
+    error: str,
+    max_dequeue_count: int,
+    stats: DrainStats,
+) -> None:
+    if message.dequeue_count >= max_dequeue_count:
+        logger.warning(
+            "Dead-lettering message %s after %d attempts: %s",
+            message.id,
+            message.dequeue_count,
+            error,
+        )
+        queue.dead_letter(message, error)
+        stats.dead_lettered += 1
+    else:
+        # Not deleted: received again once its visibility timeout expires
+        stats.retried += 1
+
+
+def _drain_batch(  # noqa: PLR0913
+    queue: MessageQueue,
+    messages: list[QueueMessage],
+    stats: DrainStats,
+    *,
+    sink: TransactionSink,
+    classifier: TransactionClassifier | None,
+    dedup_index: DedupIndex | None,
+    max_dequeue_count: int,
+) -> bool:
+    payloads, valid = [], []
+    validated = EmailPayload.validate_batch_json([m.body for m in messages])
+    for message, payload in zip(messages, validated, strict=True):
+        if isinstance(payload, EmailPayload):
+            payloads.append(payload)
+            valid.append(message)
+        else:
+            # Retrying cannot fix an invalid payload
+            queue.dead_letter(message, f"Invalid payload: {payload}")
+            stats.dead_lettered += 1
+    if not payloads:
+        return True
+
+    try:
+        outcomes = process_emails(
+            payloads, sink=sink, classifier=classifier, dedup_index=dedup_index
+        )
+    except Exception as e:
+        logger.warning(
+            "Failed to write batch of %d emails", len(payloads), exc_info=True
+        )
+        for message in valid:
+            _retry_or_dead_letter(
+                queue, message, f"{type(e).__name__}: {e}", max_dequeue_count, stats
+            )
+        return False
+
+    for message, outcome in zip(valid, outcomes, strict=True):
+        if outcome.error is not None:
+            _retry_or_dead_letter(
+                queue, message, outcome.error, max_dequeue_count, stats
+            )
+            continue
+        queue.delete(message)
+        if outcome.transaction is not None:
+            stats.written += 1
+        else:
+            stats.rejected += 1
+    return True
+
+
+def drain_queue(  # noqa: PLR0913
+    queue: MessageQueue,
+    sink: TransactionSink,
+    *,
+    classifier: TransactionClassifier | None = None,
+    dedup_index: DedupIndex | None = None,
+    batch_size: int = 32,
+    max_batches: int = 10,
+    max_dequeue_count: int = 5,
+) -> DrainStats:
+    """
+    Process the queued emails in batches until the queue is empty.
+
+    Parameters
+    ----------
+    queue : MessageQueue
+        The queue to drain.
+    sink : TransactionSink
+        Receives each batch of transactions.
+    classifier : TransactionClassifier | None, optional
+        Classifies each batch before writing it, if provided.
+    dedup_index : DedupIndex | None, optional
+        Rejects transactions already written.
+    batch_size : int, optional
+        Messages received and processed together. Default is 32.
+    max_batches : int, optional
+        Maximum batches per call, to bound its duration. Default is 10.
+    max_dequeue_count : int, optional
+        Attempts before a failing message is dead-lettered. Default is 5.
+
+    Returns
+    -------
+    DrainStats
+        The counters of the drain.
+    """
+    stats = DrainStats()
+    for _ in range(max_batches):
+        messages = queue.receive(batch_size)
+        if not messages:
+            break
+        stats.received += len(messages)
+        if not _drain_batch(
+            queue,
+            messages,
+            stats,
+            sink=sink,
+            classifier=classifier,
+            dedup_index=dedup_index,
+            max_dequeue_count=max_dequeue_count,
+        ):
+            # The sink is failing; the rest of the queue would fail too
+            break
+
+    logger.info(
+        "Queue drain: %d received, %d written, %d rejected, %d retried, "
+        "%d dead-lettered in %.1fs",
+        stats.received,
+        stats.written,
+        stats.rejected,
+        stats.retried,
+        stats.dead_lettered,
+        stats.elapsed,
+    )
+    return stats
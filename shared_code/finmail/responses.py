@@ -0,0 +1,268 @@
+"""
+HTTP requests and responses of the ingest functions.
+
+Shared by the sync and async entry points, so both read payloads, answer with
+the same bodies and replay idempotent responses the same way.
+"""
+
+import azure.functions as func
+from pydantic import ValidationError
+
+from shared_code.finmail.domain.ingest import IngestResult
+from shared_code.finmail.models import EmailPayload
+from shared_code.finmail.sinks import SinkResult
+from shared_code.finmail.utils.cache import TTLCache
+from shared_code.finmail.utils.serialization import dumps, loads
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+# Seconds a client should wait before retrying an email in progress
+RETRY_AFTER_S = 5
+
+
+def read_payload(req: func.HttpRequest) -> EmailPayload | func.HttpResponse:
+    """
+    Read the email of an ingest request.
+
+    Parameters
+    ----------
+    req : func.HttpRequest
+        The request, with the JSON payload as its body.
+
+    Returns
+    -------
+    EmailPayload | func.HttpResponse
+        The validated email, or a 400 response if the body is not valid JSON
+        and a 422 response if it is not a valid payload.
+    """
+    try:
+        data = loads(req.get_body())
+    except ValueError:
+        return func.HttpResponse("Bad JSON", status_code=400)
+    try:
+        return EmailPayload.model_validate(data)
+    except ValidationError as e:
+        return func.HttpResponse(f"Validation error: {e}", status_code=422)
+
+
+def dump_sink_results(results: list[SinkResult]) -> list[dict]:
+    """
+    Serialize per-sink results for a response body.
+
+    Parameters
+    ----------
+    results : list[SinkResult]
+        The results to serialize.
+
+    Returns
+    -------
+    list[dict]
+        The name, outcome, elapsed milliseconds and error of each sink.
+    """
+    return [
+        {
+            "name": r.name,
+            "ok": r.ok,
+            "elapsed_ms": round(r.elapsed_s * 1000, 1),
+            "error": r.error,
+        }
+        for r in results
+    ]
+
+
+def build_response(
+    result: IngestResult | None,
+    payload: EmailPayload,
+    rejected: str | None = None,
+    timings: dict[str, float] | None = None,
+) -> func.HttpResponse:
+    """
+    Build the response of a processed email.
+
+    Parameters
+    ----------
+    result : IngestResult | None
+        The processing result, or None if nothing was stored.
+    payload : EmailPayload
+        The incoming email.
+    rejected : str | None, optional
+        The reason the email was rejected, if it was.
+    timings : dict[str, float] | None, optional
+        Stage timings in milliseconds, added to the body if provided.
+
+    Returns
+    -------
+    func.HttpResponse
+        A 200 JSON response.
+    """
+    if result:
+        body = {
+            "ok": True,
+            "subject": payload.subject,
+            "processed": result.transaction,
+            "sinks": dump_sink_results(result.sink_results),
+        }
+    else:
+        body = {"ok": False, "subject": payload.subject, "processed": None}
+        if rejected:
+            body["rejected"] = rejected
+    if timings is not None:
+        body["timings"] = timings
+    return func.HttpResponse(
+        dumps(body),
+        mimetype="application/json",
+        status_code=200,
+    )
+
+
+def build_queued_response(payload: EmailPayload, message_id: str) -> func.HttpResponse:
+    """
+    Build the response of an email queued for processing.
+
+    Parameters
+    ----------
+    payload : EmailPayload
+        The incoming email.
+    message_id : str
+        The ID of the queue message.
+
+    Returns
+    -------
+    func.HttpResponse
+        A 202 JSON response.
+    """
+    return func.HttpResponse(
+        dumps({
+            "ok": True,
+            "subject": payload.subject,
+            "processed": None,
+            "queued": message_id,
+        }),
+        mimetype="application/json",
+        status_code=202,
+    )
+
+
+def build_sink_error_response(
+    payload: EmailPayload,
+    results: list[SinkResult],
+    timings: dict[str, float] | None = None,
+) -> func.HttpResponse:
+    """
+    Build the response of an email a required sink could not store.
+
+    Parameters
+    ----------
+    payload : EmailPayload
+        The incoming email.
+    results : list[SinkResult]
+        The result of every sink.
+    timings : dict[str, float] | None, optional
+        Stage timings in milliseconds, added to the body if provided.
+
+    Returns
+    -------
+    func.HttpResponse
+        A 502 JSON response, so the client retries.
+    """
+    body = {
+        "ok": False,
+        "subject": payload.subject,
+        "processed": None,
+        "sinks": dump_sink_results(results),
+    }
+    if timings is not None:
+        body["timings"] = timings
+    return func.HttpResponse(
+        dumps(body),
+        mimetype="application/json",
+        status_code=502,
+    )
+
+
+def build_in_progress_response(
+    payload: EmailPayload,
+    reason: str,
+    timings: dict[str, float] | None = None,
+) -> func.HttpResponse:
+    """
+    Build the response of an email whose transaction another request is writing.
+
+    Parameters
+    ----------
+    payload : EmailPayload
+        The incoming email.
+    reason : str
+        Why the email was not processed, reported in the ``retry`` field.
+    timings : dict[str, float] | None, optional
+        Stage timings in milliseconds, added to the body if provided.
+
+    Returns
+    -------
+    func.HttpResponse
+        A 503 JSON response with a ``Retry-After`` header: retrying once the
+        other request is done either writes the transaction or reports it as a
+        duplicate.
+    """
+    body = {"ok": False, "subject": payload.subject, "processed": None, "retry": reason}
+    if timings is not None:
+        body["timings"] = timings
+    return func.HttpResponse(
+        dumps(body),
+        mimetype="application/json",
+        status_code=503,
+        headers={"Retry-After": str(RETRY_AFTER_S)},
+    )
+
+
+def get_replayed_response(
+    cache: TTLCache[str, tuple[int, str]], idempotency_key: str | None
+) -> func.HttpResponse | None:
+    """
+    Get the cached response of an idempotency key.
+
+    Parameters
+    ----------
+    cache : TTLCache[str, tuple[int, str]]
+        The response cache.
+    idempotency_key : str | None
+        The key of the request, if any.
+
+    Returns
+    -------
+    func.HttpResponse | None
+        The cached response, marked as replayed, or None if not cached.
+    """
+    cached = cache.get(idempotency_key) if idempotency_key else None
+    if cached is None:
+        return None
+    status_code, body = cached
+    return func.HttpResponse(
+        body,
+        mimetype="application/json",
+        status_code=status_code,
+        headers={REPLAYED_HEADER: "true"},
+    )
+
+
+def cache_response(
+    cache: TTLCache[str, tuple[int, str]],
+    idempotency_key: str | None,
+    response: func.HttpResponse,
+) -> None:
+    """
+    Cache a response for replay, unless it is a server error.
+
+    Server errors are not cached: the client should retry them.
+
+    Parameters
+    ----------
+    cache : TTLCache[str, tuple[int, str]]
+        The response cache.
+    idempotency_key : str | None
+        The key of the request. Nothing is cached if None.
+    response : func.HttpResponse
+        The response to cache.
+    """
+    if idempotency_key and response.status_code < 500:  # noqa: PLR2004
+        cache.set(idempotency_key, (response.status_code, response.get_body().decode()))
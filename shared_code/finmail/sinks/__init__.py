@@ -0,0 +1,82 @@
+"""
+Sinks package.
+
+Destinations for parsed transactions: Google Sheets, a local SQLite database
+and local files (JSON Lines, CSV, Parquet).
+"""
+
+from pathlib import Path
+
+from shared_code.finmail.sinks.base import (
+    AsyncTransactionSink,
+    ResumableSink,
+    TransactionSink,
+)
+from shared_code.finmail.sinks.files import CsvSink, JsonLinesSink, ParquetSink
+from shared_code.finmail.sinks.google_sheets import (
+    AsyncGoogleSheetsSink,
+    GoogleSheetsSink,
+)
+from shared_code.finmail.sinks.multi import MultiSink, SinkResult
+from shared_code.finmail.sinks.sqlite import SQLiteSink
+
+LOCAL_SINKS: dict[str, type[TransactionSink]] = {
+    "csv": CsvSink,
+    "jsonl": JsonLinesSink,
+    "parquet": ParquetSink,
+    "sqlite": SQLiteSink,
+}
+
+_SUFFIXES = {
+    ".csv": "csv",
+    ".db": "sqlite",
+    ".jsonl": "jsonl",
+    ".parquet": "parquet",
+    ".sqlite": "sqlite",
+}
+
+
+def build_local_sink(path: str | Path, kind: str | None = None) -> TransactionSink:
+    """
+    Build a local sink.
+
+    Parameters
+    ----------
+    path : str | Path
+        The file (or, for Parquet, directory) to write to.
+    kind : str | None, optional
+        One of `LOCAL_SINKS`. If None, it is inferred from the suffix of `path`
+        (``.csv``, ``.db``/``.sqlite``, ``.parquet``), defaulting to JSON Lines.
+
+    Returns
+    -------
+    TransactionSink
+        The sink.
+
+    Raises
+    ------
+    ValueError
+        If `kind` is not a local sink.
+    """
+    if kind is None:
+        kind = _SUFFIXES.get(Path(path).suffix.lower(), "jsonl")
+    if kind not in LOCAL_SINKS:
+        raise ValueError(f"Unknown sink {kind!r}. Expected one of {list(LOCAL_SINKS)}")
+    return LOCAL_SINKS[kind](path)
+
+
+__all__ = [
+    "LOCAL_SINKS",
+    "AsyncGoogleSheetsSink",
+    "AsyncTransactionSink",
+    "CsvSink",
+    "GoogleSheetsSink",
+    "JsonLinesSink",
+    "MultiSink",
+    "ParquetSink",
+    "ResumableSink",
+    "SQLiteSink",
+    "SinkResult",
+    "TransactionSink",
+    "build_local_sink",
+]
@@ -0,0 +1,88 @@
+"""
+Sink protocols.
+
+A sink stores batches of transactions (Google Sheets, a local database, files).
+The HTTP ingest writes single-transaction batches; the backfill writes large
+ones.
+"""
+
+from typing import Protocol
+
+from shared_code.finmail.models import Transaction
+
+
+class TransactionSink(Protocol):
+    """
+    Protocol for transaction sinks.
+
+    This protocol enables dependency injection and allows switching between
+    destinations (e.g., Google Sheets for production, SQLite for high-volume
+    ingest or benchmarks without network).
+    """
+
+    def write(self, transactions: list[Transaction]) -> None:
+        """
+        Write a batch of transactions.
+
+        Parameters
+        ----------
+        transactions : list[Transaction]
+            The transactions to write, in order.
+        """
+        ...
+
+
+class AsyncTransactionSink(Protocol):
+    """
+    Protocol for sinks writing through async I/O.
+
+    Used by the async ingest, where waiting on the destination should not hold
+    a worker thread.
+    """
+
+    async def write(self, transactions: list[Transaction]) -> None:
+        """
+        Write a batch of transactions.
+
+        Parameters
+        ----------
+        transactions : list[Transaction]
+            The transactions to write, in order.
+        """
+        ...
+
+
+class ResumableSink(TransactionSink, Protocol):
+    """
+    Sink that can tell how much of an interrupted batch was persisted.
+
+    Used by checkpointed backfills to re-send only the missing part of a batch
+    after a crash, instead of duplicating rows.
+    """
+
+    def position(self) -> int:
+        """
+        Get the current position of the output (rows, bytes, ...).
+
+        Returns
+        -------
+        int
+            An opaque position to pass to `written_since`.
+        """
+        ...
+
+    def written_since(self, position: int) -> int:
+        """
+        Count the transactions fully written after `position`.
+
+        Parameters
+        ----------
+        position : int
+            A value previously returned by `position`.
+
+        Returns
+        -------
+        int
+            The number of transactions written since then.
+        """
+        ...
@@ -0,0 +1,293 @@
+"""Local file sinks (JSON Lines, CSV and Parquet)."""
+
+import csv
+import io
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections.abc import Iterable
+from pathlib import Path
+from types import ModuleType
+from typing import TYPE_CHECKING
+
+from shared_code.finmail.mappers import LEDGER_COLUMNS, transaction_to_row
+from shared_code.finmail.models import Transaction
+
+if TYPE_CHECKING:
+    from shared_code.finmail.batch import TransactionBatch
+
+
+def _import_pyarrow() -> tuple[ModuleType, ModuleType]:
+    # Imported on use: pyarrow is optional and slow to import
+    try:
+        import pyarrow as pa  # noqa: PLC0415
+        import pyarrow.parquet as pq  # noqa: PLC0415
+    except ImportError as e:
+        raise ImportError(
+            "ParquetSink requires pyarrow. Install it with 'finmail[parquet]'."
+        ) from e
+    return pa, pq
+
+
+class _AppendFileSink(ABC):
+    """Base class of the sinks appending one record per line to a text file."""
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    @abstractmethod
+    def _format(transactions: list[Transaction]) -> str:
+        """Format transactions as the lines to append."""
+        ...
+
+    @staticmethod
+    def _count_records(text: str) -> int:
+        return text.count("\n")
+
+    def write(self, transactions: list[Transaction]) -> None:
+        """
+        Append a batch of transactions with a single write.
+
+        Parameters
+        ----------
+        transactions : list[Transaction]
+            The transactions to write, in order.
+        """
+        self._append(self._format(transactions))
+
+    def _append(self, content: str) -> None:
+        with self._lock, self.path.open("a", encoding="utf-8", newline="") as file:
+            file.write(content)
+
+    def position(self) -> int:
+        """
+        Get the current size of the file.
+
+        Returns
+        -------
+        int
+            The size in bytes (0 if the file does not exist yet).
+        """
+        return self.path.stat().st_size if self.path.exists() else 0
+
+    def written_since(self, position: int) -> int:
+        """
+        Count the complete records written after `position`.
+
+        A trailing partial line (from a write interrupted midway) is truncated,
+        so the missing transactions can be appended cleanly.
+
+        Parameters
+        ----------
+        position : int
+            A size previously returned by `position`.
+
+        Returns
+        -------
+        int
+            The number of complete records after `position`.
+        """
+        if not self.path.exists():
+            return 0
+        with self._lock, self.path.open("rb+") as file:
+            file.seek(position)
+            tail = file.read()
+            complete = tail.rfind(b"\n") + 1
+            if complete < len(tail):
+                file.truncate(position + complete)
+        return self._count_records(tail[:complete].decode("utf-8"))
+
+
+class JsonLinesSink(_AppendFileSink):
+    """Append transactions to a JSON Lines file, one JSON document per line."""
+
+    def __init__(self, path: str | Path) -> None:
+        """
+        Initialize the sink.
+
+        Parameters
+        ----------
+        path : str | Path
+            The file to append to. It is created if missing.
+        """
+        super().__init__(path)
+
+    @staticmethod
+    def _format(transactions: list[Transaction]) -> str:
+        return "".join(f"{t.model_dump_json()}\n" for t in transactions)
+
+
+class CsvSink(_AppendFileSink):
+    """Append transactions to a CSV file with every transaction field."""
+
+    def __init__(self, path: str | Path) -> None:
+        """
+        Initialize the sink, writing the header if the file is new.
+
+        Parameters
+        ----------
+        path : str | Path
+            The file to append to. It is created if missing.
+        """
+        super().__init__(path)
+        if self.position() == 0:
+            with self.path.open("w", encoding="utf-8", newline="") as file:
+                csv.writer(file, lineterminator="\n").writerow(LEDGER_COLUMNS)
+
+    @staticmethod
+    def _format(transactions: list[Transaction]) -> str:
+        return CsvSink._format_rows(
+            transaction_to_row(t, columns=LEDGER_COLUMNS, date_format=None)
+            for t in transactions
+        )
+
+    @staticmethod
+    def _format_rows(rows: Iterable[list]) -> str:
+        buffer = io.StringIO()
+        csv.writer(buffer, lineterminator="\n").writerows(rows)
+        return buffer.getvalue()
+
+    def write_batch(self, batch: "TransactionBatch") -> None:
+        """
+        Append a columnar batch, mapping it to rows column by column.
+
+        Parameters
+        ----------
+        batch : TransactionBatch
+            The transactions to write, in order.
+        """
+        rows = batch.to_rows(LEDGER_COLUMNS, date_format=None)
+        self._append(self._format_rows(rows))
+
+    @staticmethod
+    def _count_records(text: str) -> int:
+        # Quoted values may contain line breaks
+        return sum(1 for _ in csv.reader(io.StringIO(text)))
+
+
+class ParquetSink:
+    """
+    Append transactions to a Parquet dataset directory.
+
+    Parquet files cannot be appended to, so every batch is written as a new
+    part file (atomically, through a temporary file). The directory can be
+    read as a single table with ``pyarrow.parquet.read_table``. `date_local`
+    is stored as a local wall-clock timestamp, as in the worksheet.
+
+    Requires the optional ``pyarrow`` dependency (``finmail[parquet]``).
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        """
+        Initialize the sink, creating the directory if missing.
+
+        Parameters
+        ----------
+        path : str | Path
+            The dataset directory.
+
+        Raises
+        ------
+        ImportError
+            If pyarrow is not installed.
+        """  # noqa: DOC502
+        pa, pq = _import_pyarrow()
+        self._pa, self._pq = pa, pq
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        types = {"date_local": pa.timestamp("us"), "amount": pa.float64()}
+        self._schema = pa.schema([
+            (column, types.get(column, pa.string())) for column in LEDGER_COLUMNS
+        ])
+
+    def write(self, transactions: list[Transaction]) -> None:
+        """
+        Write a batch of transactions as a new part file.
+
+        Parameters
+        ----------
+        transactions : list[Transaction]
+            The transactions to write, in order.
+        """
+        columns: dict[str, list] = {column: [] for column in LEDGER_COLUMNS}
+        for transaction in transactions:
+            for column in LEDGER_COLUMNS:
+                columns[column].append(getattr(transaction, column))
+        columns["date_local"] = [d.replace(tzinfo=None) for d in columns["date_local"]]
+        self._write_table(self._pa.Table.from_pydict(columns, schema=self._schema))
+
+    def write_batch(self, batch: "TransactionBatch") -> None:
+        """
+        Write a columnar batch as a new part file, converting whole columns.
+
+        The wall-clock dates and amounts are passed to Arrow without going
+        through Python objects, and dictionary-encoded columns are decoded by
+        Arrow.
+
+        Parameters
+        ----------
+        batch : TransactionBatch
+            The transactions to write, in order.
+        """
+        pa = self._pa
+        arrays = {
+            "date_local": pa.array(batch.date_local, type=pa.timestamp("us")),
+            "amount": pa.array(batch.amount, type=pa.float64()),
+        }
+        for column in ("pocket", "category", "currency"):
+            encoded = getattr(batch, column)
+            arrays[column] = pa.DictionaryArray.from_arrays(
+                encoded.codes, pa.array(encoded.values, type=pa.string())
+            ).dictionary_decode()
+        for column in LEDGER_COLUMNS:
+            if column not in arrays:
+                arrays[column] = pa.array(getattr(batch, column), type=pa.string())
+        self._write_table(
+            pa.Table.from_arrays(
+                [arrays[column] for column in LEDGER_COLUMNS], schema=self._schema
+            )
+        )
+
+    def _write_table(self, table: object) -> None:
+        with self._lock:
+            name = f"part-{time.time_ns()}.parquet"
+            tmp_path = self.path / f".{name}.tmp"
+            self._pq.write_table(table, tmp_path)
+            os.replace(tmp_path, self.path / name)
+
+    def position(self) -> int:
+        """
+        Get the number of rows in the dataset.
+
+        Returns
+        -------
+        int
+            The total rows of the part files.
+        """
+        return sum(
+            self._pq.ParquetFile(part).metadata.num_rows
+            for part in self.path.glob("part-*.parquet")
+        )
+
+    def written_since(self, position: int) -> int:
+        """
+        Count the rows written after `position`.
+
+        Part files are renamed into place once complete, so a batch is either
+        fully written or not at all.
+
+        Parameters
+        ----------
+        position : int
+            A row count previously returned by `position`.
+
+        Returns
+        -------
+        int
+            The number of rows written since then.
+        """
+        return max(0, self.position() - position)
@@ -0,0 +1,120 @@
+"""Google Sheets sinks."""
+
+from shared_code.finmail.clients import AsyncGoogleSheetsClient, GoogleSheetsClient
+from shared_code.finmail.models import Transaction
+
+
+class GoogleSheetsSink:
+    """Insert transactions into a Google Sheets worksheet."""
+
+    def __init__(
+        self,
+        google_sheets_client: GoogleSheetsClient,
+        spreadsheet_identifier: str,
+        worksheet_name: str | None = None,
+    ) -> None:
+        """
+        Initialize the sink.
+
+        Parameters
+        ----------
+        google_sheets_client : GoogleSheetsClient
+            The client used to insert the rows.
+        spreadsheet_identifier : str
+            The ID or URL of the spreadsheet.
+        worksheet_name : str | None, optional
+            The worksheet to insert into. If None, the first worksheet is used.
+        """
+        self.google_sheets_client = google_sheets_client
+        self.spreadsheet_identifier = spreadsheet_identifier
+        self.worksheet_name = worksheet_name
+
+    def write(self, transactions: list[Transaction]) -> None:
+        """
+        Insert a batch of transactions with a single request.
+
+        Parameters
+        ----------
+        transactions : list[Transaction]
+            The transactions to write, in order.
+        """
+        self.google_sheets_client.insert_transactions(
+            spreadsheet_identifier=self.spreadsheet_identifier,
+            transactions=transactions,
+            worksheet_name=self.worksheet_name,
+        )
+
+    def position(self) -> int:
+        """
+        Get the last filled row of the worksheet.
+
+        Returns
+        -------
+        int
+            The index of the last filled row.
+        """
+        sheet = self.google_sheets_client.open_sheet(
+            self.spreadsheet_identifier, self.worksheet_name
+        )
+        return self.google_sheets_client.get_last_filled_row(sheet)
+
+    def written_since(self, position: int) -> int:
+        """
+        Count the rows added after `position`.
+
+        Rows are inserted with a single request, so a batch is either fully
+        written or not at all. Rows added meanwhile by the HTTP ingest are
+        counted too, so avoid running both against the same worksheet.
+
+        Parameters
+        ----------
+        position : int
+            A row index previously returned by `position`.
+
+        Returns
+        -------
+        int
+            The number of rows added since then.
+        """
+        return max(0, self.position() - position)
+
+
+class AsyncGoogleSheetsSink:
+    """Insert transactions into a Google Sheets worksheet with async requests."""
+
+    def __init__(
+        self,
+        google_sheets_client: AsyncGoogleSheetsClient,
+        spreadsheet_identifier: str,
+        worksheet_name: str | None = None,
+    ) -> None:
+        """
+        Initialize the sink.
+
+        Parameters
+        ----------
+        google_sheets_client : AsyncGoogleSheetsClient
+            The client used to insert the rows.
+        spreadsheet_identifier : str
+            The ID or URL of the spreadsheet.
+        worksheet_name : str | None, optional
+            The worksheet to insert into. If None, the first worksheet is used.
+        """
+        self.google_sheets_client = google_sheets_client
+        self.spreadsheet_identifier = spreadsheet_identifier
+        self.worksheet_name = worksheet_name
+
+    async def write(self, transactions: list[Transaction]) -> None:
+        """
+        Append a batch of transactions with a single request.
+
+        Parameters
+        ----------
+        transactions : list[Transaction]
+            The transactions to write, in order.
+        """
+        await self.google_sheets_client.insert_transactions(
+            spreadsheet_identifier=self.spreadsheet_identifier,
+            transactions=transactions,
+            worksheet_name=self.worksheet_name,
+        )
@@ -0,0 +1,279 @@
+"""Concurrent fan-out to several sinks."""
+
+import asyncio
+import inspect
+import logging
+import time
+from collections.abc import Collection, Mapping
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from dataclasses import dataclass
+
+from shared_code.finmail.exceptions import SinkWriteError
+from shared_code.finmail.models import Transaction
+from shared_code.finmail.sinks.base import AsyncTransactionSink, TransactionSink
+
+logger = logging.getLogger(__name__)
+
+
+def _is_async(sink: TransactionSink | AsyncTransactionSink) -> bool:
+    return inspect.iscoroutinefunction(sink.write)
+
+
+@dataclass(slots=True)
+class SinkResult:
+    """Outcome of writing a batch to one sink."""
+
+    name: str
+    ok: bool
+    elapsed_s: float
+    error: str | None = None
+
+
+class MultiSink:
+    """
+    Write every batch to several sinks concurrently.
+
+    Each sink runs in its own worker thread with its own timeout, and a
+    failing or slow sink does not prevent the others from being written. A
+    sink that times out keeps running in the background (threads cannot be
+    interrupted), but its result is reported as failed.
+
+    With `adispatch`, sinks implementing `AsyncTransactionSink` are awaited on
+    the event loop and the others still run in the worker threads.
+
+    A write succeeds when every required sink wrote the batch. Sinks already
+    written by an earlier, partially failed attempt can be skipped, so a retry
+    only writes the sinks that failed.
+    """
+
+    def __init__(
+        self,
+        sinks: Mapping[str, TransactionSink | AsyncTransactionSink],
+        timeout: float = 10.0,
+        timeouts: Mapping[str, float] | None = None,
+        required: Collection[str] | None = None,
+    ) -> None:
+        """
+        Initialize the dispatcher.
+
+        Parameters
+        ----------
+        sinks : Mapping[str, TransactionSink | AsyncTransactionSink]
+            The sinks to write to, by name. Async sinks require `adispatch`.
+        timeout : float, optional
+            Default timeout of each sink, in seconds. Default is 10.
+        timeouts : Mapping[str, float] | None, optional
+            Timeouts overriding `timeout` for specific sinks, by name.
+        required : Collection[str] | None, optional
+            The sinks that must write every batch, by name. If None, every
+            sink is required. Failures of the others are only reported.
+
+        Raises
+        ------
+        ValueError
+            If a required sink is not one of `sinks`.
+        """
+        unknown = set(required or ()) - set(sinks)
+        if unknown:
+            raise ValueError(f"Unknown required sinks: {sorted(unknown)}")
+        self.sinks = dict(sinks)
+        self.required = frozenset(self.sinks if required is None else required)
+        self.timeouts = {name: (timeouts or {}).get(name, timeout) for name in sinks}
+        # Spare threads so a hung sink does not starve the next requests
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(4, 4 * len(self.sinks)), thread_name_prefix="sink"
+        )
+
+    @staticmethod
+    def _write(sink: TransactionSink, transactions: list[Transaction]) -> float:
+        started_at = time.monotonic()
+        sink.write(transactions)
+        return time.monotonic() - started_at
+
+    @staticmethod
+    def _failed(name: str, started_at: float, error: str) -> SinkResult:
+        return SinkResult(
+            name=name, ok=False, elapsed_s=time.monotonic() - started_at, error=error
+        )
+
+    @staticmethod
+    def _log_failures(results: list[SinkResult]) -> None:
+        for result in results:
+            if not result.ok:
+                logger.warning("Sink %s failed: %s", result.name, result.error)
+
+    def dispatch(
+        self, transactions: list[Transaction], skip: Collection[str] = ()
+    ) -> list[SinkResult]:
+        """
+        Write a batch to every sink and report each outcome.
+
+        Parameters
+        ----------
+        transactions : list[Transaction]
+            The transactions to write, in order.
+        skip : Collection[str], optional
+            Sinks that already wrote the batch, by name. They are reported as
+            written without writing them again.
+
+        Returns
+        -------
+        list[SinkResult]
+            One result per sink, in the order the sinks were given.
+
+        Raises
+        ------
+        TypeError
+            If a sink is async.
+        """
+        async_sinks = [n for n, s in self.sinks.items() if _is_async(s)]
+        if async_sinks:
+            raise TypeError(f"Async sinks {async_sinks} require adispatch")
+
+        started_at = time.monotonic()
+        futures = {
+            name: self._executor.submit(self._write, sink, transactions)
+            for name, sink in self.sinks.items()
+            if name not in skip
+        }
+
+        results = []
+        for name in self.sinks:
+            if name in skip:
+                results.append(SinkResult(name=name, ok=True, elapsed_s=0.0))
+                continue
+            future = futures[name]
+            remaining = started_at + self.timeouts[name] - time.monotonic()
+            try:
+                elapsed = future.result(timeout=max(0.0, remaining))
+                results.append(SinkResult(name=name, ok=True, elapsed_s=elapsed))
+            except FutureTimeoutError:
+                results.append(
+                    self._failed(
+                        name, started_at, f"Timed out after {self.timeouts[name]}s"
+                    )
+                )
+            except Exception as e:
+                results.append(
+                    self._failed(name, started_at, f"{type(e).__name__}: {e}")
+                )
+
+        self._log_failures(results)
+        return results
+
+    async def _awrite_one(
+        self,
+        name: str,
+        sink: TransactionSink | AsyncTransactionSink,
+        transactions: list[Transaction],
+    ) -> SinkResult:
+        started_at = time.monotonic()
+        if _is_async(sink):
+            write = sink.write(transactions)
+        else:
+            write = asyncio.get_running_loop().run_in_executor(
+                self._executor, sink.write, transactions
+            )
+        try:
+            await asyncio.wait_for(write, timeout=self.timeouts[name])
+        except TimeoutError:
+            return self._failed(
+                name, started_at, f"Timed out after {self.timeouts[name]}s"
+            )
+        except Exception as e:
+            return self._failed(name, started_at, f"{type(e).__name__}: {e}")
+        return SinkResult(name=name, ok=True, elapsed_s=time.monotonic() - started_at)
+
+    @staticmethod
+    async def _skipped(name: str) -> SinkResult:
+        return SinkResult(name=name, ok=True, elapsed_s=0.0)
+
+    async def adispatch(
+        self, transactions: list[Transaction], skip: Collection[str] = ()
+    ) -> list[SinkResult]:
+        """
+        Write a batch to every sink without blocking the event loop.
+
+        Async sinks are awaited directly (and cancelled on timeout); the others
+        run in the worker threads.
+
+        Parameters
+        ----------
+        transactions : list[Transaction]
+            The transactions to write, in order.
+        skip : Collection[str], optional
+            Sinks that already wrote the batch, by name, as in `dispatch`.
+
+        Returns
+        -------
+        list[SinkResult]
+            One result per sink, in the order the sinks were given.
+        """
+        results = list(
+            await asyncio.gather(
+                *(
+                    self._skipped(name)
+                    if name in skip
+                    else self._awrite_one(name, sink, transactions)
+                    for name, sink in self.sinks.items()
+                )
+            )
+        )
+        self._log_failures(results)
+        return results
+
+    def check_results(self, results: list[SinkResult]) -> None:
+        """
+        Check that a batch reached every required sink.
+
+        Parameters
+        ----------
+        results : list[SinkResult]
+            The results of `dispatch` or `adispatch`.
+
+        Raises
+        ------
+        SinkWriteError
+            If a required sink failed, or no sink wrote the batch.
+        """
+        if not any(result.ok for result in results) or any(
+            not result.ok and result.name in self.required for result in results
+        ):
+            raise SinkWriteError(results)
+
+    def write(self, transactions: list[Transaction]) -> None:
+        """
+        Write a batch to every sink.
+
+        Parameters
+        ----------
+        transactions : list[Transaction]
+            The transactions to write, in order.
+
+        Raises
+        ------
+        SinkWriteError
+            If a required sink could not write the batch.
+        """  # noqa: DOC502
+        self.check_results(self.dispatch(transactions))
+
+    async def awrite(self, transactions: list[Transaction]) -> None:
+        """
+        Write a batch to every sink without blocking the event loop.
+
+        Parameters
+        ----------
+        transactions : list[Transaction]
+            The transactions to write, in order.
+
+        Raises
+        ------
+        SinkWriteError
+            If a required sink could not write the batch.
+        """  # noqa: DOC502
+        self.check_results(await self.adispatch(transactions))
+
+    def close(self) -> None:
+        """Shut down the worker threads, waiting for pending writes."""
+        self._executor.shutdown()
@@ -0,0 +1,129 @@
+"""SQLite sink."""
+
+import re
+import sqlite3
+import threading
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from shared_code.finmail.mappers import LEDGER_COLUMNS, transaction_to_row
+from shared_code.finmail.models import Transaction
+
+if TYPE_CHECKING:
+    from shared_code.finmail.batch import TransactionBatch
+
+_TABLE_NAME_PATTERN = re.compile(r"^[A-Za-z_]\w*$")
+
+
+class SQLiteSink:
+    """
+    Store transactions in a local SQLite database.
+
+    The database runs in WAL mode (readers do not block the writer) with
+    ``synchronous=NORMAL``, and every batch is inserted with a single
+    ``executemany`` in one transaction.
+    """
+
+    def __init__(self, path: str | Path, table: str = "transactions") -> None:
+        """
+        Open (or create) the database and the transactions table.
+
+        Parameters
+        ----------
+        path : str | Path
+            The database file.
+        table : str, optional
+            The table name. Default is "transactions".
+
+        Raises
+        ------
+        ValueError
+            If the table name is not a valid identifier.
+        """
+        if not _TABLE_NAME_PATTERN.match(table):
+            raise ValueError(f"Invalid table name: {table}")
+        self.path = Path(path)
+        self.table = table
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(self.path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        columns = ", ".join(
+            f"{column} REAL" if column == "amount" else f"{column} TEXT"
+            for column in LEDGER_COLUMNS
+        )
+        self._connection.execute(f"CREATE TABLE IF NOT EXISTS {table} ({columns})")
+        placeholders = ", ".join("?" for _ in LEDGER_COLUMNS)
+        self._insert_sql = (
+            f"INSERT INTO {table} ({', '.join(LEDGER_COLUMNS)}) "  # noqa: S608
+            f"VALUES ({placeholders})"
+        )
+
+    def write(self, transactions: list[Transaction]) -> None:
+        """
+        Insert a batch of transactions in a single database transaction.
+
+        Parameters
+        ----------
+        transactions : list[Transaction]
+            The transactions to write, in order.
+        """
+        self._insert([
+            transaction_to_row(t, columns=LEDGER_COLUMNS, date_format=None)
+            for t in transactions
+        ])
+
+    def write_batch(self, batch: "TransactionBatch") -> None:
+        """
+        Insert a columnar batch, mapping it to rows column by column.
+
+        Parameters
+        ----------
+        batch : TransactionBatch
+            The transactions to write, in order.
+        """
+        self._insert(batch.to_rows(LEDGER_COLUMNS, date_format=None))
+
+    def _insert(self, rows: list[list]) -> None:
+        with self._lock, self._connection:
+            self._connection.executemany(self._insert_sql, rows)
+
+    def position(self) -> int:
+        """
+        Get the last row id of the table.
+
+        Returns
+        -------
+        int
+            The largest row id (0 if the table is empty).
+        """
+        with self._lock:
+            (rowid,) = self._connection.execute(
+                f"SELECT COALESCE(MAX(rowid), 0) FROM {self.table}"  # noqa: S608
+            ).fetchone()
+        return rowid
+
+    def written_since(self, position: int) -> int:
+        """
+        Count the rows inserted after `position`.
+
+        Parameters
+        ----------
+        position : int
+            A row id previously returned by `position`.
+
+        Returns
+        -------
+        int
+            The number of rows inserted since then.
+        """
+        with self._lock:
+            (count,) = self._connection.execute(
+                f"SELECT COUNT(*) FROM {self.table} WHERE rowid > ?",  # noqa: S608
+                (position,),
+            ).fetchone()
+        return count
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self._connection.close()
@@ -1,7 +1,12 @@
 """Date utilities."""
 
 import logging
-from datetime import datetime
+import re
+from datetime import UTC, datetime, tzinfo
+from functools import cache
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from dateutil import tz
 
 logger = logging.getLogger(__name__)
 
@@ -20,6 +25,188 @@ MONTHS_ES = {
     "diciembre": "12",
 }
 
+MONTHS_EN = {
+    "january": "01",
+    "february": "02",
+    "march": "03",
+    "april": "04",
+    "may": "05",
+    "june": "06",
+    "july": "07",
+    "august": "08",
+    "september": "09",
+    "october": "10",
+    "november": "11",
+    "december": "12",
+}
+
+# Full names, three letter abbreviations and common variants (e.g. "sept")
+MONTHS: dict[str, int] = {
+    **{name: int(number) for name, number in MONTHS_ES.items()},
+    **{name: int(number) for name, number in MONTHS_EN.items()},
+    **{name[:3]: int(number) for name, number in MONTHS_ES.items()},
+    **{name[:3]: int(number) for name, number in MONTHS_EN.items()},
+    "sept": 9,
+    "setiembre": 9,
+}
+
+_MONTH_NAMES = "|".join(sorted(MONTHS, key=len, reverse=True))
+
+# (pattern, order of the captured groups)
+DATE_PATTERNS: tuple[tuple[re.Pattern, tuple[str, str, str]], ...] = (
+    # 2025-08-12
+    (re.compile(r"(\d{4})-(\d{1,2})-(\d{1,2})"), ("year", "month", "day")),
+    # 30/01/2026
+    (re.compile(r"(\d{1,2})/(\d{1,2})/(\d{4})"), ("day", "month", "year")),
+    # 30 de enero de 2026, 1 feb 2026, 30 January 2026
+    (
+        re.compile(
+            rf"(\d{{1,2}})\s+(?:de\s+)?({_MONTH_NAMES})\b\.?,?\s+(?:del?\s+)?(\d{{4}})",
+            re.IGNORECASE,
+        ),
+        ("day", "month", "year"),
+    ),
+    # January 30, 2026
+    (
+        re.compile(
+            rf"\b({_MONTH_NAMES})\b\.?\s+(\d{{1,2}}),?\s+(\d{{4}})", re.IGNORECASE
+        ),
+        ("month", "day", "year"),
+    ),
+)
+
+# 10:10 am, 10:10 a.m., 14:00:12, 14:00 UTC
+TIME_PATTERN = re.compile(
+    r"(\d{1,2}):(\d{2})(?::(\d{2}))?\s*(?:([ap])\.?\s*m\b\.?)?\s*(utc|gmt)?",
+    re.IGNORECASE,
+)
+
+_HOURS_IN_HALF_DAY = 12
+
+
+@cache
+def get_timezone(name: str) -> tzinfo | None:
+    """
+    Get a timezone by its IANA name, loaded once.
+
+    `zoneinfo` timezones convert datetimes many times faster than the
+    ``dateutil`` ones; ``dateutil`` (with its bundled database) is used when the
+    system has no timezone data.
+
+    Parameters
+    ----------
+    name : str
+        The timezone name, e.g. ``America/Bogota``.
+
+    Returns
+    -------
+    tzinfo | None
+        The timezone, or None if it is unknown.
+    """
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        return tz.gettz(name)
+
+
+def _parse_date(date_str: str) -> tuple[int, int, int, int] | None:
+    for pattern, order in DATE_PATTERNS:
+        match = pattern.search(date_str)
+        if not match:
+            continue
+        parts = dict(zip(order, match.groups(), strict=True))
+        month = parts["month"]
+        month_number = int(month) if month.isdigit() else MONTHS[month.lower()]
+        return int(parts["year"]), month_number, int(parts["day"]), match.end()
+    return None
+
+
+def _parse_time(time_str: str) -> tuple[int, int, int, bool] | None:
+    match = TIME_PATTERN.search(time_str)
+    if not match:
+        return None
+    hour_str, minute_str, second_str, meridiem, utc = match.groups()
+    hour = int(hour_str)
+    if meridiem:
+        if not 1 <= hour <= _HOURS_IN_HALF_DAY:
+            return None
+        hour %= _HOURS_IN_HALF_DAY
+        if meridiem.lower() == "p":
+            hour += _HOURS_IN_HALF_DAY
+    return hour, int(minute_str), int(second_str or 0), utc is not None
+
+
+def parse_datetime_str(
+    date_str: str | None,
+    time_str: str | None = None,
+    *,
+    source_tz: tzinfo | None = None,
+    target_tz: tzinfo | None = None,
+) -> datetime | None:
+    """
+    Parse Spanish and English bank date and time strings into a datetime.
+
+    Supported dates are "30 de enero de 2026", "1 feb 2026", "January 30, 2026",
+    "30/01/2026" (day first) and "2026-01-30". Supported times are "10:10 am",
+    "10:10 p.m.", "14:00", "14:00:12" and "14:00 UTC". When `time_str` is None,
+    the time is looked up after the date in `date_str`, defaulting to midnight.
+
+    The datetime is built directly from the captured fields (no `strptime`,
+    so it does not depend on the locale).
+
+    Parameters
+    ----------
+    date_str : str | None
+        The date string, optionally followed by the time.
+    time_str : str | None, optional
+        The time string.
+    source_tz : tzinfo | None, optional
+        Timezone of the parsed values. A "UTC"/"GMT" suffix in the time
+        overrides it. If neither is given, the values are taken as local.
+    target_tz : tzinfo | None, optional
+        Timezone of the result. Aware values are converted to it, local values
+        are attached to it. If None, the result keeps the source timezone
+        (naive if there is none).
+
+    Returns
+    -------
+    datetime | None
+        The parsed datetime, or None if parsing fails.
+    """
+    if not date_str:
+        return None
+
+    date = _parse_date(date_str)
+    if time_str is None and date is not None:
+        time_str = date_str[date[3] :]
+    time = _parse_time(time_str) if time_str and time_str.strip() else (0, 0, 0, False)
+
+    if date is None or time is None:
+        logger.warning("Could not parse date/time: %s %s", date_str, time_str)
+        return None
+
+    year, month, day, _ = date
+    hour, minute, second, is_utc = time
+    try:
+        value = datetime(
+            year,
+            month,
+            day,
+            hour,
+            minute,
+            second,
+            tzinfo=UTC if is_utc else source_tz,
+        )
+    except ValueError:
+        logger.warning("Invalid date/time: %s %s", date_str, time_str)
+        return None
+
+    if target_tz is None:
+        return value
+    if value.tzinfo is None:
+        return value.replace(tzinfo=target_tz)
+    return value.astimezone(target_tz)
+
 
 def parse_spanish_datetime_str(
     date_str: str | None, time_str: str | None
@@ -37,25 +224,8 @@ def parse_spanish_datetime_str(
     Returns
     -------
     datetime | None
-        The parsed datetime object, or None if parsing fails.
+        The parsed (naive) datetime object, or None if parsing fails.
     """
     if not date_str or not time_str:
         return None
-
-    try:
-        # Normalize date string to handle Spanish months
-        ds = date_str.lower()
-        for spanish, digit in MONTHS_ES.items():
-            ds = ds.replace(spanish, digit).replace(" de ", "/")
-
-        # Format expected: 30/01/2026
-        # Combine with time
-        dt_str = f"{ds} {time_str}".strip()
-
-        # Handling AM/PM case insensitively usually works with %p
-        # Examples: "30/01/2026 10:10 am"
-        return datetime.strptime(dt_str, "%d/%m/%Y %I:%M %p")
-
-    except ValueError:
-        logger.warning("Could not parse spanish date/time: %s %s", date_str, time_str)
-        return None
+    return parse_datetime_str(date_str, time_str)
@@ -1,6 +1,34 @@
 """HTML Utilities."""
 
-from bs4 import BeautifulSoup
+import re
+
+from bs4 import BeautifulSoup, NavigableString, Tag
+
+FORWARD_MARKERS = (
+    "forwarded message",
+    "begin forwarded message",
+    "mensaje reenviado",
+    "original message",
+    "mensaje original",
+)
+
+# Gmail (and Outlook Web, which prefixes classes with "x_") quote containers
+QUOTE_SELECTOR = '[class*="gmail_quote"], blockquote[type="cite"]'
+SIGNATURE_SELECTOR = (
+    '[data-smartmail="gmail_signature"], [class*="gmail_signature"], div#Signature'
+)
+
+# A marker on its own line, between dashes ("-----Original Message-----") or
+# followed by a colon ("Begin forwarded message:"); elsewhere, the phrases are
+# only markers inside a quote container
+_MARKERS = "|".join(re.escape(m) for m in FORWARD_MARKERS)
+_FORWARD_SEPARATOR_PATTERN = re.compile(
+    rf"^[ \t]*(?:-{{2,}}[ \t]*(?:{_MARKERS})[ \t]*-{{2,}}|(?:{_MARKERS}):)[ \t]*$",
+    re.IGNORECASE | re.MULTILINE,
+)
+_DATA_URI_PATTERN = re.compile(r"data:[\w.+/-]*(?:;[\w=.+-]+)*;base64,[A-Za-z0-9+/=]+")
+_PIXEL_SIZE_PATTERN = re.compile(r"^\s*([01])(?:px)?\s*$")
+_HIDDEN_STYLE_PATTERN = re.compile(r"display\s*:\s*none|visibility\s*:\s*hidden")
 
 
 def extract_subject(soup: BeautifulSoup) -> str | None:
@@ -29,10 +57,131 @@ def extract_subject(soup: BeautifulSoup) -> str | None:
     return None
 
 
+def strip_data_uris(html: str, max_size: int) -> str:
+    """
+    Replace inline base64 data URIs longer than `max_size` with an empty URI.
+
+    Parameters
+    ----------
+    html : str
+        The raw HTML content.
+    max_size : int
+        Maximum length (in characters) of a data URI to keep.
+
+    Returns
+    -------
+    str
+        The HTML with oversized data URIs replaced by ``data:,``.
+    """
+    if "data:" not in html:
+        return html
+    return _DATA_URI_PATTERN.sub(
+        lambda m: "data:," if len(m.group()) > max_size else m.group(), html
+    )
+
+
+def estimate_node_count(html: str) -> int:
+    """
+    Estimate the number of DOM nodes of a raw HTML string without parsing it.
+
+    Every opening tag is counted (``<`` not followed by ``/``), which closely
+    approximates the element count lxml would build at a fraction of the cost.
+
+    Parameters
+    ----------
+    html : str
+        The raw HTML content.
+
+    Returns
+    -------
+    int
+        The estimated number of elements.
+    """
+    return html.count("<") - html.count("</")
+
+
+def _is_tracking_pixel(img: Tag) -> bool:
+    width = img.get("width") or ""
+    height = img.get("height") or ""
+    if _PIXEL_SIZE_PATTERN.match(width) and _PIXEL_SIZE_PATTERN.match(height):
+        return True
+    return bool(_HIDDEN_STYLE_PATTERN.search((img.get("style") or "").lower()))
+
+
+def _is_forward_marker(text: NavigableString) -> bool:
+    if _FORWARD_SEPARATOR_PATTERN.search(text):
+        return True
+    lowered = text.lower()
+    return any(m in lowered for m in FORWARD_MARKERS) and any(
+        parent.css.match(QUOTE_SELECTOR) for parent in text.parents
+    )
+
+
+def _find_innermost_forward_marker(soup: BeautifulSoup) -> NavigableString | None:
+    # Nested forwards appear later in document order, so the last marker
+    # found belongs to the innermost forwarded message.
+    marker = None
+    for text in soup.find_all(string=True):
+        if _is_forward_marker(text):
+            marker = text
+    return marker
+
+
+def trim_forwarded_email(soup: BeautifulSoup) -> None:
+    """
+    Reduce a forwarded email chain to its innermost forwarded message.
+
+    Signatures and tracking pixels are always removed. When a forward marker
+    is found, the innermost quote container holding it is kept and everything
+    else (forwarder text, quoted history, trailing footers) is dropped. If the
+    marker is not wrapped in a known quote container, only the content
+    preceding it is dropped.
+
+    Markers are separator lines such as "---------- Forwarded message
+    ---------", "-----Original Message-----" or "Begin forwarded message:".
+    Other mentions of `FORWARD_MARKERS` only count inside a quote container,
+    so a bank email mentioning its "mensaje original" keeps its content.
+
+    The forwarded header (with its ``Subject:`` line) is preserved, so
+    `extract_subject` keeps working on the trimmed soup.
+
+    Parameters
+    ----------
+    soup : BeautifulSoup
+        The parsed HTML content to trim in place.
+    """
+    for tag in soup.select(SIGNATURE_SELECTOR):
+        tag.decompose()
+    for img in soup.find_all("img"):
+        if _is_tracking_pixel(img):
+            img.decompose()
+
+    marker = _find_innermost_forward_marker(soup)
+    if marker is None:
+        return
+
+    container = next(
+        (parent for parent in marker.parents if parent.css.match(QUOTE_SELECTOR)),
+        None,
+    )
+    if container is not None:
+        root = soup.body or soup
+        container = container.extract()
+        root.clear()
+        root.append(container)
+        return
+
+    for text in marker.find_all_previous(string=True):
+        text.extract()
+
+
 def clean_html(soup: BeautifulSoup) -> None:
     """
     Remove unwanted tags from the HTML soup.
 
+    Besides scripts and styles, forwarded chains are trimmed down to the
+    innermost forwarded message (see `trim_forwarded_email`).
+
     Parameters
     ----------
     soup : BeautifulSoup
@@ -40,3 +189,4 @@ def clean_html(soup: BeautifulSoup) -> None:
     """
     for tag in soup(["script", "style", "noscript"]):
         tag.decompose()
+    trim_forwarded_email(soup)
@@ -0,0 +1,64 @@
+"""
+JSON Utilities.
+
+Request bodies are decoded with orjson when the optional ``finmail[json]``
+extra is installed, and with the standard library otherwise. Response bodies
+are encoded by pydantic-core, which serializes models nested in plain
+containers directly, without building their ``model_dump`` dicts first.
+"""
+
+import json
+from typing import Any
+
+from pydantic_core import to_json
+
+try:
+    import orjson
+except ImportError:
+    # Optional: decoding falls back to the standard library
+    orjson = None
+
+
+def loads(data: bytes | str) -> Any:
+    """
+    Decode a JSON document.
+
+    Parameters
+    ----------
+    data : bytes | str
+        The document, as UTF-8 bytes or text.
+
+    Returns
+    -------
+    Any
+        The decoded value.
+
+    Raises
+    ------
+    ValueError
+        If the document is not valid JSON or not valid UTF-8.
+    """  # noqa: DOC502
+    if orjson is None:
+        return json.loads(data)
+    return orjson.loads(data)
+
+
+def dumps(value: Any) -> bytes:
+    """
+    Encode a value as compact JSON.
+
+    Pydantic models, datetimes and other values pydantic can serialize may be
+    nested in the dicts and lists of `value`; they are encoded as
+    ``model_dump(mode="json")`` would.
+
+    Parameters
+    ----------
+    value : Any
+        The value to encode.
+
+    Returns
+    -------
+    bytes
+        The UTF-8 encoded document.
+    """
+    return to_json(value)
@@ -1,16 +1,33 @@
 """Text Utilities."""
 
 import logging
-import re
 import unicodedata
+from functools import lru_cache
 
 logger = logging.getLogger(__name__)
 
+# Parsers normalize every paragraph once per label they look up, so results
+# for label- and paragraph-sized strings are kept in a bounded LRU cache.
+NORMALIZE_CACHE_MAX_LENGTH = 256
+NORMALIZE_CACHE_SIZE = 4096
+
+
+def _normalize(s: str) -> str:
+    if not s.isascii():
+        s = unicodedata.normalize("NFKD", s).encode("ascii", "ignore").decode("ascii")
+    return " ".join(s.split()).lower()
+
+
+_normalize_cached = lru_cache(maxsize=NORMALIZE_CACHE_SIZE)(_normalize)
+
 
 def normalize(s: str | None) -> str | None:
     """
     Normalize a string by removing accents, extra spaces, and converting to lowercase.
 
+    ASCII strings skip the NFKD decomposition entirely, and results for short
+    strings (labels, paragraphs) are kept in a bounded LRU cache.
+
     Parameters
     ----------
     s : str | None
@@ -23,8 +40,9 @@ def normalize(s: str | None) -> str | None:
     """
     if s is None:
         return None
-    s = unicodedata.normalize("NFKD", s).encode("ascii", "ignore").decode("ascii")
-    return re.sub(r"\s+", " ", s).strip().lower()
+    if len(s) <= NORMALIZE_CACHE_MAX_LENGTH:
+        return _normalize_cached(s)
+    return _normalize(s)
 
 
 def float_from_string(
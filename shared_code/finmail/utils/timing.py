@@ -0,0 +1,245 @@
+"""Timing Utilities."""
+
+import logging
+import threading
+import time
+from bisect import bisect_left
+from collections.abc import Iterator, Mapping
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds of the histogram buckets, in seconds (roughly 1-2.5-5 steps)
+DEFAULT_BUCKETS: tuple[float, ...] = (
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+
+class StageTimer:
+    """Accumulate the wall-clock duration of the named stages of a request."""
+
+    __slots__ = ("timings",)
+
+    def __init__(self) -> None:
+        """Initialize an empty timer."""
+        self.timings: dict[str, float] = {}
+
+    def add(self, stage: str, seconds: float) -> None:
+        """
+        Add a duration to a stage.
+
+        Parameters
+        ----------
+        stage : str
+            The stage name.
+        seconds : float
+            The duration to add.
+        """
+        self.timings[stage] = self.timings.get(stage, 0.0) + seconds
+
+    @contextmanager
+    def stage(self, stage: str) -> Iterator[None]:
+        """
+        Time a block as a stage, even if it raises.
+
+        Parameters
+        ----------
+        stage : str
+            The stage name. Repeated stages are added up.
+
+        Yields
+        ------
+        None
+        """
+        started_at = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(stage, time.perf_counter() - started_at)
+
+    def as_ms(self) -> dict[str, float]:
+        """
+        Get the stage durations in milliseconds.
+
+        Returns
+        -------
+        dict[str, float]
+            The duration of each stage, rounded to microseconds.
+        """
+        return {stage: round(s * 1000, 3) for stage, s in self.timings.items()}
+
+    def format(self) -> str:
+        """
+        Format the stage durations for a log line.
+
+        Returns
+        -------
+        str
+            The stages as ``name=1.234ms``, in the order they ran.
+        """
+        return " ".join(f"{stage}={ms}ms" for stage, ms in self.as_ms().items())
+
+
+class LatencyHistogram:
+    """
+    Thread-safe histogram of durations with fixed buckets.
+
+    Quantiles are estimated as the upper bound of the bucket they fall in (the
+    maximum for the overflow bucket), which is precise enough to tell stages
+    apart without keeping every sample.
+    """
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        """
+        Initialize an empty histogram.
+
+        Parameters
+        ----------
+        buckets : tuple[float, ...], optional
+            Increasing upper bounds of the buckets, in seconds. Durations above
+            the last bound go to an overflow bucket.
+        """
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float) -> None:
+        """
+        Record a duration.
+
+        Parameters
+        ----------
+        seconds : float
+            The duration to record.
+        """
+        index = bisect_left(self.buckets, seconds)
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.total += seconds
+            self.max = max(self.max, seconds)
+
+    def quantile(self, q: float) -> float:
+        """
+        Estimate a quantile.
+
+        Parameters
+        ----------
+        q : float
+            The quantile, between 0 and 1.
+
+        Returns
+        -------
+        float
+            The estimated duration in seconds (0 if the histogram is empty).
+        """
+        with self._lock:
+            if not self.count:
+                return 0.0
+            rank = q * self.count
+            seen = 0
+            for bound, count in zip(self.buckets, self.counts, strict=False):
+                seen += count
+                if count and seen >= rank:
+                    return min(bound, self.max)
+            # In the overflow bucket
+            return self.max
+
+    def snapshot(self) -> dict[str, float]:
+        """
+        Summarize the histogram.
+
+        Returns
+        -------
+        dict[str, float]
+            The count, and the mean, p50, p95, p99 and max in milliseconds.
+        """
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total / self.count * 1000, 3) if self.count else 0.0,
+            "p50_ms": round(self.quantile(0.5) * 1000, 3),
+            "p95_ms": round(self.quantile(0.95) * 1000, 3),
+            "p99_ms": round(self.quantile(0.99) * 1000, 3),
+            "max_ms": round(self.max * 1000, 3),
+        }
+
+
+class StageHistograms:
+    """
+    Latency histograms of every stage, aggregated across requests.
+
+    A summary of every stage is logged every `summary_every` records.
+    """
+
+    def __init__(
+        self, buckets: tuple[float, ...] = DEFAULT_BUCKETS, summary_every: int = 100
+    ) -> None:
+        """
+        Initialize the histograms.
+
+        Parameters
+        ----------
+        buckets : tuple[float, ...], optional
+            Upper bounds of the buckets of every histogram, in seconds.
+        summary_every : int, optional
+            Records between logged summaries. 0 disables them. Default is 100.
+        """
+        self.buckets = buckets
+        self.summary_every = summary_every
+        self._histograms: dict[str, LatencyHistogram] = {}
+        self._records = 0
+        self._lock = threading.Lock()
+
+    def record(self, timings: Mapping[str, float]) -> None:
+        """
+        Record the stage durations of a request.
+
+        Parameters
+        ----------
+        timings : Mapping[str, float]
+            The duration of each stage, in seconds (see `StageTimer.timings`).
+        """
+        with self._lock:
+            histograms = [
+                self._histograms.setdefault(stage, LatencyHistogram(self.buckets))
+                for stage in timings
+            ]
+            self._records += 1
+            log_summary = (
+                self.summary_every > 0 and self._records % self.summary_every == 0
+            )
+        for histogram, seconds in zip(histograms, timings.values(), strict=True):
+            histogram.observe(seconds)
+        if log_summary:
+            logger.info("Stage latency summary: %s", self.snapshot())
+
+    def snapshot(self) -> dict[str, dict[str, float]]:
+        """
+        Summarize the histogram of every stage.
+
+        Returns
+        -------
+        dict[str, dict[str, float]]
+            The `LatencyHistogram.snapshot` of each stage.
+        """
+        with self._lock:
+            histograms = dict(self._histograms)
+        return {stage: h.snapshot() for stage, h in histograms.items()}
@@ -0,0 +1,206 @@
+"""
+Tracing Utilities.
+
+Spans are created with OpenTelemetry, an optional dependency
+(``finmail[tracing]``). Until `enable_tracing` is called, `start_span` yields a
+no-op span and never imports OpenTelemetry, so instrumented code costs next to
+nothing when tracing is disabled.
+"""
+
+import functools
+import inspect
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Any, ParamSpec, TypeVar
+
+if TYPE_CHECKING:
+    from opentelemetry.trace import Tracer, TracerProvider
+
+P = ParamSpec("P")
+R = TypeVar("R")
+
+TRACER_NAME = "finmail"
+
+_tracer: "Tracer | None" = None
+
+
+class NoopSpan:
+    """Stand-in for an OpenTelemetry span when tracing is disabled."""
+
+    __slots__ = ()
+
+    @staticmethod
+    def is_recording() -> bool:
+        """
+        Tell whether the span records anything, for costly attributes.
+
+        Returns
+        -------
+        bool
+            Always False.
+        """
+        return False
+
+    def set_attribute(self, key: str, value: object) -> None:
+        """Ignore an attribute."""
+
+    def set_attributes(self, attributes: dict[str, object]) -> None:
+        """Ignore attributes."""
+
+
+_NOOP_SPAN = NoopSpan()
+
+
+def enable_tracing(tracer_provider: "TracerProvider | None" = None) -> None:
+    """
+    Create spans from now on.
+
+    Parameters
+    ----------
+    tracer_provider : TracerProvider | None, optional
+        The provider of the tracer. If None, the global provider is used.
+
+    Raises
+    ------
+    ImportError
+        If opentelemetry-api is not installed.
+    """
+    global _tracer  # noqa: PLW0603
+    try:
+        from opentelemetry import trace  # noqa: PLC0415
+    except ImportError as e:
+        raise ImportError(
+            "Tracing requires opentelemetry. Install it with 'finmail[tracing]'."
+        ) from e
+    _tracer = trace.get_tracer(TRACER_NAME, tracer_provider=tracer_provider)
+
+
+def disable_tracing() -> None:
+    """Stop creating spans."""
+    global _tracer  # noqa: PLW0603
+    _tracer = None
+
+
+def configure_tracing(service_name: str = TRACER_NAME) -> "TracerProvider":
+    """
+    Export spans over OTLP/HTTP and enable tracing.
+
+    The exporter is configured with the standard ``OTEL_EXPORTER_OTLP_*``
+    environment variables; by default, spans go to a local collector at
+    ``http://localhost:4318``.
+
+    Parameters
+    ----------
+    service_name : str, optional
+        The ``service.name`` resource attribute. Default is "finmail".
+
+    Returns
+    -------
+    TracerProvider
+        The provider, also set as the global one.
+
+    Raises
+    ------
+    ImportError
+        If opentelemetry-sdk or the OTLP/HTTP exporter is not installed.
+    """
+    try:
+        from opentelemetry import trace  # noqa: PLC0415
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import (  # noqa: PLC0415
+            OTLPSpanExporter,
+        )
+        from opentelemetry.sdk.resources import Resource  # noqa: PLC0415
+        from opentelemetry.sdk.trace import TracerProvider  # noqa: PLC0415
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor  # noqa: PLC0415
+    except ImportError as e:
+        raise ImportError(
+            "Tracing requires opentelemetry-sdk and "
+            "opentelemetry-exporter-otlp-proto-http. "
+            "Install them with 'finmail[tracing]'."
+        ) from e
+
+    tracer_provider = TracerProvider(
+        resource=Resource.create({"service.name": service_name})
+    )
+    tracer_provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter()))
+    trace.set_tracer_provider(tracer_provider)
+    enable_tracing(tracer_provider)
+    return tracer_provider
+
+
+def tracing_enabled() -> bool:
+    """
+    Tell whether spans are created.
+
+    Returns
+    -------
+    bool
+        True if tracing is enabled.
+    """
+    return _tracer is not None
+
+
+@contextmanager
+def start_span(name: str, attributes: dict[str, Any] | None = None) -> Iterator[Any]:
+    """
+    Run a block in a span, child of the current one.
+
+    Exceptions raised by the block are recorded on the span and re-raised.
+
+    Parameters
+    ----------
+    name : str
+        The span name.
+    attributes : dict[str, Any] | None, optional
+        Attributes of the span. None values are dropped.
+
+    Yields
+    ------
+    Span | NoopSpan
+        The span, or a `NoopSpan` if tracing is disabled.
+    """
+    if _tracer is None:
+        yield _NOOP_SPAN
+        return
+    attributes = {k: v for k, v in (attributes or {}).items() if v is not None}
+    with _tracer.start_as_current_span(name, attributes=attributes) as span:
+        yield span
+
+
+def traced(
+    name: str, attributes: dict[str, Any] | None = None
+) -> Callable[[Callable[P, R]], Callable[P, R]]:
+    """
+    Run every call of a function, sync or async, in a span.
+
+    Parameters
+    ----------
+    name : str
+        The span name.
+    attributes : dict[str, Any] | None, optional
+        Attributes of the span.
+
+    Returns
+    -------
+    Callable
+        The decorator.
+    """
+
+    def decorator(function: Callable[P, R]) -> Callable[P, R]:
+        if inspect.iscoroutinefunction(function):
+
+            @functools.wraps(function)
+            async def async_wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
+                with start_span(name, attributes):
+                    return await function(*args, **kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(function)
+        def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
+            with start_span(name, attributes):
+                return function(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
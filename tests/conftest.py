@@ -1,3 +1,5 @@
+from collections.abc import Callable
+from email.message import EmailMessage
 from pathlib import Path
 
 import pytest
@@ -94,3 +96,29 @@ def fixture_remotepass_payment_soup() -> BeautifulSoup:
     soup = BeautifulSoup(html, "lxml")
     clean_html(soup)
     return soup
+
+
+RawEmailFactory = Callable[..., bytes]
+
+
+@pytest.fixture(name="raw_email_factory")
+def fixture_raw_email_factory() -> RawEmailFactory:
+    def _raw_email(
+        sample: str | None = "rappipay_bank_transfer_in.html",
+        subject: str = "Fwd: Resumen transferencia Bancaria",
+        sender: str = "Juan <sample@email.com>",
+        date: str = "Fri, 30 Jan 2026 15:10:00 +0000",
+        text: str | None = None,
+    ) -> bytes:
+        message = EmailMessage()
+        message["Subject"] = subject
+        message["From"] = sender
+        message["Date"] = date
+        if sample:
+            html = Path(f"tests/html_samples/{sample}").read_text(encoding="utf-8")
+            message.set_content(html, subtype="html")
+        else:
+            message.set_content(text or "")
+        return message.as_bytes()
+
+    return _raw_email
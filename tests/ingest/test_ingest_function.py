@@ -0,0 +1,178 @@
+import importlib
+import json
+from datetime import datetime
+from types import ModuleType
+
+import azure.functions as func
+import pytest
+from pytest_mock import MockerFixture
+
+from shared_code.finmail.clients import GoogleSheetsClient
+from shared_code.finmail.core.config import settings
+from shared_code.finmail.domain import ingest as domain_ingest
+from shared_code.finmail.domain.dedup import DedupIndex
+from shared_code.finmail.models import EmailPayload, Transaction
+from shared_code.finmail.responses import IDEMPOTENCY_HEADER, REPLAYED_HEADER
+from shared_code.finmail.sinks import MultiSink
+from shared_code.finmail.utils.cache import TTLCache
+
+PAYLOAD = EmailPayload(subject="Test", sender="test@example.com", html="<p>Monto</p>")
+TRANSACTION = Transaction(
+    date_local=datetime(2026, 1, 1, 12, 0),
+    pocket="Test Pocket",
+    currency="COP",
+    amount=-1000.0,
+)
+
+
+@pytest.fixture(name="function")
+def fixture_function(
+    mocker: MockerFixture, monkeypatch: pytest.MonkeyPatch
+) -> ModuleType:
+    # The function module authorizes the Google Sheets client on import
+    mocker.patch.object(GoogleSheetsClient, "_authorize")
+    function = importlib.import_module("ingest")
+
+    parser = mocker.Mock(DOMAINS=("test@example.com",), KEYWORDS=())
+    parser.parse.return_value = TRANSACTION
+    mocker.patch.object(domain_ingest, "get_registry", return_value=[parser])
+    monkeypatch.setattr(settings, "ENABLE_CLASSIFICATION", False)
+    monkeypatch.setattr(settings, "ENABLE_DEDUP", True)
+    monkeypatch.setattr(function, "ingest_queue", None)
+    monkeypatch.setattr(function, "dedup_index", DedupIndex())
+    monkeypatch.setattr(function, "response_cache", TTLCache(maxsize=16, ttl=60))
+    return function
+
+
+@pytest.fixture(name="install_sinks")
+def fixture_install_sinks(mocker: MockerFixture, function: ModuleType):
+    # Replace the sinks of the function, shutting their threads down after
+    installed = []
+
+    def install(sinks: dict) -> None:
+        installed.append(MultiSink(sinks))
+        mocker.patch.object(function, "transaction_sink", installed[-1])
+
+    yield install
+    for sink in installed:
+        sink.close()
+
+
+@pytest.fixture(name="sheets")
+def fixture_sheets(mocker: MockerFixture, install_sinks):
+    sheets = mocker.Mock()
+    install_sinks({"google_sheets": sheets})
+    return sheets
+
+
+def _request(
+    payload: EmailPayload = PAYLOAD, idempotency_key: str | None = None
+) -> func.HttpRequest:
+    return func.HttpRequest(
+        method="POST",
+        url="/api/ingest",
+        body=payload.model_dump_json().encode(),
+        headers={IDEMPOTENCY_HEADER: idempotency_key} if idempotency_key else {},
+    )
+
+
+def test_main_stores_transaction(function: ModuleType, sheets):
+    response = function.main(_request())
+
+    assert response.status_code == 200
+    body = json.loads(response.get_body())
+    assert body["ok"]
+    assert body["processed"] == TRANSACTION.model_dump(mode="json")
+    assert [sink["name"] for sink in body["sinks"]] == ["google_sheets"]
+    sheets.write.assert_called_once_with([TRANSACTION])
+
+
+@pytest.mark.parametrize(
+    ("body", "status_code"),
+    [
+        pytest.param(b"{not json", 400, id="malformed"),
+        pytest.param(b'{"subject": "Test"}', 422, id="missing-fields"),
+    ],
+)
+def test_main_rejects_invalid_bodies(
+    function: ModuleType, sheets, body: bytes, status_code: int
+):
+    request = func.HttpRequest(
+        method="POST",
+        url="/api/ingest",
+        body=body,
+        headers={IDEMPOTENCY_HEADER: "key-1"},
+    )
+
+    assert function.main(request).status_code == status_code
+    assert function.main(_request(idempotency_key="key-1")).status_code == 200
+    sheets.write.assert_called_once()
+
+
+def test_main_replays_idempotency_key(function: ModuleType, sheets):
+    first = function.main(_request(idempotency_key="key-1"))
+    second = function.main(_request(idempotency_key="key-1"))
+
+    assert second.status_code == first.status_code == 200
+    assert second.get_body() == first.get_body()
+    assert second.headers[REPLAYED_HEADER] == "true"
+    assert REPLAYED_HEADER not in first.headers
+    sheets.write.assert_called_once()
+
+
+def test_main_replays_by_message_id(function: ModuleType, sheets):
+    payload = PAYLOAD.model_copy(update={"message_id": "<id@mail>"})
+
+    function.main(_request(payload))
+    replayed = function.main(_request(payload))
+
+    assert replayed.headers[REPLAYED_HEADER] == "true"
+    sheets.write.assert_called_once()
+
+
+def test_main_does_not_cache_sink_errors(function: ModuleType, sheets):
+    sheets.write.side_effect = [ConnectionError("quota"), None]
+
+    failed = function.main(_request(idempotency_key="key-1"))
+    retried = function.main(_request(idempotency_key="key-1"))
+
+    assert failed.status_code == 502
+    assert json.loads(failed.get_body())["sinks"][0]["error"].startswith(
+        "ConnectionError"
+    )
+    assert retried.status_code == 200
+    assert REPLAYED_HEADER not in retried.headers
+    assert sheets.write.call_count == 2
+
+
+def test_main_retries_partial_write(
+    mocker: MockerFixture, function: ModuleType, sheets, install_sinks
+):
+    ledger = mocker.Mock()
+    install_sinks({"google_sheets": sheets, "sqlite": ledger})
+    sheets.write.side_effect = [ConnectionError("quota"), None]
+
+    failed = function.main(_request(idempotency_key="key-1"))
+    retried = function.main(_request(idempotency_key="key-1"))
+    duplicate = function.main(_request(idempotency_key="key-2"))
+
+    assert failed.status_code == 502
+    assert retried.status_code == 200
+    assert json.loads(retried.get_body())["processed"] is not None
+    assert sheets.write.call_count == 2
+    ledger.write.assert_called_once()
+    # Recorded for dedup only once every sink wrote it
+    assert json.loads(duplicate.get_body())["rejected"].startswith("Duplicate")
+
+
+def test_main_answers_in_progress_transaction(function: ModuleType, sheets):
+    function.dedup_index.reserve(TRANSACTION)
+
+    in_progress = function.main(_request(idempotency_key="key-1"))
+    function.dedup_index.release([TRANSACTION])
+    retried = function.main(_request(idempotency_key="key-1"))
+
+    assert in_progress.status_code == 503
+    assert "Retry-After" in in_progress.headers
+    assert retried.status_code == 200
+    sheets.write.assert_called_once()
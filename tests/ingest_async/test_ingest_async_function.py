@@ -0,0 +1,125 @@
+import asyncio
+import importlib
+import json
+from datetime import datetime
+from types import ModuleType
+
+import azure.functions as func
+import pytest
+from pytest_mock import MockerFixture
+
+from shared_code.finmail.clients import AsyncGoogleSheetsClient, GoogleSheetsClient
+from shared_code.finmail.core.config import settings
+from shared_code.finmail.domain import ingest as domain_ingest
+from shared_code.finmail.domain.dedup import DedupIndex
+from shared_code.finmail.models import EmailPayload, Transaction
+from shared_code.finmail.responses import IDEMPOTENCY_HEADER, REPLAYED_HEADER
+from shared_code.finmail.sinks import MultiSink
+from shared_code.finmail.utils.cache import TTLCache
+
+PAYLOAD = EmailPayload(subject="Test", sender="test@example.com", html="<p>Monto</p>")
+TRANSACTION = Transaction(
+    date_local=datetime(2026, 1, 1, 12, 0),
+    pocket="Test Pocket",
+    currency="COP",
+    amount=-1000.0,
+)
+
+
+@pytest.fixture(name="function")
+def fixture_function(
+    mocker: MockerFixture, monkeypatch: pytest.MonkeyPatch
+) -> ModuleType:
+    # The function module authorizes the Google Sheets clients on import
+    mocker.patch.object(GoogleSheetsClient, "_authorize")
+    mocker.patch.object(AsyncGoogleSheetsClient, "_load_credentials")
+    function = importlib.import_module("ingest_async")
+
+    parser = mocker.Mock(DOMAINS=("test@example.com",), KEYWORDS=())
+    parser.parse.return_value = TRANSACTION
+    mocker.patch.object(domain_ingest, "get_registry", return_value=[parser])
+    monkeypatch.setattr(settings, "ENABLE_CLASSIFICATION", False)
+    monkeypatch.setattr(function, "dedup_index", DedupIndex())
+    monkeypatch.setattr(function, "response_cache", TTLCache(maxsize=16, ttl=60))
+    # Parse in the default executor of each event loop, shut down with it
+    monkeypatch.setattr(function, "parse_executor", None)
+    return function
+
+
+@pytest.fixture(name="install_sinks")
+def fixture_install_sinks(mocker: MockerFixture, function: ModuleType):
+    # Replace the sinks of the function, shutting their threads down after
+    installed = []
+
+    def install(sinks: dict) -> None:
+        installed.append(MultiSink(sinks))
+        mocker.patch.object(function, "async_transaction_sink", installed[-1])
+
+    yield install
+    for sink in installed:
+        sink.close()
+
+
+@pytest.fixture(name="sheets")
+def fixture_sheets(mocker: MockerFixture, install_sinks):
+    sheets = mocker.AsyncMock()
+    install_sinks({"google_sheets": sheets})
+    return sheets
+
+
+def _request(
+    body: bytes = PAYLOAD.model_dump_json().encode(), idempotency_key: str = "key-1"
+) -> func.HttpRequest:
+    return func.HttpRequest(
+        method="POST",
+        url="/api/ingest_async",
+        body=body,
+        headers={IDEMPOTENCY_HEADER: idempotency_key},
+    )
+
+
+def test_main_stores_and_replays(function: ModuleType, sheets):
+    first = asyncio.run(function.main(_request()))
+    second = asyncio.run(function.main(_request()))
+
+    assert first.status_code == 200
+    assert first.mimetype == "application/json"
+    assert json.loads(first.get_body())["processed"] == TRANSACTION.model_dump(
+        mode="json"
+    )
+    assert second.get_body() == first.get_body()
+    assert second.headers[REPLAYED_HEADER] == "true"
+    sheets.write.assert_awaited_once_with([TRANSACTION])
+
+
+@pytest.mark.parametrize(
+    ("body", "status_code"),
+    [
+        pytest.param(b"{not json", 400, id="malformed"),
+        pytest.param(b'"\xff"', 400, id="not-utf8"),
+        pytest.param(b'{"subject": "Test"}', 422, id="missing-fields"),
+    ],
+)
+def test_main_rejects_invalid_bodies(
+    function: ModuleType, sheets, body: bytes, status_code: int
+):
+    assert asyncio.run(function.main(_request(body))).status_code == status_code
+    assert asyncio.run(function.main(_request())).status_code == 200
+    sheets.write.assert_awaited_once()
+
+
+def test_main_retries_partial_write(
+    mocker: MockerFixture, function: ModuleType, sheets, install_sinks
+):
+    ledger = mocker.Mock()
+    install_sinks({"google_sheets": sheets, "sqlite": ledger})
+    sheets.write.side_effect = [ConnectionError("quota"), None]
+
+    failed = asyncio.run(function.main(_request()))
+    retried = asyncio.run(function.main(_request()))
+
+    assert failed.status_code == 502
+    assert retried.status_code == 200
+    assert REPLAYED_HEADER not in retried.headers
+    assert sheets.write.await_count == 2
+    ledger.write.assert_called_once()
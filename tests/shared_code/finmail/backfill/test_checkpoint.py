@@ -0,0 +1,188 @@
+import json
+from pathlib import Path
+
+import pytest
+from pytest_mock import MockerFixture
+
+from shared_code.finmail.backfill import (
+    BackfillCheckpoint,
+    RawMessage,
+    run_backfill,
+    runner,
+)
+from shared_code.finmail.backfill.__main__ import main  # noqa: PLC2701
+from shared_code.finmail.models import Transaction
+from shared_code.finmail.sinks import JsonLinesSink
+
+
+class CrashingSink(JsonLinesSink):
+    """Writes the first `crash_after` lines of the second batch, then crashes."""
+
+    def __init__(self, path: Path, crash_after: int) -> None:
+        super().__init__(path)
+        self.crash_after = crash_after
+        self.batches = 0
+
+    def write(self, transactions: list[Transaction]) -> None:
+        self.batches += 1
+        if self.batches == 2:
+            super().write(transactions[: self.crash_after])
+            raise ConnectionError("boom")
+        super().write(transactions)
+
+
+@pytest.fixture
+def messages(raw_email_factory) -> list[RawMessage]:
+    return [
+        RawMessage(str(i), raw_email_factory(subject=f"Fwd: Transfer {i}"))
+        for i in range(6)
+    ]
+
+
+@pytest.mark.parametrize("crash_after", [0, 1, 2])
+def test_resume_after_crash_does_not_duplicate(
+    tmp_path: Path, messages: list[RawMessage], crash_after: int
+):
+    output = tmp_path / "out.jsonl"
+    state = tmp_path / "state.json"
+    checkpoint = BackfillCheckpoint.load(state, "test")
+
+    with pytest.raises(ConnectionError):
+        run_backfill(
+            messages,
+            sink=CrashingSink(output, crash_after),
+            workers=1,
+            batch_size=2,
+            checkpoint=checkpoint,
+        )
+
+    checkpoint = BackfillCheckpoint.load(state, "test")
+    assert checkpoint.offset == 2
+    assert checkpoint.pending is not None
+
+    stats = run_backfill(
+        messages[checkpoint.offset + checkpoint.pending.size :],
+        sink=JsonLinesSink(output),
+        workers=1,
+        batch_size=2,
+        checkpoint=checkpoint,
+    )
+
+    assert stats.read == 2
+    assert stats.written == 4 - crash_after
+    assert len(output.read_text().splitlines()) == len(messages)
+    assert checkpoint.offset == len(messages)
+    assert checkpoint.pending is None
+
+
+def test_replay_without_position_resends_whole_batch(
+    mocker: MockerFixture, tmp_path: Path
+):
+    sink = mocker.Mock(spec=["write"])
+    transaction = Transaction(
+        date_local="2026-01-30T10:10:00-05:00",
+        pocket="RappiCuenta",
+        currency="COP",
+        amount=-1000.0,
+    )
+    checkpoint = BackfillCheckpoint.load(tmp_path / "state.json", "test")
+    checkpoint.set_pending(3, "2", [transaction], position=None)
+
+    run_backfill([], sink=sink, workers=1, checkpoint=checkpoint)
+
+    sink.write.assert_called_once_with([transaction])
+    assert (checkpoint.offset, checkpoint.last_key) == (3, "2")
+
+
+def test_failed_replay_starts_no_workers(mocker: MockerFixture, tmp_path: Path):
+    pool = mocker.patch.object(runner, "ProcessPoolExecutor")
+    sink = mocker.Mock(spec=["write"])
+    sink.write.side_effect = ConnectionError("boom")
+    checkpoint = BackfillCheckpoint.load(tmp_path / "state.json", "test")
+    checkpoint.set_pending(
+        1,
+        "0",
+        [
+            Transaction(
+                date_local="2026-01-30T10:10:00-05:00",
+                pocket="RappiCuenta",
+                currency="COP",
+                amount=-1000.0,
+            )
+        ],
+        position=None,
+    )
+
+    with pytest.raises(ConnectionError):
+        run_backfill([], sink=sink, workers=2, checkpoint=checkpoint)
+
+    pool.assert_not_called()
+
+
+def test_checkpoint_rejects_other_source(tmp_path: Path):
+    checkpoint = BackfillCheckpoint.load(tmp_path / "state.json", "mbox:a")
+    checkpoint.advance(1, "a:0")
+
+    with pytest.raises(ValueError, match="belongs to mbox:a"):
+        BackfillCheckpoint.load(tmp_path / "state.json", "mbox:b")
+
+
+def test_backfill_cli_resumes(tmp_path: Path, raw_email_factory):
+    emails = tmp_path / "emails"
+    emails.mkdir()
+    (emails / "a.eml").write_bytes(raw_email_factory())
+    output = tmp_path / "out.jsonl"
+    args = [
+        "--eml-dir",
+        str(emails),
+        "--output",
+        str(output),
+        "--workers",
+        "1",
+        "--no-classify",
+        "--checkpoint",
+        str(tmp_path / "state.json"),
+    ]
+
+    assert main(args) == 0
+    # Only files sorting after the last processed one are read on resume
+    (emails / "0.eml").write_bytes(raw_email_factory())
+    (emails / "b.eml").write_bytes(raw_email_factory(sample="remotepass.html"))
+    assert main(args) == 0
+
+    pockets = [json.loads(line)["pocket"] for line in output.read_text().splitlines()]
+    assert pockets == ["RappiCuenta", "RemotePass Cards"]
+
+
+def test_backfill_cli_resumes_after_pending_batch(tmp_path: Path, raw_email_factory):
+    emails = tmp_path / "emails"
+    emails.mkdir()
+    (emails / "a.eml").write_bytes(raw_email_factory())
+    output = tmp_path / "out.jsonl"
+    state = tmp_path / "state.json"
+    checkpoint = BackfillCheckpoint.load(state, f"eml:{emails.resolve()}")
+    transaction = Transaction(
+        date_local="2026-01-30T10:10:00-05:00",
+        pocket="RappiCuenta",
+        currency="COP",
+        amount=-1000.0,
+    )
+    checkpoint.set_pending(1, "a.eml", [transaction], position=None)
+
+    assert (
+        main([
+            "--eml-dir",
+            str(emails),
+            "--output",
+            str(output),
+            "--workers",
+            "1",
+            "--no-classify",
+            "--checkpoint",
+            str(state),
+        ])
+        == 0
+    )
+
+    # The pending batch is replayed, and its message is not parsed again
+    assert len(output.read_text().splitlines()) == 1
@@ -0,0 +1,97 @@
+import json
+from pathlib import Path
+
+import pytest
+from pytest_mock import MockerFixture
+
+from shared_code.finmail.backfill import RawMessage, run_backfill
+from shared_code.finmail.backfill.__main__ import main  # noqa: PLC2701
+from shared_code.finmail.domain.dedup import DedupIndex
+from shared_code.finmail.models import Transaction
+from shared_code.finmail.sinks import JsonLinesSink
+
+
+@pytest.fixture
+def messages(raw_email_factory) -> list[RawMessage]:
+    return [
+        RawMessage("0", raw_email_factory()),
+        RawMessage(
+            "1",
+            raw_email_factory(
+                sample="remotepass.html", subject="Fwd: Your transaction"
+            ),
+        ),
+        RawMessage("2", raw_email_factory(sample=None, subject="Newsletter")),
+        RawMessage("3", b"From: not an email\n\nbody"),
+    ]
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_run_backfill(tmp_path: Path, messages: list[RawMessage], workers: int):
+    output = tmp_path / "transactions.jsonl"
+
+    stats = run_backfill(
+        messages, sink=JsonLinesSink(output), workers=workers, batch_size=3
+    )
+
+    assert (stats.read, stats.parsed, stats.skipped, stats.failed) == (4, 2, 1, 1)
+    assert stats.written == 2
+    lines = [json.loads(line) for line in output.read_text().splitlines()]
+    assert [line["pocket"] for line in lines] == ["RappiCuenta", "RemotePass Cards"]
+
+
+def test_run_backfill_classifies_in_batch(
+    mocker: MockerFixture, messages: list[RawMessage]
+):
+    sink = mocker.Mock()
+    classifier = mocker.Mock()
+    classifier.classify_batch.side_effect = lambda records: [
+        r.with_category("Transfer") for r in records
+    ]
+
+    run_backfill(messages, sink=sink, classifier=classifier, workers=1)
+
+    classifier.classify_batch.assert_called_once()
+    written = sink.write.call_args.args[0]
+    assert [t.category for t in written] == ["Transfer", "Transfer"]
+    assert all(isinstance(t, Transaction) for t in written)
+
+
+def test_run_backfill_skips_duplicates(
+    tmp_path: Path, messages: list[RawMessage], raw_email_factory
+):
+    output = tmp_path / "transactions.jsonl"
+    dedup_index = DedupIndex(tmp_path / "dedup.db")
+    forwarded_twice = [*messages, RawMessage("4", raw_email_factory())]
+
+    stats = run_backfill(
+        forwarded_twice,
+        sink=JsonLinesSink(output),
+        workers=1,
+        dedup_index=dedup_index,
+    )
+    rerun = run_backfill(
+        messages, sink=JsonLinesSink(output), workers=1, dedup_index=dedup_index
+    )
+
+    assert (stats.duplicates, stats.written) == (1, 2)
+    assert (rerun.duplicates, rerun.written) == (2, 0)
+    assert len(output.read_text().splitlines()) == 2
+
+
+def test_backfill_cli(tmp_path: Path, raw_email_factory):
+    (tmp_path / "a.eml").write_bytes(raw_email_factory())
+    output = tmp_path / "out.jsonl"
+
+    exit_code = main([
+        "--eml-dir",
+        str(tmp_path),
+        "--output",
+        str(output),
+        "--workers",
+        "1",
+        "--no-classify",
+    ])
+
+    assert exit_code == 0
+    assert len(output.read_text().splitlines()) == 1
@@ -0,0 +1,66 @@
+import mailbox
+from datetime import UTC, datetime
+from email import message_from_bytes
+from pathlib import Path
+
+from shared_code.finmail.backfill import iter_eml_dir, iter_mbox, message_to_payload
+
+
+def test_iter_mbox(tmp_path: Path, raw_email_factory):
+    path = tmp_path / "takeout.mbox"
+    box = mailbox.mbox(path)
+    box.add(message_from_bytes(raw_email_factory(subject="first")))
+    box.add(message_from_bytes(raw_email_factory(subject="second")))
+    box.close()
+
+    messages = list(iter_mbox(path))
+
+    assert [m.key for m in messages] == ["takeout.mbox:0", "takeout.mbox:1"]
+    assert message_to_payload(messages[1].data).subject == "second"
+
+
+def test_iter_eml_dir(tmp_path: Path, raw_email_factory):
+    (tmp_path / "b.eml").write_bytes(raw_email_factory(subject="b"))
+    (tmp_path / "a.eml").write_bytes(raw_email_factory(subject="a"))
+    (tmp_path / "notes.txt").write_text("ignored")
+
+    messages = list(iter_eml_dir(tmp_path))
+
+    assert [m.key for m in messages] == ["a.eml", "b.eml"]
+
+
+def test_iter_eml_dir_resumes_after_key(tmp_path: Path, raw_email_factory):
+    for name in ("a.eml", "c.eml", "d.eml"):
+        (tmp_path / name).write_bytes(raw_email_factory())
+
+    # Files added before the key and removed after it do not shift the resume
+    (tmp_path / "0.eml").write_bytes(raw_email_factory())
+    (tmp_path / "c.eml").unlink()
+    messages = list(iter_eml_dir(tmp_path, start=1, after="c.eml"))
+
+    assert [m.key for m in messages] == ["d.eml"]
+
+
+def test_message_to_payload_html(raw_email_factory):
+    payload = message_to_payload(raw_email_factory())
+
+    assert payload.subject == "Fwd: Resumen transferencia Bancaria"
+    assert payload.sender == "sample@email.com"
+    assert "Forwarded message" in payload.html
+    assert payload.received_at == datetime(2026, 1, 30, 15, 10, tzinfo=UTC)
+    assert payload.message_id is None
+
+
+def test_message_to_payload_message_id(raw_email_factory):
+    data = b"Message-ID: <abc123@mail.gmail.com>\n" + raw_email_factory()
+
+    assert message_to_payload(data).message_id == "<abc123@mail.gmail.com>"
+
+
+def test_message_to_payload_plain_text_is_escaped(raw_email_factory):
+    payload = message_to_payload(
+        raw_email_factory(sample=None, text="Payment <Amount>: $250")
+    )
+
+    assert payload.html.startswith("<pre>")
+    assert "Payment &lt;Amount&gt;: $250" in payload.html
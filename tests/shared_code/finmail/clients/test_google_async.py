@@ -0,0 +1,86 @@
+import asyncio
+import json
+
+import pytest
+from pytest_mock import MockerFixture
+
+from shared_code.finmail.clients import AsyncGoogleSheetsClient
+from shared_code.finmail.clients.google_async import SHEETS_API_URL
+from shared_code.finmail.models import Transaction
+
+httpx = pytest.importorskip("httpx")
+
+
+@pytest.fixture(name="requests")
+def fixture_requests() -> list:
+    return []
+
+
+@pytest.fixture(name="client")
+def fixture_client(mocker: MockerFixture, requests: list) -> AsyncGoogleSheetsClient:
+    credentials = mocker.Mock(valid=True, token="token")  # noqa: S106
+    mocker.patch.object(
+        AsyncGoogleSheetsClient, "_load_credentials", return_value=credentials
+    )
+
+    def handler(request) -> httpx.Response:
+        requests.append(request)
+        if request.url.path.endswith("/spreadsheet"):
+            return httpx.Response(
+                200, json={"sheets": [{"properties": {"title": "Sheet 1"}}]}
+            )
+        if request.method == "GET":
+            return httpx.Response(200, json={"values": [["a", "b"]]})
+        return httpx.Response(200, json={})
+
+    http_client = httpx.AsyncClient(
+        base_url=SHEETS_API_URL, transport=httpx.MockTransport(handler)
+    )
+    return AsyncGoogleSheetsClient({}, http_client=http_client)
+
+
+def test_insert_transactions_appends_rows(
+    client: AsyncGoogleSheetsClient, requests: list, transactions: list[Transaction]
+):
+    asyncio.run(
+        client.insert_transactions(
+            "https://docs.google.com/spreadsheets/d/spreadsheet/edit",
+            transactions,
+            "Transactions",
+        )
+    )
+
+    (request,) = requests
+    assert request.method == "POST"
+    assert request.url.path == (
+        "/v4/spreadsheets/spreadsheet/values/'Transactions'!A1:append"
+    )
+    assert request.url.params["insertDataOption"] == "INSERT_ROWS"
+    assert request.headers["Authorization"] == "Bearer token"
+    rows = json.loads(request.content)["values"]
+    assert rows[0][:2] == ["30/01/2026 10:10:00", "RappiCard"]
+    assert len(rows) == 2
+
+
+def test_read_all_defaults_to_first_worksheet(
+    client: AsyncGoogleSheetsClient, requests: list
+):
+    async def read_twice() -> list[list]:
+        await client.read_all("spreadsheet")
+        return await client.read_all("spreadsheet")
+
+    assert asyncio.run(read_twice()) == [["a", "b"]]
+    # The first worksheet is looked up once
+    assert [r.url.path for r in requests] == [
+        "/v4/spreadsheets/spreadsheet",
+        "/v4/spreadsheets/spreadsheet/values/'Sheet 1'",
+        "/v4/spreadsheets/spreadsheet/values/'Sheet 1'",
+    ]
+
+
+def test_refreshes_expired_credentials(client: AsyncGoogleSheetsClient):
+    client._credentials.valid = False
+
+    asyncio.run(client.read_all("spreadsheet", "Transactions"))
+
+    client._credentials.refresh.assert_called_once()
@@ -0,0 +1,25 @@
+from datetime import datetime
+
+import pytest
+
+from shared_code.finmail.models import Transaction
+
+
+@pytest.fixture(name="transactions")
+def fixture_transactions() -> list[Transaction]:
+    return [
+        Transaction(
+            date_local=datetime(2026, 1, 30, 10, 10),
+            pocket="RappiCard",
+            currency="COP",
+            amount=-25000.0,
+            merchant="Uber",
+            description="Trip\nto the airport",
+        ),
+        Transaction(
+            date_local=datetime(2026, 1, 31, 8, 0),
+            pocket="RappiCuenta",
+            currency="COP",
+            amount=150000.0,
+        ),
+    ]
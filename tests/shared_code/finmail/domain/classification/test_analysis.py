@@ -0,0 +1,213 @@
+"""Tests for the condition pattern analysis and the rule analyzer."""
+
+import csv
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+from shared_code.finmail.domain.classification import (
+    ClassificationRule,
+    PruningRuleProvider,
+    StaticRuleProvider,
+    TransactionClassifier,
+    analyze_rules,
+)
+from shared_code.finmail.domain.classification import __main__ as cli
+from shared_code.finmail.domain.classification.analysis import format_analysis
+from shared_code.finmail.domain.classification.patterns import (
+    analyze_condition,
+    condition_implies,
+)
+from shared_code.finmail.models import Transaction
+
+
+def _rule(conditions: str, category: str = "A") -> ClassificationRule:
+    return ClassificationRule(conditions=conditions, category=category)
+
+
+def _transaction(merchant: str, description: str | None = None) -> Transaction:
+    return Transaction(
+        date_local=datetime(2024, 1, 1, 12, 0),
+        pocket="Test Pocket",
+        currency="USD",
+        amount=1.0,
+        merchant=merchant,
+        description=description,
+    )
+
+
+RULES = [
+    _rule("merchant:uber", "Transport"),
+    _rule("merchant:^uber eats$", "Food"),
+    _rule("merchant:netflix", "Streaming"),
+    _rule("merchant:netflix", "Streaming"),
+    _rule("vendor:spotify", "Streaming"),
+    _rule("merchant:spotify AND description:family", "Streaming"),
+]
+
+
+@pytest.mark.parametrize(
+    ("pattern", "shape", "literals"),
+    [
+        (".*", "any", ()),
+        ("^uber$", "exact", ("uber",)),
+        ("^(?:uber|didi)$", "exact", ("uber", "didi")),
+        ("^rappi", "prefix", ("rappi",)),
+        ("^rappi.*", "prefix", ("rappi",)),
+        ("pay$", "suffix", ("pay",)),
+        (".*uber.*", "contains", ("uber",)),
+        ("uber\\.com", "contains", ("uber.com",)),
+        ("\\d+", None, ()),
+        ("^uber\\.*", None, ()),
+    ],
+)
+def test_analyze_condition_shape(
+    pattern: str, shape: str | None, literals: tuple[str, ...]
+) -> None:
+    """Test that the match set of simple patterns is recognized."""
+    condition = analyze_condition("merchant", pattern)
+
+    assert condition.shape == shape
+    assert condition.literals == literals
+
+
+@pytest.mark.parametrize(
+    ("narrow", "broad", "implied"),
+    [
+        ("^uber eats$", "uber", True),
+        ("^UBER$", "^uber", True),
+        ("^(?:uber|didi)$", "uber", False),
+        ("^rappipay", "^rappi", True),
+        ("^rappi", "^rappipay", False),
+        ("rappipay$", "pay$", True),
+        ("^uber", ".*uber.*", True),
+        ("uber eats", "eats", True),
+        ("uber", "^uber", False),
+        ("uber", ".*", True),
+        ("\\d+", "\\d+", True),
+        ("\\d+", "\\d", False),
+    ],
+)
+def test_condition_implies(narrow: str, broad: str, *, implied: bool) -> None:
+    """Test that inclusion is only claimed when it is proven."""
+    assert (
+        condition_implies(
+            analyze_condition("merchant", narrow), analyze_condition("merchant", broad)
+        )
+        is implied
+    )
+
+
+def test_analyze_rules_static_findings() -> None:
+    """Test the findings proven from the rules alone."""
+    analysis = analyze_rules(RULES)
+
+    assert [(f.position, f.kind, f.related) for f in analysis.findings] == [
+        (1, "shadowed", 0),
+        (3, "duplicate", 2),
+        (4, "unknown_field", None),
+    ]
+    assert analysis.pruned_rules() == [RULES[0], RULES[2], RULES[5]]
+
+
+def test_analyze_rules_ignores_later_broader_rules() -> None:
+    """Test that a rule is only shadowed by the rules before it."""
+    rules = [_rule("merchant:^uber eats$", "Food"), _rule("merchant:uber", "Transport")]
+
+    assert analyze_rules(rules).findings == []
+
+
+def test_analyze_rules_reports_unmatched_rules() -> None:
+    """Test that rules matching none of the sample are reported, not pruned."""
+    sample = [
+        _transaction("Uber", "Trip"),
+        _transaction("Netflix"),
+        _transaction("Spotify", "Premium"),
+        _transaction("Bookstore", "Family gift"),
+    ]
+
+    analysis = analyze_rules(RULES, sample)
+
+    unmatched = [f.position for f in analysis.findings if f.kind == "unmatched"]
+    assert unmatched == [5]
+    assert analysis.sample_size == 4
+    assert RULES[5] in analysis.pruned_rules()
+    assert RULES[5] not in analysis.pruned_rules(include_unmatched=True)
+
+
+def test_pruning_never_changes_classification() -> None:
+    """Test that the pruned rules classify like the original ones."""
+    transactions = [
+        _transaction(merchant, description)
+        for merchant in ("Uber", "Uber Eats", "Netflix", "Spotify", "Other")
+        for description in (None, "family plan")
+    ]
+    original = TransactionClassifier(rule_provider=StaticRuleProvider(RULES))
+    pruned = TransactionClassifier(
+        rule_provider=PruningRuleProvider(StaticRuleProvider(RULES))
+    )
+
+    assert pruned.classify_batch(transactions) == original.classify_batch(transactions)
+
+
+def test_pruning_keeps_rules_behind_quarantined_ones() -> None:
+    """Test that unsafe and unknown-field rules do not shadow later rules."""
+    rules = [
+        _rule("merchant:(a+)+$", "Unsafe"),
+        _rule("unknown:a", "Unknown"),
+        _rule("merchant:^aaa$", "Kept"),
+    ]
+    pruned = TransactionClassifier(
+        rule_provider=PruningRuleProvider(StaticRuleProvider(rules))
+    )
+
+    analysis = analyze_rules(rules)
+
+    assert [f.kind for f in analysis.findings] == ["unsafe", "unknown_field"]
+    assert pruned.classify(_transaction("aaa")).category == "Kept"
+
+
+def test_format_analysis() -> None:
+    """Test the sections of the report."""
+    report = format_analysis(analyze_rules(RULES))
+
+    assert "Analyzed rules: 6" in report
+    assert "Shadowed rules (never the first match): 1" in report
+    assert "#2 merchant:^uber eats$ -> Food: every match is taken by #1" in report
+    assert "sampled transactions" not in report
+    assert "Rules after pruning: 3" in report
+
+
+def test_analyze_command(tmp_path: Path, capsys: pytest.CaptureFixture[str]) -> None:
+    """Test the analyze command on a CSV export of the rules."""
+    rules_path = tmp_path / "rules.csv"
+    with rules_path.open("w", encoding="utf-8", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(["conditions", "category"])
+        writer.writerows((rule.conditions, rule.category) for rule in RULES)
+    transactions_path = tmp_path / "transactions.jsonl"
+    transactions_path.write_text(
+        _transaction("Uber").model_dump_json() + "\n", encoding="utf-8"
+    )
+    output_path = tmp_path / "pruned.csv"
+
+    exit_code = cli.main([
+        "analyze",
+        "--rules",
+        str(rules_path),
+        "--transactions",
+        str(transactions_path),
+        "--output",
+        str(output_path),
+        "--prune-unmatched",
+    ])
+
+    assert exit_code == 0
+    assert "Rules matching none of the 1 sampled transactions: 2" in (
+        capsys.readouterr().out
+    )
+    with output_path.open(encoding="utf-8", newline="") as file:
+        assert list(csv.DictReader(file)) == [
+            {"conditions": "merchant:uber", "category": "Transport"}
+        ]
@@ -1,6 +1,8 @@
 """Tests for TransactionClassifier."""
 
+import time
 from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 
 import pytest
@@ -10,7 +12,10 @@ from shared_code.finmail.domain.classification import (
     ClassificationRule,
     TransactionClassifier,
 )
-from shared_code.finmail.models import Transaction
+from shared_code.finmail.domain.classification.classifier import (
+    _CompiledRules,  # noqa: PLC2701
+)
+from shared_code.finmail.models import Transaction, TransactionRecord
 
 CreateTransactionType = Callable[..., Transaction]
 
@@ -298,7 +303,7 @@ def test_is_cache_expired_when_rules_loaded_at_is_none(mocker: MockerFixture) ->
     """Test that cache is expired when rules are loaded but timestamp is None."""
     mock_provider = mocker.Mock()
     classifier = TransactionClassifier(rule_provider=mock_provider)
-    classifier._compiled_rules = []
+    classifier._compiled = _CompiledRules()
     classifier._rules_loaded_at = None
 
     assert classifier._is_cache_expired() is True
@@ -308,7 +313,7 @@ def test_is_cache_expired_when_compiled_rules_is_none(mocker: MockerFixture) ->
     """Test that cache is expired when timestamp exists but rules are None."""
     mock_provider = mocker.Mock()
     classifier = TransactionClassifier(rule_provider=mock_provider)
-    classifier._compiled_rules = None
+    classifier._compiled = None
     classifier._rules_loaded_at = datetime.now()
 
     assert classifier._is_cache_expired() is True
@@ -318,7 +323,7 @@ def test_is_cache_expired_when_within_ttl(mocker: MockerFixture) -> None:
     """Test that cache is not expired when within TTL period."""
     mock_provider = mocker.Mock()
     classifier = TransactionClassifier(rule_provider=mock_provider, ttl_min=60.0)
-    classifier._compiled_rules = []
+    classifier._compiled = _CompiledRules()
     classifier._rules_loaded_at = datetime.now() - timedelta(minutes=30)
 
     assert classifier._is_cache_expired() is False
@@ -328,7 +333,7 @@ def test_is_cache_expired_when_exactly_at_ttl(mocker: MockerFixture) -> None:
     """Test that cache is expired when exactly at TTL boundary."""
     mock_provider = mocker.Mock()
     classifier = TransactionClassifier(rule_provider=mock_provider, ttl_min=60.0)
-    classifier._compiled_rules = []
+    classifier._compiled = _CompiledRules()
     classifier._rules_loaded_at = datetime.now() - timedelta(minutes=60)
 
     assert classifier._is_cache_expired() is True
@@ -338,7 +343,7 @@ def test_is_cache_expired_when_beyond_ttl(mocker: MockerFixture) -> None:
     """Test that cache is expired when beyond TTL period."""
     mock_provider = mocker.Mock()
     classifier = TransactionClassifier(rule_provider=mock_provider, ttl_min=60.0)
-    classifier._compiled_rules = []
+    classifier._compiled = _CompiledRules()
     classifier._rules_loaded_at = datetime.now() - timedelta(minutes=61)
 
     assert classifier._is_cache_expired() is True
@@ -348,7 +353,7 @@ def test_is_cache_expired_with_custom_ttl(mocker: MockerFixture) -> None:
     """Test cache expiration with custom TTL value."""
     mock_provider = mocker.Mock()
     classifier = TransactionClassifier(rule_provider=mock_provider, ttl_min=5.0)
-    classifier._compiled_rules = []
+    classifier._compiled = _CompiledRules()
     classifier._rules_loaded_at = datetime.now() - timedelta(minutes=6)
 
     assert classifier._is_cache_expired() is True
@@ -358,12 +363,27 @@ def test_is_cache_expired_with_very_recent_load(mocker: MockerFixture) -> None:
     """Test that cache is not expired immediately after loading."""
     mock_provider = mocker.Mock()
     classifier = TransactionClassifier(rule_provider=mock_provider, ttl_min=60.0)
-    classifier._compiled_rules = []
+    classifier._compiled = _CompiledRules()
     classifier._rules_loaded_at = datetime.now()
 
     assert classifier._is_cache_expired() is False
 
 
+def test_refresh_rules_loads_once_across_threads(mocker: MockerFixture) -> None:
+    """Test that threads finding the cache expired reload the rules once."""
+    mock_provider = mocker.Mock()
+    mock_provider.get_rules.side_effect = lambda: time.sleep(0.05) or [
+        ClassificationRule(conditions="merchant:uber", category="Transport")
+    ]
+    classifier = TransactionClassifier(rule_provider=mock_provider)
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        reloaded = list(executor.map(lambda _: classifier.refresh_rules(), range(4)))
+
+    assert reloaded.count(True) == 1
+    mock_provider.get_rules.assert_called_once()
+
+
 def test_classify_amount_exact_match_ignoring_decimals(
     mocker: MockerFixture, create_transaction: CreateTransactionType
 ) -> None:
@@ -432,3 +452,43 @@ def test_classify_negative_amount(
     transaction3.amount = 100.0
     result3 = classifier3.classify(transaction3)
     assert result3.category == "Pending Classification"
+
+
+def test_classify_batch(
+    mocker: MockerFixture, create_transaction: CreateTransactionType
+) -> None:
+    """Test batch classification loads rules once and keeps order."""
+    mock_provider = mocker.Mock()
+    mock_provider.get_rules.return_value = [
+        ClassificationRule(conditions="merchant:.*uber.*", category="Transport")
+    ]
+
+    classifier = TransactionClassifier(rule_provider=mock_provider)
+    results = classifier.classify_batch([
+        create_transaction(merchant="Uber"),
+        create_transaction(merchant="Amazon"),
+    ])
+
+    assert [r.category for r in results] == ["Transport", "Pending Classification"]
+    mock_provider.get_rules.assert_called_once()
+
+
+def test_classify_batch_records(
+    mocker: MockerFixture, create_transaction: CreateTransactionType
+) -> None:
+    """Test that records are classified like models, and stay records."""
+    mock_provider = mocker.Mock()
+    mock_provider.get_rules.return_value = [
+        ClassificationRule(conditions="merchant:uber", category="Transport")
+    ]
+    classifier = TransactionClassifier(rule_provider=mock_provider)
+    transactions = [create_transaction(merchant="Uber"), create_transaction("Other")]
+
+    records = classifier.classify_batch([
+        TransactionRecord.from_model(t) for t in transactions
+    ])
+
+    assert all(type(record) is TransactionRecord for record in records)
+    assert [record.to_model() for record in records] == classifier.classify_batch(
+        transactions
+    )
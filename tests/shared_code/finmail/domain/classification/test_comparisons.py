@@ -0,0 +1,190 @@
+"""Tests for typed comparisons in classification rules."""
+
+from datetime import UTC, datetime
+
+import pytest
+
+from shared_code.finmail.domain.classification import (
+    ClassificationRule,
+    StaticRuleProvider,
+    TransactionClassifier,
+    analyze_rules,
+    rules_disjoint,
+)
+from shared_code.finmail.domain.classification.comparisons import (
+    Comparison,
+    IntervalIndex,
+    comparison_implies,
+    parse_comparison,
+)
+from shared_code.finmail.models import Transaction
+
+# 2024-01-06 is a Saturday
+SATURDAY = datetime(2024, 1, 6, 23, 30)
+MONDAY = datetime(2024, 1, 8, 9, 0)
+
+
+def _transaction(amount: float, date_local: datetime = MONDAY) -> Transaction:
+    return Transaction(
+        date_local=date_local,
+        pocket="Main",
+        currency="COP",
+        amount=amount,
+        merchant="Store",
+    )
+
+
+@pytest.mark.parametrize(
+    ("field_name", "pattern", "value", "expected"),
+    [
+        ("amount", "<-500000", -600000.0, True),
+        ("amount", "<-500000", -500000.0, False),
+        ("amount", "<= -500000", -500000.0, True),
+        ("amount", ">=100", 100.0, True),
+        ("amount", "=12.5", 12.5, True),
+        ("date_local", "weekday in 5,6", SATURDAY, True),
+        ("date_local", "weekday in 5,6", MONDAY, False),
+        ("date_local", "hour in 0..5,22..23", SATURDAY, True),
+        ("date_local", "month>=12", SATURDAY, False),
+        ("date_local", "<=2024-01-06", SATURDAY, True),
+        ("date_local", "<2024-01-06", SATURDAY, False),
+        ("date_local", "=2024-01-06", SATURDAY, True),
+        ("date_local", ">2024-01-06 12:00", SATURDAY, True),
+        ("date_local", ">=2024-01-07", SATURDAY.replace(tzinfo=UTC), False),
+    ],
+)
+def test_comparison_contains(
+    field_name: str, pattern: str, value: object, *, expected: bool
+) -> None:
+    """Test that comparisons hold on the native value."""
+    comparison = parse_comparison(field_name, pattern)
+
+    assert comparison.contains(comparison.key(value)) is expected
+
+
+@pytest.mark.parametrize(
+    ("field_name", "pattern"),
+    [("amount", "-.*"), ("amount", "^5"), ("date_local", "2024-01"), ("pocket", "<5")],
+)
+def test_parse_comparison_leaves_regexes(field_name: str, pattern: str) -> None:
+    """Test that patterns not starting like a comparison stay regexes."""
+    assert parse_comparison(field_name, pattern) is None
+
+
+@pytest.mark.parametrize(
+    ("field_name", "pattern"),
+    [("amount", "<abc"), ("date_local", ">=yesterday"), ("date_local", "hour in 1-")],
+)
+def test_parse_comparison_rejects_malformed(field_name: str, pattern: str) -> None:
+    """Test that malformed comparisons fail rule validation."""
+    with pytest.raises(ValueError, match="Invalid comparison"):
+        parse_comparison(field_name, pattern)
+    with pytest.raises(ValueError, match="Invalid comparison"):
+        ClassificationRule(conditions=f"{field_name}:{pattern}", category="A")
+
+
+def test_comparison_implies() -> None:
+    """Test inclusion between comparisons of the same key."""
+    below_big = parse_comparison("amount", "<-500000")
+    negative = parse_comparison("amount", "<0")
+    weekend = parse_comparison("date_local", "weekday in 5,6")
+    saturday = parse_comparison("date_local", "weekday=5")
+
+    assert comparison_implies(below_big, negative)
+    assert not comparison_implies(negative, below_big)
+    assert comparison_implies(saturday, weekend)
+    assert not comparison_implies(weekend, saturday)
+
+
+def test_interval_index_candidates() -> None:
+    """Test that the index only selects items whose comparisons may hold."""
+    index = IntervalIndex(
+        ["big", "negative", "any", "positive"],
+        {
+            0: [parse_comparison("amount", "<-500000")],
+            1: [parse_comparison("amount", "<0")],
+            3: [parse_comparison("amount", ">0")],
+        },
+    )
+
+    assert index.candidates(-600000.0) == ("big", "negative", "any")
+    assert index.candidates(-500000.0) == ("negative", "any")
+    assert index.candidates(0.0) == ("any",)
+    assert index.candidates(5.0) == ("any", "positive")
+    assert index.candidates(None) == ("any",)
+
+
+def test_interval_index_mixed_bounds() -> None:
+    """Test that open and closed bounds are indexed in any interval order."""
+    comparison = Comparison(
+        "amount",
+        None,
+        ((5, 10, False, True), (5, 7, True, False), (12, 12, True, True)),
+    )
+    index = IntervalIndex(["mixed", "any"], {0: [comparison]})
+
+    for key in [4.0, 5.0, 6.0, 7.0, 10.0, 11.0, 12.0, 13.0]:
+        expected = ("mixed", "any") if comparison.contains(key) else ("any",)
+        assert index.candidates(key) == expected, key
+    assert index.candidates(5.0) == ("mixed", "any")
+
+
+def test_interval_index_many_items() -> None:
+    """Test that an index of 1,000 items selects exactly those that hold."""
+    operators = ["<", "<=", ">", ">=", "="]
+    constraints = {
+        position: [
+            parse_comparison("amount", f"{operators[position % 5]}{position % 97}"),
+            parse_comparison("amount", f"<={position % 89 + 20}"),
+        ]
+        for position in range(1_000)
+        if position % 10
+    }
+    index = IntervalIndex(range(1_000), constraints)
+
+    for key in [x / 2 for x in range(-4, 240)]:
+        assert index.candidates(key) == tuple(
+            position
+            for position in range(1_000)
+            if all(c.contains(key) for c in constraints.get(position, ()))
+        )
+
+
+def test_classify_with_comparisons() -> None:
+    """Test that typed and regex conditions combine, in rule order."""
+    rules = [
+        ClassificationRule(conditions="amount:<-500000", category="Large"),
+        ClassificationRule(
+            conditions="amount:<0 AND date_local:weekday in 5,6", category="Weekend"
+        ),
+        ClassificationRule(conditions="amount:-.*", category="Expense"),
+        ClassificationRule(conditions="amount:>=0", category="Income"),
+    ]
+    classifier = TransactionClassifier(rule_provider=StaticRuleProvider(rules))
+
+    results = classifier.classify_batch([
+        _transaction(-600000.0, SATURDAY),
+        _transaction(-20.0, SATURDAY),
+        _transaction(-20.0),
+        _transaction(20.0),
+    ])
+
+    assert [t.category for t in results] == ["Large", "Weekend", "Expense", "Income"]
+
+
+def test_analysis_compares_intervals() -> None:
+    """Test that comparisons are shadowed, disjoint and sampled by value."""
+    rules = [
+        ClassificationRule(conditions="amount:<0", category="Expense"),
+        ClassificationRule(conditions="amount:<-500000", category="Large"),
+        ClassificationRule(conditions="amount:>1000000", category="Huge"),
+    ]
+
+    analysis = analyze_rules(rules, [_transaction(-5.0)])
+
+    assert [(f.position, f.kind) for f in analysis.findings] == [
+        (1, "shadowed"),
+        (2, "unmatched"),
+    ]
+    assert rules_disjoint(rules[0], rules[2])
+    assert not rules_disjoint(rules[0], rules[1])
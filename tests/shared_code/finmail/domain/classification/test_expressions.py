@@ -0,0 +1,157 @@
+"""Tests for rule expressions and their evaluation plans."""
+
+import re
+from datetime import datetime
+
+import pytest
+
+from shared_code.finmail.domain.classification import (
+    ClassificationRule,
+    StaticRuleProvider,
+    TransactionClassifier,
+    analyze_rules,
+)
+from shared_code.finmail.domain.classification.expressions import (
+    And,
+    Not,
+    Or,
+    Term,
+    is_conjunction,
+    parse_expression,
+    required_terms,
+)
+from shared_code.finmail.domain.classification.plans import (
+    compile_term,
+    field_values,
+)
+from shared_code.finmail.models import Transaction
+
+
+def _transaction(merchant: str | None, pocket: str = "Main") -> Transaction:
+    return Transaction(
+        date_local=datetime(2024, 1, 1, 12, 0),
+        pocket=pocket,
+        currency="USD",
+        amount=1.0,
+        merchant=merchant,
+    )
+
+
+@pytest.mark.parametrize(
+    ("expression", "expected"),
+    [
+        ("merchant:uber", Term("merchant", "uber")),
+        (
+            "merchant:uber AND pocket:Main",
+            And((Term("merchant", "uber"), Term("pocket", "Main"))),
+        ),
+        (
+            "merchant:uber OR merchant:didi AND pocket:Main",
+            Or((
+                Term("merchant", "uber"),
+                And((Term("merchant", "didi"), Term("pocket", "Main"))),
+            )),
+        ),
+        (
+            "(merchant:uber OR merchant:didi) AND NOT pocket:Work",
+            And((
+                Or((Term("merchant", "uber"), Term("merchant", "didi"))),
+                Not(Term("pocket", "Work")),
+            )),
+        ),
+        # Parentheses balanced within a pattern belong to the regex
+        ("merchant:^(?:uber|didi)$", Term("merchant", "^(?:uber|didi)$")),
+        (
+            "(merchant:(uber|didi) OR pocket:[)])",
+            Or((Term("merchant", "(uber|didi)"), Term("pocket", "[)]"))),
+        ),
+        # Keywords not followed by an operand are part of the pattern
+        ("merchant:Salt AND Pepper", Term("merchant", "Salt AND Pepper")),
+        ("merchant:Black OR White", Term("merchant", "Black OR White")),
+    ],
+)
+def test_parse_expression(expression: str, expected: object) -> None:
+    """Test precedence, grouping and backward-compatible patterns."""
+    assert parse_expression(expression) == expected
+
+
+@pytest.mark.parametrize(
+    ("expression", "message"),
+    [
+        ("uber", "Expected 'field:pattern'"),
+        ("(merchant:uber OR merchant:didi", "Missing '\\)'"),
+        ("merchant:uber AND NOT pocket", "Expected 'field:pattern'"),
+    ],
+)
+def test_parse_expression_errors(expression: str, message: str) -> None:
+    """Test that malformed expressions are rejected."""
+    with pytest.raises(ValueError, match=message):
+        parse_expression(expression)
+
+
+def test_required_terms() -> None:
+    """Test that only the conditions joined by the top-level AND are required."""
+    expression = parse_expression(
+        "merchant:uber AND (pocket:Main OR pocket:Travel) AND NOT description:eats"
+    )
+
+    assert required_terms(expression) == [Term("merchant", "uber")]
+    assert not is_conjunction(expression)
+    assert is_conjunction(parse_expression("merchant:uber AND pocket:Main"))
+
+
+@pytest.mark.parametrize(
+    "pattern",
+    ["uber", ".*uber.*", "^uber", "eats$", "^uber$", "^(?:uber|didi)$", ".*"],
+)
+@pytest.mark.parametrize(
+    "value", ["Uber", "UBER EATS", "uber\n", "Über", "didi", "x uber", ""]
+)
+def test_literal_checks_match_like_regex(pattern: str, value: str) -> None:
+    """Test that literal fast paths agree with a case-insensitive search."""
+    check, _ = compile_term(Term("merchant", pattern), 0)
+    texts, folded = field_values(_transaction(value), (("merchant", None),))
+
+    assert check(texts, folded) is bool(re.search(pattern, value, re.IGNORECASE))
+
+
+def test_classify_with_or_and_not() -> None:
+    """Test that OR, NOT and groups classify as written."""
+    rules = [
+        ClassificationRule(
+            conditions="(merchant:uber OR merchant:didi) AND NOT merchant:eats",
+            category="Transport",
+        ),
+        ClassificationRule(conditions="NOT pocket:^Main$", category="Other"),
+    ]
+    classifier = TransactionClassifier(rule_provider=StaticRuleProvider(rules))
+
+    results = classifier.classify_batch([
+        _transaction("Uber"),
+        _transaction("DiDi Chuxing"),
+        _transaction("Uber Eats"),
+        _transaction("Uber Eats", pocket="Travel"),
+        _transaction(None, pocket="Travel"),
+    ])
+
+    assert [t.category for t in results] == [
+        "Transport",
+        "Transport",
+        "Pending Classification",
+        "Other",
+        "Other",
+    ]
+
+
+def test_analyze_rules_with_or_and_not() -> None:
+    """Test that expressions with OR are not claimed to shadow other rules."""
+    rules = [
+        ClassificationRule(conditions="merchant:uber OR merchant:didi", category="A"),
+        ClassificationRule(conditions="merchant:^uber$", category="B"),
+        ClassificationRule(conditions="merchant:didi OR merchant:uber", category="C"),
+        ClassificationRule(conditions="NOT merchant:.*", category="D"),
+    ]
+
+    analysis = analyze_rules(rules, [_transaction("Uber"), _transaction("Cabify")])
+
+    assert [(f.position, f.kind) for f in analysis.findings] == [(3, "unmatched")]
@@ -0,0 +1,127 @@
+"""Tests for the rule order optimizer."""
+
+from datetime import datetime
+from itertools import product
+
+import pytest
+from pytest_mock import MockerFixture
+
+from shared_code.finmail.domain.classification import (
+    ClassificationRule,
+    TransactionClassifier,
+    can_swap,
+    optimize_rule_order,
+    rules_disjoint,
+)
+from shared_code.finmail.domain.classification.optimizer import expected_evaluations
+from shared_code.finmail.models import Transaction
+
+
+def _rule(conditions: str, category: str = "A") -> ClassificationRule:
+    return ClassificationRule(conditions=conditions, category=category)
+
+
+@pytest.mark.parametrize(
+    ("a", "b", "disjoint"),
+    [
+        ("merchant:^uber$", "merchant:^didi$", True),
+        ("merchant:^(?:uber|didi)$", "merchant:^cabify$", True),
+        ("merchant:^(uber|didi)$", "merchant:.*DIDI.*", False),
+        ("merchant:^uber$", "merchant:eats", True),
+        ("merchant:^uber\\.com$", "merchant:uber.com", False),
+        ("merchant:^rappi", "merchant:^netflix", True),
+        ("merchant:^rappi", "merchant:^RAPPIPAY", False),
+        ("merchant:pay$", "merchant:card$", True),
+        ("merchant:pay$", "merchant:rappipay$", False),
+        ("merchant:^rappi", "merchant:pay$", False),
+        ("merchant:uber", "merchant:netflix", False),
+        ("merchant:^uber$", "description:^didi$", False),
+        ("pocket:^a$ AND merchant:^uber$", "pocket:^a$ AND merchant:^didi$", True),
+        ("merchant:^\\d+$", "merchant:^uber$", True),
+        ("merchant:^\\d+$", "merchant:^[a-z]+$", False),
+    ],
+)
+def test_rules_disjoint(a: str, b: str, disjoint: bool) -> None:
+    """Test which rules are proven to never match the same transaction."""
+    assert rules_disjoint(_rule(a), _rule(b)) is disjoint
+    assert rules_disjoint(_rule(b), _rule(a)) is disjoint
+
+
+def test_can_swap_rules_with_the_same_category() -> None:
+    """Test that overlapping rules can swap if they assign the same category."""
+    assert can_swap(_rule("merchant:uber", "Taxi"), _rule("merchant:didi", "Taxi"))
+    assert not can_swap(_rule("merchant:uber", "Taxi"), _rule("merchant:ub", "Food"))
+
+
+def test_optimize_rule_order_moves_hot_rules_up() -> None:
+    """Test that hot rules move above colder rules they do not conflict with."""
+    rules = [
+        _rule("merchant:^netflix$", "Streaming"),
+        _rule("merchant:uber", "Transport"),
+        _rule("merchant:uber eats", "Food"),
+        _rule("merchant:^rappi", "Food"),
+    ]
+    hits = {
+        ("merchant:uber eats", "Food"): 50,
+        ("merchant:^rappi", "Food"): 100,
+        ("merchant:uber", "Transport"): 10,
+    }
+
+    order = optimize_rule_order(rules, hits)
+
+    # "uber" may match anything ("rappi uber"), so the Food rules stay below it
+    assert order == [1, 3, 2, 0]
+    assert expected_evaluations([rules[i] for i in order], hits, 200) < (
+        expected_evaluations(rules, hits, 200)
+    )
+
+
+def test_optimize_rule_order_keeps_order_without_hits() -> None:
+    """Test that the original order is kept without hit statistics."""
+    rules = [_rule(f"merchant:^m{i}$", f"C{i}") for i in range(5)]
+
+    assert optimize_rule_order(rules, {}) == list(range(5))
+
+
+def test_reordered_classifier_classifies_the_same(mocker: MockerFixture) -> None:
+    """Test that the reordered rules classify every transaction the same way."""
+    rules = [
+        _rule("merchant:^uber$", "Transport"),
+        _rule("merchant:uber", "Food"),
+        _rule("merchant:^didi", "Transport"),
+        _rule("description:trip AND merchant:^(?:uber|didi)$", "Trips"),
+        _rule("merchant:eats$", "Food"),
+        _rule("description:^rent$", "Housing"),
+    ]
+    hits = {(rule.conditions, rule.category): i * 10 for i, rule in enumerate(rules)}
+    provider = mocker.Mock()
+    provider.get_rules.return_value = rules
+    plain = TransactionClassifier(rule_provider=provider)
+    reordered = TransactionClassifier(rule_provider=provider, rule_hits=hits)
+    transactions = [
+        Transaction(
+            date_local=datetime(2024, 1, 1, 12, 0),
+            pocket="Test Pocket",
+            currency="USD",
+            amount=1.0,
+            merchant=merchant,
+            description=description,
+        )
+        for merchant, description in product(
+            ["Uber", "uber eats", "DiDi", "didi food", "Rappi", None],
+            ["trip", "rent", "Rent ", None],
+        )
+    ]
+
+    assert reordered.classify_batch(transactions) == plain.classify_batch(transactions)
+    assert reordered._compiled.entries != plain._compiled.entries
+
+
+def test_expected_evaluations() -> None:
+    """Test the estimate of rules evaluated per transaction."""
+    rules = [_rule("merchant:a", "A"), _rule("merchant:b", "B")]
+    hits = {("merchant:a", "A"): 2, ("merchant:b", "B"): 1}
+
+    # 2 transactions at rule 1, 1 at rule 2, 1 unmatched evaluating both
+    assert expected_evaluations(rules, hits, 4) == (2 + 2 + 2) / 4
+    assert expected_evaluations(rules, hits, 0) == 0.0
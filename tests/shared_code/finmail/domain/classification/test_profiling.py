@@ -0,0 +1,180 @@
+"""Tests for RuleProfiler and the rule profile report."""
+
+import json
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+from pytest_mock import MockerFixture
+
+from shared_code.finmail.domain.classification import (
+    ClassificationRule,
+    RuleProfiler,
+    TransactionClassifier,
+)
+from shared_code.finmail.domain.classification import __main__ as cli
+from shared_code.finmail.domain.classification.profiling import (
+    format_report,
+    load_profiles,
+)
+from shared_code.finmail.models import Transaction
+
+RULES = [
+    ClassificationRule(
+        conditions="merchant:uber AND description:trip", category="Taxi"
+    ),
+    ClassificationRule(conditions="merchant:uber", category="Transport"),
+    ClassificationRule(conditions="merchant:netflix", category="Streaming"),
+]
+
+
+def _transaction(merchant: str | None, description: str | None = None) -> Transaction:
+    return Transaction(
+        date_local=datetime(2024, 1, 1, 12, 0),
+        pocket="Test Pocket",
+        currency="USD",
+        amount=100.0,
+        merchant=merchant,
+        description=description,
+    )
+
+
+@pytest.fixture
+def transactions() -> list[Transaction]:
+    return [
+        _transaction("Uber", "Trip home"),
+        _transaction("Uber Eats", "Dinner"),
+        _transaction("Uber", "Lunch"),
+        _transaction(None),
+    ]
+
+
+@pytest.fixture
+def rule_provider(mocker: MockerFixture):
+    provider = mocker.Mock()
+    provider.get_rules.return_value = RULES
+    return provider
+
+
+def test_profiled_classification_matches_unprofiled(
+    rule_provider, transactions: list[Transaction]
+) -> None:
+    """Test that profiling does not change the classification."""
+    plain = TransactionClassifier(rule_provider=rule_provider)
+    profiled = TransactionClassifier(
+        rule_provider=rule_provider, profiler=RuleProfiler()
+    )
+
+    assert profiled.classify_batch(transactions) == plain.classify_batch(transactions)
+
+
+def test_profiler_counts_evaluations_and_matches(
+    rule_provider, transactions: list[Transaction]
+) -> None:
+    """Test the rule and pattern counters after a batch."""
+    profiler = RuleProfiler()
+    TransactionClassifier(
+        rule_provider=rule_provider, profiler=profiler
+    ).classify_batch(transactions)
+
+    profile = profiler.to_dict()
+    taxi, transport, streaming = profile["rules"]
+    assert profile["classified"] == 4
+    assert (taxi["evaluations"], taxi["matches"]) == (4, 1)
+    assert [(p["evaluations"], p["matches"]) for p in taxi["patterns"]] == [
+        (3, 3),
+        (3, 1),
+    ]
+    assert (transport["evaluations"], transport["matches"]) == (3, 2)
+    assert (streaming["evaluations"], streaming["matches"]) == (1, 0)
+    assert taxi["total_s"] > 0
+
+
+def test_profiler_keeps_counters_across_reloads(
+    rule_provider, transactions: list[Transaction]
+) -> None:
+    """Test that counters follow rules, not positions, when rules are reloaded."""
+    profiler = RuleProfiler()
+    classifier = TransactionClassifier(rule_provider=rule_provider, profiler=profiler)
+    classifier.classify_batch(transactions)
+
+    rule_provider.get_rules.return_value = [RULES[2], RULES[1]]
+    classifier._load_and_compile_rules()
+    classifier.classify(transactions[1])
+
+    streaming, transport, taxi = profiler.to_dict()["rules"]
+    assert (streaming["position"], streaming["evaluations"]) == (0, 2)
+    assert (transport["position"], transport["matches"]) == (1, 3)
+    assert taxi["position"] is None
+
+
+def test_profiler_exports_periodically(
+    tmp_path: Path, rule_provider, transactions: list[Transaction]
+) -> None:
+    """Test that the profile is exported every `export_every` classifications."""
+    path = tmp_path / "profile-{pid}.json"
+    profiler = RuleProfiler(export_path=path, export_every=2)
+    classifier = TransactionClassifier(rule_provider=rule_provider, profiler=profiler)
+
+    classifier.classify(transactions[0])
+    assert not list(tmp_path.iterdir())
+    classifier.classify(transactions[1])
+
+    (exported,) = tmp_path.iterdir()
+    assert json.loads(exported.read_text())["classified"] == 2
+
+
+def test_load_profiles_merges_counters(
+    tmp_path: Path, rule_provider, transactions: list[Transaction]
+) -> None:
+    """Test that the profiles of several workers are summed per rule."""
+    paths = []
+    for worker in range(2):
+        profiler = RuleProfiler()
+        TransactionClassifier(
+            rule_provider=rule_provider, profiler=profiler
+        ).classify_batch(transactions)
+        paths.append(tmp_path / f"profile-{worker}.json")
+        profiler.export(paths[-1])
+
+    profile = load_profiles(paths)
+
+    assert profile["classified"] == 8
+    assert [rule["matches"] for rule in profile["rules"]] == [2, 4, 0]
+    assert profile["rules"][0]["patterns"][1]["evaluations"] == 6
+
+
+def test_report_lists_hot_and_dead_rules(
+    rule_provider, transactions: list[Transaction]
+) -> None:
+    """Test the sections of the report."""
+    profiler = RuleProfiler()
+    TransactionClassifier(
+        rule_provider=rule_provider, profiler=profiler
+    ).classify_batch(transactions)
+
+    report = format_report(profiler.to_dict(), top=1)
+
+    hot = report.split("Hot rules")[1].split("Dead rules")[0]
+    assert "#2 merchant:uber -> Transport" in hot
+    assert "Taxi" not in hot
+    assert "Dead rules (no matches): 1" in report
+    assert "#3 merchant:netflix -> Streaming" in report
+    assert "Expensive patterns" in report
+
+
+def test_report_command(
+    tmp_path: Path,
+    capsys: pytest.CaptureFixture[str],
+    rule_provider,
+    transactions: list[Transaction],
+) -> None:
+    """Test the report command on an exported profile."""
+    profiler = RuleProfiler()
+    TransactionClassifier(
+        rule_provider=rule_provider, profiler=profiler
+    ).classify_batch(transactions)
+    profiler.export(tmp_path / "profile.json")
+
+    assert cli.main(["report", str(tmp_path / "profile.json")]) == 0
+    assert "Classified transactions: 4" in capsys.readouterr().out
@@ -0,0 +1,181 @@
+"""Tests for regex screening and rule quarantine."""
+
+import re
+from datetime import datetime
+
+import pytest
+from pytest_mock import MockerFixture
+
+from shared_code.finmail.domain.classification import (
+    ClassificationRule,
+    StaticRuleProvider,
+    TransactionClassifier,
+    analyze_rules,
+)
+from shared_code.finmail.domain.classification import classifier as classifier_module
+from shared_code.finmail.domain.classification.safety import (
+    compile_pattern,
+    screen_pattern,
+)
+from shared_code.finmail.exceptions import UnsafePatternError
+from shared_code.finmail.models import Transaction
+
+# Quadratic, so not screened, but slow on long values
+SLOW_PATTERN = "(ab*)+$"
+
+
+def _transaction(merchant: str) -> Transaction:
+    return Transaction(
+        date_local=datetime(2024, 1, 1, 12, 0),
+        pocket="Test Pocket",
+        currency="USD",
+        amount=1.0,
+        merchant=merchant,
+    )
+
+
+@pytest.mark.parametrize(
+    "pattern",
+    [
+        "(a+)+$",
+        "(a*)*",
+        "(\\w+\\s?)*$",
+        "((a+)b?)+",
+        "x(.*)+y",
+        "(a|aa)*c",
+        "(?=(a+)+)b",
+        "(x+x+)+y",
+        "(\\w+\\w+)+$",
+        "([a-z]+[a-z0-9]+)+x",
+        "(x+,?x+)+y",
+        "(a|a)+$",
+        "(ab|ab)+$",
+    ],
+)
+def test_screen_pattern_flags_exponential_patterns(pattern: str) -> None:
+    """Test that nested and ambiguous repetitions are flagged."""
+    assert screen_pattern(pattern) is not None
+
+
+@pytest.mark.parametrize(
+    "pattern",
+    [
+        ".*uber.*",
+        "^(?:uber|didi)$",
+        "(?:uber|didi)+",
+        "(ab*)+",
+        "(\\w+\\s)+",
+        "(\\d+)(\\.\\d+)*",
+        "(foo\\s?)+",
+        "(?>a+)+",
+        "(a++)+",
+        "(x+y+)+z",
+        "(\\d+[.,]\\d+)+",
+        "(a|ab)+$",
+    ],
+)
+def test_screen_pattern_accepts_safe_patterns(pattern: str) -> None:
+    """Test that unambiguous repetitions are not flagged."""
+    assert screen_pattern(pattern) is None
+
+
+def test_compile_pattern() -> None:
+    """Test that safe patterns compile case-insensitively and unsafe ones fail."""
+    assert compile_pattern("uber").search("UBER EATS")
+    with pytest.raises(UnsafePatternError, match="nested unbounded quantifiers"):
+        compile_pattern("(a+)+$")
+    with pytest.raises(re.error):
+        compile_pattern("(")
+
+
+def test_compile_pattern_with_re2() -> None:
+    """Test that RE2 compiles unsafe patterns and `re` takes what it rejects."""
+    re2 = pytest.importorskip("re2")
+
+    unsafe = compile_pattern("(a+)+$", re2)
+    lookahead = compile_pattern("uber(?= eats)", re2)
+
+    assert not unsafe.search("a" * 100 + "!")
+    assert isinstance(lookahead, re.Pattern)
+    assert lookahead.search("UBER EATS")
+
+
+def test_classifier_quarantines_unsafe_rules() -> None:
+    """Test that unsafe rules are skipped and the next rule applies."""
+    rules = [
+        ClassificationRule(conditions="merchant:(u+)+ber", category="Unsafe"),
+        ClassificationRule(conditions="merchant:uber", category="Transport"),
+    ]
+    classifier = TransactionClassifier(rule_provider=StaticRuleProvider(rules))
+
+    result = classifier.classify(_transaction("Uber"))
+
+    assert result.category == "Transport"
+    assert classifier.quarantined == {
+        ("merchant:(u+)+ber", "Unsafe"): "nested unbounded quantifiers"
+    }
+
+
+def test_classifier_quarantines_slow_rules() -> None:
+    """Test that a rule exceeding the match budget is skipped afterwards."""
+    rules = [
+        ClassificationRule(conditions=f"merchant:{SLOW_PATTERN}", category="Slow"),
+        ClassificationRule(conditions="merchant:a", category="Other"),
+    ]
+    classifier = TransactionClassifier(
+        rule_provider=StaticRuleProvider(rules), match_budget_ms=1.0
+    )
+    slow_value = "a" * 2_000 + "!"
+    classifier.refresh_rules()
+    compiled = classifier._compiled
+
+    first = classifier.classify(_transaction(slow_value))
+    second = classifier.classify(_transaction("ab"))
+
+    assert first.category == "Other"
+    assert second.category == "Other"
+    assert list(classifier.quarantined) == [(f"merchant:{SLOW_PATTERN}", "Slow")]
+    # The rules are replaced, not changed under concurrent classifications
+    assert len(compiled.rules) == len(compiled.entries) == len(rules)
+    assert len(classifier._compiled.rules) == 1
+
+
+def test_classifier_times_rules_without_reevaluating(mocker: MockerFixture) -> None:
+    """Test that the rules are timed as they are evaluated, not run again."""
+    rules = [
+        ClassificationRule(conditions=f"merchant:{SLOW_PATTERN}", category="Slow"),
+        ClassificationRule(conditions="merchant:a", category="Other"),
+    ]
+    classifier = TransactionClassifier(
+        rule_provider=StaticRuleProvider(rules), match_budget_ms=1.0
+    )
+    classifier.refresh_rules()
+    evaluate_plan = mocker.spy(classifier_module, "evaluate_plan")
+
+    classifier.classify(_transaction("a" * 2_000 + "!"))
+
+    assert evaluate_plan.call_count == len(rules)
+
+
+def test_classifier_ignores_unconfirmed_slowness(mocker: MockerFixture) -> None:
+    """Test that a slow evaluation not confirmed in CPU time is tolerated."""
+    mocker.patch("time.thread_time", return_value=0.0)
+    rules = [ClassificationRule(conditions=f"merchant:{SLOW_PATTERN}", category="Slow")]
+    classifier = TransactionClassifier(
+        rule_provider=StaticRuleProvider(rules), match_budget_ms=1.0
+    )
+
+    classifier.classify(_transaction("a" * 2_000 + "!"))
+
+    assert classifier.quarantined == {}
+    assert classifier.classify(_transaction("ab")).category == "Slow"
+
+
+def test_analyze_rules_reports_unsafe_rules() -> None:
+    """Test that unsafe rules are reported and kept by pruning."""
+    rules = [ClassificationRule(conditions="merchant:(a|aa)*c", category="Unsafe")]
+
+    analysis = analyze_rules(rules, [_transaction("a" * 50)])
+
+    assert [finding.kind for finding in analysis.findings] == ["unsafe"]
+    assert analysis.pruned_rules(include_unmatched=True) == rules
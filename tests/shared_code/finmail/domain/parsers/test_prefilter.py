@@ -0,0 +1,62 @@
+from pathlib import Path
+
+import pytest
+from pytest_mock import MockerFixture
+
+from shared_code.finmail.domain.parsers import (
+    RappiCardParser,
+    RappiPayParser,
+    RemotePassParser,
+    prefilter_matches,
+)
+from shared_code.finmail.domain.parsers.rappipay import (
+    MATCH_KEYWORDS,
+    PREFILTER_KEYWORDS,
+)
+
+PARSERS = [RappiCardParser(), RappiPayParser(), RemotePassParser()]
+
+
+@pytest.mark.parametrize(
+    "sample",
+    [
+        "rappicard.html",
+        "rappipay_bank_transfer_in.html",
+        "rappipay_pse_payment.html",
+        "remotepass.html",
+    ],
+)
+def test_prefilter_accepts_forwarded_samples(sample: str):
+    html = Path(f"tests/html_samples/{sample}").read_text(encoding="utf-8")
+    assert prefilter_matches("other@gmail.com", "Fwd: message", html, PARSERS)
+
+
+@pytest.mark.parametrize(
+    "sender, subject",
+    [
+        ("noreply@rappicard.co", "Resumen"),
+        ("other@gmail.com", "RappiCard - Resumen de transacción"),
+        ("other@gmail.com", "Tu dinero está en camino"),
+    ],
+)
+def test_prefilter_accepts_sender_or_subject(sender: str, subject: str):
+    assert prefilter_matches(sender, subject, None, PARSERS)
+
+
+def test_prefilter_rejects_unrelated_email():
+    html = "<html><body><p>Weekly newsletter</p></body></html>"
+    assert not prefilter_matches("news@shop.com", "Offers", html, PARSERS)
+
+
+def test_prefilter_disabled_by_parser_without_keywords(mocker: MockerFixture):
+    parser = mocker.Mock(DOMAINS=(), KEYWORDS=None)
+    assert prefilter_matches("news@shop.com", "Offers", None, [*PARSERS, parser])
+
+
+def test_prefilter_without_parsers_rejects():
+    assert not prefilter_matches("noreply@rappicard.co", "RappiCard", None, [])
+
+
+@pytest.mark.parametrize("match_keyword", MATCH_KEYWORDS)
+def test_rappipay_prefilter_keywords_cover_match_keywords(match_keyword: str):
+    assert any(keyword in match_keyword for keyword in PREFILTER_KEYWORDS)
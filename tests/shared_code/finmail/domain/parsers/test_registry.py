@@ -5,7 +5,10 @@ from shared_code.finmail.domain.parsers import Parser, registry
 
 @pytest.fixture(autouse=True)
 def clear_registry():
+    registered = registry.get_registry()
     registry._registry.clear()
+    yield
+    registry._registry[:] = registered
 
 
 def test_register_parser_decorator_adds_instance():
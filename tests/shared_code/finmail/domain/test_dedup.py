@@ -0,0 +1,144 @@
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+from shared_code.finmail.domain.dedup import (
+    DedupIndex,
+    parse_sheet_amount,
+    transaction_fingerprint,
+)
+from shared_code.finmail.models import Transaction
+
+
+@pytest.fixture
+def transaction() -> Transaction:
+    return Transaction(
+        date_local=datetime(2026, 1, 30, 10, 10),
+        pocket="RappiCard",
+        currency="COP",
+        amount=-25000.0,
+        merchant="Uber Rides",
+    )
+
+
+def test_fingerprint_prefers_auth_code(transaction: Transaction):
+    with_code = transaction.model_copy(update={"auth_code": "123456"})
+    moved = with_code.model_copy(update={"date_local": datetime(2026, 1, 31)})
+
+    assert transaction_fingerprint(with_code).startswith("auth:")
+    assert transaction_fingerprint(with_code) == transaction_fingerprint(moved)
+    assert transaction_fingerprint(transaction).startswith("txn:")
+
+
+def test_fingerprint_ignores_category_and_merchant_formatting(
+    transaction: Transaction,
+):
+    same = transaction.model_copy(
+        update={"category": "Transport", "merchant": "  UBER   rides "}
+    )
+    other = transaction.model_copy(update={"amount": -26000.0})
+
+    assert transaction_fingerprint(same) == transaction_fingerprint(transaction)
+    assert transaction_fingerprint(other) != transaction_fingerprint(transaction)
+
+
+def test_index_in_memory_lru(transaction: Transaction):
+    index = DedupIndex(cache_size=1)
+    other = transaction.model_copy(update={"amount": 1.0})
+
+    assert not index.contains(transaction)
+    index.add([transaction])
+    assert index.contains(transaction)
+
+    index.add([other])
+    assert not index.contains(transaction)
+
+
+def test_index_persists_across_instances(tmp_path: Path, transaction: Transaction):
+    path = tmp_path / "dedup.db"
+    DedupIndex(path, cache_size=1).add([transaction])
+
+    index = DedupIndex(path, cache_size=1)
+    index.add([transaction.model_copy(update={"amount": 1.0})])
+
+    assert index.contains(transaction)
+
+
+def test_seed_from_rows(tmp_path: Path, transaction: Transaction):
+    index = DedupIndex(tmp_path / "dedup.db")
+    rows = [
+        ["Date", "Pocket", "Category", "Currency", "Amount", "Description"],
+        ["30/01/2026 10:10:00", "RappiCard", "Transport", "COP", "-25000", ""],
+    ]
+
+    assert index.seed_from_rows(rows) == 1
+    assert index.contains(transaction)
+    assert not index.contains(transaction.model_copy(update={"amount": -1.0}))
+    assert DedupIndex(tmp_path / "dedup.db").contains(transaction)
+
+
+@pytest.mark.parametrize(
+    ("value", "expected"),
+    [
+        ("-25000", -25000.0),
+        (-25000, -25000.0),
+        ("$ -25.000,00", -25000.0),
+        ("-25,000.50", -25000.5),
+        ("$1.234.567", 1234567.0),
+        ("25.000", 25000.0),
+        ("1.234", 1234.0),
+        ("-1000.5", -1000.5),
+        ("Amount", None),
+        ("", None),
+        (None, None),
+    ],
+)
+def test_parse_sheet_amount(value: object, expected: float | None):
+    assert parse_sheet_amount(value) == expected
+
+
+def test_seed_from_rows_reads_formatted_amounts(
+    caplog: pytest.LogCaptureFixture, transaction: Transaction
+):
+    index = DedupIndex()
+    rows = [
+        ["Date", "Pocket", "Category", "Currency", "Amount"],
+        ["30/01/2026 10:10:00", "RappiCard", "Transport", "COP", "$ -25.000,00"],
+        ["30/01/2026 11:00:00", "RappiCard", "Transport", "COP", "12 3x"],
+    ]
+
+    assert index.seed_from_rows(rows) == 1
+    assert index.contains(transaction)
+    assert "Skipped 1 sheet rows" in caplog.text
+
+
+def test_reserve_and_release(transaction: Transaction):
+    index = DedupIndex()
+
+    assert index.reserve(transaction)
+    assert not index.reserve(transaction)
+    assert not index.contains(transaction)
+
+    index.release([transaction])
+    assert index.reserve(transaction)
+
+    index.add([transaction])
+    index.release([transaction])
+    assert not index.reserve(transaction)
+    assert index.contains(transaction)
+
+
+def test_record_partial_write(transaction: Transaction):
+    index = DedupIndex()
+    other = transaction.model_copy(update={"amount": 1.0})
+
+    index.record_partial_write([transaction, other], ["sqlite"])
+    index.record_partial_write([transaction], ["csv"])
+
+    assert index.written_sinks([transaction]) == {"sqlite", "csv"}
+    assert index.written_sinks([transaction, other]) == {"sqlite"}
+    assert not index.contains(transaction)
+
+    index.add([transaction])
+    assert index.written_sinks([transaction]) == frozenset()
@@ -0,0 +1,358 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import pytest
+from pytest_mock import MockerFixture
+
+from shared_code.finmail.core.config import settings
+from shared_code.finmail.domain import ingest
+from shared_code.finmail.domain.dedup import DedupIndex
+from shared_code.finmail.exceptions import (
+    DuplicateTransactionError,
+    EmailRejectedError,
+    SinkWriteError,
+    TransactionInProgressError,
+)
+from shared_code.finmail.models import EmailPayload, Transaction
+from shared_code.finmail.sinks import MultiSink
+from shared_code.finmail.utils.timing import StageTimer
+
+
+@pytest.fixture
+def payload() -> EmailPayload:
+    return EmailPayload(subject="Test", sender="test@example.com", html="<p>Monto</p>")
+
+
+@pytest.fixture
+def transaction() -> Transaction:
+    return Transaction(
+        date_local=datetime(2026, 1, 1, 12, 0),
+        pocket="Test Pocket",
+        currency="COP",
+        amount=-1000.0,
+    )
+
+
+@pytest.fixture
+def parser(mocker: MockerFixture, transaction: Transaction):
+    parser = mocker.Mock(DOMAINS=("test@example.com",), KEYWORDS=())
+    parser.matches.return_value = True
+    parser.parse.return_value = transaction
+    mocker.patch.object(ingest, "get_registry", return_value=[parser])
+    return parser
+
+
+def test_process_email_inserts_parsed_transaction(
+    mocker: MockerFixture, payload: EmailPayload, parser, transaction: Transaction
+):
+    sink = mocker.Mock()
+
+    result = ingest.process_email(payload, sink=sink)
+
+    assert result.transaction == transaction
+    parser.parse.assert_called_once()
+    sink.write.assert_called_once_with([transaction])
+
+
+@pytest.mark.usefixtures("parser")
+def test_process_email_records_stage_timings(
+    mocker: MockerFixture, payload: EmailPayload
+):
+    classifier = mocker.Mock()
+    classifier.refresh_rules.return_value = False
+    classifier.classify.side_effect = lambda t: t
+    timer = StageTimer()
+
+    result = ingest.process_email(
+        payload, sink=mocker.Mock(), classifier=classifier, timer=timer
+    )
+
+    assert result.timings is timer.timings
+    assert {"prefilter", "get_soup", "detect_parser", "parse", "classify", "write"} <= (
+        timer.timings.keys()
+    )
+    assert "load_rules" not in timer.timings
+
+    classifier.refresh_rules.return_value = True
+    ingest.process_email(
+        payload, sink=mocker.Mock(), classifier=classifier, timer=timer
+    )
+
+    assert "load_rules" in timer.timings
+
+
+def test_process_email_without_parser_returns_none(
+    mocker: MockerFixture, payload: EmailPayload
+):
+    mocker.patch.object(ingest, "get_registry", return_value=[])
+    sink = mocker.Mock()
+
+    assert ingest.process_email(payload, sink=sink) is None
+    sink.write.assert_not_called()
+
+
+def test_process_email_rejected_by_prefilter(mocker: MockerFixture, parser):
+    payload = EmailPayload(
+        subject="Offers", sender="news@shop.com", html="<p>Newsletter</p>"
+    )
+    get_soup = mocker.patch.object(EmailPayload, "get_soup")
+    sink = mocker.Mock()
+
+    assert ingest.process_email(payload, sink=sink) is None
+    get_soup.assert_not_called()
+    parser.matches.assert_not_called()
+
+
+def test_process_email_time_budget_exceeded(
+    mocker: MockerFixture,
+    monkeypatch: pytest.MonkeyPatch,
+    payload: EmailPayload,
+    parser,
+):
+    monkeypatch.setattr(settings, "PARSE_TIME_BUDGET_S", 0.0)
+    sink = mocker.Mock()
+
+    with pytest.raises(EmailRejectedError, match="Time budget"):
+        ingest.process_email(payload, sink=sink)
+
+    parser.parse.assert_not_called()
+    sink.write.assert_not_called()
+
+
+@pytest.mark.usefixtures("parser")
+def test_process_email_overlapping_deliveries(
+    mocker: MockerFixture, payload: EmailPayload
+):
+    dedup_index = DedupIndex()
+    sink = mocker.Mock()
+    overlapping = []
+
+    def write(_):
+        # A second delivery of the email arrives while the first is written
+        with pytest.raises(TransactionInProgressError):
+            ingest.process_email(payload, sink=sink, dedup_index=dedup_index)
+        overlapping.append(True)
+
+    sink.write.side_effect = write
+
+    ingest.process_email(payload, sink=sink, dedup_index=dedup_index)
+
+    assert overlapping == [True]
+    sink.write.assert_called_once()
+    with pytest.raises(DuplicateTransactionError):
+        ingest.process_email(payload, sink=sink, dedup_index=dedup_index)
+
+
+@pytest.mark.usefixtures("parser")
+def test_process_email_releases_failed_writes(
+    mocker: MockerFixture, payload: EmailPayload, transaction: Transaction
+):
+    dedup_index = DedupIndex()
+    sink = mocker.Mock()
+    sink.write.side_effect = [ConnectionError("down"), None]
+
+    with pytest.raises(ConnectionError):
+        ingest.process_email(payload, sink=sink, dedup_index=dedup_index)
+    result = ingest.process_email(payload, sink=sink, dedup_index=dedup_index)
+
+    assert result.transaction == transaction
+    assert dedup_index.contains(transaction)
+
+
+def test_process_email_time_budget_checked_between_parsers(
+    mocker: MockerFixture, monkeypatch: pytest.MonkeyPatch, payload: EmailPayload
+):
+    def slow_matches(*_) -> bool:
+        monkeypatch.setattr(settings, "PARSE_TIME_BUDGET_S", 0.0)
+        return False
+
+    first = mocker.Mock(DOMAINS=("test@example.com",), KEYWORDS=())
+    first.matches.side_effect = slow_matches
+    second = mocker.Mock(DOMAINS=("test@example.com",), KEYWORDS=())
+    mocker.patch.object(ingest, "get_registry", return_value=[first, second])
+
+    with pytest.raises(EmailRejectedError, match="during parser detection"):
+        ingest.process_email(payload, sink=mocker.Mock())
+
+    second.matches.assert_not_called()
+
+
+def test_process_email_keeps_slow_parse(
+    mocker: MockerFixture,
+    monkeypatch: pytest.MonkeyPatch,
+    payload: EmailPayload,
+    parser,
+    transaction: Transaction,
+):
+    def slow_parse(**_) -> Transaction:
+        monkeypatch.setattr(settings, "PARSE_TIME_BUDGET_S", 0.0)
+        return transaction
+
+    parser.parse.side_effect = slow_parse
+
+    assert ingest.process_email(payload, sink=mocker.Mock()).transaction == transaction
+
+
+@pytest.mark.usefixtures("parser")
+def test_process_email_skips_duplicates(mocker: MockerFixture, payload: EmailPayload):
+    sink = mocker.Mock()
+    classifier = mocker.Mock()
+    classifier.classify.side_effect = lambda t: t
+    dedup_index = DedupIndex()
+
+    ingest.process_email(
+        payload,
+        sink=sink,
+        classifier=classifier,
+        dedup_index=dedup_index,
+    )
+    with pytest.raises(DuplicateTransactionError, match="Duplicate transaction"):
+        ingest.process_email(
+            payload,
+            sink=sink,
+            classifier=classifier,
+            dedup_index=dedup_index,
+        )
+
+    sink.write.assert_called_once()
+    classifier.classify.assert_called_once()
+
+
+@pytest.mark.usefixtures("parser")
+def test_process_email_does_not_record_failed_writes(
+    mocker: MockerFixture, payload: EmailPayload, transaction: Transaction
+):
+    sink = mocker.Mock()
+    sink.write.side_effect = [ConnectionError, True]
+    dedup_index = DedupIndex()
+
+    with pytest.raises(ConnectionError):
+        ingest.process_email(payload, sink=sink, dedup_index=dedup_index)
+    result = ingest.process_email(payload, sink=sink, dedup_index=dedup_index)
+
+    assert result.transaction == transaction
+
+
+@pytest.mark.usefixtures("parser")
+def test_process_email_reports_sink_results(
+    mocker: MockerFixture, payload: EmailPayload
+):
+    failing = mocker.Mock()
+    failing.write.side_effect = ConnectionError("down")
+    sink = MultiSink({"sheets": mocker.Mock(), "ledger": failing}, required=["sheets"])
+
+    result = ingest.process_email(payload, sink=sink)
+
+    assert [(r.name, r.ok) for r in result.sink_results] == [
+        ("sheets", True),
+        ("ledger", False),
+    ]
+
+
+@pytest.mark.usefixtures("parser")
+def test_process_email_fails_when_every_sink_fails(
+    mocker: MockerFixture, payload: EmailPayload
+):
+    failing = mocker.Mock()
+    failing.write.side_effect = ConnectionError("down")
+    dedup_index = DedupIndex()
+
+    with pytest.raises(SinkWriteError, match="ledger: ConnectionError: down"):
+        ingest.process_email(
+            payload, sink=MultiSink({"ledger": failing}), dedup_index=dedup_index
+        )
+    ingest.process_email(payload, sink=mocker.Mock(), dedup_index=dedup_index)
+
+
+@pytest.mark.usefixtures("parser")
+def test_process_email_retries_only_failed_required_sinks(
+    mocker: MockerFixture, payload: EmailPayload, transaction: Transaction
+):
+    sheets, ledger = mocker.Mock(), mocker.Mock()
+    sheets.write.side_effect = [ConnectionError("quota"), None]
+    sink = MultiSink({"google_sheets": sheets, "ledger": ledger})
+    dedup_index = DedupIndex()
+
+    with pytest.raises(SinkWriteError, match="google_sheets: ConnectionError"):
+        ingest.process_email(payload, sink=sink, dedup_index=dedup_index)
+    assert not dedup_index.contains(transaction)
+
+    # The retry is not a duplicate, and does not write the ledger twice
+    result = ingest.process_email(payload, sink=sink, dedup_index=dedup_index)
+
+    assert all(r.ok for r in result.sink_results)
+    assert sheets.write.call_count == 2
+    ledger.write.assert_called_once()
+    assert dedup_index.contains(transaction)
+
+
+@pytest.mark.usefixtures("parser")
+def test_process_email_async_awaits_async_sinks(
+    mocker: MockerFixture, payload: EmailPayload, transaction: Transaction
+):
+    sink = mocker.AsyncMock()
+    classifier = mocker.Mock()
+    classifier.classify.side_effect = lambda t: t
+    dedup_index = DedupIndex()
+
+    result = asyncio.run(
+        ingest.process_email_async(
+            payload, sink=sink, classifier=classifier, dedup_index=dedup_index
+        )
+    )
+
+    assert result.transaction == transaction
+    sink.write.assert_awaited_once_with([transaction])
+    assert dedup_index.contains(transaction)
+
+
+@pytest.mark.usefixtures("parser")
+def test_process_email_async_writes_multi_sink(
+    mocker: MockerFixture, payload: EmailPayload
+):
+    sync_sink = mocker.Mock()
+    sink = MultiSink({"sheets": mocker.AsyncMock(), "ledger": sync_sink})
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        result = asyncio.run(
+            ingest.process_email_async(payload, sink=sink, executor=executor)
+        )
+
+    assert [(r.name, r.ok) for r in result.sink_results] == [
+        ("sheets", True),
+        ("ledger", True),
+    ]
+    sync_sink.write.assert_called_once()
+
+
+def test_process_email_async_without_parser_returns_none(
+    mocker: MockerFixture, payload: EmailPayload
+):
+    mocker.patch.object(ingest, "get_registry", return_value=[])
+    sink = mocker.AsyncMock()
+
+    assert asyncio.run(ingest.process_email_async(payload, sink=sink)) is None
+    sink.write.assert_not_awaited()
+
+
+def test_process_emails_writes_batch_once(
+    mocker: MockerFixture, parser, transaction: Transaction
+):
+    other = transaction.model_copy(update={"amount": -2000.0})
+    parser.parse.side_effect = [transaction, ValueError("broken"), transaction, other]
+    payloads = [
+        EmailPayload(subject=f"Test {i}", sender="test@example.com", html="<p></p>")
+        for i in range(4)
+    ]
+    sink = mocker.Mock()
+    classifier = mocker.Mock()
+    classifier.classify_batch.side_effect = lambda transactions: transactions
+
+    outcomes = ingest.process_emails(payloads, sink=sink, classifier=classifier)
+
+    assert [o.transaction for o in outcomes] == [transaction, None, None, other]
+    assert outcomes[1].error == "ValueError: broken"
+    assert outcomes[2].rejected.startswith("Duplicate transaction")
+    sink.write.assert_called_once_with([transaction, other])
+    classifier.classify_batch.assert_called_once_with([transaction, other])
@@ -0,0 +1,66 @@
+import json
+import os
+
+import pytest
+from pytest_mock import MockerFixture
+
+from shared_code.finmail.queues.azure import (
+    AzureStorageQueue,
+    decode_message,
+    encode_message,
+)
+
+
+@pytest.fixture(name="clients")
+def fixture_clients(mocker: MockerFixture):
+    return mocker.Mock(), mocker.Mock()
+
+
+def test_enqueue_compresses_body(clients):
+    client, poison_client = clients
+    client.send_message.return_value.id = "id"
+    queue = AzureStorageQueue(
+        "", "finmail", queue_client=client, poison_queue_client=poison_client
+    )
+
+    assert queue.enqueue("<p>" * 10_000) == "id"
+
+    (content,) = client.send_message.call_args.args
+    assert len(content) < 1_000
+    assert decode_message(content) == "<p>" * 10_000
+
+
+def test_enqueue_rejects_large_bodies(clients):
+    client, poison_client = clients
+    queue = AzureStorageQueue(
+        "", "finmail", queue_client=client, poison_queue_client=poison_client
+    )
+
+    with pytest.raises(ValueError, match="exceeds the queue limit"):
+        queue.enqueue(os.urandom(100_000).hex())
+
+
+def test_receive_and_dead_letter(mocker: MockerFixture, clients):
+    client, poison_client = clients
+    client.receive_messages.return_value = [
+        mocker.Mock(
+            id="1", content=encode_message("body"), dequeue_count=5, pop_receipt="r"
+        ),
+        mocker.Mock(id="2", content="not encoded", dequeue_count=1, pop_receipt="s"),
+    ]
+    queue = AzureStorageQueue(
+        "", "finmail", queue_client=client, poison_queue_client=poison_client
+    )
+
+    message, foreign = queue.receive(32)
+    queue.dead_letter(message, "Too many attempts")
+
+    assert foreign.body == "not encoded"
+    (content,) = poison_client.send_message.call_args.args
+    assert json.loads(decode_message(content)) == {
+        "id": "1",
+        "reason": "Too many attempts",
+        "dequeue_count": 5,
+        "body": "body",
+    }
+    client.delete_message.assert_called_once_with("1", "r")
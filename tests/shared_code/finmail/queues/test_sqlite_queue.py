@@ -0,0 +1,51 @@
+import sqlite3
+import time
+from pathlib import Path
+
+from shared_code.finmail.queues import SQLiteQueue
+
+
+def test_receive_leases_messages_in_order(tmp_path: Path):
+    queue = SQLiteQueue(tmp_path / "queue.db")
+    ids = [queue.enqueue(f"message {i}") for i in range(3)]
+
+    first = queue.receive(2)
+    second = queue.receive(2)
+
+    assert [m.id for m in first] == ids[:2]
+    assert [m.body for m in second] == ["message 2"]
+    assert queue.receive(2) == []
+    assert all(m.dequeue_count == 1 for m in first + second)
+
+
+def test_messages_reappear_after_visibility_timeout(tmp_path: Path):
+    queue = SQLiteQueue(tmp_path / "queue.db", visibility_timeout=0.05)
+    queue.enqueue("message")
+
+    (leased,) = queue.receive(10)
+    time.sleep(0.1)
+    (released,) = queue.receive(10)
+
+    assert released.dequeue_count == 2
+    # The expired lease can no longer delete the message
+    queue.delete(leased)
+    time.sleep(0.1)
+    assert [m.dequeue_count for m in queue.receive(10)] == [3]
+
+
+def test_delete_and_dead_letter(tmp_path: Path):
+    path = tmp_path / "queue.db"
+    queue = SQLiteQueue(path, visibility_timeout=0)
+    queue.enqueue("processed")
+    queue.enqueue("poison")
+
+    processed, poison = queue.receive(10)
+    queue.delete(processed)
+    queue.dead_letter(poison, "Invalid payload")
+
+    assert queue.receive(10) == []
+    with sqlite3.connect(path) as connection:
+        rows = connection.execute(
+            "SELECT body, reason, dequeue_count FROM dead_letters"
+        ).fetchall()
+    assert rows == [("poison", "Invalid payload", 1)]
@@ -0,0 +1,60 @@
+from pathlib import Path
+
+import pytest
+from pytest_mock import MockerFixture
+
+from shared_code.finmail.backfill import message_to_payload
+from shared_code.finmail.queues import SQLiteQueue, drain_queue
+
+
+@pytest.fixture(name="queue")
+def fixture_queue(tmp_path: Path) -> SQLiteQueue:
+    return SQLiteQueue(tmp_path / "queue.db", visibility_timeout=0)
+
+
+def _enqueue_email(queue: SQLiteQueue, raw_email: bytes) -> None:
+    queue.enqueue(message_to_payload(raw_email).model_dump_json())
+
+
+def test_drain_queue_writes_in_batches(
+    mocker: MockerFixture, queue: SQLiteQueue, raw_email_factory
+):
+    _enqueue_email(queue, raw_email_factory())
+    _enqueue_email(
+        queue,
+        raw_email_factory(sample="remotepass.html", subject="Fwd: Your transaction"),
+    )
+    _enqueue_email(queue, raw_email_factory(sample=None, subject="Newsletter"))
+    sink = mocker.Mock()
+
+    stats = drain_queue(queue, sink, batch_size=3)
+
+    (written,) = sink.write.call_args_list
+    assert [t.pocket for t in written.args[0]] == ["RappiCuenta", "RemotePass Cards"]
+    assert (stats.received, stats.written, stats.rejected) == (3, 2, 1)
+    assert queue.receive(10) == []
+
+
+def test_drain_queue_dead_letters_poison_messages(
+    mocker: MockerFixture, queue: SQLiteQueue, raw_email_factory
+):
+    queue.enqueue("not json")
+    _enqueue_email(queue, raw_email_factory())
+    sink = mocker.Mock()
+    sink.write.side_effect = ConnectionError("down")
+
+    stats = [drain_queue(queue, sink, max_dequeue_count=2) for _ in range(2)]
+
+    assert [(s.retried, s.dead_lettered) for s in stats] == [(1, 1), (0, 1)]
+    assert queue.receive(10) == []
+    assert sink.write.call_count == 2
+
+
+def test_drain_queue_stops_at_max_batches(mocker: MockerFixture, queue: SQLiteQueue):
+    for _ in range(5):
+        queue.enqueue("not json")
+
+    stats = drain_queue(queue, mocker.Mock(), batch_size=2, max_batches=2)
+
+    assert stats.received == 4
+    assert len(queue.receive(10)) == 1
@@ -0,0 +1,93 @@
+import csv
+import json
+from pathlib import Path
+
+import pytest
+
+from shared_code.finmail.models import Transaction
+from shared_code.finmail.sinks import (
+    CsvSink,
+    JsonLinesSink,
+    ParquetSink,
+    SQLiteSink,
+    build_local_sink,
+)
+from shared_code.finmail.sinks.files import _AppendFileSink  # noqa: PLC2701
+
+
+def test_jsonl_sink_appends(tmp_path: Path, transactions: list[Transaction]):
+    sink = JsonLinesSink(tmp_path / "out.jsonl")
+
+    sink.write(transactions[:1])
+    sink.write(transactions[1:])
+
+    lines = [json.loads(line) for line in sink.path.read_text().splitlines()]
+    assert [line["pocket"] for line in lines] == ["RappiCard", "RappiCuenta"]
+
+
+def test_jsonl_written_since_truncates_partial_line(tmp_path: Path):
+    output = tmp_path / "out.jsonl"
+    output.write_text('{"a": 1}\n')
+    sink = JsonLinesSink(output)
+    position = sink.position()
+    with output.open("a") as file:
+        file.write('{"b": 2}\n{"c":')
+
+    assert sink.written_since(position) == 1
+    assert output.read_text() == '{"a": 1}\n{"b": 2}\n'
+
+
+def test_append_file_sink_requires_format(tmp_path: Path):
+    class IncompleteSink(_AppendFileSink):
+        pass
+
+    with pytest.raises(TypeError, match="_format"):
+        IncompleteSink(tmp_path / "out.txt")
+
+
+def test_csv_sink_writes_header_once(tmp_path: Path, transactions: list[Transaction]):
+    path = tmp_path / "out.csv"
+    CsvSink(path).write(transactions)
+    sink = CsvSink(path)
+    position = sink.position()
+    sink.write(transactions)
+
+    with path.open(newline="") as file:
+        rows = list(csv.DictReader(file))
+    assert len(rows) == 4
+    assert rows[0]["description"] == "Trip\nto the airport"
+    assert rows[0]["date_local"] == "2026-01-30T10:10:00"
+    assert sink.written_since(position) == 2
+
+
+def test_parquet_sink(tmp_path: Path, transactions: list[Transaction]):
+    pq = pytest.importorskip("pyarrow.parquet")
+    sink = ParquetSink(tmp_path / "ledger.parquet")
+
+    sink.write(transactions[:1])
+    position = sink.position()
+    sink.write(transactions[1:])
+
+    table = pq.read_table(sink.path)
+    assert table.column("pocket").to_pylist() == ["RappiCard", "RappiCuenta"]
+    assert table.column("amount").to_pylist() == [-25000.0, 150000.0]
+    assert sink.written_since(position) == 1
+
+
+@pytest.mark.parametrize(
+    ("name", "kind", "expected"),
+    [
+        ("out.jsonl", None, JsonLinesSink),
+        ("out.csv", None, CsvSink),
+        ("out.db", None, SQLiteSink),
+        ("out.txt", None, JsonLinesSink),
+        ("out.txt", "csv", CsvSink),
+    ],
+)
+def test_build_local_sink(tmp_path: Path, name: str, kind: str | None, expected):
+    assert isinstance(build_local_sink(tmp_path / name, kind=kind), expected)
+
+
+def test_build_local_sink_unknown_kind(tmp_path: Path):
+    with pytest.raises(ValueError, match="Unknown sink"):
+        build_local_sink(tmp_path / "out", kind="xlsx")
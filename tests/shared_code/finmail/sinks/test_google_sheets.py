@@ -0,0 +1,20 @@
+from pytest_mock import MockerFixture
+
+from shared_code.finmail.models import Transaction
+from shared_code.finmail.sinks import GoogleSheetsSink
+
+
+def test_google_sheets_sink(mocker: MockerFixture, transactions: list[Transaction]):
+    client = mocker.Mock()
+    client.get_last_filled_row.side_effect = [10, 12]
+    sink = GoogleSheetsSink(client, "spreadsheet", "Transactions")
+
+    position = sink.position()
+    sink.write(transactions)
+
+    client.insert_transactions.assert_called_once_with(
+        spreadsheet_identifier="spreadsheet",
+        transactions=transactions,
+        worksheet_name="Transactions",
+    )
+    assert sink.written_since(position) == 2
@@ -0,0 +1,128 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from pytest_mock import MockerFixture
+
+from shared_code.finmail.exceptions import SinkWriteError
+from shared_code.finmail.models import Transaction
+from shared_code.finmail.sinks import MultiSink
+
+
+class SlowSink:
+    def __init__(self, delay: float) -> None:
+        self.delay = delay
+        self.written = threading.Event()
+        self.transactions: list[Transaction] = []
+
+    def write(self, transactions: list[Transaction]) -> None:
+        time.sleep(self.delay)
+        self.transactions.extend(transactions)
+        self.written.set()
+
+
+def test_dispatch_writes_every_sink_concurrently(
+    mocker: MockerFixture, transactions: list[Transaction]
+):
+    fast = mocker.Mock()
+    slow_a, slow_b = SlowSink(0.2), SlowSink(0.2)
+    sink = MultiSink({"fast": fast, "a": slow_a, "b": slow_b})
+
+    started_at = time.monotonic()
+    results = sink.dispatch(transactions)
+
+    assert time.monotonic() - started_at < 0.35
+    assert [r.name for r in results] == ["fast", "a", "b"]
+    assert all(r.ok for r in results)
+    fast.write.assert_called_once_with(transactions)
+
+
+def test_dispatch_isolates_failures_and_timeouts(
+    mocker: MockerFixture, transactions: list[Transaction]
+):
+    failing = mocker.Mock()
+    failing.write.side_effect = ConnectionError("down")
+    hung = SlowSink(0.5)
+    sink = MultiSink(
+        {"ok": mocker.Mock(), "failing": failing, "hung": hung},
+        timeout=5,
+        timeouts={"hung": 0.05},
+    )
+
+    results = {r.name: r for r in sink.dispatch(transactions)}
+
+    assert results["ok"].ok
+    assert results["failing"].error == "ConnectionError: down"
+    assert results["hung"].error == "Timed out after 0.05s"
+    assert not hung.written.is_set()
+    sink.close()
+    assert hung.written.is_set()
+
+
+def test_write_raises_if_a_required_sink_fails(
+    mocker: MockerFixture, transactions: list[Transaction]
+):
+    failing = mocker.Mock()
+    failing.write.side_effect = ConnectionError("down")
+
+    MultiSink({"ok": mocker.Mock(), "failing": failing}, required=["ok"]).write(
+        transactions
+    )
+    with pytest.raises(SinkWriteError, match="failing: ConnectionError") as error:
+        MultiSink({"ok": mocker.Mock(), "failing": failing}).write(transactions)
+
+    assert [(r.name, r.ok) for r in error.value.results] == [
+        ("ok", True),
+        ("failing", False),
+    ]
+    with pytest.raises(SinkWriteError):
+        MultiSink({"failing": failing}, required=[]).write(transactions)
+    with pytest.raises(ValueError, match="Unknown required sinks"):
+        MultiSink({"ok": mocker.Mock()}, required=["sheets"])
+
+
+def test_dispatch_skips_written_sinks(
+    mocker: MockerFixture, transactions: list[Transaction]
+):
+    written, pending = mocker.Mock(), mocker.AsyncMock()
+    sink = MultiSink({"written": written, "pending": pending})
+
+    results = asyncio.run(sink.adispatch(transactions, skip={"written"}))
+
+    assert all(r.ok for r in results)
+    written.write.assert_not_called()
+    pending.write.assert_awaited_once_with(transactions)
+    assert all(r.ok for r in MultiSink({"written": written}).dispatch([], {"written"}))
+    written.write.assert_not_called()
+
+
+class AsyncSlowSink:
+    def __init__(self, delay: float) -> None:
+        self.delay = delay
+        self.transactions: list[Transaction] = []
+
+    async def write(self, transactions: list[Transaction]) -> None:
+        await asyncio.sleep(self.delay)
+        self.transactions.extend(transactions)
+
+
+def test_adispatch_mixes_async_and_sync_sinks(transactions: list[Transaction]):
+    fast, hung, threaded = AsyncSlowSink(0.0), AsyncSlowSink(5), SlowSink(0.1)
+    sink = MultiSink(
+        {"fast": fast, "hung": hung, "threaded": threaded}, timeouts={"hung": 0.05}
+    )
+
+    results = {r.name: r for r in asyncio.run(sink.adispatch(transactions))}
+
+    assert results["fast"].ok
+    assert results["threaded"].ok
+    assert results["hung"].error == "Timed out after 0.05s"
+    assert fast.transactions == threaded.transactions == transactions
+    # Async sinks are cancelled on timeout
+    assert not hung.transactions
+
+
+def test_dispatch_rejects_async_sinks(transactions: list[Transaction]):
+    with pytest.raises(TypeError, match="require adispatch"):
+        MultiSink({"async": AsyncSlowSink(0.0)}).dispatch(transactions)
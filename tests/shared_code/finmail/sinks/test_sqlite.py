@@ -0,0 +1,30 @@
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from shared_code.finmail.models import Transaction
+from shared_code.finmail.sinks import SQLiteSink
+
+
+def test_sqlite_sink_inserts_batches(tmp_path: Path, transactions: list[Transaction]):
+    sink = SQLiteSink(tmp_path / "ledger.db")
+
+    sink.write(transactions)
+    position = sink.position()
+    sink.write(transactions[:1])
+    sink.close()
+
+    connection = sqlite3.connect(tmp_path / "ledger.db")
+    rows = connection.execute(
+        "SELECT date_local, pocket, amount, merchant FROM transactions"
+    ).fetchall()
+    assert rows[0] == ("2026-01-30T10:10:00", "RappiCard", -25000.0, "Uber")
+    assert len(rows) == 3
+    assert connection.execute("PRAGMA journal_mode").fetchone() == ("wal",)
+    assert SQLiteSink(tmp_path / "ledger.db").written_since(position) == 1
+
+
+def test_sqlite_sink_rejects_invalid_table(tmp_path: Path):
+    with pytest.raises(ValueError, match="Invalid table name"):
+        SQLiteSink(tmp_path / "ledger.db", table="transactions; DROP TABLE x")
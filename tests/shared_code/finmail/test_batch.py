@@ -0,0 +1,168 @@
+import csv
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+from dateutil import tz
+
+from shared_code.finmail.core.config import settings
+from shared_code.finmail.domain.dedup import DedupIndex, transaction_fingerprint
+from shared_code.finmail.mappers import LEDGER_COLUMNS, transaction_to_row
+from shared_code.finmail.models import Transaction, TransactionRecord
+from shared_code.finmail.sinks import CsvSink, JsonLinesSink, ParquetSink, SQLiteSink
+
+pytest.importorskip("numpy")
+
+import numpy as np
+
+from shared_code.finmail.batch import DictionaryColumn, TransactionBatch
+
+
+@pytest.fixture(name="ledger")
+def fixture_ledger(transactions: list[Transaction]) -> list[Transaction]:
+    bogota = tz.gettz("America/Bogota")
+    return [
+        *transactions,
+        Transaction(
+            date_local=datetime(2026, 2, 1, 9, 30, tzinfo=bogota),
+            pocket="RappiCard",
+            category="Food",
+            currency="USD",
+            amount=-12.5,
+            merchant="Rappi",
+            auth_code="A1",
+        ),
+        transactions[0],
+    ]
+
+
+def test_dictionary_column_encodes_distinct_values():
+    column = DictionaryColumn.encode(["COP", "USD", "COP"])
+
+    assert column.values == ("COP", "USD")
+    assert column.codes.tolist() == [0, 1, 0]
+    assert column.decode() == ["COP", "USD", "COP"]
+    assert column.isin(["USD", "EUR"]).tolist() == [False, True, False]
+
+
+def test_batch_round_trips_transactions(ledger: list[Transaction]):
+    batch = TransactionBatch.from_transactions(ledger)
+
+    assert len(batch) == 4
+    assert batch.amount.dtype == np.float64
+    assert batch.date_local.dtype == np.int64
+    assert batch.to_transactions() == ledger
+    assert batch.to_records() == [TransactionRecord.from_model(t) for t in ledger]
+    assert batch.datetimes()[2].utcoffset() == ledger[2].date_local.utcoffset()
+
+
+def test_batch_from_records(ledger: list[Transaction]):
+    records = [TransactionRecord.from_model(t) for t in ledger]
+
+    assert TransactionBatch.from_transactions(records).to_records() == records
+
+
+@pytest.mark.parametrize(
+    ("columns", "date_format"),
+    [
+        pytest.param(None, "default", id="sheet"),
+        pytest.param(LEDGER_COLUMNS, None, id="ledger"),
+    ],
+)
+def test_batch_rows_match_mapper(ledger: list[Transaction], columns, date_format):
+    kwargs = {} if columns is None else {"columns": columns}
+    if date_format != "default":
+        kwargs["date_format"] = date_format
+    batch = TransactionBatch.from_transactions(ledger)
+
+    rows = batch.to_rows(**kwargs)
+
+    assert rows == [transaction_to_row(t, **kwargs) for t in ledger]
+    assert TransactionBatch.from_rows(rows, **kwargs).to_rows(**kwargs) == rows
+
+
+def test_batch_from_sheet_rows_uses_defaults():
+    rows = [["30/01/2026 10:10:00", "RappiCard", "Transport", "COP", "-25000", ""]]
+
+    (transaction,) = TransactionBatch.from_rows(rows).to_transactions()
+    (short,) = TransactionBatch.from_rows(
+        [row[:2] + row[3:5] for row in rows],
+        columns=("date_local", "pocket", "currency", "amount"),
+    ).to_transactions()
+
+    assert transaction.date_local == datetime(2026, 1, 30, 10, 10)
+    assert transaction.amount == -25000.0
+    assert transaction.description is None
+    assert short.category == settings.DEFAULT_CATEGORY
+
+
+def test_batch_from_rows_rejects_missing_columns():
+    with pytest.raises(ValueError, match="Missing required columns"):
+        TransactionBatch.from_rows([], columns=("date_local", "pocket"))
+
+
+def test_batch_select_filter_and_totals(ledger: list[Transaction]):
+    batch = TransactionBatch.from_transactions(ledger)
+
+    expenses = batch.select(batch.amount < 0)
+    cop = batch.select(batch.isin("currency", ["COP"]))
+
+    assert [t.amount for t in expenses.to_records()] == [-25000.0, -12.5, -25000.0]
+    assert len(cop) == 3
+    assert batch.select([2, 0]).to_records()[0].merchant == "Rappi"
+    assert batch.totals_by("pocket") == {"RappiCard": -50012.5, "RappiCuenta": 150000}
+    with pytest.raises(ValueError, match="Unknown dictionary column"):
+        batch.totals_by("merchant")
+
+
+def test_batch_with_categories(ledger: list[Transaction]):
+    batch = TransactionBatch.from_transactions(ledger)
+
+    classified = batch.with_categories(["Transport", "Income", "Food", "Transport"])
+
+    assert classified.category.values == ("Transport", "Income", "Food")
+    assert classified.amount is batch.amount
+    with pytest.raises(ValueError, match="Expected 4 categories"):
+        batch.with_categories(["Food"])
+
+
+def test_batch_drop_duplicates(ledger: list[Transaction]):
+    batch = TransactionBatch.from_transactions(ledger)
+    index = DedupIndex()
+    index.add(ledger[1:2])
+
+    assert batch.fingerprints() == [transaction_fingerprint(t) for t in ledger]
+    assert batch.drop_duplicates().to_transactions() == ledger[:3]
+    assert batch.drop_duplicates(index).to_transactions() == [ledger[0], ledger[2]]
+
+
+def test_batch_write_to_sinks(tmp_path: Path, ledger: list[Transaction]):
+    batch = TransactionBatch.from_transactions(ledger)
+    sqlite_sink = SQLiteSink(tmp_path / "ledger.db")
+    csv_sink = CsvSink(tmp_path / "ledger.csv")
+    jsonl_sink = JsonLinesSink(tmp_path / "ledger.jsonl")
+
+    for sink in (sqlite_sink, csv_sink, jsonl_sink):
+        batch.write_to(sink)
+    sqlite_sink.close()
+
+    connection = sqlite3.connect(tmp_path / "ledger.db")
+    stored = connection.execute("SELECT * FROM transactions").fetchall()
+    assert [list(row) for row in stored] == [
+        transaction_to_row(t, LEDGER_COLUMNS, None) for t in ledger
+    ]
+    with csv_sink.path.open(newline="") as file:
+        assert next(csv.DictReader(file))["description"] == "Trip\nto the airport"
+    assert jsonl_sink.position() > 0
+
+
+def test_batch_write_to_parquet(tmp_path: Path, ledger: list[Transaction]):
+    pq = pytest.importorskip("pyarrow.parquet")
+    batch_sink = ParquetSink(tmp_path / "batch")
+    row_sink = ParquetSink(tmp_path / "rows")
+
+    TransactionBatch.from_transactions(ledger).write_to(batch_sink)
+    row_sink.write(ledger)
+
+    assert pq.read_table(batch_sink.path).equals(pq.read_table(row_sink.path))
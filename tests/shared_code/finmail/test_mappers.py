@@ -0,0 +1,36 @@
+from datetime import datetime
+
+from shared_code.finmail.mappers import LEDGER_COLUMNS, transaction_to_row
+from shared_code.finmail.models import Transaction
+
+
+def _transaction() -> Transaction:
+    return Transaction(
+        date_local=datetime(2026, 1, 30, 10, 10),
+        pocket="RappiCard",
+        category="Transport",
+        currency="COP",
+        amount=-25000.0,
+        merchant="Uber",
+    )
+
+
+def test_transaction_to_row_uses_sheet_columns():
+    row = transaction_to_row(_transaction())
+
+    assert row == [
+        "30/01/2026 10:10:00",
+        "RappiCard",
+        "Transport",
+        "COP",
+        -25000.0,
+        None,
+    ]
+
+
+def test_transaction_to_row_ledger_columns_iso_dates():
+    row = transaction_to_row(_transaction(), columns=LEDGER_COLUMNS, date_format=None)
+
+    assert len(row) == len(LEDGER_COLUMNS)
+    assert row[0] == "2026-01-30T10:10:00"
+    assert row[LEDGER_COLUMNS.index("merchant")] == "Uber"
@@ -1,3 +1,4 @@
+from dataclasses import fields
 from datetime import UTC, datetime
 
 import pytest
@@ -5,7 +6,14 @@ from dateutil import tz
 from pydantic import ValidationError
 
 from shared_code.finmail.core.config import settings
-from shared_code.finmail.models import EmailPayload, Transaction
+from shared_code.finmail.exceptions import EmailRejectedError
+from shared_code.finmail.models import (
+    EmailPayload,
+    Transaction,
+    TransactionRecord,
+    check_sender,
+)
+from shared_code.finmail.utils.dates import get_timezone
 
 
 def test_transaction_creation_with_required_fields():
@@ -49,6 +57,34 @@ def test_transaction_with_all_fields():
     assert transaction.auth_code == "ABC123"
 
 
+def test_transaction_record_mirrors_model():
+    assert [f.name for f in fields(TransactionRecord)] == list(Transaction.model_fields)
+    assert (
+        TransactionRecord(
+            date_local=datetime(2026, 1, 15), pocket="Bank", currency="COP", amount=1.0
+        ).category
+        == settings.DEFAULT_CATEGORY
+    )
+
+
+def test_transaction_record_round_trip():
+    transaction = Transaction(
+        date_local=datetime(2026, 1, 15, 10, 30),
+        pocket="Test Bank",
+        amount=-50.0,
+        currency="USD",
+        merchant="Starbucks",
+        auth_code="ABC123",
+    )
+
+    record = TransactionRecord.from_model(transaction)
+    classified = record.with_category("Food")
+
+    assert record.to_model() == transaction
+    assert classified.to_model() == transaction.model_copy(update={"category": "Food"})
+    assert record.category == settings.DEFAULT_CATEGORY
+
+
 def test_transaction_default_category():
     transaction = Transaction(
         date_local=datetime(2026, 1, 15, 10, 30),
@@ -92,7 +128,7 @@ def test_received_at_naive_datetime_converted_to_utc_then_default_tz():
     )
 
     # Should be converted to default timezone
-    default_tz = tz.gettz(settings.DEFAULT_TZ)
+    default_tz = get_timezone(settings.DEFAULT_TZ)
     expected_dt = naive_dt.replace(tzinfo=UTC).astimezone(default_tz)
 
     assert payload.received_at == expected_dt
@@ -108,7 +144,7 @@ def test_received_at_with_utc_timezone_converted_to_default_tz():
     )
 
     # Should be converted to default timezone
-    default_tz = tz.gettz(settings.DEFAULT_TZ)
+    default_tz = get_timezone(settings.DEFAULT_TZ)
     expected_dt = utc_dt.astimezone(default_tz)
 
     assert payload.received_at == expected_dt
@@ -127,7 +163,7 @@ def test_received_at_with_different_timezone_converted_to_default_tz():
     )
 
     # Should be converted to default timezone
-    default_tz = tz.gettz(settings.DEFAULT_TZ)
+    default_tz = get_timezone(settings.DEFAULT_TZ)
     expected_dt = eastern_dt.astimezone(default_tz)
 
     assert payload.received_at == expected_dt
@@ -155,7 +191,7 @@ def test_received_at_from_iso_string_converted_to_default_tz():
     )
 
     # String will be parsed as naive, treated as UTC, then converted to default TZ
-    default_tz = tz.gettz(settings.DEFAULT_TZ)
+    default_tz = get_timezone(settings.DEFAULT_TZ)
     expected_dt = datetime(2026, 2, 1, 12, 0, 0, tzinfo=UTC).astimezone(default_tz)
 
     assert payload.received_at == expected_dt
@@ -170,7 +206,7 @@ def test_received_at_from_iso_string_with_utc_converted_to_default_tz():
         received_at=iso_string,
     )
 
-    default_tz = tz.gettz(settings.DEFAULT_TZ)
+    default_tz = get_timezone(settings.DEFAULT_TZ)
     expected_dt = datetime(2026, 2, 1, 12, 0, 0, tzinfo=UTC).astimezone(default_tz)
 
     assert payload.received_at == expected_dt
@@ -206,3 +242,91 @@ def test_invalid_email_raises_validation_error():
             subject="Test",
             sender="invalid-email",
         )
+
+
+@pytest.mark.parametrize("mode", ["fast", "full"])
+@pytest.mark.parametrize(
+    ("sender", "expected"),
+    [
+        ("alerts@bank.com", "alerts@bank.com"),
+        ("Alerts@Bank.COM", "Alerts@bank.com"),
+        ("Bank <alerts@Bank.com>", "alerts@bank.com"),
+        ("user+tag@mail.bank.com.co", "user+tag@mail.bank.com.co"),
+        ("invalid-email", None),
+        ("a@localhost", None),
+        ("a b@bank.com", None),
+        ("a@@bank.com", None),
+    ],
+)
+def test_sender_validation_modes(
+    monkeypatch: pytest.MonkeyPatch, mode: str, sender: str, expected: str | None
+):
+    monkeypatch.setattr(settings, "SENDER_VALIDATION", mode)
+
+    if expected is None:
+        with pytest.raises(ValidationError, match="not a valid email address"):
+            EmailPayload(subject="Test", sender=sender)
+    else:
+        assert EmailPayload(subject="Test", sender=sender).sender == expected
+
+
+def test_check_sender_rejects_long_addresses():
+    with pytest.raises(ValueError, match="not a valid email address"):
+        check_sender(f"{'a' * 250}@bank.com")
+
+
+def test_get_timezone_is_cached():
+    assert get_timezone("America/Bogota") is get_timezone("America/Bogota")
+    assert get_timezone("Not/AZone") is None
+
+
+def test_validate_batch_json():
+    valid = '{"subject": "A", "sender": "a@bank.com"}'
+    invalid = '{"subject": "B", "sender": "invalid-email"}'
+
+    payloads = EmailPayload.validate_batch_json([valid, valid])
+    mixed = EmailPayload.validate_batch_json([valid, invalid, "{", f"{valid}, {valid}"])
+
+    assert [p.subject for p in payloads] == ["A", "A"]
+    assert isinstance(mixed[0], EmailPayload)
+    assert all(isinstance(result, ValidationError) for result in mixed[1:])
+    assert EmailPayload.validate_batch_json([]) == []
+
+
+def test_get_soup_rejects_oversized_html(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(settings, "MAX_HTML_SIZE", 100)
+    payload = EmailPayload(
+        subject="Test",
+        sender="test@example.com",
+        html="<p>" + "x" * 200 + "</p>",
+    )
+
+    with pytest.raises(EmailRejectedError, match="HTML size"):
+        payload.get_soup()
+
+
+def test_get_soup_rejects_too_many_nodes(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(settings, "MAX_HTML_NODES", 10)
+    payload = EmailPayload(
+        subject="Test",
+        sender="test@example.com",
+        html="<p>x</p>" * 20,
+    )
+
+    with pytest.raises(EmailRejectedError, match="node count"):
+        payload.get_soup()
+
+
+def test_get_soup_strips_data_uris_before_size_check(
+    monkeypatch: pytest.MonkeyPatch,
+):
+    monkeypatch.setattr(settings, "MAX_HTML_SIZE", 1_000)
+    payload = EmailPayload(
+        subject="Test",
+        sender="test@example.com",
+        html='<p>Test</p><img src="data:image/png;base64,' + "A" * 10_000 + '">',
+    )
+
+    soup = payload.get_soup()
+
+    assert soup.find("img")["src"] == "data:,"
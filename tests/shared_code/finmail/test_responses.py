@@ -0,0 +1,87 @@
+import json
+from datetime import datetime
+
+import azure.functions as func
+import pytest
+
+from shared_code.finmail.domain.ingest import IngestResult
+from shared_code.finmail.models import EmailPayload, Transaction
+from shared_code.finmail.responses import (
+    build_response,
+    build_sink_error_response,
+    cache_response,
+    get_replayed_response,
+    read_payload,
+)
+from shared_code.finmail.sinks import SinkResult
+from shared_code.finmail.utils.cache import TTLCache
+
+PAYLOAD = EmailPayload(subject="Test", sender="test@example.com", html="<p></p>")
+
+
+def _request(body: bytes) -> func.HttpRequest:
+    return func.HttpRequest(method="POST", url="/api/ingest", body=body)
+
+
+def test_read_payload():
+    payload = read_payload(_request(PAYLOAD.model_dump_json().encode()))
+
+    assert payload == PAYLOAD
+
+
+@pytest.mark.parametrize(
+    ("body", "status_code"),
+    [
+        pytest.param(b"{not json", 400, id="malformed"),
+        pytest.param(b"", 400, id="empty"),
+        pytest.param(b'{"subject": "\xff"}', 400, id="not-utf8"),
+        pytest.param(b'{"subject": "Test"}', 422, id="missing-fields"),
+        pytest.param(b"[1, 2]", 422, id="not-an-object"),
+    ],
+)
+def test_read_payload_rejects_invalid_bodies(body: bytes, status_code: int):
+    response = read_payload(_request(body))
+
+    assert isinstance(response, func.HttpResponse)
+    assert response.status_code == status_code
+
+
+def test_build_response_reports_transaction_and_sinks():
+    transaction = Transaction(
+        date_local=datetime(2026, 1, 1), pocket="Pocket", currency="COP", amount=1.0
+    )
+    result = IngestResult(
+        transaction=transaction,
+        sink_results=[SinkResult(name="sqlite", ok=True, elapsed_s=0.0123)],
+    )
+
+    body = json.loads(build_response(result, PAYLOAD).get_body())
+
+    assert body["ok"]
+    assert body["processed"] == transaction.model_dump(mode="json")
+    assert body["sinks"] == [
+        {"name": "sqlite", "ok": True, "elapsed_ms": 12.3, "error": None}
+    ]
+
+
+def test_build_response_reports_rejection():
+    response = build_response(None, PAYLOAD, rejected="Too large")
+
+    assert response.status_code == 200
+    assert json.loads(response.get_body())["rejected"] == "Too large"
+
+
+def test_server_errors_are_not_replayed():
+    cache: TTLCache[str, tuple[int, str]] = TTLCache(maxsize=10, ttl=60)
+    failed = build_sink_error_response(
+        PAYLOAD, [SinkResult(name="sheets", ok=False, elapsed_s=1.0, error="down")]
+    )
+
+    cache_response(cache, "key", failed)
+    assert get_replayed_response(cache, "key") is None
+
+    cache_response(cache, "key", build_response(None, PAYLOAD))
+    replayed = get_replayed_response(cache, "key")
+    assert replayed.status_code == 200
+    assert replayed.headers["Idempotent-Replayed"] == "true"
+    assert get_replayed_response(cache, None) is None
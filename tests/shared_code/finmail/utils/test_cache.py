@@ -0,0 +1,39 @@
+from pytest_mock import MockerFixture
+
+from shared_code.finmail.utils import cache
+from shared_code.finmail.utils.cache import TTLCache
+
+
+def test_get_and_set():
+    store: TTLCache[str, int] = TTLCache(maxsize=2, ttl=60)
+
+    store.set("a", 1)
+
+    assert store.get("a") == 1
+    assert store.get("missing") is None
+
+
+def test_evicts_least_recently_used():
+    store: TTLCache[str, int] = TTLCache(maxsize=2, ttl=60)
+    store.set("a", 1)
+    store.set("b", 2)
+    store.get("a")
+
+    store.set("c", 3)
+
+    assert store.get("b") is None
+    assert (store.get("a"), store.get("c")) == (1, 3)
+    assert len(store) == 2
+
+
+def test_entries_expire(mocker: MockerFixture):
+    monotonic = mocker.patch.object(cache.time, "monotonic", return_value=100.0)
+    store: TTLCache[str, int] = TTLCache(maxsize=2, ttl=10)
+    store.set("a", 1)
+
+    monotonic.return_value = 109.9
+    assert store.get("a") == 1
+
+    monotonic.return_value = 110.0
+    assert store.get("a") is None
+    assert len(store) == 0
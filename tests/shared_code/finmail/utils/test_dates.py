@@ -1,6 +1,12 @@
-from datetime import datetime
+from datetime import UTC, datetime
 
-from shared_code.finmail.utils.dates import parse_spanish_datetime_str
+import pytest
+from dateutil import tz
+
+from shared_code.finmail.utils.dates import (
+    parse_datetime_str,
+    parse_spanish_datetime_str,
+)
 
 
 def test_parse_spanish_datetime_str_valid():
@@ -18,3 +24,59 @@ def test_parse_spanish_datetime_str_invalid():
     assert parse_spanish_datetime_str("30 de Enero de 2026", "Invalid Time") is None
     assert parse_spanish_datetime_str(None, "10:10 am") is None
     assert parse_spanish_datetime_str("Date", None) is None
+
+
+@pytest.mark.parametrize(
+    "date_str, time_str, expected",
+    [
+        ("30 de enero de 2026", "10:10 am", datetime(2026, 1, 30, 10, 10)),
+        ("01 de febrero de 2026", "12:05 am", datetime(2026, 2, 1, 0, 5)),
+        ("10 de enero de 2026", "12:25 p.m.", datetime(2026, 1, 10, 12, 25)),
+        ("vie, 24 oct 2025", "11:15 p.m.", datetime(2025, 10, 24, 23, 15)),
+        ("1 de septiembre del 2025", "08:00", datetime(2025, 9, 1, 8, 0)),
+        ("January 30, 2026", "10:10 PM", datetime(2026, 1, 30, 22, 10)),
+        ("30 Jan 2026", "09:00:30", datetime(2026, 1, 30, 9, 0, 30)),
+        ("30/01/2026", "22:25", datetime(2026, 1, 30, 22, 25)),
+        ("2025-08-12\n      14:00:12", None, datetime(2025, 8, 12, 14, 0, 12)),
+        ("2025-08-12", None, datetime(2025, 8, 12)),
+    ],
+)
+def test_parse_datetime_str(date_str: str, time_str: str | None, expected: datetime):
+    assert parse_datetime_str(date_str, time_str) == expected
+
+
+@pytest.mark.parametrize(
+    "date_str, time_str",
+    [
+        (None, "10:10 am"),
+        ("Invalid Date", "10:10 am"),
+        ("30 de enero de 2026", "13:10 pm"),
+        ("31/02/2026", "10:10"),
+        ("30/01/2026", "25:10"),
+    ],
+)
+def test_parse_datetime_str_invalid(date_str: str | None, time_str: str):
+    assert parse_datetime_str(date_str, time_str) is None
+
+
+def test_parse_datetime_str_utc_suffix_converted_to_target_tz():
+    bogota = tz.gettz("America/Bogota")
+
+    dt = parse_datetime_str("24/10/2025", "04:15 UTC", target_tz=bogota)
+
+    assert dt == datetime(2025, 10, 24, 4, 15, tzinfo=UTC)
+    assert dt.tzinfo == bogota
+    assert dt.hour == 23
+
+
+def test_parse_datetime_str_source_tz():
+    dt = parse_datetime_str("24/10/2025", "04:15", source_tz=UTC)
+    assert dt == datetime(2025, 10, 24, 4, 15, tzinfo=UTC)
+
+
+def test_parse_datetime_str_local_values_attached_to_target_tz():
+    bogota = tz.gettz("America/Bogota")
+
+    dt = parse_datetime_str("24/10/2025", "04:15", target_tz=bogota)
+
+    assert dt == datetime(2025, 10, 24, 4, 15, tzinfo=bogota)
@@ -1,6 +1,13 @@
+import pytest
 from bs4 import BeautifulSoup
 
-from shared_code.finmail.utils.html import clean_html, extract_subject
+from shared_code.finmail.utils.html import (
+    clean_html,
+    estimate_node_count,
+    extract_subject,
+    strip_data_uris,
+    trim_forwarded_email,
+)
 
 
 def test_clean_html(to_clean_soup: BeautifulSoup):
@@ -25,3 +32,110 @@ def test_extract_subject(rappicard_soup: BeautifulSoup, to_clean_soup: Beautiful
     assert extracted_subject == "RappiCard - Resumen de transacción"
     none_subject = extract_subject(to_clean_soup)
     assert none_subject is None
+
+
+def test_trim_forwarded_email_keeps_innermost_forward():
+    html = """
+    <html><body>
+    <div dir="ltr">FYI, see below</div>
+    <div class="gmail_quote">
+        <div class="gmail_attr">---------- Forwarded message ---------<br>
+        Subject: Fwd: RappiCard</div>
+        <p>Outer forward text</p>
+        <div class="gmail_quote">
+            <div class="gmail_attr">---------- Forwarded message ---------<br>
+            Subject: RappiCard - Resumen de transacción</div>
+            <p>Monto</p><img src="https://t.example/p.gif" width="1" height="1">
+        </div>
+    </div>
+    <div data-smartmail="gmail_signature">Saludos, Juan</div>
+    </body></html>
+    """
+    soup = BeautifulSoup(html, "lxml")
+
+    trim_forwarded_email(soup)
+
+    text = soup.get_text(" ", strip=True)
+    assert "FYI" not in text
+    assert "Outer forward text" not in text
+    assert "Saludos" not in text
+    assert "Monto" in text
+    assert soup.find("img") is None
+    assert extract_subject(soup) == "RappiCard - Resumen de transacción"
+
+
+def test_trim_forwarded_email_without_quote_container():
+    html = """
+    <div>Please check this one</div>
+    <div>---------- Forwarded message ---------<br>Subject: Payment received</div>
+    <p>Payment Amount: $250</p>
+    """
+    soup = BeautifulSoup(html, "lxml")
+
+    trim_forwarded_email(soup)
+
+    text = soup.get_text(" ", strip=True)
+    assert "Please check" not in text
+    assert "Payment Amount: $250" in text
+    assert extract_subject(soup) == "Payment received"
+
+
+@pytest.mark.parametrize(
+    "separator",
+    ["-----Original Message-----", "-------- Mensaje original --------"],
+)
+def test_trim_forwarded_email_with_outlook_separator(separator: str):
+    html = f"""
+    <div>Reenvío el comprobante</div>
+    <div>{separator}<br>Subject: Payment received</div>
+    <p>Payment Amount: $250</p>
+    """
+    soup = BeautifulSoup(html, "lxml")
+
+    trim_forwarded_email(soup)
+
+    text = soup.get_text(" ", strip=True)
+    assert "Reenvío" not in text
+    assert extract_subject(soup) == "Payment received"
+
+
+def test_trim_forwarded_email_ignores_marker_phrases_in_content():
+    html = """
+    <p>Hola, este correo reemplaza el mensaje original enviado ayer.</p>
+    <table><tr><td>Monto</td><td>$250</td></tr></table>
+    <p>Conserve este mensaje original como comprobante.</p>
+    """
+    soup = BeautifulSoup(html, "lxml")
+
+    trim_forwarded_email(soup)
+
+    text = soup.get_text(" ", strip=True)
+    assert "reemplaza el mensaje original" in text
+    assert "Monto $250" in text
+
+
+def test_trim_forwarded_email_without_marker_is_noop():
+    html = '<p>Direct email</p><img src="logo.png" width="120" height="40">'
+    soup = BeautifulSoup(html, "lxml")
+
+    trim_forwarded_email(soup)
+
+    assert soup.find("p").text == "Direct email"
+    assert soup.find("img") is not None
+
+
+def test_strip_data_uris_removes_only_oversized():
+    small = "data:image/png;base64,AAAA"
+    large = "data:image/png;base64," + "A" * 5000
+    html = f'<img src="{small}"><img src="{large}">'
+
+    stripped = strip_data_uris(html, max_size=100)
+
+    assert small in stripped
+    assert large not in stripped
+    assert 'src="data:,"' in stripped
+
+
+def test_estimate_node_count():
+    assert estimate_node_count("<div><p>a</p><br><p>b</p></div>") == 4
+    assert estimate_node_count("") == 0
@@ -0,0 +1,50 @@
+import json
+from datetime import datetime
+
+import pytest
+
+from shared_code.finmail.models import Transaction
+from shared_code.finmail.utils import serialization
+from shared_code.finmail.utils.serialization import dumps, loads
+
+
+@pytest.fixture(name="decoder", params=["stdlib", "orjson"])
+def fixture_decoder(request: pytest.FixtureRequest, monkeypatch: pytest.MonkeyPatch):
+    if request.param == "stdlib":
+        monkeypatch.setattr(serialization, "orjson", None)
+    elif serialization.orjson is None:
+        pytest.skip("orjson not installed")
+    return request.param
+
+
+@pytest.mark.usefixtures("decoder")
+def test_loads():
+    assert loads(b'{"subject": "Compra", "amount": -1.5}') == {
+        "subject": "Compra",
+        "amount": -1.5,
+    }
+    assert loads('["á"]') == ["á"]
+
+
+@pytest.mark.usefixtures("decoder")
+@pytest.mark.parametrize("data", [b"{not json", b"", b'"\xff"'])
+def test_loads_rejects_invalid_documents(data: bytes):
+    with pytest.raises(ValueError):
+        loads(data)
+
+
+def test_dumps_encodes_nested_models():
+    transaction = Transaction(
+        date_local=datetime(2026, 1, 30, 10, 10),
+        pocket="RappiCard",
+        currency="COP",
+        amount=-25000.0,
+    )
+
+    encoded = dumps({"ok": True, "processed": transaction, "sinks": []})
+
+    assert json.loads(encoded) == {
+        "ok": True,
+        "processed": transaction.model_dump(mode="json"),
+        "sinks": [],
+    }
@@ -1,6 +1,14 @@
+import re
+import unicodedata
+
 import pytest
 
-from shared_code.finmail.utils.text import normalize
+from shared_code.finmail.utils.text import NORMALIZE_CACHE_MAX_LENGTH, normalize
+
+
+def _reference_normalize(s: str) -> str:
+    s = unicodedata.normalize("NFKD", s).encode("ascii", "ignore").decode("ascii")
+    return re.sub(r"\s+", " ", s).strip().lower()
 
 
 @pytest.mark.parametrize(
@@ -24,3 +32,23 @@ from shared_code.finmail.utils.text import normalize
 )
 def test_normalize(input_str: str | None, expected: str | None):
     assert normalize(input_str) == expected
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        "¡Hola,\xa0Juan!",
+        "N° de autorización",
+        "ﬁnanzas",
+        "Ωmega",
+        "\uff11\uff12\uff13",
+        "tab\tand\x1fseparator\u2003space",
+    ],
+)
+def test_normalize_matches_nfkd_reference(value: str):
+    assert normalize(value) == _reference_normalize(value)
+
+
+def test_normalize_long_string_not_cached():
+    value = "Transacción " * NORMALIZE_CACHE_MAX_LENGTH
+    assert normalize(value) == _reference_normalize(value)
@@ -0,0 +1,78 @@
+import logging
+
+import pytest
+from pytest_mock import MockerFixture
+
+from shared_code.finmail.utils import timing
+from shared_code.finmail.utils.timing import (
+    LatencyHistogram,
+    StageHistograms,
+    StageTimer,
+)
+
+
+def test_stage_timer_adds_up_repeated_stages(mocker: MockerFixture):
+    mocker.patch.object(timing.time, "perf_counter", side_effect=[0.0, 0.5, 1.0, 1.25])
+    timer = StageTimer()
+
+    with timer.stage("parse"):
+        pass
+    with timer.stage("parse"):
+        pass
+    timer.add("write", 0.002)
+
+    assert timer.timings == {"parse": 0.75, "write": 0.002}
+    assert timer.as_ms() == {"parse": 750.0, "write": 2.0}
+    assert timer.format() == "parse=750.0ms write=2.0ms"
+
+
+def test_stage_timer_records_failed_stages():
+    timer = StageTimer()
+
+    with pytest.raises(ValueError, match="boom"), timer.stage("parse"):
+        raise ValueError("boom")
+
+    assert "parse" in timer.timings
+
+
+def test_histogram_quantiles_use_bucket_bounds():
+    histogram = LatencyHistogram(buckets=(0.001, 0.01, 0.1))
+    for seconds in [0.0005] * 90 + [0.005] * 9 + [0.05]:
+        histogram.observe(seconds)
+
+    assert histogram.quantile(0.5) == 0.001
+    assert histogram.quantile(0.95) == 0.01
+    assert histogram.quantile(1.0) == 0.05
+
+
+def test_histogram_overflow_uses_max():
+    histogram = LatencyHistogram(buckets=(0.001,))
+    histogram.observe(3.0)
+
+    assert histogram.quantile(0.99) == 3.0
+    assert histogram.snapshot()["max_ms"] == 3000.0
+
+
+def test_empty_histogram_snapshot():
+    assert LatencyHistogram().snapshot() == {
+        "count": 0,
+        "mean_ms": 0.0,
+        "p50_ms": 0.0,
+        "p95_ms": 0.0,
+        "p99_ms": 0.0,
+        "max_ms": 0.0,
+    }
+
+
+def test_stage_histograms_log_summary(caplog: pytest.LogCaptureFixture):
+    histograms = StageHistograms(summary_every=2)
+
+    with caplog.at_level(logging.INFO, logger=timing.__name__):
+        histograms.record({"parse": 0.002, "write": 0.2})
+        assert not caplog.records
+        histograms.record({"parse": 0.004})
+
+    snapshot = histograms.snapshot()
+    assert snapshot["parse"]["count"] == 2
+    assert snapshot["write"]["count"] == 1
+    assert "Stage latency summary" in caplog.text
@@ -0,0 +1,126 @@
+import asyncio
+from collections.abc import Iterator
+
+import pytest
+from pytest_mock import MockerFixture
+
+from shared_code.finmail.clients.google import GoogleSheetsClient
+from shared_code.finmail.domain.classification import (
+    ClassificationRule,
+    TransactionClassifier,
+)
+from shared_code.finmail.models import Transaction
+from shared_code.finmail.utils.tracing import (
+    NoopSpan,
+    disable_tracing,
+    enable_tracing,
+    start_span,
+    traced,
+    tracing_enabled,
+)
+
+pytest.importorskip("opentelemetry.sdk")
+
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import (
+    InMemorySpanExporter,
+)
+from opentelemetry.trace import StatusCode
+
+
+@pytest.fixture(name="exporter")
+def fixture_exporter() -> Iterator[InMemorySpanExporter]:
+    exporter = InMemorySpanExporter()
+    tracer_provider = TracerProvider()
+    tracer_provider.add_span_processor(SimpleSpanProcessor(exporter))
+    enable_tracing(tracer_provider)
+    yield exporter
+    disable_tracing()
+
+
+def test_start_span_is_noop_when_disabled():
+    assert not tracing_enabled()
+
+    with start_span("finmail.test", {"key": "value"}) as span:
+        span.set_attribute("other", 1)
+
+    assert isinstance(span, NoopSpan)
+    assert not span.is_recording()
+
+
+def test_start_span_records_nested_spans(exporter: InMemorySpanExporter):
+    with start_span("outer"), start_span("inner", {"a": 1, "b": None}) as span:
+        span.set_attribute("c", "x")
+
+    inner, outer = exporter.get_finished_spans()
+    assert (inner.name, outer.name) == ("inner", "outer")
+    assert inner.parent.span_id == outer.context.span_id
+    assert dict(inner.attributes) == {"a": 1, "c": "x"}
+
+
+def test_start_span_records_exceptions(exporter: InMemorySpanExporter):
+    with pytest.raises(ValueError, match="boom"), start_span("failing"):
+        raise ValueError("boom")
+
+    (span,) = exporter.get_finished_spans()
+    assert span.status.status_code == StatusCode.ERROR
+    assert span.events[0].name == "exception"
+
+
+def test_traced_wraps_sync_and_async_functions(exporter: InMemorySpanExporter):
+    @traced("sync", {"kind": "sync"})
+    def add(a: int, b: int) -> int:
+        return a + b
+
+    @traced("async")
+    async def aadd(a: int, b: int) -> int:
+        await asyncio.sleep(0)
+        return a + b
+
+    assert add(1, 2) == 3
+    assert asyncio.run(aadd(1, 2)) == 3
+    assert [span.name for span in exporter.get_finished_spans()] == ["sync", "async"]
+    assert add.__name__ == "add"
+
+
+def test_gspread_calls_are_traced(
+    mocker: MockerFixture,
+    exporter: InMemorySpanExporter,
+    transactions: list[Transaction],
+):
+    mocker.patch.object(GoogleSheetsClient, "_authorize")
+    client = GoogleSheetsClient({})
+    sheet = client.client.open_by_key.return_value.sheet1
+    sheet.col_values.return_value = ["Date", "2026-01-01"]
+
+    client.insert_transactions("sheet-id", transactions)
+
+    spans = {span.name: span for span in exporter.get_finished_spans()}
+    assert list(spans) == [
+        "gspread.open_by_key",
+        "gspread.sheet1",
+        "gspread.col_values",
+        "gspread.insert_rows",
+    ]
+    assert spans["gspread.col_values"].attributes["gspread.rows"] == 2
+    insert = spans["gspread.insert_rows"].attributes
+    assert insert["gspread.method"] == "insert_rows"
+    assert insert["gspread.rows"] == 2
+    assert insert["gspread.bytes"] > 0
+
+
+def test_rule_reloads_are_traced(mocker: MockerFixture, exporter: InMemorySpanExporter):
+    provider = mocker.Mock()
+    provider.get_rules.return_value = [
+        ClassificationRule(conditions="merchant: uber", category="Transport"),
+        ClassificationRule(conditions="description: rent", category="Housing"),
+    ]
+
+    TransactionClassifier(provider).refresh_rules()
+
+    (span,) = exporter.get_finished_spans()
+    assert span.name == "finmail.load_rules"
+    assert span.attributes["finmail.rules.loaded"] == 2
+    assert span.attributes["finmail.rules.count"] == 2
+    assert span.attributes["finmail.rules.reload_ms"] >= 0